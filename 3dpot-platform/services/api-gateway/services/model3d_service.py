@@ -430,14 +430,14 @@ Provide analysis in JSON format with:
             return geometries
         
         if settings.resolution == "low":
+            # copy(update=...) evita passar `parameters` duas vezes ao construtor
             return [
-                Geometry(
-                    **geo.dict(exclude_unset=True),
-                    parameters={
+                geo.copy(update={
+                    "parameters": {
                         **geo.parameters,
                         "segments": max(8, geo.parameters.get('segments', 16) // 2)
                     }
-                )
+                })
                 for geo in geometries
             ]
         
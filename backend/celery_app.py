@@ -86,6 +86,23 @@ def run_simulation_task(self, simulation_id: str, model_path: str, simulation_da
         model_path: Caminho para o arquivo do modelo 3D
         simulation_data: Dados da simulação
     """
+    return execute_simulation_job(simulation_id, model_path, simulation_data,
+                                  task_id=self.request.id)
+
+def execute_simulation_job(simulation_id: str, model_path: str, simulation_data: dict,
+                           task_id: str = None) -> dict:
+    """
+    Ciclo de vida completo de uma simulação: status, execução e persistência
+    
+    Compartilhado pelos backends de execução (Celery, pool de processos local
+    e inline); o progresso é publicado via `update_simulation_status`.
+    
+    Args:
+        simulation_id: ID da simulação
+        model_path: Caminho para o arquivo do modelo 3D
+        simulation_data: Dados da simulação
+        task_id: ID da tarefa no backend de execução (se houver)
+    """
     try:
         logger.info(f"Iniciando simulação {simulation_id}")
         
@@ -94,8 +111,8 @@ def run_simulation_task(self, simulation_id: str, model_path: str, simulation_da
         
         # Importar serviço de simulação
         from backend.services.simulation_service import SimulationService
-        from backend.core.database import SessionLocal
-        from backend.models import Simulation, Model3D
+        from backend.database import SessionLocal
+        from backend.models import Simulation
         
         # Criar sessão do banco
         db = SessionLocal()
@@ -110,7 +127,8 @@ def run_simulation_task(self, simulation_id: str, model_path: str, simulation_da
                 raise ValueError(f"Simulação {simulation_id} não encontrada")
             
             # Atualizar informações de execução
-            simulation.celery_task_id = self.request.id
+            if task_id:
+                simulation.celery_task_id = task_id
             simulation.started_at = datetime.utcnow()
             simulation.status = "running"
             simulation.progress = 25
@@ -128,8 +146,11 @@ def run_simulation_task(self, simulation_id: str, model_path: str, simulation_da
             update_simulation_status(simulation_id, "running", progress=80)
             
             if result.get("status") == "completed":
-                # Salvar resultados
-                simulation.results = result
+                # Salvar resultados: séries numéricas vão para o store,
+                # o banco guarda apenas o resumo
+                simulation.results = simulation_service.result_store.save_for_simulation(
+                    simulation_id, result
+                )
                 simulation.status = "completed"
                 simulation.progress = 100
                 simulation.completed_at = datetime.utcnow()
@@ -166,7 +187,7 @@ def run_simulation_task(self, simulation_id: str, model_path: str, simulation_da
         except Exception as update_error:
             logger.error(f"Erro ao atualizar status: {update_error}")
         
-        # Re-lançar exceção para Celery
+        # Re-lançar exceção para o backend de execução
         raise
 
 @celery_app.task(name='cancel_simulation_task')
@@ -180,7 +201,7 @@ def cancel_simulation_task(simulation_id: str):
     try:
         logger.info(f"Cancelando simulação {simulation_id}")
         
-        from backend.core.database import SessionLocal
+        from backend.database import SessionLocal
         from backend.models import Simulation
         
         db = SessionLocal()
@@ -247,7 +268,7 @@ def cleanup_old_simulations():
     try:
         logger.info("Iniciando limpeza de simulações antigas")
         
-        from backend.core.database import SessionLocal
+        from backend.database import SessionLocal
         from backend.models import Simulation
         
         db = SessionLocal()
@@ -260,6 +281,9 @@ def cleanup_old_simulations():
                 Simulation.completed_at < cutoff_date
             ).all()
             
+            from backend.services.simulation_result_store import SimulationResultStore
+            result_store = SimulationResultStore()
+            
             deleted_count = 0
             for simulation in old_simulations:
                 # Remover também os logs de execução
@@ -271,7 +295,8 @@ def cleanup_old_simulations():
                 for log in logs:
                     db.delete(log)
                 
-                # Remover simulação
+                # Remover séries persistidas e a simulação
+                result_store.delete_for_simulation(simulation.id)
                 db.delete(simulation)
                 deleted_count += 1
             
@@ -295,7 +320,7 @@ def monitor_simulation_health():
     Verifica simulações que estão rodando há muito tempo
     """
     try:
-        from backend.core.database import SessionLocal
+        from backend.database import SessionLocal
         from backend.models import Simulation
         
         db = SessionLocal()
@@ -344,7 +369,7 @@ def update_simulation_status(simulation_id: str, status: str, progress: float =
         error_message: Mensagem de erro
     """
     try:
-        from backend.core.database import SessionLocal
+        from backend.database import SessionLocal
         from backend.models import Simulation
         
         db = SessionLocal()
@@ -366,6 +391,15 @@ def update_simulation_status(simulation_id: str, status: str, progress: float =
             
     except Exception as e:
         logger.error(f"Erro ao atualizar status da simulação {simulation_id}: {e}")
+    
+    # Notificar a sala WebSocket da simulação
+    from backend.services.simulation_progress import publish_simulation_event
+    publish_simulation_event(simulation_id, {
+        "event": "status",
+        "status": status,
+        "progress": progress,
+        "error_message": error_message
+    })
 
 def calculate_and_save_metrics(simulation, result: dict, db):
     """
@@ -55,6 +55,7 @@ DATABASE_URL = (
 REDIS_HOST = os.environ.get("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.environ.get("REDIS_PORT", "6379"))
 REDIS_DB = int(os.environ.get("REDIS_DB", "0"))
+REDIS_URL = os.environ.get("REDIS_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}")
 
 # Storage (S3/MinIO)
 S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL", "http://localhost:9000")
@@ -92,6 +93,47 @@ TEMP_STORAGE_PATH = ROOT_DIR / "storage" / "temp"
 LOGS_PATH = ROOT_DIR / "logs"
 CACHE_PATH = ROOT_DIR / "cache"
 
+# Collision shape cache (simulation workers)
+COLLISION_CACHE_PATH = CACHE_PATH / "collision_shapes"
+COLLISION_CACHE_MAX_BYTES = int(os.environ.get("COLLISION_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# Parametric model generation cache (content-addressed, LRU by size)
+MODEL_GENERATION_CACHE_PATH = MODELS_STORAGE_PATH / "generation_cache"
+MODEL_GENERATION_CACHE_MAX_BYTES = int(os.environ.get("MODEL_GENERATION_CACHE_MAX_MB", "1024")) * 1024 * 1024
+
+# CadQuery feature tree (intermediate BRep solids keyed by spec prefix)
+CADQUERY_FEATURE_CACHE_PATH = CACHE_PATH / "cadquery_features"
+CADQUERY_FEATURE_CACHE_MAX_BYTES = int(os.environ.get("CADQUERY_FEATURE_CACHE_MAX_MB", "256")) * 1024 * 1024
+CADQUERY_FEATURE_MEMORY_ENTRIES = int(os.environ.get("CADQUERY_FEATURE_MEMORY_ENTRIES", "64"))
+
+# Model render pool (OpenSCAD subprocesses / CadQuery worker processes)
+MODELING_MAX_CONCURRENCY = int(os.environ.get("MODELING_MAX_CONCURRENCY", str(os.cpu_count() or 2)))
+MODELING_RENDER_TIMEOUT = float(os.environ.get("MODELING_RENDER_TIMEOUT", "60"))
+
+# Batch model generation (events relayed to WebSocket rooms via Redis pub/sub)
+MODELING_BATCH_MAX_REQUESTS = int(os.environ.get("MODELING_BATCH_MAX_REQUESTS", "500"))
+MODELING_BATCH_CHANNEL = os.environ.get("MODELING_BATCH_CHANNEL", "modeling_batch")
+
+# G-code generated by the in-process slicer
+GCODE_STORAGE_PATH = ROOT_DIR / "storage" / "gcode"
+GCODE_COMPRESSION = os.environ.get("GCODE_COMPRESSION", "false").lower() == "true"
+
+# Simulation results (summary in the database, numeric series on disk/Redis)
+SIMULATION_RESULTS_PATH = ROOT_DIR / "storage" / "results"
+SIMULATION_RESULT_TTL = int(os.environ.get("SIMULATION_RESULT_TTL", "3600"))
+
+# Parameter sweeps (process pool fan-out)
+SIMULATION_SWEEP_MAX_POINTS = int(os.environ.get("SIMULATION_SWEEP_MAX_POINTS", "500"))
+SIMULATION_SWEEP_MAX_WORKERS = int(os.environ.get("SIMULATION_SWEEP_MAX_WORKERS", str(os.cpu_count() or 2)))
+
+# Simulation execution backend: "celery", "process" (local pool) or "inline"
+SIMULATION_EXECUTOR = os.environ.get("SIMULATION_EXECUTOR", "celery")
+SIMULATION_EXECUTOR_WORKERS = int(os.environ.get("SIMULATION_EXECUTOR_WORKERS", str(os.cpu_count() or 2)))
+
+# Simulation progress events (Redis pub/sub -> WebSocket rooms)
+SIMULATION_PROGRESS_CHANNEL = os.environ.get("SIMULATION_PROGRESS_CHANNEL", "simulation_progress")
+SIMULATION_PROGRESS_MAX_RATE = float(os.environ.get("SIMULATION_PROGRESS_MAX_RATE", "5"))
+
 # Ensure directories exist
 for path in [MODELS_STORAGE_PATH, TEMP_STORAGE_PATH, LOGS_PATH, CACHE_PATH]:
     path.mkdir(parents=True, exist_ok=True)
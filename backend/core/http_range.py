@@ -0,0 +1,203 @@
+"""
+Respostas de arquivo com suporte a HTTP Range (RFC 7233)
+Um único intervalo `bytes=início-fim` é servido com 206; múltiplos intervalos
+ou um `If-Range` desatualizado recebem o arquivo inteiro (200). Arquivos
+ainda em gravação são acompanhados até o fim da escrita; se a escrita for
+interrompida a resposta é abortada, em vez de terminar com um corpo truncado
+"""
+
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+RANGE_CHUNK_BYTES = 1 << 16
+
+# Intervalo entre leituras de um arquivo em gravação
+GROWING_POLL_SECONDS = 0.2
+
+# Sem crescimento por este tempo, a gravação é considerada abandonada
+GROWING_IDLE_TIMEOUT = 60.0
+
+
+class IncompleteFileError(IOError):
+    """Gravação interrompida enquanto o arquivo era servido"""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Intervalo pedido como (início, fim) inclusivos
+
+    Returns:
+        None para servir o arquivo inteiro
+
+    Raises:
+        HTTPException 416 se o intervalo estiver fora do arquivo
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text == "":
+            # Sufixo: os últimos N bytes
+            length = int(end_text)
+            if length <= 0:
+                raise ValueError
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or end < start:
+        raise HTTPException(
+            status_code=416,
+            detail="Intervalo solicitado fora do arquivo",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, min(end, size - 1)
+
+
+def _iter_file_range(path: Path, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(RANGE_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def ranged_file_response(request: Request, path: Path, media_type: str,
+                         filename: Optional[str] = None,
+                         disposition: str = "attachment",
+                         headers: Optional[Dict[str, str]] = None) -> Response:
+    """Arquivo inteiro (200) ou o intervalo pedido no cabeçalho Range (206)"""
+    path = Path(path)
+    stat = path.stat()
+    headers = dict(headers or {})
+    headers.setdefault("ETag", f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"')
+    headers["Accept-Ranges"] = "bytes"
+
+    if_range = request.headers.get("if-range")
+    byte_range = None
+    if if_range is None or if_range == headers["ETag"]:
+        byte_range = parse_range(request.headers.get("range"), stat.st_size)
+
+    if byte_range is None:
+        return FileResponse(
+            path=str(path),
+            media_type=media_type,
+            filename=filename,
+            content_disposition_type=disposition,
+            headers=headers
+        )
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    headers["Content-Length"] = str(end - start + 1)
+    if filename:
+        headers["Content-Disposition"] = f'{disposition}; filename="{filename}"'
+    return StreamingResponse(
+        _iter_file_range(path, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
+
+
+async def _follow_file(path: Path, start: int, is_growing: Callable[[], bool],
+                       is_failed: Optional[Callable[[], bool]],
+                       poll_interval: float, idle_timeout: float) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        idle = 0.0
+        while True:
+            chunk = f.read(RANGE_CHUNK_BYTES)
+            if chunk:
+                idle = 0.0
+                yield chunk
+                continue
+            # Fim atual do arquivo: terminou ou ainda vem mais
+            if not is_growing():
+                # Arquivo apagado (falha) ou escrita abandonada: abortar a resposta
+                if not path.exists() or (is_failed is not None and is_failed()):
+                    raise IncompleteFileError(f"Gravação de {path.name} interrompida")
+                chunk = f.read()
+                if chunk:
+                    yield chunk
+                return
+            if idle >= idle_timeout:
+                raise IncompleteFileError(f"Gravação de {path.name} sem progresso por {idle_timeout:.0f}s")
+            await asyncio.sleep(poll_interval)
+            idle += poll_interval
+
+
+def growing_file_response(request: Request, path: Path, media_type: str,
+                          is_growing: Callable[[], bool],
+                          is_failed: Optional[Callable[[], bool]] = None,
+                          filename: Optional[str] = None,
+                          disposition: str = "attachment",
+                          headers: Optional[Dict[str, str]] = None,
+                          poll_interval: float = GROWING_POLL_SECONDS,
+                          idle_timeout: float = GROWING_IDLE_TIMEOUT) -> Response:
+    """
+    Arquivo que pode ainda estar sendo gravado
+
+    Concluído, é servido por `ranged_file_response`. Em gravação, o tamanho
+    final é desconhecido: sem Range o corpo acompanha o arquivo até o fim da
+    escrita (200, sem Content-Length); com Range são servidos os bytes já
+    gravados (206 com tamanho total `*`), e um início além deles recebe 416.
+    `is_failed` distingue escrita abandonada de escrita concluída.
+    """
+    path = Path(path)
+    if not is_growing():
+        return ranged_file_response(request, path, media_type, filename, disposition, headers)
+
+    size = path.stat().st_size
+    headers = dict(headers or {})
+    headers["Accept-Ranges"] = "bytes"
+    headers["X-Content-Complete"] = "false"
+    if filename:
+        headers["Content-Disposition"] = f'{disposition}; filename="{filename}"'
+
+    header = request.headers.get("range")
+    if not header or not header.startswith("bytes=") or "," in header:
+        return StreamingResponse(
+            _follow_file(path, 0, is_growing, is_failed, poll_interval, idle_timeout),
+            media_type=media_type,
+            headers=headers
+        )
+
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        # Sufixos dependem do tamanho final, ainda desconhecido
+        raise HTTPException(
+            status_code=416,
+            detail="Intervalo indisponível durante a gravação do arquivo",
+            headers={"Content-Range": "bytes */*", "Retry-After": "1"}
+        )
+    if start >= size or end < start:
+        raise HTTPException(
+            status_code=416,
+            detail="Intervalo ainda não gravado",
+            headers={"Content-Range": "bytes */*", "Retry-After": "1"}
+        )
+
+    end = min(end, size - 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/*"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_file_range(path, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
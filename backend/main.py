@@ -62,6 +62,51 @@ async def lifespan(app: FastAPI):
         database_url=DATABASE_URL[:20] + "...",
     )
     
+    # Relay Redis -> WebSocket dos eventos de progresso das simulações
+    progress_relay = None
+    batch_relay = None
+    try:
+        from app.websocket.manager import websocket_manager
+        from backend.services.simulation_progress import SimulationProgressRelay
+        progress_relay = SimulationProgressRelay(websocket_manager)
+        await progress_relay.start()
+        
+        # Eventos da geração de modelos em lote (sala "modeling_batch_<id>")
+        from backend.core.config import MODELING_BATCH_CHANNEL
+        from backend.services.batch_generation import batch_room
+        batch_relay = SimulationProgressRelay(
+            websocket_manager, channel=MODELING_BATCH_CHANNEL,
+            room=batch_room, id_field="batch_id"
+        )
+        await batch_relay.start()
+    except Exception as e:
+        logger.warning("simulation_progress_relay_unavailable", error=str(e))
+        progress_relay = batch_relay = None
+    
+    # Índices das filas de impressão reconstruídos a partir do banco
+    try:
+        from backend.database import SessionLocal
+        from backend.routers.printing3d import print3d_service
+        db = SessionLocal()
+        try:
+            print3d_service.queues.rebuild(db)
+            # Posições renumeradas na reconstrução
+            db.commit()
+        finally:
+            db.close()
+    except Exception as e:
+        logger.warning("print_queue_index_unavailable", error=str(e))
+    
+    # G-code parcial de gerações interrompidas (processo encerrado durante a escrita)
+    try:
+        from backend.core.config import GCODE_STORAGE_PATH
+        from backend.services.gcode_stream import sweep_abandoned
+        removed = sweep_abandoned(GCODE_STORAGE_PATH)
+        if removed:
+            logger.info("abandoned_gcode_removed", count=removed)
+    except Exception as e:
+        logger.warning("gcode_sweep_failed", error=str(e))
+    
     try:
         logger.info("application_started", status="success")
         yield
@@ -71,6 +116,11 @@ async def lifespan(app: FastAPI):
     finally:
         # Shutdown
         logger.info("application_shutdown", status="initiated")
+        for relay in (progress_relay, batch_relay):
+            if relay is not None:
+                await relay.stop()
+        from backend.services.model_render_pool import shutdown_model_render_pool
+        shutdown_model_render_pool(wait=False)
         logger.info("application_shutdown", status="completed")
 
 
@@ -15,6 +15,8 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
+from .geometry import GeometryMetrics, GeometryMetricsType
+
 Base = declarative_base()
 
 class User(Base):
@@ -191,6 +193,7 @@ class Model3D(Base):
     numero_faces = Column(Integer, nullable=True)
     volume_calculado = Column(Numeric(12, 3), nullable=True)
     area_superficie = Column(Numeric(12, 3), nullable=True)
+    metricas_geometria = Column(GeometryMetricsType, nullable=True)  # GeometryMetrics da versão atual
     
     # Engine de geração
     engine = Column(Enum('cadquery', 'openscad', 'slant3d', 'manual', name='model_engine'))
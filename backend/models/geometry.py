@@ -0,0 +1,80 @@
+"""
+Métricas Geométricas do Modelo 3D
+Registro calculado uma vez por versão do arquivo e persistido em
+`Model3D.metricas_geometria`; orçamento, simulação e impressão leem daqui
+em vez de recarregar a malha
+"""
+
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import JSON
+from sqlalchemy.types import TypeDecorator
+
+# Incrementar quando o cálculo mudar: registros antigos são recalculados
+GEOMETRY_METRICS_VERSION = 1
+
+
+@dataclass
+class GeometryMetrics:
+    """Métricas de uma malha (mm, mm², mm³; inércia por densidade unitária em mm⁵)"""
+    vertices: int
+    faces: int
+    volume_mm3: float
+    surface_area_mm2: float
+    bounds_mm: List[List[float]]
+    dimensions_mm: Dict[str, float]
+    centroid_mm: List[float]
+    inertia_tensor_mm5: List[List[float]]
+    projected_area_mm2: Dict[str, float]
+    convex_hull_volume_mm3: Optional[float] = None
+    watertight: Optional[bool] = None
+    support_volume_mm3: Optional[float] = None
+    critical_overhang_area_mm2: Optional[float] = None
+    min_wall_thickness_mm: Optional[float] = None
+    source_sha256: Optional[str] = None
+    version: int = GEOMETRY_METRICS_VERSION
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GeometryMetrics":
+        """Reconstruir a partir do JSON; chaves desconhecidas vão para `extra`"""
+        known = {f.name for f in fields(cls)}
+        values = {k: v for k, v in data.items() if k in known}
+        values.setdefault("extra", {}).update({k: v for k, v in data.items() if k not in known})
+        return cls(**values)
+
+    @property
+    def is_current(self) -> bool:
+        return self.version == GEOMETRY_METRICS_VERSION
+
+    def mass_kg(self, density_g_cm3: float) -> float:
+        """Massa do sólido para a densidade do material"""
+        return self.volume_mm3 / 1000.0 * density_g_cm3 / 1000.0
+
+    def material_volume_mm3(self, include_support: bool = True) -> float:
+        """Volume de material da peça, somando o suporte estimado quando conhecido"""
+        if not include_support or self.support_volume_mm3 is None:
+            return self.volume_mm3
+        return self.volume_mm3 + self.support_volume_mm3
+
+
+class GeometryMetricsType(TypeDecorator):
+    """Coluna JSON que grava e devolve `GeometryMetrics`"""
+    impl = JSON
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, GeometryMetrics):
+            return value.to_dict()
+        return GeometryMetrics.from_dict(value).to_dict()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return GeometryMetrics.from_dict(value)
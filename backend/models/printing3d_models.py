@@ -19,7 +19,7 @@ from uuid import uuid4, UUID
 from decimal import Decimal
 
 from sqlalchemy import (
-    Boolean, Column, DateTime, Enum, ForeignKey, Integer, 
+    Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, 
     JSON, Numeric, String, Text, Float, UniqueConstraint
 )
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
@@ -46,6 +46,7 @@ class Printer(Base):
     volume_impressao_x = Column(Float, nullable=False)  # mm
     volume_impressao_y = Column(Float, nullable=False)  # mm
     volume_impressao_z = Column(Float, nullable=False)  # mm
+    diametro_bico = Column(Float, default=0.4)  # mm
     
     temperatura_bico_max = Column(Integer, nullable=False)
     temperatura_bico_min = Column(Integer, nullable=False)
@@ -152,7 +153,7 @@ class PrintJob(Base):
     # Relacionamentos
     user_id = Column(PGUUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     project_id = Column(PGUUID(as_uuid=True), ForeignKey("projects.id"), nullable=True)
-    printer_id = Column(PGUUID(as_uuid=True), ForeignKey("printers.id"), nullable=False)
+    printer_id = Column(PGUUID(as_uuid=True), ForeignKey("printers.id"), nullable=True)  # Vazio: escalonador da fazenda
     material_id = Column(PGUUID(as_uuid=True), ForeignKey("materials.id"), nullable=False)
     
     # Informações do job
@@ -173,6 +174,7 @@ class PrintJob(Base):
                              default='none')
     paredes_duplas = Column(Boolean, default=True)
     velocidade_ventilador = Column(Float, default=50)  # %
+    diametro_bico = Column(Float, nullable=True)  # mm exigido (vazio: qualquer)
     
     # Métricas do job
     tempo_estimado_segundos = Column(Integer, nullable=True)
@@ -243,6 +245,10 @@ class PrintJob(Base):
         return self.status == 'failed'
 
 
+# Itens da fila que ainda ocupam a impressora
+ACTIVE_QUEUE_STATUSES = ('queued', 'processing', 'paused')
+
+
 class PrintQueue(Base):
     """Fila de impressão para organizar jobs"""
     __tablename__ = "print_queue"
@@ -273,9 +279,11 @@ class PrintQueue(Base):
     printer = relationship("Printer", backref="print_queue")
     print_job = relationship("PrintJob", backref="print_queue_item")
     
-    # Constraints
+    # Constraints: posição única só entre os itens ainda na fila
     __table_args__ = (
-        UniqueConstraint('printer_id', 'posicao', name='uq_queue_position'),
+        Index('uq_queue_position', 'printer_id', 'posicao', unique=True,
+              postgresql_where=status.in_(ACTIVE_QUEUE_STATUSES),
+              sqlite_where=status.in_(ACTIVE_QUEUE_STATUSES)),
     )
 
 
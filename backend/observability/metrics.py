@@ -101,6 +101,87 @@ budget_calculations_total = Counter(
 )
 
 
+# === Simulation Cache Metrics ===
+
+collision_cache_hits_total = Counter(
+    "collision_cache_hits_total",
+    "Collision shape cache hits",
+    ["tier"],
+    registry=registry,
+)
+
+collision_cache_misses_total = Counter(
+    "collision_cache_misses_total",
+    "Collision shape cache misses (mesh parsed and decomposed)",
+    registry=registry,
+)
+
+collision_cache_evictions_total = Counter(
+    "collision_cache_evictions_total",
+    "Collision shape cache entries evicted from disk",
+    registry=registry,
+)
+
+
+# === Modeling Cache Metrics ===
+
+model_generation_cache_hits_total = Counter(
+    "model_generation_cache_hits_total",
+    "Parametric model generation cache hits",
+    registry=registry,
+)
+
+model_generation_cache_misses_total = Counter(
+    "model_generation_cache_misses_total",
+    "Parametric model generation cache misses (geometry regenerated)",
+    registry=registry,
+)
+
+model_generation_cache_evictions_total = Counter(
+    "model_generation_cache_evictions_total",
+    "Parametric model generation cache entries evicted from disk",
+    registry=registry,
+)
+
+cadquery_feature_stages_total = Counter(
+    "cadquery_feature_stages_total",
+    "CadQuery feature-tree stages reused from the cache or executed",
+    ["result"],
+    registry=registry,
+)
+
+cadquery_feature_cache_evictions_total = Counter(
+    "cadquery_feature_cache_evictions_total",
+    "CadQuery intermediate solids evicted from disk",
+    registry=registry,
+)
+
+
+# === Model Render Pool Metrics ===
+
+model_render_queue_depth = Gauge(
+    "model_render_queue_depth",
+    "Render jobs waiting for a free slot in the render pool",
+    ["engine"],
+    registry=registry,
+)
+
+model_renders_in_progress = Gauge(
+    "model_renders_in_progress",
+    "Render jobs currently running in the render pool",
+    ["engine"],
+    registry=registry,
+)
+
+model_render_duration_seconds = Histogram(
+    "model_render_duration_seconds",
+    "Model render time in seconds (excluding queue wait)",
+    ["engine", "status"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+    registry=registry,
+)
+
+
 # === Security Metrics (Sprint 8) ===
 
 rate_limit_hits_total = Counter(
@@ -240,6 +321,62 @@ class Metrics:
         """Record a budget calculation"""
         budget_calculations_total.inc()
     
+    @staticmethod
+    def collision_cache_hit(tier: str = "disk") -> None:
+        """Record a collision shape cache hit (memory or disk)"""
+        collision_cache_hits_total.labels(tier=tier).inc()
+    
+    @staticmethod
+    def collision_cache_miss() -> None:
+        """Record a collision shape cache miss"""
+        collision_cache_misses_total.inc()
+    
+    @staticmethod
+    def collision_cache_eviction() -> None:
+        """Record a collision shape cache eviction"""
+        collision_cache_evictions_total.inc()
+    
+    @staticmethod
+    def model_generation_cache_hit() -> None:
+        """Record a model generation cache hit"""
+        model_generation_cache_hits_total.inc()
+    
+    @staticmethod
+    def model_generation_cache_miss() -> None:
+        """Record a model generation cache miss"""
+        model_generation_cache_misses_total.inc()
+    
+    @staticmethod
+    def model_generation_cache_eviction() -> None:
+        """Record a model generation cache eviction"""
+        model_generation_cache_evictions_total.inc()
+    
+    @staticmethod
+    def cadquery_feature_stages(reused: int, executed: int) -> None:
+        """Record feature-tree stages reused from the cache and executed"""
+        cadquery_feature_stages_total.labels(result="reused").inc(reused)
+        cadquery_feature_stages_total.labels(result="executed").inc(executed)
+    
+    @staticmethod
+    def cadquery_feature_cache_eviction() -> None:
+        """Record a CadQuery feature cache eviction"""
+        cadquery_feature_cache_evictions_total.inc()
+    
+    @staticmethod
+    def model_render_queued(engine: str, delta: int = 1) -> None:
+        """Adjust the number of render jobs waiting for a slot"""
+        model_render_queue_depth.labels(engine=engine).inc(delta)
+    
+    @staticmethod
+    def model_render_started(engine: str, delta: int = 1) -> None:
+        """Adjust the number of render jobs running"""
+        model_renders_in_progress.labels(engine=engine).inc(delta)
+    
+    @staticmethod
+    def model_render_finished(engine: str, status: str, duration: float) -> None:
+        """Record a finished render job (ok, error, timeout or cancelled)"""
+        model_render_duration_seconds.labels(engine=engine, status=status).observe(duration)
+    
     @staticmethod
     def error(error_type: str, endpoint: str) -> None:
         """Record an error"""
@@ -10,15 +10,18 @@ Data: 2025-11-11
 Versão: 1.0.0 - Sprint 3
 """
 
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 from uuid import UUID, uuid4
 from typing import List, Optional, Dict, Any
+import asyncio
 import os
 import logging
 from pathlib import Path
 
+from backend.core.config import MODELING_BATCH_MAX_REQUESTS
+from backend.core.http_range import ranged_file_response
 from backend.database import get_db
 from backend.middleware.auth import get_current_user
 from backend.services.modeling_service import (
@@ -28,6 +31,15 @@ from backend.services.modeling_service import (
     ModelingSpecs,
     ModelingResult
 )
+from backend.services.mesh_format import COMPACT_MESH_MEDIA_TYPE, COMPACT_MESH_SUFFIX, ensure_compact
+from backend.services.mesh_lod import LOD_LEVELS, LOD_SUFFIXES, get_lods, remove_lods
+from backend.services.batch_generation import (
+    BatchGenerationJob,
+    BatchItem,
+    batch_room,
+    cancel_background_batch,
+    start_background_batch
+)
 from backend.schemas.modeling import (
     ModelingRequest,
     ModelingResponse,
@@ -90,12 +102,13 @@ async def generate_model(
             "funcionalidades": request.specs.features or []
         }
         
-        # Gerar modelo
-        result = service.generate_model_from_specs(
+        # Gerar modelo no pool de renderização (não bloqueia outras requisições)
+        result = await service.generate_model_from_specs_async(
             specifications=specs,
             project_id=request.project_id,
             engine=ModelingEngine(request.engine) if request.engine else None,
-            format=ModelFormat(request.format) if request.format else None
+            format=ModelFormat(request.format) if request.format else None,
+            job_id=request.job_id
         )
         
         if not result.success:
@@ -130,6 +143,24 @@ async def generate_model(
         )
 
 
+@router.delete("/modeling/jobs/{job_id}")
+async def cancel_model_generation(
+    job_id: str,
+    current_user = Depends(get_current_user)
+):
+    """Cancela uma geração em andamento (na fila ou renderizando)."""
+    service = get_modeling_service()
+    
+    if not service.cancel_generation(job_id):
+        raise HTTPException(
+            status_code=404,
+            detail="Job de renderização não encontrado"
+        )
+    
+    logger.info(f"Job de renderização cancelado: {job_id}")
+    return {"success": True, "message": f"Job {job_id} cancelado"}
+
+
 @router.get("/modeling/status/{model_id}", response_model=ModelingStatus)
 async def get_modeling_status(
     model_id: UUID,
@@ -180,67 +211,134 @@ async def get_modeling_status(
         )
 
 
+LOD_PATTERN = "^(" + "|".join(LOD_LEVELS) + ")$"
+
+MEDIA_TYPES = {
+    "stl": "application/vnd.ms-pki.stl",
+    "obj": "text/plain",
+    "step": "application/step",
+    COMPACT_MESH_SUFFIX.lstrip("."): COMPACT_MESH_MEDIA_TYPE
+}
+
+
+def _find_model_file(model_id: UUID, format: str) -> Path:
+    """Arquivo do modelo no formato solicitado (HTTP 404 se não existir)"""
+    service = get_modeling_service()
+    
+    # Buscar arquivo no formato solicitado
+    pattern = f"*{model_id}*.{format.lower()}"
+    model_files = list(service.storage_path.glob(pattern))
+    
+    if not model_files:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Modelo no formato {format} não encontrado"
+        )
+    
+    model_file = model_files[0]
+    
+    if not model_file.exists():
+        raise HTTPException(
+            status_code=404,
+            detail="Arquivo do modelo não encontrado"
+        )
+    return model_file
+
+
+async def _lod_response(request: Request, model_id: UUID, format: str, lod: str,
+                        download: bool) -> Response:
+    """
+    Resposta com o arquivo do nível de detalhe pedido (variantes geradas sob demanda)
+    
+    `format=3dpm` serve a malha compacta convertida a partir do STL; todas as
+    respostas aceitam requisições Range.
+    """
+    format = format.lower()
+    compact = format == COMPACT_MESH_SUFFIX.lstrip(".")
+    model_file = _find_model_file(model_id, "stl" if compact else format)
+    headers = {"X-Model-LOD": lod}
+    
+    if lod != "full":
+        if model_file.suffix.lower() not in LOD_SUFFIXES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Níveis de detalhe disponíveis apenas para {', '.join(sorted(LOD_SUFFIXES))}"
+            )
+        lods = await asyncio.to_thread(get_lods, model_file)
+        variant = lods.variants[lod]
+        model_file = lods.path(lod)
+        # Conteúdo endereçado por hash: o ETag muda apenas quando a variante muda
+        headers["ETag"] = f'"{variant.sha256}-{format}"'
+        headers["X-Model-Faces"] = str(variant.faces)
+    
+    if compact:
+        model_file = await asyncio.to_thread(ensure_compact, model_file)
+    
+    download_name = f"3dpot_model_{model_id}.{format}"
+    if lod != "full":
+        download_name = f"3dpot_model_{model_id}_{lod}.{format}"
+    
+    return ranged_file_response(
+        request,
+        model_file,
+        media_type=MEDIA_TYPES.get(format, "application/octet-stream"),
+        filename=download_name,
+        disposition="attachment" if download else "inline",
+        headers=headers
+    )
+
+
 @router.get("/modeling/download/{model_id}")
 async def download_model(
+    request: Request,
     model_id: UUID,
     format: str = Query(default="stl", description="Formato do arquivo"),
+    lod: str = Query(default="full", pattern=LOD_PATTERN, description="Nível de detalhe"),
     current_user = Depends(get_current_user)
 ):
     """
     Baixa modelo 3D gerado.
     
     Este endpoint permite baixar o modelo 3D gerado no formato especificado.
+    Com `lod=medium` ou `lod=low` é servida a variante decimada (25% ou 5%
+    das faces); `format=3dpm` entrega a malha compacta do 3dPot. Suporta
+    download parcial via cabeçalho Range.
     """
     try:
-        service = get_modeling_service()
-        
-        # Buscar modelo pelo ID
-        models_dir = service.storage_path
-        
-        # Buscar arquivo no formato solicitado
-        pattern = f"*{model_id}*.{format.lower()}"
-        model_files = list(models_dir.glob(pattern))
-        
-        if not model_files:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Modelo no formato {format} não encontrado"
-            )
-        
-        model_file = model_files[0]
-        
-        if not model_file.exists():
-            raise HTTPException(
-                status_code=404,
-                detail="Arquivo do modelo não encontrado"
-            )
+        response = await _lod_response(request, model_id, format, lod, download=True)
+        logger.info(f"Download do modelo 3D {model_id} ({format}, LOD {lod})")
+        return response
         
-        # Verificar se é arquivo STL
-        if format.lower() == "stl":
-            media_type = "application/vnd.ms-pki.stl"
-        elif format.lower() == "obj":
-            media_type = "text/plain"
-        elif format.lower() == "step":
-            media_type = "application/step"
-        else:
-            media_type = "application/octet-stream"
-        
-        # Nome do arquivo para download
-        download_name = f"3dpot_model_{model_id}.{format.lower()}"
-        
-        logger.info(f"Download do modelo 3D: {model_file}")
-        
-        return FileResponse(
-            path=str(model_file),
-            media_type=media_type,
-            filename=download_name,
-            headers={"Content-Disposition": f"attachment; filename={download_name}"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro no download do modelo: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="Erro interno do servidor"
         )
+
+
+@router.get("/modeling/preview/{model_id}")
+async def preview_model(
+    request: Request,
+    model_id: UUID,
+    format: str = Query(default="stl", description="Formato do arquivo"),
+    lod: str = Query(default="low", pattern=LOD_PATTERN, description="Nível de detalhe"),
+    current_user = Depends(get_current_user)
+):
+    """
+    Malha para pré-visualização no navegador.
+    
+    Servida inline e, por padrão, na variante de 5% das faces.
+    """
+    try:
+        return await _lod_response(request, model_id, format, lod, download=False)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Erro no download do modelo: {str(e)}")
+        logger.error(f"Erro na pré-visualização do modelo: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail="Erro interno do servidor"
@@ -260,7 +358,8 @@ async def delete_model(
         models_dir = service.storage_path
         
         # Buscar por padrão de ID
-        model_patterns = [f"*{model_id}*.stl", f"*{model_id}*.obj", f"*{model_id}*.step"]
+        model_patterns = [f"*{model_id}*.stl", f"*{model_id}*.obj", f"*{model_id}*.step",
+                          f"*{model_id}*{COMPACT_MESH_SUFFIX}"]
         
         deleted_files = []
         
@@ -269,6 +368,7 @@ async def delete_model(
             for model_file in model_files:
                 try:
                     model_file.unlink()
+                    remove_lods(model_file)
                     deleted_files.append(str(model_file))
                 except Exception as e:
                     logger.warning(f"Não foi possível excluir {model_file}: {str(e)}")
@@ -410,63 +510,82 @@ async def get_modeling_templates():
 @router.post("/modeling/batch-generate")
 async def batch_generate_models(
     requests: List[ModelingRequest],
-    current_user = Depends(get_current_user),
-    background_tasks: BackgroundTasks = None
+    stream: str = Query("ndjson", pattern="^(ndjson|websocket)$",
+                        description="Entrega dos resultados: NDJSON na resposta ou sala WebSocket"),
+    current_user = Depends(get_current_user)
 ):
-    """Gera múltiplos modelos 3D em lote."""
+    """
+    Gera múltiplos modelos 3D em lote.
+    
+    Requisições com especificações idênticas são renderizadas uma única vez
+    e os modelos únicos são gerados em paralelo no pool de renderização.
+    Com `stream=ndjson` cada resultado é enviado como uma linha JSON assim
+    que fica pronto; com `stream=websocket` o lote roda em segundo plano e
+    os eventos chegam à sala `modeling_batch_<batch_id>`.
+    """
+    if not requests:
+        raise HTTPException(status_code=400, detail="Lote vazio")
+    if len(requests) > MODELING_BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Lote excede o limite de {MODELING_BATCH_MAX_REQUESTS} requisições"
+        )
+    
     try:
         service = get_modeling_service()
-        results = []
         
-        for request in requests:
-            try:
-                # Converter especificações
-                specs = {
+        items = [
+            BatchItem(
+                index=index,
+                specifications={
                     "categoria": request.specs.category,
                     "material": request.specs.material,
                     "dimensoes": request.specs.dimensions,
                     "especificacoes_adicionais": request.specs.additional_specs or {},
                     "componentes": request.specs.components or [],
                     "funcionalidades": request.specs.features or []
-                }
-                
-                # Gerar modelo
-                result = service.generate_model_from_specs(
-                    specifications=specs,
-                    project_id=request.project_id,
-                    engine=ModelingEngine(request.engine) if request.engine else None,
-                    format=ModelFormat(request.format) if request.format else None
-                )
-                
-                results.append({
-                    "request_id": getattr(request, 'id', None),
-                    "success": result.success,
-                    "model_path": result.model_path,
-                    "message": result.message,
-                    "generation_time": result.generation_time
-                })
-                
-            except Exception as e:
-                results.append({
-                    "request_id": getattr(request, 'id', None),
-                    "success": False,
-                    "message": str(e),
-                    "model_path": None,
-                    "generation_time": 0
-                })
-        
-        logger.info(f"Geração em lote concluída: {len([r for r in results if r['success']])}/{len(results)} sucessos")
-        
-        return {
-            "total_requests": len(requests),
-            "successful": len([r for r in results if r['success']]),
-            "failed": len([r for r in results if not r['success']]),
-            "results": results
-        }
+                },
+                project_id=request.project_id,
+                engine=ModelingEngine(request.engine) if request.engine else None,
+                format=ModelFormat(request.format) if request.format else None
+            )
+            for index, request in enumerate(requests)
+        ]
+        job = BatchGenerationJob(service, items)
         
     except Exception as e:
         logger.error(f"Erro na geração em lote: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail="Erro interno do servidor na geração em lote"
-        )
\ No newline at end of file
+        )
+    
+    logger.info(f"Lote {job.batch_id}: {len(items)} requisições, {job.unique_models} modelos únicos")
+    
+    if stream == "websocket":
+        start_background_batch(job)
+        return JSONResponse(status_code=202, content={
+            "batch_id": job.batch_id,
+            "room": batch_room(job.batch_id),
+            "total_requests": len(items),
+            "unique_models": job.unique_models
+        })
+    
+    return StreamingResponse(
+        job.ndjson(),
+        media_type="application/x-ndjson",
+        headers={"X-Batch-Id": job.batch_id}
+    )
+
+
+@router.delete("/modeling/batch/{batch_id}")
+async def cancel_batch_generation(
+    batch_id: str,
+    current_user = Depends(get_current_user)
+):
+    """Cancela um lote em segundo plano (stream=websocket)."""
+    if not cancel_background_batch(batch_id):
+        raise HTTPException(status_code=404, detail="Lote não encontrado")
+    
+    logger.info(f"Lote cancelado: {batch_id}")
+    return {"success": True, "message": f"Lote {batch_id} cancelado"}
@@ -7,13 +7,14 @@ Rotas para gerenciamento de impressão 3D, incluindo:
 - Controle de materiais (Material)
 - Jobs de impressão (PrintJob)
 - Fila de impressão (PrintQueue)
+- Escalonamento da fazenda de impressão
 
 Autor: MiniMax Agent
 Data: 2025-11-13
 Versão: 2.0.0 - Sprint 6+
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Request
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
@@ -21,13 +22,15 @@ from uuid import UUID
 
 from ..database import get_db
 from ..core.config import settings
+from ..core.http_range import growing_file_response
 from ..services.print3d_service import Print3DService
 from ..schemas import (
     PrinterCreate, PrinterUpdate, MaterialCreate, PrintJobCreate,
     PrintSettingsCreate, PrintJobUpdate, PrintJobStatus
 )
 from ..middleware.auth import get_current_user
-from ..models import User
+from ..models import User, PrintJob
+from ..services.gcode_stream import discard_abandoned, is_abandoned, is_generating
 
 router = APIRouter()
 
@@ -447,18 +450,20 @@ async def update_job_status(
 async def generate_gcode(
     job_id: UUID,
     slicer_type: str = Query("cura", description="Tipo de slicer a usar"),
+    wait: bool = Query(True, description="Aguardar o fim do fatiamento (False: gerar em segundo plano)"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Gerar G-code para job"""
     try:
-        gcode_path = await print3d_service.generate_gcode(db, job_id, current_user.id, slicer_type)
+        gcode_path = await print3d_service.generate_gcode(db, job_id, current_user.id, slicer_type, wait)
         return {
             "success": True,
-            "message": "G-code gerado com sucesso",
+            "message": "G-code gerado com sucesso" if wait else "Geração de G-code iniciada",
             "data": {
                 "gcode_path": gcode_path,
-                "slicer_type": slicer_type
+                "slicer_type": slicer_type,
+                "em_andamento": is_generating(gcode_path)
             }
         }
     except Exception as e:
@@ -466,14 +471,22 @@ async def generate_gcode(
 
 @router.get("/print-jobs/{job_id}/download-gcode", response_model=FileResponse)
 async def download_gcode(
+    request: Request,
     job_id: UUID,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Download do G-code gerado"""
+    """
+    Download do G-code gerado
+    
+    Suporta Range; durante a geração o arquivo é servido enquanto cresce,
+    para que a impressora receba as primeiras camadas imediatamente.
+    """
     try:
-        jobs = await print3d_service.list_print_jobs(db, current_user.id, limit=1)
-        job = next((j for j in jobs if j.id == job_id), None)
+        job = db.query(PrintJob).filter(
+            PrintJob.id == job_id,
+            PrintJob.user_id == current_user.id
+        ).first()
         
         if not job:
             raise HTTPException(status_code=404, detail="Job não encontrado")
@@ -483,13 +496,19 @@ async def download_gcode(
         
         from pathlib import Path
         gcode_file = Path(job.arquivo_gcode)
+        if discard_abandoned(gcode_file):
+            raise HTTPException(status_code=404, detail="Geração do G-code interrompida; gere novamente")
         if not gcode_file.exists():
             raise HTTPException(status_code=404, detail="Arquivo G-code não existe")
         
-        return FileResponse(
-            path=str(gcode_file),
-            filename=f"{job.nome}.gcode",
-            media_type="text/plain"
+        compressed = gcode_file.suffix == ".gz"
+        return growing_file_response(
+            request,
+            gcode_file,
+            media_type="application/gzip" if compressed else "text/plain",
+            is_growing=lambda: is_generating(gcode_file),
+            is_failed=lambda: is_abandoned(gcode_file),
+            filename=f"{job.nome}.gcode.gz" if compressed else f"{job.nome}.gcode"
         )
     except HTTPException:
         raise
@@ -566,6 +585,26 @@ async def reorder_queue(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# =============================================================================
+# ROTAS DA FAZENDA DE IMPRESSÃO
+# =============================================================================
+
+@router.post("/print-farm/schedule", response_model=dict)
+async def schedule_print_farm(
+    dry_run: bool = Query(True, description="Apenas calcular o plano, sem atribuir jobs"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Distribuir jobs sem impressora entre as impressoras por material, volume, bico e fila"""
+    try:
+        plan = await print3d_service.schedule_farm(db, current_user.id, dry_run=dry_run)
+        return {
+            "success": True,
+            "data": plan
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # =============================================================================
 # ROTAS DE ESTATÍSTICAS
 # =============================================================================
@@ -3,6 +3,7 @@ API Routes para Sistema de Simulação Física
 Endpoints para criação, monitoramento e resultados de simulações
 """
 
+import json
 import logging
 from typing import List, Optional
 from uuid import UUID
@@ -15,12 +16,16 @@ from backend.database import get_db
 from backend.middleware.auth import get_current_user
 from backend.models import User, Simulation, Model3D
 from backend.schemas.simulation import (
-    SimulationCreate, SimulationResponse, SimulationResult,
+    SimulationCreate, SimulationResponse, SimulationResult, SimulationSweepRequest,
     SimulationStatusResponse, SimulationTemplate,
     DropTestConfig, StressTestConfig, MotionTestConfig, FluidTestConfig,
     ValidationResult
 )
+from backend.services.geometry_metrics import ensure_model_geometry
 from backend.services.simulation_service import SimulationService
+from backend.services.simulation_result_store import json_default
+from backend.services.simulation_executor import get_simulation_executor
+from backend.services.simulation_sweep import expand_parameter_grid, get_sweep_runner
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -88,9 +93,8 @@ async def create_simulation(
         db.commit()
         db.refresh(simulation)
         
-        # Iniciar simulação em background via Celery
-        from celery_app import run_simulation_task
-        run_simulation_task.delay(
+        # Enfileirar no backend de execução configurado (retorna imediatamente)
+        task_id = get_simulation_executor().submit(
             simulation.id,
             str(model_3d.arquivo_path),
             {
@@ -99,6 +103,9 @@ async def create_simulation(
                 "condicoes_iniciais": simulation_data.condicoes_iniciais
             }
         )
+        if task_id:
+            simulation.celery_task_id = task_id
+            db.commit()
         
         logger.info(f"Simulação {simulation.id} criada para usuário {current_user.id}")
         
@@ -122,6 +129,60 @@ async def create_simulation(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
+@router.post("/simulations/sweep")
+async def sweep_simulation(
+    sweep_data: SimulationSweepRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Varredura de parâmetros de simulação
+    
+    Expande a grade (produto cartesiano sobre os parâmetros base), distribui
+    os pontos num pool de processos e transmite cada resultado em NDJSON
+    assim que fica pronto. Pontos inválidos são reportados sem executar.
+    
+    - **grade**: `{"drop_height": [0.5, 1.0], "mass": {"start": 0.1, "stop": 1.0, "step": 0.1}}`
+    """
+    model_3d = db.query(Model3D).filter(
+        Model3D.id == sweep_data.modelo_3d_id,
+        Model3D.user_id == current_user.id
+    ).first()
+    
+    if not model_3d:
+        raise HTTPException(
+            status_code=404,
+            detail="Modelo 3D não encontrado ou acesso negado"
+        )
+    
+    try:
+        points = expand_parameter_grid(sweep_data.parametros, sweep_data.grade)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    geometry = ensure_model_geometry(model_3d, db)
+    
+    async def event_stream():
+        events = get_sweep_runner().run(
+            str(model_3d.arquivo_path),
+            sweep_data.tipo_simulacao.value,
+            points,
+            validator=simulation_service.validate_simulation_parameters,
+            geometry=geometry.to_dict() if geometry else None
+        )
+        try:
+            async for event in events:
+                yield json.dumps(event, default=json_default) + "\n"
+        finally:
+            # Cliente desconectado: fechar o gerador cancela os pontos pendentes
+            await events.aclose()
+    
+    logger.info(
+        f"Varredura de {len(points)} pontos ({sweep_data.tipo_simulacao.value}) "
+        f"iniciada para usuário {current_user.id}"
+    )
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
 @router.get("/simulations/{simulation_id}", response_model=SimulationResponse)
 async def get_simulation(
     simulation_id: UUID,
@@ -158,10 +219,17 @@ async def get_simulation(
 @router.get("/simulations/{simulation_id}/results", response_model=SimulationResult)
 async def get_simulation_results(
     simulation_id: UUID,
+    include_series: bool = Query(False, description="Incluir séries numéricas (trajetórias, amostras)"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Obter resultados detalhados da simulação"""
+    """
+    Obter resultados detalhados da simulação
+    
+    Por padrão retorna apenas o resumo; as séries numéricas ficam no store
+    de resultados e podem ser incluídas com `include_series=true` ou lidas
+    individualmente em `/simulations/{id}/series/{nome}`.
+    """
     try:
         simulation = db.query(Simulation).filter(
             Simulation.id == simulation_id,
@@ -183,11 +251,22 @@ async def get_simulation_results(
                 detail="Resultados não encontrados para esta simulação"
             )
         
+        results = simulation.results
+        if include_series and "series" in results:
+            series = simulation_service.result_store.load_series(simulation.id)
+            results = {
+                **results,
+                "series_data": {
+                    name: {column: values.tolist() for column, values in columns.items()}
+                    for name, columns in series.items()
+                }
+            }
+        
         return SimulationResult(
             simulation_id=simulation.id,
             tipo_simulacao=simulation.tipo_simulacao,
             status=simulation.status,
-            results=simulation.results,
+            results=results,
             created_at=simulation.created_at,
             completed_at=simulation.updated_at,
             duration=simulation.completed_at - simulation.created_at if simulation.completed_at else None
@@ -199,6 +278,48 @@ async def get_simulation_results(
         logger.error(f"Erro no banco de dados: {e}")
         raise HTTPException(status_code=500, detail="Erro interno no banco de dados")
 
+@router.get("/simulations/{simulation_id}/series/{series_name}")
+async def get_simulation_series(
+    simulation_id: UUID,
+    series_name: str,
+    columns: Optional[str] = Query(None, description="Colunas separadas por vírgula"),
+    step: int = Query(1, ge=1, description="Decimação: retornar uma amostra a cada N"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Obter uma série numérica da simulação em formato colunar"""
+    try:
+        simulation = db.query(Simulation).filter(
+            Simulation.id == simulation_id,
+            Simulation.user_id == current_user.id
+        ).first()
+        
+        if not simulation:
+            raise HTTPException(status_code=404, detail="Simulação não encontrada")
+        
+        column_filter = [c.strip() for c in columns.split(",")] if columns else None
+        series = simulation_service.result_store.load_series(
+            simulation.id, names=[series_name], columns=column_filter
+        )
+        
+        if series_name not in series:
+            raise HTTPException(status_code=404, detail=f"Série '{series_name}' não encontrada")
+        
+        data = series[series_name]
+        return {
+            "simulation_id": simulation.id,
+            "series": series_name,
+            "length": len(next(iter(data.values()))),
+            "step": step,
+            "columns": {name: values[::step].tolist() for name, values in data.items()}
+        }
+        
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        logger.error(f"Erro no banco de dados: {e}")
+        raise HTTPException(status_code=500, detail="Erro interno no banco de dados")
+
 @router.get("/simulations/{simulation_id}/status", response_model=SimulationStatusResponse)
 async def get_simulation_status(
     simulation_id: UUID,
@@ -252,12 +373,12 @@ async def delete_simulation(
                 detail="Não é possível excluir simulação em andamento"
             )
         
-        # Cancelar tarefa Celery se estiver pendente
+        # Cancelar a execução se ainda estiver pendente
         if simulation.status == "pending":
-            from celery_app import cancel_simulation_task
-            cancel_simulation_task.delay(simulation_id)
+            get_simulation_executor().cancel(simulation_id, simulation.celery_task_id)
         
-        # Remover do banco
+        # Remover séries persistidas e o registro do banco
+        simulation_service.result_store.delete_for_simulation(simulation_id)
         db.delete(simulation)
         db.commit()
         
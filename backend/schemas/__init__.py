@@ -174,6 +174,7 @@ class Model3D(Model3DBase):
     numero_faces: Optional[int] = None
     volume_calculado: Optional[float] = None
     area_superficie: Optional[float] = None
+    metricas_geometria: Optional[Dict[str, Any]] = None
     imprimivel: bool
     erros_validacao: List[str] = Field(default_factory=list)
     warnings: List[str] = Field(default_factory=list)
@@ -182,6 +183,11 @@ class Model3D(Model3DBase):
     created_at: datetime
     updated_at: datetime
     
+    @validator('metricas_geometria', pre=True)
+    def geometry_as_dict(cls, v):
+        # A coluna devolve GeometryMetrics; a API expõe o dicionário
+        return v.to_dict() if hasattr(v, 'to_dict') else v
+    
     class Config:
         from_attributes = True
 
@@ -97,6 +97,11 @@ class ModelingRequest(BaseModel):
         default=ModelFormatEnum.STL,
         description="Formato do arquivo de saída"
     )
+    job_id: Optional[str] = Field(
+        None,
+        max_length=64,
+        description="Identificador do job de renderização (permite cancelamento)"
+    )
     
     class Config:
         schema_extra = {
@@ -64,6 +64,14 @@ class StressTestConfig(BaseModel):
     force_increment: float = Field(100.0, ge=1.0, le=5000.0, description="Incremento de força")
     force_direction: List[float] = Field([0, 0, 1], description="Direção da força (x, y, z)")
     test_duration: float = Field(5.0, ge=1.0, le=60.0, description="Duração do teste em segundos")
+    search_mode: str = Field("adaptive", description="Busca da ruptura: adaptive (bisseção) ou linear")
+    tolerance: Optional[float] = Field(None, gt=0, description="Precisão da força de ruptura (padrão: incremento)")
+    
+    @validator('search_mode')
+    def validate_search_mode(cls, v):
+        if v not in ('adaptive', 'linear'):
+            raise ValueError('Modo de busca deve ser adaptive ou linear')
+        return v
     
     @validator('force_direction')
     def validate_direction(cls, v):
@@ -95,6 +103,8 @@ class FluidTestConfig(BaseModel):
     drag_coefficient: float = Field(0.47, ge=0.0, le=2.0, description="Coeficiente de arrasto")
     viscosity: float = Field(0.001, ge=0.0, le=100.0, description="Viscosidade dinâmica")
     flow_direction: List[float] = Field([0, 0, -1], description="Direção do fluxo")
+    telemetry_samples: int = Field(2400, ge=10, le=100000, description="Capacidade do buffer de telemetria")
+    telemetry_decimation: Optional[int] = Field(None, ge=1, description="Gravar uma amostra a cada N passos")
     
     @validator('flow_direction')
     def validate_flow_direction(cls, v):
@@ -124,6 +134,25 @@ class SimulationCreate(BaseModel):
             raise ValueError('Nome não pode ser vazio')
         return v.strip()
 
+class SimulationSweepRequest(BaseModel):
+    """Schema para varredura de parâmetros de simulação"""
+    modelo_3d_id: UUID = Field(..., description="ID do modelo 3D a ser simulado")
+    tipo_simulacao: SimulationType = Field(..., description="Tipo de simulação")
+    parametros: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Parâmetros base, comuns a todos os pontos"
+    )
+    grade: Dict[str, Any] = Field(
+        ...,
+        description="Valores por parâmetro: lista ou intervalo {start, stop, step}"
+    )
+    
+    @validator('grade')
+    def validate_grid(cls, v):
+        if not v:
+            raise ValueError('Grade de parâmetros não pode ser vazia')
+        return v
+
 class SimulationPreviewRequest(BaseModel):
     """Schema para preview de simulação"""
     tipo_simulacao: SimulationType
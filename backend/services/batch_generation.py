@@ -0,0 +1,204 @@
+"""
+Geração de Modelos em Lote
+Requisições deduplicadas pelo hash das especificações, renderizadas em
+paralelo no pool de renderização e entregues à medida que cada modelo fica
+pronto (NDJSON ou sala WebSocket "modeling_batch_<id>" via Redis pub/sub)
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from backend.core.config import MODELING_BATCH_CHANNEL
+from backend.services.simulation_progress import get_redis_client
+from backend.services.simulation_result_store import json_default
+
+logger = logging.getLogger(__name__)
+
+
+def batch_channel(batch_id: Any) -> str:
+    """Canal Redis dos eventos de um lote"""
+    return f"{MODELING_BATCH_CHANNEL}:{batch_id}"
+
+
+def batch_room(batch_id: Any) -> str:
+    """Sala WebSocket que recebe os eventos de um lote"""
+    return f"modeling_batch_{batch_id}"
+
+
+def publish_batch_event(batch_id: Any, event: Dict[str, Any], redis_client=None) -> bool:
+    """Publicar um evento no canal do lote; falhas só são registradas"""
+    client = redis_client or get_redis_client()
+    if client is None:
+        return False
+    message = {
+        "type": "modeling_batch",
+        "batch_id": str(batch_id),
+        "timestamp": time.time(),
+        **event
+    }
+    try:
+        client.publish(batch_channel(batch_id), json.dumps(message, default=json_default))
+        return True
+    except Exception as e:
+        logger.warning(f"Falha ao publicar evento do lote {batch_id}: {e}")
+        return False
+
+
+@dataclass
+class BatchItem:
+    """Uma requisição do lote"""
+    index: int
+    specifications: Dict[str, Any]
+    project_id: Optional[UUID] = None
+    engine: Any = None
+    format: Any = None
+
+
+class BatchGenerationJob:
+    """
+    Job de geração em lote
+
+    Requisições com o mesmo hash de especificações (mesmo engine e formato)
+    formam um grupo: só a primeira é renderizada; as demais recebem o
+    arquivo pelo cache de geração assim que ela termina. Os grupos rodam
+    concorrentemente sobre `generate_model_from_specs_async`, cujo pool de
+    renderização limita quantos modelos são gerados ao mesmo tempo.
+    """
+
+    def __init__(self, service, items: List[BatchItem], batch_id: Optional[str] = None):
+        self.service = service
+        self.items = items
+        self.batch_id = batch_id or uuid4().hex
+        self.groups: Dict[str, List[BatchItem]] = {}
+        for item in items:
+            key = service.generation_key(item.specifications, item.engine, item.format)
+            self.groups.setdefault(key, []).append(item)
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def unique_models(self) -> int:
+        return len(self.groups)
+
+    async def run(self) -> AsyncIterator[Dict[str, Any]]:
+        """Resultados por requisição, na ordem em que ficam prontos"""
+        results: asyncio.Queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._run_group(key, group, n, results))
+            for n, (key, group) in enumerate(self.groups.items())
+        ]
+        try:
+            for _ in range(len(self.items)):
+                yield await results.get()
+        finally:
+            self.cancel()
+
+    async def _run_group(self, key: str, group: List[BatchItem], n: int,
+                         results: asyncio.Queue):
+        primary, duplicates = group[0], group[1:]
+        result = await self._generate(primary, job_id=f"{self.batch_id}-{n}")
+        await results.put(self._result_payload(primary, key, result, deduplicated=False))
+
+        for item in duplicates:
+            if result.success:
+                # Cache de geração: apenas materializa o arquivo do primeiro
+                duplicate = await self._generate(item)
+                await results.put(self._result_payload(item, key, duplicate, deduplicated=True))
+            else:
+                await results.put(self._result_payload(item, key, result, deduplicated=True))
+
+    async def _generate(self, item: BatchItem, job_id: Optional[str] = None):
+        return await self.service.generate_model_from_specs_async(
+            specifications=item.specifications,
+            project_id=item.project_id,
+            engine=item.engine,
+            format=item.format,
+            job_id=job_id
+        )
+
+    def _result_payload(self, item: BatchItem, key: str, result,
+                        deduplicated: bool) -> Dict[str, Any]:
+        return {
+            "event": "result",
+            "request_index": item.index,
+            "spec_hash": key,
+            "deduplicated": deduplicated,
+            "success": result.success,
+            "model_path": result.model_path,
+            "message": result.message,
+            "validation_passed": result.validation_passed,
+            "generation_time": result.generation_time
+        }
+
+    def summary(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Evento final com os totais do lote"""
+        successful = sum(1 for r in results if r["success"])
+        return {
+            "event": "completed",
+            "batch_id": self.batch_id,
+            "total_requests": len(self.items),
+            "unique_models": self.unique_models,
+            "successful": successful,
+            "failed": len(results) - successful
+        }
+
+    async def ndjson(self) -> AsyncIterator[bytes]:
+        """Corpo NDJSON: uma linha por resultado e uma linha final de resumo"""
+        results = []
+        async for result in self.run():
+            results.append(result)
+            yield (json.dumps(result, default=json_default) + "\n").encode("utf-8")
+        yield (json.dumps(self.summary(results), default=json_default) + "\n").encode("utf-8")
+        logger.info(f"Lote {self.batch_id} concluído: {len(results)} resultados, "
+                    f"{self.unique_models} modelos únicos")
+
+    async def publish(self, redis_client=None) -> Dict[str, Any]:
+        """Publicar cada resultado (e o resumo) no canal do lote"""
+        results = []
+        publish_batch_event(self.batch_id, {
+            "event": "started",
+            "total_requests": len(self.items),
+            "unique_models": self.unique_models
+        }, redis_client)
+        try:
+            async for result in self.run():
+                results.append(result)
+                publish_batch_event(self.batch_id, result, redis_client)
+        except Exception as e:
+            logger.error(f"Erro no lote {self.batch_id}: {e}")
+            publish_batch_event(self.batch_id, {"event": "failed", "error": str(e)}, redis_client)
+            raise
+        summary = self.summary(results)
+        publish_batch_event(self.batch_id, summary, redis_client)
+        return summary
+
+    def cancel(self):
+        """Cancelar os grupos ainda em execução"""
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+
+
+# Lotes publicados em segundo plano (referências mantidas até terminarem)
+_background_jobs: Dict[str, asyncio.Task] = {}
+
+
+def start_background_batch(job: BatchGenerationJob) -> asyncio.Task:
+    """Executar o lote em segundo plano publicando os eventos no Redis"""
+    task = asyncio.create_task(job.publish())
+    _background_jobs[job.batch_id] = task
+    task.add_done_callback(lambda _: _background_jobs.pop(job.batch_id, None))
+    return task
+
+
+def cancel_background_batch(batch_id: str) -> bool:
+    """Cancelar um lote em segundo plano; False se ele não existir"""
+    task = _background_jobs.get(batch_id)
+    if task is None or task.done():
+        return False
+    task.cancel()
+    return True
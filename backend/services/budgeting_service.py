@@ -17,6 +17,8 @@ from sqlalchemy import and_
 from backend.core.config import OCTOPART_API_KEY, DIGIKEY_API_KEY
 from backend.models import Budget, Project, Model3D
 from backend.schemas import BudgetCreate, ItemDetalhado, Fornecedor
+from backend.services.gcode_analyzer import estimate_model_print
+from backend.services.geometry_metrics import ensure_model_geometry, model_volume_mm3
 
 logger = logging.getLogger(__name__)
 
@@ -73,6 +75,8 @@ class BudgetingService:
             model_3d = db.query(Model3D).filter(Model3D.projeto_id == project.id).first()
             if not model_3d:
                 raise ValueError("Modelo 3D não encontrado para o projeto")
+            # Modelos anteriores ao registro de métricas são analisados uma vez
+            ensure_model_geometry(model_3d, db)
             
             # Calcular custos automaticamente
             budget_calculation = await self._calculate_project_budget(project, model_3d)
@@ -158,7 +162,8 @@ class BudgetingService:
     async def _calculate_material_cost(self, project: Project, model_3d: Model3D) -> Dict[str, Any]:
         """Calcular custo do material de impressão"""
         material_type = project.material_tipo or "PLA"
-        volume_cm3 = model_3d.volume_calculado or 0
+        # Volume da peça mais o suporte estimado (métricas geométricas do modelo)
+        volume_cm3 = model_volume_mm3(model_3d, include_support=True)
         
         # Converter volume de mm³ para cm³
         volume_cm3 = volume_cm3 / 1000
@@ -399,7 +404,7 @@ class BudgetingService:
     
     async def _calculate_printing_cost(self, model_3d: Model3D, material_type: str) -> Dict[str, Any]:
         """Calcular custo de impressão"""
-        volume_mm3 = model_3d.volume_calculado or 0
+        volume_mm3 = model_volume_mm3(model_3d, include_support=True)
         volume_cm3 = volume_mm3 / 1000  # converter para cm³
         
         # Velocidade de impressão por material (cm³/hora)
@@ -412,8 +417,14 @@ class BudgetingService:
             "composite": 12.0
         }
         
-        speed = printing_speeds.get(material_type.upper(), 20.0)
-        print_time_hours = volume_cm3 / speed
+        try:
+            # Tempo das trajetórias fatiadas com aceleração
+            analysis = await asyncio.to_thread(estimate_model_print, model_3d.arquivo_path)
+            print_time_hours = analysis.print_time_s / 3600
+        except Exception as e:
+            logger.warning(f"Análise de G-code indisponível, usando velocidade volumétrica: {e}")
+            speed = printing_speeds.get(material_type.upper(), 20.0)
+            print_time_hours = volume_cm3 / speed
         
         # Custo de impressão
         print_cost = print_time_hours * self.printing_cost_per_hour
@@ -0,0 +1,185 @@
+"""
+Árvore de Features CadQuery com Cache Incremental
+A geometria é construída como uma sequência de estágios (caixa base,
+especificações da categoria, uma feature por estágio). O sólido após cada
+estágio é guardado sob o hash do prefixo da sequência, então editar o fim
+da lista de features só reexecuta os estágios alterados
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.core.config import (
+    CADQUERY_FEATURE_CACHE_MAX_BYTES,
+    CADQUERY_FEATURE_CACHE_PATH,
+    CADQUERY_FEATURE_MEMORY_ENTRIES,
+)
+from backend.observability.metrics import metrics
+from backend.services.model_generation_cache import MODEL_GENERATOR_VERSION, normalize_spec_value
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FeatureStage:
+    """Um estágio da árvore: `apply` recebe o sólido anterior (None no primeiro)"""
+    name: str
+    params: Dict[str, Any]
+    apply: Callable[[Any], Any]
+
+
+@dataclass
+class FeatureTreeResult:
+    model: Any
+    reused_stages: int
+    executed_stages: int
+
+
+def stage_keys(stages: List[FeatureStage], root: str = "") -> List[str]:
+    """
+    Chave de cada prefixo da sequência
+
+    A chave do estágio i encadeia a chave do estágio i-1 com o nome e os
+    parâmetros canônicos do estágio, como em uma cadeia de hashes: mudar
+    um estágio muda a chave dele e de todos os seguintes.
+    """
+    keys = []
+    previous = hashlib.sha256(f"{root}:{MODEL_GENERATOR_VERSION}".encode("utf-8")).hexdigest()
+    for stage in stages:
+        canonical = json.dumps({
+            "parent": previous,
+            "name": stage.name,
+            "params": normalize_spec_value(stage.params),
+        }, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        previous = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        keys.append(previous)
+    return keys
+
+
+class FeatureTreeCache:
+    """
+    Sólidos intermediários em memória (LRU por processo) e em disco
+
+    O disco é compartilhado pelos processos worker do pool de renderização
+    e limitado por `max_bytes` com despejo LRU (mtime marca o último
+    acesso). `dump`/`load` serializam o sólido (BRep no caso do CadQuery).
+    """
+
+    def __init__(self, dump: Callable[[Any, Path], None], load: Callable[[Path], Any],
+                 cache_dir: Path = CADQUERY_FEATURE_CACHE_PATH,
+                 max_bytes: int = CADQUERY_FEATURE_CACHE_MAX_BYTES,
+                 memory_entries: int = CADQUERY_FEATURE_MEMORY_ENTRIES,
+                 suffix: str = ".brep"):
+        self.dump = dump
+        self.load = load
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.suffix = suffix
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Sólido do cache (memória, depois disco); None em caso de falta"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        entry_path = self._entry_path(key)
+        if not entry_path.exists():
+            return None
+        try:
+            model = self.load(entry_path)
+            os.utime(entry_path)
+        except Exception as e:
+            logger.warning(f"Sólido em cache corrompido {entry_path}: {e}")
+            entry_path.unlink(missing_ok=True)
+            return None
+        self._remember(key, model)
+        return model
+
+    def put(self, key: str, model: Any):
+        """Guardar o sólido em memória e gravá-lo em disco (escrita atômica)"""
+        self._remember(key, model)
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=f"{self.suffix}.tmp")
+        os.close(fd)
+        try:
+            self.dump(model, Path(tmp_name))
+            os.replace(tmp_name, self._entry_path(key))
+        except Exception as e:
+            logger.warning(f"Falha ao gravar sólido intermediário {key[:12]}: {e}")
+            Path(tmp_name).unlink(missing_ok=True)
+            return
+        self._evict()
+
+    def _remember(self, key: str, model: Any):
+        with self._lock:
+            self._memory[key] = model
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _evict(self):
+        """Despejar os sólidos menos usados até caber em `max_bytes`"""
+        entries = []
+        total = 0
+        for entry in self.cache_dir.glob(f"*{self.suffix}"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry))
+            total += stat.st_size
+
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            metrics.cadquery_feature_cache_eviction()
+            total -= size
+
+    def stats(self) -> Dict[str, int]:
+        files = list(self.cache_dir.glob(f"*{self.suffix}"))
+        return {
+            "entries": len(files),
+            "bytes": sum(f.stat().st_size for f in files),
+            "memory_entries": len(self._memory)
+        }
+
+
+class FeatureTreeEvaluator:
+    """Avalia a sequência de estágios reaproveitando o maior prefixo em cache"""
+
+    def __init__(self, cache: FeatureTreeCache, root: str = ""):
+        self.cache = cache
+        self.root = root
+
+    def evaluate(self, stages: List[FeatureStage]) -> FeatureTreeResult:
+        keys = stage_keys(stages, self.root)
+
+        # Procurar do fim para o começo: o maior prefixo já calculado
+        model, start = None, 0
+        for i in range(len(stages) - 1, -1, -1):
+            cached = self.cache.get(keys[i])
+            if cached is not None:
+                model, start = cached, i + 1
+                break
+
+        for i in range(start, len(stages)):
+            model = stages[i].apply(model)
+            self.cache.put(keys[i], model)
+
+        executed = len(stages) - start
+        metrics.cadquery_feature_stages(start, executed)
+        logger.debug(f"Árvore de features: {start} estágios reaproveitados, {executed} executados")
+        return FeatureTreeResult(model=model, reused_stages=start, executed_stages=executed)
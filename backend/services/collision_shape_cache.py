@@ -0,0 +1,289 @@
+"""
+Cache de Shapes de Colisão - PyBullet
+Dados de colisão decimados e decompostos em convexos, endereçados pelo conteúdo da malha
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pybullet as p
+import trimesh
+
+from backend.core.config import COLLISION_CACHE_PATH, COLLISION_CACHE_MAX_BYTES
+from backend.observability.metrics import metrics
+from backend.services.mesh_ingest import file_content_hash, ingest_mesh
+from backend.services.mesh_lod import collision_source, decimate_vertex_clustering
+
+logger = logging.getLogger(__name__)
+
+# Incrementar quando o formato dos blobs .npz (ou dos OBJ ao lado) mudar
+CACHE_FORMAT_VERSION = 2
+
+# Hashes de conteúdo memorizados por (caminho, mtime, tamanho)
+HASH_MEMO_ENTRIES = 1024
+
+
+def _parse_vhacd_obj(path: Path) -> List[np.ndarray]:
+    """Ler os vértices de cada casco convexo ('o convex_N') de um OBJ do V-HACD"""
+    hulls: List[List[List[float]]] = []
+    with open(path) as f:
+        for line in f:
+            if line.startswith("o "):
+                hulls.append([])
+            elif line.startswith("v ") and hulls:
+                hulls[-1].append([float(x) for x in line.split()[1:4]])
+    return [np.asarray(h) for h in hulls if len(h) >= 4]
+
+
+@dataclass
+class CollisionData:
+    """Dados de colisão prontos para o PyBullet"""
+    key: str
+    vertices: np.ndarray
+    faces: np.ndarray
+    hull_vertices: np.ndarray
+    hull_offsets: np.ndarray
+    path: Path
+
+    @property
+    def hulls(self) -> List[np.ndarray]:
+        """Cascos convexos como lista de arrays (N, 3)"""
+        return np.split(self.hull_vertices, self.hull_offsets[1:-1])
+
+    @property
+    def nbytes(self) -> int:
+        return (self.vertices.nbytes + self.faces.nbytes +
+                self.hull_vertices.nbytes + self.hull_offsets.nbytes)
+
+
+class CollisionShapeCache:
+    """
+    Cache de dados de colisão por hash do conteúdo da malha
+
+    Cada entrada é um blob .npz com a malha decimada e os cascos convexos.
+    O disco é limitado por `max_bytes` com despejo LRU (mtime marca o último
+    acesso) e as entradas mais recentes ficam também em memória no worker.
+    """
+
+    def __init__(self, cache_dir: Path = COLLISION_CACHE_PATH,
+                 max_bytes: int = COLLISION_CACHE_MAX_BYTES,
+                 max_faces: int = 5000, decompose: bool = True,
+                 memory_entries: int = 32):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_faces = max_faces
+        self.decompose = decompose
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, CollisionData]" = OrderedDict()
+        self._hash_memo: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def cache_key(self, model_path: Path) -> str:
+        """Chave = hash do conteúdo + parâmetros que afetam o resultado"""
+        # O hash é memorizado por (caminho, mtime, tamanho) para não reler o arquivo
+        stat = model_path.stat()
+        memo_key = (str(model_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            content_hash = self._hash_memo.get(memo_key)
+            if content_hash is not None:
+                self._hash_memo.move_to_end(memo_key)
+        if content_hash is None:
+            content_hash = file_content_hash(model_path)
+            with self._lock:
+                self._hash_memo[memo_key] = content_hash
+                while len(self._hash_memo) > HASH_MEMO_ENTRIES:
+                    self._hash_memo.popitem(last=False)
+        decompose = "vhacd" if self.decompose else "hull"
+        return f"{content_hash}-f{self.max_faces}-{decompose}-v{CACHE_FORMAT_VERSION}"
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npz"
+
+    def get(self, model_path: Path) -> CollisionData:
+        """Obter dados de colisão do cache, gerando-os em caso de falta"""
+        model_path = Path(model_path)
+        key = self.cache_key(model_path)
+
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                metrics.collision_cache_hit("memory")
+                return data
+
+        entry_path = self._entry_path(key)
+        if entry_path.exists():
+            try:
+                data = self._load_entry(key, entry_path)
+                os.utime(entry_path)
+                metrics.collision_cache_hit("disk")
+                self._remember(data)
+                return data
+            except Exception as e:
+                logger.warning(f"Entrada de cache corrompida {entry_path}: {e}")
+                entry_path.unlink(missing_ok=True)
+
+        metrics.collision_cache_miss()
+        data = self._build_entry(key, model_path)
+        self._remember(data)
+        self._evict()
+        return data
+
+    def create_collision_shape(self, model_path: Path, physics_client: int) -> int:
+        """Criar o shape de colisão no cliente PyBullet a partir do cache"""
+        data = self.get(model_path)
+        hulls = data.hulls
+
+        if len(hulls) == 1:
+            return p.createCollisionShape(
+                p.GEOM_MESH, vertices=hulls[0], physicsClientId=physics_client
+            )
+
+        # Para shapes compostos o PyBullet lê cada objeto de um OBJ como um casco
+        obj_path = data.path.with_suffix(".obj")
+        if not obj_path.exists():
+            self._write_hulls_obj(hulls, obj_path)
+        return p.createCollisionShape(
+            p.GEOM_MESH, fileName=str(obj_path), physicsClientId=physics_client
+        )
+
+    def _remember(self, data: CollisionData):
+        with self._lock:
+            self._memory[data.key] = data
+            self._memory.move_to_end(data.key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _load_entry(self, key: str, entry_path: Path) -> CollisionData:
+        with np.load(entry_path) as blob:
+            return CollisionData(
+                key=key,
+                vertices=blob["vertices"],
+                faces=blob["faces"],
+                hull_vertices=blob["hull_vertices"],
+                hull_offsets=blob["hull_offsets"],
+                path=entry_path
+            )
+
+    def _build_entry(self, key: str, model_path: Path) -> CollisionData:
+        """Carregar, decimar e decompor a malha e gravar o blob .npz"""
+        # A variante LOD menor que ainda tem `max_faces` faces poupa a leitura do original
+        mesh = ingest_mesh(collision_source(model_path, self.max_faces), min_component_faces=None)
+        vertices, faces = decimate_vertex_clustering(mesh.vertices, mesh.faces, self.max_faces)
+
+        hulls = self._convex_decomposition(vertices, faces) if self.decompose else []
+        if not hulls:
+            hulls = [vertices]
+
+        offsets = np.cumsum([0] + [len(h) for h in hulls]).astype(np.int32)
+        data = CollisionData(
+            key=key,
+            vertices=vertices.astype(np.float32),
+            faces=faces.astype(np.int32),
+            hull_vertices=np.concatenate(hulls).astype(np.float32),
+            hull_offsets=offsets,
+            path=self._entry_path(key)
+        )
+
+        # Escrita atômica para não expor blobs parciais a outros workers
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".npz.tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(
+                f,
+                vertices=data.vertices,
+                faces=data.faces,
+                hull_vertices=data.hull_vertices,
+                hull_offsets=data.hull_offsets
+            )
+        os.replace(tmp_name, data.path)
+
+        logger.info(
+            f"Shape de colisão cacheado {key[:12]}: {len(mesh.faces)} -> {len(faces)} faces, "
+            f"{len(hulls)} cascos"
+        )
+        return data
+
+    def _convex_decomposition(self, vertices: np.ndarray, faces: np.ndarray) -> List[np.ndarray]:
+        """Decomposição convexa aproximada com o V-HACD embutido no PyBullet"""
+        with tempfile.TemporaryDirectory(dir=self.cache_dir) as scratch:
+            mesh_in = Path(scratch) / "mesh.obj"
+            mesh_out = Path(scratch) / "hulls.obj"
+            trimesh.Trimesh(vertices=vertices, faces=faces, process=False).export(str(mesh_in))
+            try:
+                p.vhacd(str(mesh_in), str(mesh_out), str(Path(scratch) / "vhacd.log"),
+                        resolution=50000, maxNumVerticesPerCH=64)
+                return _parse_vhacd_obj(mesh_out)
+            except Exception as e:
+                logger.warning(f"V-HACD falhou, usando casco convexo único: {e}")
+                return []
+
+    @staticmethod
+    def _write_hulls_obj(hulls: List[np.ndarray], obj_path: Path):
+        """Gravar cascos como objetos separados de um OBJ"""
+        # Temporário exclusivo: workers podem gravar o mesmo OBJ ao mesmo tempo
+        fd, tmp_name = tempfile.mkstemp(dir=obj_path.parent, suffix=".obj.tmp")
+        with os.fdopen(fd, "w") as f:
+            base = 1
+            for i, hull in enumerate(hulls):
+                # Vértices e faces do mesmo casco: pontos internos ficam de fora
+                # e os índices das faces se referem aos vértices gravados
+                convex = trimesh.convex.convex_hull(hull)
+                f.write(f"o convex_{i}\n")
+                np.savetxt(f, convex.vertices, fmt="v %.6f %.6f %.6f")
+                np.savetxt(f, convex.faces + base, fmt="f %d %d %d")
+                base += len(convex.vertices)
+        os.replace(tmp_name, obj_path)
+
+    def _evict(self):
+        """Despejar as entradas menos usadas até caber em `max_bytes`"""
+        entries = []
+        total = 0
+        for entry in self.cache_dir.glob("*.npz"):
+            stat = entry.stat()
+            size = stat.st_size
+            sidecar = entry.with_suffix(".obj")
+            if sidecar.exists():
+                size += sidecar.stat().st_size
+            entries.append((stat.st_mtime, size, entry))
+            total += size
+
+        if total <= self.max_bytes:
+            return
+
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            entry.with_suffix(".obj").unlink(missing_ok=True)
+            with self._lock:
+                self._memory.pop(entry.stem, None)
+            metrics.collision_cache_eviction()
+            total -= size
+
+    def stats(self) -> Dict[str, int]:
+        """Tamanho atual do cache em disco e em memória"""
+        files = list(self.cache_dir.glob("*.npz"))
+        return {
+            "entries": len(files),
+            "bytes": sum(f.stat().st_size for f in files),
+            "memory_entries": len(self._memory)
+        }
+
+
+_default_cache: Optional[CollisionShapeCache] = None
+
+
+def get_collision_shape_cache() -> CollisionShapeCache:
+    """Cache compartilhado pelo processo (um por worker)"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = CollisionShapeCache()
+    return _default_cache
@@ -0,0 +1,516 @@
+"""
+Escalonador da Fazenda de Impressão
+Distribui os jobs sem impressora entre as impressoras do usuário conforme
+material compatível, volume de impressão, bico e fila atual. Lista gulosa
+(prioridade e maior duração primeiro) seguida de busca local que reduz o
+makespan e depois as trocas de material, em horizonte rolante: só os jobs que
+começam dentro do horizonte entram nas filas, o resto é replanejado quando
+jobs terminam ou falham
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from backend.models import PrintJob, PrintQueue, Printer
+from backend.services.print_queue import PrintQueueManager
+
+logger = logging.getLogger(__name__)
+
+# Tempo de troca de filamento (descarregar, carregar, purgar)
+MATERIAL_SWAP_PENALTY_S = 15 * 60
+
+# Orçamento da busca local
+LOCAL_SEARCH_TIME_S = 0.25
+
+# Jobs que começam dentro deste horizonte entram nas filas; os demais esperam
+COMMIT_HORIZON_S = 8 * 3600
+
+# Duração assumida para jobs ainda sem estimativa
+DEFAULT_JOB_DURATION_S = 3600
+
+# Impressoras que recebem jobs
+SCHEDULABLE_PRINTER_STATUSES = ('available', 'printing')
+
+PRIORITY_RANK = {'urgent': 0, 'high': 1, 'normal': 2, 'low': 3}
+
+_EPS = 1e-6
+
+
+@dataclass
+class FarmPrinter:
+    """Impressora vista pelo escalonador"""
+    id: Any
+    materials: FrozenSet[Any]
+    build_volume_mm: Tuple[float, float, float]
+    ready_in_s: float = 0.0              # Fila atual até esvaziar
+    loaded_material: Any = None          # Material do último job na fila (None = desconhecido)
+    nozzle_mm: Optional[float] = None
+
+
+@dataclass
+class FarmJob:
+    """Job aguardando impressora"""
+    id: Any
+    material_id: Any
+    duration_s: float
+    dimensions_mm: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    nozzle_mm: Optional[float] = None    # None = qualquer bico
+    priority: str = 'normal'
+
+
+@dataclass
+class FarmAssignment:
+    job_id: Any
+    printer_id: Any
+    start_s: float
+    end_s: float
+    material_swap: bool = False
+
+
+@dataclass
+class FarmPlan:
+    """Plano de execução a partir de agora"""
+    assignments: List[FarmAssignment] = field(default_factory=list)
+    unassigned: Dict[Any, str] = field(default_factory=dict)
+    makespan_s: float = 0.0
+    material_swaps: int = 0
+    planning_time_s: float = 0.0
+
+    def by_printer(self) -> Dict[Any, List[FarmAssignment]]:
+        grouped: Dict[Any, List[FarmAssignment]] = defaultdict(list)
+        for assignment in self.assignments:
+            grouped[assignment.printer_id].append(assignment)
+        return dict(grouped)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'makespan_s': round(self.makespan_s),
+            'material_swaps': self.material_swaps,
+            'planning_time_s': round(self.planning_time_s, 4),
+            'printers': {
+                str(printer_id): [
+                    {
+                        'job_id': str(item.job_id),
+                        'start_s': round(item.start_s),
+                        'end_s': round(item.end_s),
+                        'material_swap': item.material_swap
+                    }
+                    for item in items
+                ]
+                for printer_id, items in self.by_printer().items()
+            },
+            'unassigned': {str(job_id): reason for job_id, reason in self.unassigned.items()}
+        }
+
+
+# =============================================================================
+# COMPATIBILIDADE
+# =============================================================================
+
+def _compatibility(printers: Sequence[FarmPrinter], jobs: Sequence[FarmJob],
+                   material_index: Dict[Any, int]) -> Tuple[np.ndarray, Dict[int, str]]:
+    """Matriz jobs x impressoras e o motivo dos jobs sem nenhuma impressora"""
+    supports = np.zeros((len(printers), len(material_index)), dtype=bool)
+    for row, printer in enumerate(printers):
+        columns = [material_index[m] for m in printer.materials if m in material_index]
+        supports[row, columns] = True
+    job_material = np.array([material_index[job.material_id] for job in jobs], dtype=np.int64)
+    material_ok = supports[:, job_material].T
+
+    # Rotação de 90° no plano da mesa: comparar os lados ordenados
+    volume = np.array([printer.build_volume_mm for printer in printers], dtype=np.float64)
+    dims = np.array([job.dimensions_mm for job in jobs], dtype=np.float64)
+    volume_xy = np.sort(volume[:, :2], axis=1)
+    dims_xy = np.sort(dims[:, :2], axis=1)
+    fits = ((dims_xy[:, None, 0] <= volume_xy[None, :, 0] + _EPS)
+            & (dims_xy[:, None, 1] <= volume_xy[None, :, 1] + _EPS)
+            & (dims[:, None, 2] <= volume[None, :, 2] + _EPS))
+
+    printer_nozzle = np.array([np.nan if p.nozzle_mm is None else p.nozzle_mm for p in printers])
+    job_nozzle = np.array([np.nan if j.nozzle_mm is None else j.nozzle_mm for j in jobs])
+    nozzle_ok = np.isnan(job_nozzle)[:, None] | (np.abs(job_nozzle[:, None] - printer_nozzle[None, :]) < 1e-3)
+
+    compatible = material_ok & fits & nozzle_ok
+    reasons = {}
+    for j in np.flatnonzero(~compatible.any(axis=1)):
+        if not material_ok[j].any():
+            reasons[j] = "Nenhuma impressora compatível com o material"
+        elif not (material_ok[j] & fits[j]).any():
+            reasons[j] = "Peça maior que o volume de impressão"
+        else:
+            reasons[j] = "Nenhuma impressora com o bico exigido"
+    return compatible, reasons
+
+
+# =============================================================================
+# ESTADO DO PLANO
+# =============================================================================
+
+class _FarmState:
+    """
+    Carga de cada impressora no modelo agrupado por material
+
+    Com os jobs de um material em sequência, as trocas de uma impressora são
+    os materiais distintos menos o já carregado (ou menos um, se o carregado
+    for desconhecido), independentemente da ordem.
+    """
+
+    def __init__(self, ready: np.ndarray, loaded: np.ndarray, n_materials: int, penalty: float):
+        self.work = ready.astype(np.float64).copy()
+        self.loaded = loaded
+        self.counts = np.zeros((len(ready), n_materials), dtype=np.int32)
+        self.distinct = np.zeros(len(ready), dtype=np.int32)
+        self.penalty = penalty
+        self._rows = np.arange(len(ready))
+
+    def swaps(self, distinct: np.ndarray, loaded_count: np.ndarray, loaded: Optional[np.ndarray] = None) -> np.ndarray:
+        loaded = self.loaded if loaded is None else loaded
+        base = np.where(loaded < 0, distinct > 0, loaded_count > 0)
+        return distinct - base
+
+    def loaded_counts(self) -> np.ndarray:
+        counts = self.counts[self._rows, np.maximum(self.loaded, 0)]
+        return np.where(self.loaded < 0, 0, counts)
+
+    def cost(self) -> np.ndarray:
+        return self.work + self.penalty * self.swaps(self.distinct, self.loaded_counts())
+
+    def cost_with(self, material: int, duration: float) -> np.ndarray:
+        """Custo de cada impressora se recebesse um job do material"""
+        distinct = self.distinct + (self.counts[:, material] == 0)
+        loaded_count = self.loaded_counts() + (self.loaded == material)
+        return self.work + duration + self.penalty * self.swaps(distinct, loaded_count)
+
+    def cost_without(self, printer: int, material: int, duration: float) -> float:
+        distinct = self.distinct[printer] - (self.counts[printer, material] == 1)
+        loaded_count = self.loaded_counts()[printer] - (self.loaded[printer] == material)
+        swaps = self.swaps(distinct, loaded_count, self.loaded[printer])
+        return float(self.work[printer] - duration + self.penalty * swaps)
+
+    def add(self, printer: int, material: int, duration: float):
+        self.distinct[printer] += self.counts[printer, material] == 0
+        self.counts[printer, material] += 1
+        self.work[printer] += duration
+
+    def remove(self, printer: int, material: int, duration: float):
+        self.counts[printer, material] -= 1
+        self.distinct[printer] -= self.counts[printer, material] == 0
+        self.work[printer] -= duration
+
+
+def _list_schedule(state: _FarmState, compatible: np.ndarray, materials: np.ndarray,
+                   durations: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """Cada job (na ordem dada) vai para a impressora que o termina mais cedo"""
+    assigned = np.full(len(durations), -1, dtype=np.int64)
+    for j in order:
+        if not compatible[j].any():
+            continue
+        cost = np.where(compatible[j], state.cost_with(materials[j], durations[j]), np.inf)
+        printer = int(np.argmin(cost))
+        state.add(printer, materials[j], durations[j])
+        assigned[j] = printer
+    return assigned
+
+
+def _local_search(state: _FarmState, compatible: np.ndarray, materials: np.ndarray,
+                  durations: np.ndarray, assigned: np.ndarray, deadline: float):
+    """
+    Movimentos e trocas de jobs saindo da impressora crítica enquanto o
+    makespan cair; depois movimentos que eliminam trocas de material sem
+    aumentar o makespan
+    """
+    while time.perf_counter() < deadline:
+        cost = state.cost()
+        critical = int(np.argmax(cost))
+        makespan = cost[critical]
+        best = None
+
+        for j in np.flatnonzero(assigned == critical):
+            m, d = materials[j], durations[j]
+            left = state.cost_without(critical, m, d)
+            # Mover j para outra impressora
+            target_cost = np.where(compatible[j], state.cost_with(m, d), np.inf)
+            target_cost[critical] = np.inf
+            target = int(np.argmin(target_cost))
+            peak = max(left, target_cost[target])
+            if peak < makespan - _EPS and (best is None or peak < best[0]):
+                best = (peak, j, target, None)
+
+            # Trocar j com um job k de outra impressora que alivie a crítica
+            penalty = state.penalty
+            lighter = (durations < d) | ((durations < d + penalty) & (materials != m))
+            others = np.flatnonzero((assigned >= 0) & (assigned != critical) & lighter)
+            others = others[compatible[others, critical] & compatible[j, assigned[others]]]
+            if len(others):
+                # Limite otimista (no máximo uma troca de material a menos de cada lado)
+                bound = np.maximum(cost[assigned[others]] - durations[others] + d,
+                                   makespan - d + durations[others]) - penalty * (materials[others] != m)
+                for candidate in np.argsort(bound)[:8]:
+                    if bound[candidate] >= makespan - _EPS:
+                        break
+                    k = others[candidate]
+                    other = int(assigned[k])
+                    state.remove(critical, m, d)
+                    state.remove(other, materials[k], durations[k])
+                    state.add(critical, materials[k], durations[k])
+                    state.add(other, m, d)
+                    swapped = state.cost()
+                    state.remove(other, m, d)
+                    state.remove(critical, materials[k], durations[k])
+                    state.add(other, materials[k], durations[k])
+                    state.add(critical, m, d)
+                    peak = max(swapped[critical], swapped[other])
+                    if peak < makespan - _EPS and (best is None or peak < best[0]):
+                        best = (peak, j, other, k)
+
+        if best is None:
+            break
+        _, j, target, k = best
+        state.remove(critical, materials[j], durations[j])
+        state.add(target, materials[j], durations[j])
+        assigned[j] = target
+        if k is not None:
+            state.remove(target, materials[k], durations[k])
+            state.add(critical, materials[k], durations[k])
+            assigned[k] = critical
+
+    # Trocas de material: tirar jobs que são o único do seu material na impressora
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        makespan = state.cost().max()
+        for j in np.flatnonzero(assigned >= 0):
+            source, m, d = int(assigned[j]), materials[j], durations[j]
+            if state.counts[source, m] != 1 or state.loaded[source] == m:
+                continue
+            before = state.swaps(state.distinct, state.loaded_counts()).sum()
+            target_cost = np.where(compatible[j] & ((state.counts[:, m] > 0) | (state.loaded == m)),
+                                   state.cost_with(m, d), np.inf)
+            target_cost[source] = np.inf
+            target = int(np.argmin(target_cost))
+            if target_cost[target] > makespan + _EPS:
+                continue
+            state.remove(source, m, d)
+            state.add(target, m, d)
+            if state.swaps(state.distinct, state.loaded_counts()).sum() < before:
+                assigned[j] = target
+                improved = True
+            else:
+                state.remove(target, m, d)
+                state.add(source, m, d)
+
+
+def _group_duration(jobs: Sequence[FarmJob], members: Sequence[int]) -> float:
+    return sum(jobs[j].duration_s for j in members)
+
+
+def _sequence(printers: Sequence[FarmPrinter], jobs: Sequence[FarmJob], assigned: np.ndarray,
+              materials: np.ndarray, loaded: np.ndarray, penalty: float) -> Tuple[List[FarmAssignment], int]:
+    """
+    Ordem em cada impressora: por prioridade e, dentro de cada nível, em
+    grupos de material começando pelo que estiver carregado
+    """
+    assignments = []
+    total_swaps = 0
+    for p, printer in enumerate(printers):
+        members = np.flatnonzero(assigned == p)
+        if not len(members):
+            continue
+        tiers: Dict[int, Dict[int, List[int]]] = defaultdict(lambda: defaultdict(list))
+        for j in members:
+            tiers[PRIORITY_RANK.get(jobs[j].priority, 2)][materials[j]].append(j)
+
+        clock = float(printer.ready_in_s)
+        current = loaded[p]
+        for rank in sorted(tiers):
+            groups = tiers[rank]
+            group_order = sorted(groups, key=lambda m: (m != current, -_group_duration(jobs, groups[m]), m))
+            for m in group_order:
+                for j in sorted(groups[m], key=lambda j: -jobs[j].duration_s):
+                    swap = current >= 0 and m != current
+                    if swap:
+                        clock += penalty
+                        total_swaps += 1
+                    current = m
+                    assignments.append(FarmAssignment(jobs[j].id, printer.id, clock,
+                                                      clock + jobs[j].duration_s, bool(swap)))
+                    clock += jobs[j].duration_s
+    return assignments, total_swaps
+
+
+def schedule_jobs(printers: Sequence[FarmPrinter], jobs: Sequence[FarmJob],
+                  swap_penalty_s: float = MATERIAL_SWAP_PENALTY_S,
+                  search_time_s: float = LOCAL_SEARCH_TIME_S) -> FarmPlan:
+    """
+    Distribuir os jobs entre as impressoras
+
+    Returns:
+        Plano com início e fim de cada job (segundos a partir de agora), jobs
+        sem impressora compatível e o motivo, makespan e trocas de material
+    """
+    started = time.perf_counter()
+    if not jobs:
+        return FarmPlan(makespan_s=max((p.ready_in_s for p in printers), default=0.0))
+    if not printers:
+        return FarmPlan(unassigned={job.id: "Nenhuma impressora disponível" for job in jobs},
+                        planning_time_s=time.perf_counter() - started)
+
+    material_index: Dict[Any, int] = {}
+    for job in jobs:
+        material_index.setdefault(job.material_id, len(material_index))
+    materials = np.array([material_index[job.material_id] for job in jobs], dtype=np.int64)
+    durations = np.array([max(float(job.duration_s or 0), 0.0) for job in jobs])
+    loaded = np.array([material_index.get(p.loaded_material, -1) if p.loaded_material is not None else -1
+                       for p in printers], dtype=np.int64)
+    ready = np.array([float(p.ready_in_s) for p in printers])
+    compatible, reasons = _compatibility(printers, jobs, material_index)
+
+    # Material carregado que nenhum job usa não conta como desconhecido
+    known = np.array([p.loaded_material is not None for p in printers])
+    loaded = np.where(known & (loaded < 0), len(material_index), loaded)
+
+    state = _FarmState(ready, loaded, len(material_index) + 1, swap_penalty_s)
+    ranks = np.array([PRIORITY_RANK.get(job.priority, 2) for job in jobs])
+    order = np.lexsort((-durations, ranks))
+    assigned = _list_schedule(state, compatible, materials, durations, order)
+    _local_search(state, compatible, materials, durations, assigned, started + search_time_s)
+
+    assignments, swaps = _sequence(printers, jobs, assigned, materials, loaded, swap_penalty_s)
+    finish = ready.copy()
+    rows = {printer.id: p for p, printer in enumerate(printers)}
+    for item in assignments:
+        finish[rows[item.printer_id]] = max(finish[rows[item.printer_id]], item.end_s)
+
+    plan = FarmPlan(
+        assignments=assignments,
+        unassigned={jobs[j].id: reason for j, reason in reasons.items()},
+        makespan_s=float(finish.max()),
+        material_swaps=swaps,
+        planning_time_s=time.perf_counter() - started
+    )
+    logger.info(f"Plano da fazenda: {len(assignments)} jobs em {len(printers)} impressoras, "
+                f"makespan {plan.makespan_s / 3600:.1f} h, {swaps} trocas de material "
+                f"({plan.planning_time_s * 1000:.0f} ms)")
+    return plan
+
+
+# =============================================================================
+# FAZENDA NO BANCO
+# =============================================================================
+
+class FarmScheduler:
+    """Plano da fazenda de um usuário a partir do banco e dos índices das filas"""
+
+    def __init__(self, queues: PrintQueueManager, swap_penalty_s: float = MATERIAL_SWAP_PENALTY_S,
+                 horizon_s: float = COMMIT_HORIZON_S):
+        self.queues = queues
+        self.swap_penalty_s = swap_penalty_s
+        self.horizon_s = horizon_s
+
+    def snapshot(self, db: Session, user_id: UUID) -> Tuple[List[FarmPrinter], List[FarmJob], Dict[Any, PrintJob]]:
+        """Impressoras disponíveis com a fila atual e jobs pendentes sem impressora"""
+        jobs = db.query(PrintJob).filter(
+            and_(
+                PrintJob.user_id == user_id,
+                PrintJob.printer_id.is_(None),
+                PrintJob.status == 'pending'
+            )
+        ).all()
+        if not jobs:
+            return [], [], {}
+
+        printers = db.query(Printer).filter(
+            and_(
+                Printer.user_id == user_id,
+                Printer.status.in_(SCHEDULABLE_PRINTER_STATUSES)
+            )
+        ).all()
+        queues = self.queues.get_many(db, [printer.id for printer in printers])
+
+        # Material do último job de cada fila (o que estará carregado)
+        tails = {printer_id: queue.last_job() for printer_id, queue in queues.items()}
+        tail_ids = [job_id for job_id in tails.values() if job_id is not None]
+        tail_materials = dict(
+            db.query(PrintJob.id, PrintJob.material_id).filter(PrintJob.id.in_(tail_ids)).all()
+        ) if tail_ids else {}
+
+        farm_printers = [
+            FarmPrinter(
+                id=printer.id,
+                materials=frozenset(str(material_id) for material_id in printer.materiais_compatíveis or []),
+                build_volume_mm=(printer.volume_impressao_x, printer.volume_impressao_y, printer.volume_impressao_z),
+                ready_in_s=queues[printer.id].total_seconds,
+                loaded_material=str(tail_materials[tails[printer.id]]) if tails[printer.id] in tail_materials else None,
+                nozzle_mm=printer.diametro_bico
+            )
+            for printer in printers
+        ]
+        farm_jobs = [
+            FarmJob(
+                id=job.id,
+                material_id=str(job.material_id),
+                duration_s=job.tempo_estimado_segundos or DEFAULT_JOB_DURATION_S,
+                dimensions_mm=(job.dimensao_x or 0.0, job.dimensao_y or 0.0, job.dimensao_z or 0.0),
+                nozzle_mm=job.diametro_bico,
+                priority=job.prioridade or 'normal'
+            )
+            for job in jobs
+        ]
+        return farm_printers, farm_jobs, {job.id: job for job in jobs}
+
+    async def plan(self, db: Session, user_id: UUID, dry_run: bool = True) -> FarmPlan:
+        """
+        Planejar os jobs pendentes
+
+        Com `dry_run=False` os jobs que começam dentro do horizonte são
+        atribuídos e entram nas filas; os demais continuam pendentes para o
+        próximo replanejamento.
+        """
+        printers, jobs, rows = self.snapshot(db, user_id)
+        if not jobs:
+            return FarmPlan()
+
+        plan = await asyncio.to_thread(schedule_jobs, printers, jobs, self.swap_penalty_s)
+        if not dry_run:
+            self._commit(db, plan, rows)
+        return plan
+
+    def _commit(self, db: Session, plan: FarmPlan, rows: Dict[Any, PrintJob]) -> int:
+        """Gravar as atribuições; em caso de falha as filas tocadas voltam ao banco"""
+        committed = 0
+        by_printer = plan.by_printer()
+        try:
+            for printer_id, items in by_printer.items():
+                for item in items:
+                    if item.start_s >= self.horizon_s:
+                        break
+                    job = rows[item.job_id]
+                    job.printer_id = printer_id
+                    queue_item = PrintQueue(
+                        printer_id=printer_id,
+                        print_job_id=job.id,
+                        status='queued',
+                        created_at=datetime.utcnow()
+                    )
+                    self.queues.add(db, queue_item, job)
+                    db.add(queue_item)
+                    committed += 1
+
+            db.commit()
+        except Exception:
+            # `queues.add` já alterou os índices em memória
+            db.rollback()
+            self.queues.discard(by_printer)
+            raise
+        logger.info(f"Fazenda: {committed} jobs atribuídos, {len(plan.assignments) - committed} aguardando horizonte")
+        return committed
@@ -0,0 +1,273 @@
+"""
+Arrasto em Fluido - PyBullet
+Área projetada pela silhueta da malha, força de arrasto aplicada a cada passo
+e telemetria em buffer circular pré-alocado
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pybullet as p
+
+from backend.services.geometry_metrics import silhouette_area
+
+logger = logging.getLogger(__name__)
+
+# Colunas gravadas pela telemetria do teste de fluido
+TELEMETRY_COLUMNS = (
+    "tempo", "posicao_x", "posicao_y", "posicao_z",
+    "velocidade_x", "velocidade_y", "velocidade_z",
+    "velocidade", "forca_arrasto", "area_projetada"
+)
+
+
+def hemisphere_directions(count: int) -> np.ndarray:
+    """
+    Direções unitárias no hemisfério z >= 0: os três eixos do corpo (onde a
+    área de peças prismáticas muda mais rápido) mais uma espiral de Fibonacci
+    """
+    i = np.arange(count) + 0.5
+    z = 1 - i / count
+    radius = np.sqrt(1 - z ** 2)
+    theta = np.pi * (1 + 5 ** 0.5) * i
+    spiral = np.stack([radius * np.cos(theta), radius * np.sin(theta), z], axis=1)
+    return np.concatenate([np.eye(3), spiral])
+
+
+class ProjectedAreaTable:
+    """
+    Área projetada por direção no referencial do corpo
+
+    A silhueta é simétrica (d e -d projetam a mesma área), então a tabela
+    cobre apenas um hemisfério e a consulta usa |d . direção|.
+    """
+
+    def __init__(self, directions: np.ndarray, areas: np.ndarray):
+        self.directions = directions
+        self.areas = areas
+
+    @classmethod
+    def from_mesh(cls, vertices: np.ndarray, faces: np.ndarray, num_directions: int = 64,
+                  resolution: int = 128) -> "ProjectedAreaTable":
+        directions = hemisphere_directions(num_directions)
+        areas = np.array([silhouette_area(vertices, faces, d, resolution) for d in directions])
+        return cls(directions, areas)
+
+    def lookup(self, direction: np.ndarray) -> float:
+        """Área para uma direção unitária no referencial do corpo"""
+        return float(self.areas[np.argmax(np.abs(self.directions @ direction))])
+
+
+_table_cache: "OrderedDict[str, ProjectedAreaTable]" = OrderedDict()
+_table_lock = threading.Lock()
+
+
+def get_projected_area_table(key: str, vertices: np.ndarray, faces: np.ndarray,
+                             max_entries: int = 32) -> ProjectedAreaTable:
+    """Tabela de áreas memorizada pela chave da malha (ex.: chave do cache de colisão)"""
+    with _table_lock:
+        table = _table_cache.get(key)
+        if table is not None:
+            _table_cache.move_to_end(key)
+            return table
+
+    table = ProjectedAreaTable.from_mesh(vertices, faces)
+    with _table_lock:
+        _table_cache[key] = table
+        while len(_table_cache) > max_entries:
+            _table_cache.popitem(last=False)
+    return table
+
+
+class TelemetryRingBuffer:
+    """
+    Buffer circular pré-alocado para telemetria por passo
+
+    Grava uma linha a cada `decimation` passos; quando cheio, sobrescreve as
+    amostras mais antigas.
+    """
+
+    def __init__(self, capacity: int, columns: Sequence[str] = TELEMETRY_COLUMNS,
+                 decimation: int = 1):
+        self.columns = tuple(columns)
+        self.capacity = capacity
+        self.decimation = max(1, int(decimation))
+        self._data = np.zeros((capacity, len(self.columns)))
+        self._count = 0
+
+    def record(self, step: int, row: Sequence[float]):
+        """Gravar a linha do passo `step` se ele cair na decimação"""
+        if step % self.decimation:
+            return
+        self._data[self._count % self.capacity] = row
+        self._count += 1
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def to_array(self) -> np.ndarray:
+        """Amostras em ordem cronológica, shape (n, colunas)"""
+        if self._count <= self.capacity:
+            return self._data[:self._count].copy()
+        start = self._count % self.capacity
+        return np.concatenate([self._data[start:], self._data[:start]])
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        data = self.to_array()
+        return {name: data[:, i] for i, name in enumerate(self.columns)}
+
+    def to_records(self) -> List[Dict[str, float]]:
+        """Amostras como lista de registros (formato de `resistencia`)"""
+        return [dict(zip(self.columns, row)) for row in self.to_array().tolist()]
+
+
+class FluidDragEngine:
+    """
+    Queda em fluido com arrasto quadrático aplicado ao corpo
+
+    A cada passo a direção do escoamento é levada ao referencial do corpo,
+    a área projetada é lida da tabela pré-calculada e a força
+    F = 0.5 * rho * Cd * A * v^2, oposta à velocidade, é aplicada com
+    `applyExternalForce` antes de avançar a simulação.
+    """
+
+    def __init__(self, physics_client: int, collision_shape: int,
+                 area_table: ProjectedAreaTable, mass: float = 1.0,
+                 time_step: float = 1 / 240):
+        self.physics_client = physics_client
+        self.collision_shape = collision_shape
+        self.area_table = area_table
+        self.mass = mass
+        self.time_step = time_step
+        self.body_id: Optional[int] = None
+
+    def setup(self) -> int:
+        """Criar o corpo uma única vez"""
+        if self.body_id is None:
+            self.body_id = p.createMultiBody(
+                baseMass=self.mass,
+                baseCollisionShapeIndex=self.collision_shape,
+                physicsClientId=self.physics_client
+            )
+            # Sem o amortecimento padrão do PyBullet: o arrasto é modelado aqui
+            p.changeDynamics(self.body_id, -1, linearDamping=0, angularDamping=0,
+                             physicsClientId=self.physics_client)
+        return self.body_id
+
+    def set_mass(self, mass: float):
+        """Alterar a massa do corpo já criado"""
+        if mass == self.mass:
+            return
+        self.mass = mass
+        if self.body_id is not None:
+            p.changeDynamics(self.body_id, -1, mass=mass, physicsClientId=self.physics_client)
+
+    def run(self, duration: float, fluid_density: float, drag_coefficient: float,
+            initial_velocity: float = 0.0, start_height: float = 10.0,
+            gravity: float = -9.8, mass: Optional[float] = None,
+            telemetry: Optional[TelemetryRingBuffer] = None,
+            progress: Optional[Callable[[float, Dict[str, Any]], None]] = None,
+            progress_interval: int = 24) -> Dict[str, np.ndarray]:
+        """
+        Simular a queda até `duration` ou até atingir z = 0
+
+        `mass` (kg) substitui a massa do motor; `progress` recebe (fração,
+        métricas parciais) a cada `progress_interval` passos.
+
+        Returns:
+            Arrays por passo de velocidade escalar, força de arrasto e área
+            projetada, posições inicial/final e número de passos
+        """
+        if mass is not None:
+            self.set_mass(mass)
+        body_id = self.setup()
+        client = self.physics_client
+        dt = self.time_step
+        max_steps = int(duration / dt)
+
+        p.setGravity(0, 0, gravity, physicsClientId=client)
+        p.setTimeStep(dt, physicsClientId=client)
+        p.resetBasePositionAndOrientation(body_id, [0, 0, start_height], [0, 0, 0, 1],
+                                          physicsClientId=client)
+        p.resetBaseVelocity(body_id, [0, 0, -initial_velocity], [0, 0, 0], physicsClientId=client)
+
+        speeds = np.zeros(max_steps)
+        drag_forces = np.zeros(max_steps)
+        areas = np.zeros(max_steps)
+        drag_factor = 0.5 * fluid_density * drag_coefficient
+        start_position = np.array([0.0, 0.0, start_height])
+        pos = start_position
+
+        step = -1
+        for step in range(max_steps):
+            pos, orn = p.getBasePositionAndOrientation(body_id, physicsClientId=client)
+            vel, _ = p.getBaseVelocity(body_id, physicsClientId=client)
+            velocity = np.asarray(vel)
+            speed = float(np.sqrt(velocity @ velocity))
+
+            force = 0.0
+            area = 0.0
+            if speed > 0:
+                flow = velocity / speed
+                rotation = np.asarray(p.getMatrixFromQuaternion(orn)).reshape(3, 3)
+                area = self.area_table.lookup(rotation.T @ flow)
+                force = drag_factor * area * speed ** 2
+                p.applyExternalForce(
+                    body_id, -1, (-force * flow).tolist(), pos, p.WORLD_FRAME,
+                    physicsClientId=client
+                )
+
+            speeds[step] = speed
+            drag_forces[step] = force
+            areas[step] = area
+            if telemetry is not None:
+                telemetry.record(step, (step * dt, *pos, *vel, speed, force, area))
+
+            if progress is not None and step % progress_interval == 0:
+                progress(step / max_steps, {
+                    "tempo": step * dt,
+                    "altura": pos[2],
+                    "velocidade": speed,
+                    "forca_arrasto": force
+                })
+
+            p.stepSimulation(physicsClientId=client)
+            if pos[2] <= 0:
+                break
+
+        num_steps = step + 1
+        return {
+            "speeds": speeds[:num_steps],
+            "drag_forces": drag_forces[:num_steps],
+            "areas": areas[:num_steps],
+            "start_position": start_position,
+            "final_position": np.asarray(pos),
+            "num_steps": num_steps
+        }
+
+    def close(self):
+        """Remover o corpo criado pelo motor"""
+        if self.body_id is not None:
+            p.removeBody(self.body_id, physicsClientId=self.physics_client)
+            self.body_id = None
+
+
+def terminal_velocity_step(speeds: np.ndarray, window: int = 120,
+                           max_variance: float = 0.1) -> int:
+    """
+    Primeiro passo em que a variância da velocidade nas últimas `window`
+    amostras fica abaixo de `max_variance` (-1 se nunca)
+    """
+    if len(speeds) <= window:
+        return -1
+    cumulative = np.concatenate(([0.0], np.cumsum(speeds)))
+    cumulative_sq = np.concatenate(([0.0], np.cumsum(speeds ** 2)))
+    # Janela terminando em cada passo i >= window (exige window + 1 amostras, como antes)
+    ends = np.arange(window + 1, len(speeds) + 1)
+    mean = (cumulative[ends] - cumulative[ends - window]) / window
+    variance = (cumulative_sq[ends] - cumulative_sq[ends - window]) / window - mean ** 2
+    stable = np.flatnonzero(variance < max_variance)
+    return int(ends[stable[0]] - 1) if len(stable) else -1
@@ -0,0 +1,530 @@
+"""
+Analisador de G-code
+Leitura vetorizada do G-code em blocos de bytes para uma tabela de linhas
+(comando e parâmetros), estado modal propagado com NumPy e tempo de cada
+movimento pelo perfil trapezoidal de velocidade, respeitando os limites de
+aceleração e avanço de M201/M203/M204/M205
+"""
+
+import gzip
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, astuple, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from backend.services.slicer import SliceSettings, iter_gcode
+
+logger = logging.getLogger(__name__)
+
+# Tamanho dos blocos lidos e analisados de uma vez (cortados em fim de linha)
+PARSE_CHUNK_BYTES = 8 << 20
+
+# Parâmetros de movimento (colunas densas) e de configuração (esparsos)
+MOTION_PARAMETERS = "XYZEF"
+SETTING_PARAMETERS = "PSRT"
+
+# Códigos da tabela: G n -> n, M n -> M_OFFSET + n
+M_OFFSET = 10000
+NO_COMMAND = -1
+
+# Largura da grade de leitura dos números (cobre "-1234.56789")
+NUMBER_GRID_CHARS = 11
+
+LAYER_MARKER = re.compile(rb";LAYER:")
+
+_POWERS = 10.0 ** np.arange(-20, 21)
+
+
+@dataclass
+class MachineLimits:
+    """Limites padrão da máquina (mm/s, mm/s²), sobrescritos pelos M-codes do arquivo"""
+    max_feedrate: Sequence[float] = (300.0, 300.0, 5.0, 25.0)
+    max_acceleration: Sequence[float] = (3000.0, 3000.0, 100.0, 10000.0)
+    print_acceleration: float = 3000.0
+    travel_acceleration: float = 3000.0
+    retract_acceleration: float = 3000.0
+    jerk_xy: float = 10.0
+    default_feedrate: float = 25.0
+
+
+@dataclass
+class GcodeAnalysis:
+    """Totais do G-code analisado"""
+    print_time_s: float = 0.0
+    layer_times_s: List[float] = field(default_factory=list)
+    filament_length_mm: float = 0.0
+    extrusion_path_mm: float = 0.0
+    travel_path_mm: float = 0.0
+    moves: int = 0
+    retractions: int = 0
+    dwell_time_s: float = 0.0
+    bounds_mm: List[List[float]] = field(default_factory=list)
+    lines: int = 0
+    analysis_time_s: float = 0.0
+    filament_diameter: float = 1.75
+
+    @property
+    def layers(self) -> int:
+        return len(self.layer_times_s)
+
+    @property
+    def filament_volume_mm3(self) -> float:
+        return self.filament_length_mm * math.pi * (self.filament_diameter / 2) ** 2
+
+    def material_g(self, density_g_cm3: float) -> float:
+        return self.filament_volume_mm3 / 1000.0 * density_g_cm3
+
+    def to_dict(self) -> Dict[str, object]:
+        data = asdict(self)
+        data["layers"] = self.layers
+        data["filament_volume_mm3"] = self.filament_volume_mm3
+        return data
+
+
+# =============================================================================
+# LEITURA
+# =============================================================================
+
+def _parse_numbers(raw: bytes, buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Valor numérico de cada palavra (bytes após a letra)
+
+    Os bytes de todas as palavras são lidos coluna a coluna numa grade de
+    largura fixa: a mantissa acumula os dígitos e as casas após o ponto
+    definem a potência de dez. As raras palavras mais largas que a grade
+    são convertidas uma a uma.
+    """
+    lengths = ends - starts - 1
+    width = min(int(lengths.max()) if len(lengths) else 0, NUMBER_GRID_CHARS)
+    padded = np.concatenate([buf, np.full(width + 1, 32, dtype=np.uint8)])
+    mantissa = np.zeros(len(starts), dtype=np.int64)
+    decimals = np.zeros(len(starts), dtype=np.int64)
+    after_dot = np.zeros(len(starts), dtype=bool)
+    negative = np.zeros(len(starts), dtype=bool)
+    for column in range(width):
+        chars = padded[starts + 1 + column]
+        inside = column < lengths
+        digit = inside & (chars >= 48) & (chars <= 57)
+        mantissa = np.where(digit, mantissa * 10 + (chars - 48), mantissa)
+        decimals += digit & after_dot
+        after_dot |= inside & (chars == 46)
+        negative |= inside & (chars == 45)
+    values = mantissa / _POWERS[np.minimum(decimals, 20) + 20]
+    values[negative] *= -1
+
+    for index in np.flatnonzero(lengths > width):
+        try:
+            values[index] = float(raw[starts[index] + 1:ends[index]])
+        except ValueError:
+            values[index] = np.nan
+    return values
+
+
+def _parse_chunk(raw: bytes) -> Dict[str, np.ndarray]:
+    """
+    Tabela das linhas com comando de um bloco de G-code (terminado em fim de linha)
+
+    Comentários viram espaços e cada palavra `<letra><número>` é localizada
+    pelas fronteiras entre espaço e texto. Linhas sem G/M são descartadas;
+    os marcadores `;LAYER:` ficam como contagem acumulada por linha. Os
+    parâmetros de configuração (P, S, R, T) são esparsos: linhas e valores.
+    """
+    data = np.frombuffer(raw, dtype=np.uint8)
+    newlines = np.flatnonzero(data == 10)
+    n_lines = len(newlines) + (1 if len(data) and data[-1] != 10 else 0)
+    line_ends = np.append(newlines, len(data))[:n_lines]
+
+    buf = data.copy()
+    semicolons = np.flatnonzero(buf == 59)
+    markers = np.zeros(n_lines, dtype=np.int32)
+    if len(semicolons):
+        line_of = np.searchsorted(newlines, semicolons)
+        first = np.r_[True, line_of[1:] != line_of[:-1]]
+        marks = np.zeros(len(buf) + 1, dtype=np.int8)
+        marks[semicolons[first]] += 1
+        marks[line_ends[line_of[first]]] -= 1
+        buf[np.cumsum(marks[:-1], dtype=np.int8) > 0] = 32
+        positions = [m.start() for m in LAYER_MARKER.finditer(raw)]
+        markers[np.searchsorted(newlines, positions)] = 1
+
+    lower = (buf >= 97) & (buf <= 122)
+    buf[lower] -= 32
+    space = buf <= 32
+    text = ~space
+    starts = np.flatnonzero(text & np.r_[True, space[:-1]])
+    ends = np.flatnonzero(text & np.r_[space[1:], True]) + 1
+    letters = buf[starts]
+    words = (letters >= 65) & (letters <= 90)
+    starts, ends, letters = starts[words], ends[words], letters[words]
+    values = _parse_numbers(raw, buf, starts, ends)
+    word_line = np.searchsorted(newlines, starts)
+
+    # Comando da linha: primeira palavra G ou M
+    is_command = (letters == 71) | (letters == 77)
+    command_line = word_line[is_command]
+    first = np.r_[True, command_line[1:] != command_line[:-1]] if len(command_line) else np.zeros(0, dtype=bool)
+    lines_with_command = command_line[first]
+    codes = values[is_command][first].astype(np.int32) + np.where(letters[is_command][first] == 77, M_OFFSET, 0)
+    row_of_line = np.full(n_lines, -1, dtype=np.int64)
+    row_of_line[lines_with_command] = np.arange(len(lines_with_command))
+
+    layer_marks = np.cumsum(markers, dtype=np.int32)
+    table = {
+        "command": codes.astype(np.int32),
+        "layer": layer_marks[lines_with_command],
+        "lines": np.array([n_lines]),
+        "markers": np.array([int(layer_marks[-1]) if n_lines else 0]),
+    }
+
+    word_row = row_of_line[word_line]
+    for name in MOTION_PARAMETERS:
+        column = np.full(len(lines_with_command), np.nan)
+        selected = (letters == ord(name)) & (word_row >= 0)
+        column[word_row[selected]] = values[selected]
+        table[name] = column
+    for name in SETTING_PARAMETERS:
+        selected = (letters == ord(name)) & (word_row >= 0)
+        table[f"{name}_rows"] = word_row[selected]
+        table[name] = values[selected]
+    return table
+
+
+def _iter_blocks(chunks: Iterable[Union[bytes, str]], block_bytes: int) -> Iterable[bytes]:
+    """Reagrupar blocos de qualquer tamanho em blocos grandes cortados em fim de linha"""
+    pending: List[bytes] = []
+    size = 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        pending.append(chunk)
+        size += len(chunk)
+        if size < block_bytes:
+            continue
+        joined = b"".join(pending)
+        cut = joined.rfind(b"\n") + 1
+        if cut == 0:
+            pending, size = [joined], len(joined)
+            continue
+        yield joined[:cut]
+        pending, size = [joined[cut:]], len(joined) - cut
+    tail = b"".join(pending)
+    if tail:
+        yield tail
+
+
+def _read_file(path: Path, block_bytes: int) -> Iterable[bytes]:
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as f:
+        while True:
+            chunk = f.read(block_bytes)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _concatenate_tables(tables: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Juntar as tabelas dos blocos, deslocando linhas esparsas e contagens de camada"""
+    row_offsets = np.cumsum([0] + [len(t["command"]) for t in tables])
+    layer_offsets = np.cumsum([0] + [int(t["markers"][0]) for t in tables])
+    table = {}
+    for key in tables[0]:
+        parts = [t[key] for t in tables]
+        if key.endswith("_rows"):
+            parts = [part + offset for part, offset in zip(parts, row_offsets)]
+        elif key == "layer":
+            parts = [part + offset for part, offset in zip(parts, layer_offsets)]
+        table[key] = np.concatenate(parts)
+    return table
+
+
+# =============================================================================
+# ESTADO MODAL E PLANEJAMENTO
+# =============================================================================
+
+def _ffill(values: np.ndarray, valid: np.ndarray, initial) -> np.ndarray:
+    """Último valor válido até cada linha (`initial` antes do primeiro)"""
+    index = np.where(valid, np.arange(len(valid)), -1)
+    np.maximum.accumulate(index, out=index)
+    return np.where(index >= 0, values[np.maximum(index, 0)], initial)
+
+
+def _axis_positions(values: np.ndarray, motion: np.ndarray, set_position: np.ndarray,
+                    relative: np.ndarray) -> np.ndarray:
+    """
+    Coordenada de um eixo após cada linha
+
+    Linhas absolutas (e G92) ancoram a posição; deslocamentos relativos são
+    somados desde a última âncora.
+    """
+    given = ~np.isnan(values)
+    anchor = given & ((motion & ~relative) | set_position)
+    offsets = np.cumsum(np.where(given & motion & relative, values, 0.0))
+    index = np.where(anchor, np.arange(len(values)), -1)
+    np.maximum.accumulate(index, out=index)
+    base = np.where(index >= 0, values[np.maximum(index, 0)] - offsets[np.maximum(index, 0)], 0.0)
+    return base + offsets
+
+
+def _mode(command: np.ndarray, switches: Dict[int, bool]) -> np.ndarray:
+    """Modo booleano definido pelo último comando de `switches` (False antes)"""
+    code = np.full(len(command), -1, dtype=np.int8)
+    for value, state in switches.items():
+        code[command == value] = int(state)
+    return _ffill(code, code >= 0, 0).astype(bool)
+
+
+def _setting(table: Dict[str, np.ndarray], command: np.ndarray, code: int, name: str,
+             rows: np.ndarray, default: float) -> np.ndarray:
+    """Último valor de `name` definido por `code` antes de cada linha de `rows`"""
+    if name in SETTING_PARAMETERS:
+        set_rows, set_values = table[f"{name}_rows"], table[name]
+    else:
+        set_rows = np.flatnonzero(~np.isnan(table[name]))
+        set_values = table[name][set_rows]
+    keep = command[set_rows] == code
+    set_rows, set_values = set_rows[keep], set_values[keep]
+    index = np.searchsorted(set_rows, rows, side="right") - 1
+    return np.where(index >= 0, set_values[np.maximum(index, 0)] if len(set_rows) else default, default)
+
+
+def _plan_speeds(junction_sq: np.ndarray, reach: np.ndarray) -> np.ndarray:
+    """
+    Velocidades² nas junções pelas passadas para frente e para trás
+
+    A recorrência w[i+1] = min(c[i+1], w[i] + d[i]) tem forma fechada
+    w = D + acumulado_mínimo(c - D), com D a soma acumulada de d = 2·a·L,
+    então as duas passadas do planejador são operações vetoriais.
+    """
+    distance = np.concatenate([[0.0], np.cumsum(reach)])
+    forward = distance + np.minimum.accumulate(junction_sq - distance)
+    backward_reach = np.concatenate([[0.0], np.cumsum(reach[::-1])])
+    backward = backward_reach + np.minimum.accumulate(forward[::-1] - backward_reach)
+    return np.maximum(backward[::-1], 0.0)
+
+
+def _trapezoid_times(length: np.ndarray, accel: np.ndarray, cruise: np.ndarray,
+                     entry_sq: np.ndarray, exit_sq: np.ndarray) -> np.ndarray:
+    """Tempo de cada movimento no perfil acelera-cruzeiro-desacelera"""
+    cruise_sq = cruise ** 2
+    entry_sq = np.minimum(entry_sq, cruise_sq)
+    exit_sq = np.minimum(exit_sq, cruise_sq)
+    accel_distance = (cruise_sq - entry_sq) / (2 * accel)
+    decel_distance = (cruise_sq - exit_sq) / (2 * accel)
+    reaches_cruise = accel_distance + decel_distance <= length
+
+    peak = np.where(reaches_cruise, cruise,
+                    np.sqrt(np.maximum((2 * accel * length + entry_sq + exit_sq) / 2, 0.0)))
+    entry, exit_ = np.sqrt(entry_sq), np.sqrt(exit_sq)
+    ramps = (peak - entry) / accel + (peak - exit_) / accel
+    plateau = np.where(reaches_cruise, (length - accel_distance - decel_distance) / cruise, 0.0)
+    return ramps + plateau
+
+
+def _analyze_table(table: Dict[str, np.ndarray], limits: MachineLimits,
+                   filament_diameter: float) -> GcodeAnalysis:
+    command = table["command"]
+    motion = (command == 0) | (command == 1)
+    set_position = command == 92
+
+    relative = _mode(command, {90: False, 91: True})
+    relative_e = _mode(command, {90: False, 91: True, M_OFFSET + 82: False, M_OFFSET + 83: True})
+    position = np.stack([
+        _axis_positions(table[axis], motion, set_position, relative) for axis in "XYZ"
+    ] + [_axis_positions(table["E"], motion, set_position, relative_e)], axis=1)
+    feed = _ffill(table["F"] / 60.0, motion & ~np.isnan(table["F"]), limits.default_feedrate)
+
+    # Tabela de movimentos
+    rows = np.flatnonzero(motion)
+    previous = np.vstack([np.zeros((1, 4)), position])[rows]
+    delta = position[rows] - previous
+    xyz_length = np.sqrt(np.einsum("ij,ij->i", delta[:, :3], delta[:, :3]))
+    e_delta = delta[:, 3]
+    e_only = (xyz_length == 0) & (e_delta != 0)
+    length = np.where(e_only, np.abs(e_delta), xyz_length)
+    moving = length > 0
+    rows, previous, delta, xyz_length, e_delta, e_only, length = (
+        rows[moving], previous[moving], delta[moving], xyz_length[moving], e_delta[moving],
+        e_only[moving], length[moving]
+    )
+    extruding = (e_delta > 0) & ~e_only
+
+    # Limites vigentes em cada movimento (M201/M203/M204/M205)
+    max_feed = np.stack([_setting(table, command, M_OFFSET + 203, axis, rows, default)
+                         for axis, default in zip("XYZE", limits.max_feedrate)], axis=1)
+    max_accel = np.stack([_setting(table, command, M_OFFSET + 201, axis, rows, default)
+                          for axis, default in zip("XYZE", limits.max_acceleration)], axis=1)
+    shared_accel = _setting(table, command, M_OFFSET + 204, "S", rows, np.nan)
+    print_accel = _setting(table, command, M_OFFSET + 204, "P", rows, np.nan)
+    travel_accel = _setting(table, command, M_OFFSET + 204, "T", rows, np.nan)
+    print_accel = np.where(np.isnan(print_accel), np.nan_to_num(shared_accel, nan=limits.print_acceleration),
+                           print_accel)
+    travel_accel = np.where(np.isnan(travel_accel), np.nan_to_num(shared_accel, nan=limits.travel_acceleration),
+                            travel_accel)
+    retract_accel = _setting(table, command, M_OFFSET + 204, "R", rows, limits.retract_acceleration)
+    jerk = _setting(table, command, M_OFFSET + 205, "X", rows, limits.jerk_xy)
+
+    # Componentes por unidade de trajetória limitam avanço e aceleração
+    unit = np.abs(delta) / length[:, None]
+    with np.errstate(divide="ignore"):
+        cruise = np.minimum(feed[rows], np.min(max_feed / unit, axis=1))
+        accel = np.where(e_only, retract_accel, np.where(extruding, print_accel, travel_accel))
+        accel = np.minimum(accel, np.min(max_accel / unit, axis=1))
+
+    # Junções: velocidade limitada pelo jerk e pela mudança de direção; paradas em retrações e pausas
+    direction = np.where(e_only[:, None], 0.0, delta[:, :3] / np.maximum(xyz_length, 1e-12)[:, None])
+    turn_vector = direction[1:] - direction[:-1]
+    turn = np.sqrt(np.einsum("ij,ij->i", turn_vector, turn_vector))
+    with np.errstate(divide="ignore"):
+        junction = np.minimum(np.minimum(cruise[1:], cruise[:-1]), jerk[1:] / turn)
+    dwell = command == 4
+    dwell_count = np.cumsum(dwell)[rows]
+    junction[(e_only[1:] | e_only[:-1]) | (dwell_count[1:] != dwell_count[:-1])] = 0.0
+    junction_sq = np.concatenate([[0.0], junction ** 2, [0.0]])
+    speeds_sq = _plan_speeds(junction_sq, 2 * accel * length)
+    move_times = _trapezoid_times(length, accel, cruise, speeds_sq[:-1], speeds_sq[1:])
+
+    dwell_rows = np.flatnonzero(dwell)
+    dwell_ms = _setting(table, command, 4, "P", dwell_rows, np.nan)
+    dwell_s = _setting(table, command, 4, "S", dwell_rows, 0.0)
+    # _setting propaga o último valor; pausas sem o parâmetro não herdam o da anterior
+    dwell_ms[~np.isin(dwell_rows, table["P_rows"])] = np.nan
+    dwell_s[~np.isin(dwell_rows, table["S_rows"])] = 0.0
+    dwell_times = np.where(np.isnan(dwell_ms), dwell_s, dwell_ms / 1000.0)
+
+    # Camadas pelos marcadores ;LAYER: ou, sem eles, pela altura dos movimentos que extrudam
+    if table["markers"].sum():
+        layer = table["layer"][rows].astype(np.int64) - 1
+    elif extruding.any():
+        _, level = np.unique(np.round(position[rows[extruding], 2], 4), return_inverse=True)
+        layer = np.full(len(rows), -1)
+        layer[extruding] = level
+        layer = _ffill(layer, layer >= 0, -1)
+    else:
+        layer = np.full(len(rows), -1)
+    layer_count = int(layer.max()) + 1 if len(layer) and layer.max() >= 0 else 0
+    counted = layer >= 0
+    layer_times = np.bincount(layer[counted], weights=move_times[counted], minlength=layer_count)
+
+    extruded_points = np.concatenate([position[rows[extruding], :3], previous[extruding, :3]])
+    bounds = ([extruded_points.min(axis=0).tolist(), extruded_points.max(axis=0).tolist()]
+              if len(extruded_points) else [])
+
+    return GcodeAnalysis(
+        print_time_s=float(move_times.sum() + dwell_times.sum()),
+        layer_times_s=layer_times.tolist(),
+        filament_length_mm=float(e_delta.sum()),
+        extrusion_path_mm=float(xyz_length[extruding].sum()),
+        travel_path_mm=float(xyz_length[~extruding].sum()),
+        moves=len(rows),
+        retractions=int(np.count_nonzero(e_only & (e_delta < 0))),
+        dwell_time_s=float(dwell_times.sum()),
+        bounds_mm=bounds,
+        lines=int(table["lines"].sum()),
+        filament_diameter=filament_diameter
+    )
+
+
+# =============================================================================
+# API
+# =============================================================================
+
+def analyze_gcode_chunks(chunks: Iterable[Union[bytes, str]], filament_diameter: float = 1.75,
+                         limits: Optional[MachineLimits] = None,
+                         block_bytes: int = PARSE_CHUNK_BYTES) -> GcodeAnalysis:
+    """
+    Analisar G-code recebido em blocos (arquivo lido aos pedaços ou o
+    gerador do fatiador), sem montar o texto inteiro em memória
+    """
+    started = time.perf_counter()
+    tables = [_parse_chunk(block) for block in _iter_blocks(chunks, block_bytes)] or [_parse_chunk(b"")]
+    table = _concatenate_tables(tables)
+    analysis = _analyze_table(table, limits or MachineLimits(), filament_diameter)
+    analysis.analysis_time_s = time.perf_counter() - started
+    logger.info(f"G-code analisado: {analysis.lines} linhas, {analysis.layers} camadas, "
+                f"{analysis.print_time_s / 60:.1f} min em {analysis.analysis_time_s:.2f}s")
+    return analysis
+
+
+def analyze_gcode(source: Union[str, Path, bytes], filament_diameter: float = 1.75,
+                  limits: Optional[MachineLimits] = None,
+                  block_bytes: int = PARSE_CHUNK_BYTES) -> GcodeAnalysis:
+    """
+    Analisar um arquivo de G-code (.gcode ou .gcode.gz) ou o conteúdo em bytes
+
+    Returns:
+        Tempo de impressão com aceleração, tempo por camada, filamento,
+        distâncias e caixa envolvente do material extrudado
+    """
+    if isinstance(source, bytes):
+        chunks: Iterable[bytes] = [source]
+    else:
+        chunks = _read_file(Path(source), block_bytes)
+    return analyze_gcode_chunks(chunks, filament_diameter, limits, block_bytes)
+
+
+_estimate_cache: "OrderedDict[tuple, GcodeAnalysis]" = OrderedDict()
+_estimate_lock = threading.Lock()
+
+# Comandos do cabeçalho que mudam a análise (modos, movimentos, pausas e limites)
+TIMING_COMMANDS = frozenset({
+    "G0", "G1", "G4", "G28", "G90", "G91", "G92",
+    "M82", "M83", "M201", "M203", "M204", "M205",
+})
+_COMMAND_WORD = re.compile(r"^([GM])0*(\d+)$")
+
+
+def _timing_header(start_gcode: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Linhas do cabeçalho relevantes para o tempo, sem comentários
+
+    Metadados (id do job, data de criação) e temperaturas não alteram a
+    estimativa e ficam fora da chave do cache.
+    """
+    lines = []
+    for line in start_gcode:
+        words = line.split(";", 1)[0].upper().split()
+        match = _COMMAND_WORD.match(words[0]) if words else None
+        if match and "".join(match.groups()) in TIMING_COMMANDS:
+            lines.append(" ".join(["".join(match.groups())] + words[1:]))
+    return tuple(lines)
+
+
+def estimate_model_print(model_path: Union[str, Path], settings: Optional[SliceSettings] = None,
+                         start_gcode: Sequence[str] = (), limits: Optional[MachineLimits] = None,
+                         max_entries: int = 128) -> GcodeAnalysis:
+    """
+    Fatiar o modelo e analisar o G-code produzido, sem gravá-lo em disco
+
+    O cabeçalho (M201/M203/M204) entra na análise, então os limites da
+    impressora valem para a estimativa de orçamentos e da fila. O resultado
+    é memorizado pelo hash do conteúdo do modelo, pelos parâmetros e pelas
+    linhas do cabeçalho que afetam o tempo: orçar de novo o mesmo arquivo não
+    fatia outra vez, mesmo com outro id de job ou data no cabeçalho.
+    """
+    from backend.services.mesh_ingest import file_content_hash, ingest_mesh
+
+    settings = settings or SliceSettings()
+    # repr: campos podem ser listas (não hasheáveis)
+    key = (file_content_hash(Path(model_path)), repr(astuple(settings)), _timing_header(start_gcode),
+           repr(astuple(limits)) if limits is not None else None)
+    with _estimate_lock:
+        analysis = _estimate_cache.get(key)
+        if analysis is not None:
+            _estimate_cache.move_to_end(key)
+            return analysis
+
+    mesh = ingest_mesh(model_path, min_component_faces=None)
+    chunks = iter_gcode(mesh.vertices, mesh.faces, settings, start_gcode)
+    analysis = analyze_gcode_chunks(chunks, settings.filament_diameter, limits)
+    with _estimate_lock:
+        _estimate_cache[key] = analysis
+        while len(_estimate_cache) > max_entries:
+            _estimate_cache.popitem(last=False)
+    return analysis
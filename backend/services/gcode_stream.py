@@ -0,0 +1,186 @@
+"""
+Gravação de G-code em Fluxo
+Os blocos de texto do fatiador são gravados num arquivo com buffer
+(opcionalmente gzip) à medida que são produzidos. Um marcador ao lado do
+arquivo indica que a geração está em andamento, para que o download possa
+acompanhar o arquivo enquanto ele cresce, inclusive a partir de outro processo.
+O marcador guarda host e PID de quem grava e é renovado durante a escrita;
+marcador de processo morto ou sem renovação é de uma geração abandonada
+"""
+
+import gzip
+import logging
+import os
+import socket
+import time
+from pathlib import Path
+from typing import Generator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Buffer do arquivo de saída
+GCODE_WRITE_BUFFER_BYTES = 1 << 20
+
+# Bytes de texto entre descargas para o disco (visíveis para quem acompanha o arquivo)
+GCODE_FLUSH_BYTES = 1 << 18
+
+# Sufixo do marcador de geração em andamento
+IN_PROGRESS_SUFFIX = ".writing"
+
+# Intervalo de renovação do marcador durante a escrita
+MARKER_HEARTBEAT_SECONDS = 30.0
+
+# Marcador sem renovação por este tempo pertence a uma geração abandonada
+MARKER_STALE_SECONDS = 300.0
+
+
+def gcode_filename(stem: str, compress: bool = False) -> str:
+    return f"{stem}.gcode.gz" if compress else f"{stem}.gcode"
+
+
+def in_progress_marker(path: Union[str, Path]) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + IN_PROGRESS_SUFFIX)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _marker_alive(marker: Path) -> bool:
+    """Processo dono do marcador ainda gravando"""
+    try:
+        owner = marker.read_text().split()
+        age = time.time() - marker.stat().st_mtime
+    except OSError:
+        return False
+    if age > MARKER_STALE_SECONDS:
+        return False
+    # No mesmo host o PID decide; de outro host só vale a renovação
+    if len(owner) == 2 and owner[0] == socket.gethostname() and owner[1].isdigit():
+        return _pid_alive(int(owner[1]))
+    return True
+
+
+def is_generating(path: Union[str, Path]) -> bool:
+    """G-code ainda sendo escrito (marcador presente e de geração viva)"""
+    marker = in_progress_marker(path)
+    return marker.exists() and _marker_alive(marker)
+
+
+def is_abandoned(path: Union[str, Path]) -> bool:
+    """Marcador de uma geração que não terminou (processo morto ou parado)"""
+    marker = in_progress_marker(path)
+    return marker.exists() and not _marker_alive(marker)
+
+
+def discard_abandoned(path: Union[str, Path]) -> bool:
+    """
+    Apagar G-code parcial de geração abandonada
+
+    Returns:
+        True se havia marcador abandonado (arquivo parcial e marcador removidos)
+    """
+    if not is_abandoned(path):
+        return False
+    Path(path).unlink(missing_ok=True)
+    in_progress_marker(path).unlink(missing_ok=True)
+    logger.warning(f"G-code parcial de geração interrompida removido: {path}")
+    return True
+
+
+def sweep_abandoned(directory: Union[str, Path]) -> int:
+    """Remover gerações abandonadas sob `directory` (na inicialização)"""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return 0
+    removed = 0
+    for marker in directory.rglob(f"*{IN_PROGRESS_SUFFIX}"):
+        removed += discard_abandoned(marker.with_name(marker.name[:-len(IN_PROGRESS_SUFFIX)]))
+    return removed
+
+
+class GcodeFileSink:
+    """
+    Destino de G-code com buffer, gzip opcional
+
+    O marcador de andamento é criado ao abrir (com host e PID), renovado
+    durante a escrita e removido ao fechar; se a geração falhar o arquivo
+    parcial também é apagado, para que o job possa gerar de novo.
+    """
+
+    def __init__(self, path: Union[str, Path], compress: Optional[bool] = None,
+                 compresslevel: int = 6, flush_bytes: int = GCODE_FLUSH_BYTES):
+        self.path = Path(path)
+        self.compress = self.path.suffix == ".gz" if compress is None else compress
+        self.compresslevel = compresslevel
+        self.flush_bytes = flush_bytes
+        self.bytes_written = 0
+        self._unflushed = 0
+        self._heartbeat = 0.0
+        self._file = None
+
+    def open(self) -> "GcodeFileSink":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        in_progress_marker(self.path).write_text(f"{socket.gethostname()} {os.getpid()}\n")
+        self._heartbeat = time.monotonic()
+        if self.compress:
+            self._file = gzip.open(self.path, "wt", compresslevel=self.compresslevel)
+        else:
+            self._file = open(self.path, "w", buffering=GCODE_WRITE_BUFFER_BYTES)
+        return self
+
+    def write(self, chunk: str):
+        self._file.write(chunk)
+        self.bytes_written += len(chunk)
+        self._unflushed += len(chunk)
+        if self._unflushed >= self.flush_bytes:
+            self.flush()
+        if time.monotonic() - self._heartbeat >= MARKER_HEARTBEAT_SECONDS:
+            self._heartbeat = time.monotonic()
+            os.utime(in_progress_marker(self.path))
+
+    def flush(self):
+        # No gzip a descarga fecha o bloco deflate atual (Z_SYNC_FLUSH)
+        self._file.flush()
+        self._unflushed = 0
+
+    def close(self, failed: bool = False):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if failed:
+            self.path.unlink(missing_ok=True)
+        in_progress_marker(self.path).unlink(missing_ok=True)
+
+    def __enter__(self) -> "GcodeFileSink":
+        return self.open() if self._file is None else self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(failed=exc_type is not None)
+        return False
+
+
+def write_gcode(chunks: Generator, sink: GcodeFileSink):
+    """
+    Consumir o gerador de blocos gravando no destino
+
+    Returns:
+        Valor de retorno do gerador (o `SliceResult` do fatiador)
+    """
+    with sink:
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration as stop:
+                result = stop.value
+                break
+            sink.write(chunk)
+    logger.info(f"G-code gravado em {sink.path} ({sink.bytes_written / 1e6:.1f} MB de texto)")
+    return result
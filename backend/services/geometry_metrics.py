@@ -0,0 +1,265 @@
+"""
+Análise Geométrica de Malhas
+Estágio único, executado uma vez por versão do modelo: volume, área,
+caixa envolvente, centroide, tensor de inércia, áreas projetadas nos eixos e
+volume do fecho convexo, vetorizados sobre os arrays da malha ingerida.
+O resultado é persistido em `Model3D.metricas_geometria`
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from backend.models.geometry import GeometryMetrics
+
+logger = logging.getLogger(__name__)
+
+# Resolução da grade das silhuetas nos eixos (pixels por lado)
+PROJECTED_AREA_RESOLUTION = 256
+
+# Densidade usada quando o material não é informado (PLA, g/cm³)
+DEFAULT_MATERIAL_DENSITY = 1.24
+
+# Métricas de imprimibilidade copiadas para o registro quando disponíveis
+PRINTABILITY_FIELDS = ("watertight", "support_volume_mm3", "critical_overhang_area_mm2",
+                       "min_wall_thickness_mm")
+
+
+def _orthonormal_basis(direction: np.ndarray) -> np.ndarray:
+    """Dois vetores unitários perpendiculares a `direction`, shape (2, 3)"""
+    helper = np.array([1.0, 0.0, 0.0]) if abs(direction[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
+    u = np.cross(direction, helper)
+    u /= np.linalg.norm(u)
+    v = np.cross(direction, u)
+    return np.stack([u, v])
+
+
+def silhouette_area(vertices: np.ndarray, faces: np.ndarray, direction: Sequence[float],
+                    resolution: int = 128) -> float:
+    """
+    Área da silhueta da malha vista ao longo de `direction`
+
+    Os triângulos são projetados no plano perpendicular e rasterizados numa
+    grade `resolution` x `resolution`; cada pixel coberto por ao menos um
+    triângulo conta uma vez, de modo que sobreposições (malhas côncavas ou
+    faces de frente e de trás) não inflam a área.
+    """
+    direction = np.asarray(direction, dtype=np.float64)
+    direction = direction / np.linalg.norm(direction)
+
+    uv = np.asarray(vertices, dtype=np.float64) @ _orthonormal_basis(direction).T
+    origin = uv.min(axis=0)
+    extent = float((uv.max(axis=0) - origin).max())
+    if extent <= 0:
+        return 0.0
+
+    pixel = extent / resolution
+    tri = ((uv - origin) / pixel)[np.asarray(faces)]
+    a, b, c = tri[:, 0], tri[:, 1], tri[:, 2]
+
+    # Triângulos degenerados na projeção (vistos de lado) não cobrem pixels
+    doubled_area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+    keep = doubled_area != 0
+    a, b, c = a[keep], b[keep], c[keep]
+
+    # Candidatos: centros de pixel dentro da caixa envolvente de cada triângulo
+    lo = np.ceil(np.minimum(np.minimum(a, b), c) - 0.5).astype(np.int64)
+    hi = np.floor(np.maximum(np.maximum(a, b), c) - 0.5).astype(np.int64)
+    lo = np.clip(lo, 0, resolution)
+    hi = np.clip(hi, -1, resolution)
+    size = np.maximum(hi - lo + 1, 0)
+    counts = size[:, 0] * size[:, 1]
+    total = int(counts.sum())
+    if total == 0:
+        return 0.0
+
+    owner = np.repeat(np.arange(len(counts)), counts)
+    local = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    ix = lo[owner, 0] + local % size[owner, 0]
+    iy = lo[owner, 1] + local // size[owner, 0]
+    px, py = ix + 0.5, iy + 0.5
+
+    def edge(p0, p1):
+        return ((p1[owner, 0] - p0[owner, 0]) * (py - p0[owner, 1]) -
+                (p1[owner, 1] - p0[owner, 1]) * (px - p0[owner, 0]))
+
+    w0, w1, w2 = edge(a, b), edge(b, c), edge(c, a)
+    inside = ((w0 >= 0) & (w1 >= 0) & (w2 >= 0)) | ((w0 <= 0) & (w1 <= 0) & (w2 <= 0))
+
+    mask = np.zeros((resolution + 1, resolution + 1), dtype=bool)
+    mask[ix[inside], iy[inside]] = True
+    return float(np.count_nonzero(mask)) * pixel ** 2
+
+
+def mass_properties(triangles: np.ndarray) -> Dict[str, Any]:
+    """
+    Volume, centroide e tensor de inércia (densidade unitária) de uma malha fechada
+
+    Cada triângulo forma um tetraedro com a origem; o segundo momento de
+    cada tetraedro tem forma fechada (det/120 * (Σ pᵢpᵢᵀ + (Σp)(Σp)ᵀ)) e a
+    soma é transladada para o centroide. Malhas com orientação invertida
+    têm o sinal corrigido pelo volume total.
+    """
+    a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    det = np.einsum("ij,ij->i", a, np.cross(b, c))
+    volume = det.sum() / 6.0
+    sign = -1.0 if volume < 0 else 1.0
+    det = det * sign
+    volume = abs(volume)
+
+    if volume <= 0:
+        # Superfície aberta ou plana: centroide ponderado pela área
+        areas = 0.5 * np.linalg.norm(np.cross(b - a, c - a), axis=1)
+        weight = areas.sum()
+        centroid = (triangles.mean(axis=1) * areas[:, None]).sum(axis=0) / weight if weight > 0 else np.zeros(3)
+        return {"volume": 0.0, "centroid": centroid, "inertia": np.zeros((3, 3))}
+
+    summed = a + b + c
+    centroid = (det[:, None] * summed).sum(axis=0) / (24.0 * volume)
+    covariance = (np.einsum("f,fi,fj->ij", det, a, a) + np.einsum("f,fi,fj->ij", det, b, b) +
+                  np.einsum("f,fi,fj->ij", det, c, c) +
+                  np.einsum("f,fi,fj->ij", det, summed, summed)) / 120.0
+    covariance -= volume * np.outer(centroid, centroid)
+    inertia = np.trace(covariance) * np.eye(3) - covariance
+    return {"volume": float(volume), "centroid": centroid, "inertia": inertia}
+
+
+def is_closed_manifold(faces: np.ndarray) -> bool:
+    """Cada aresta compartilhada por exatamente duas faces (malha estanque)"""
+    if len(faces) == 0:
+        return False
+    edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    # Aresta como chave escalar: ordenar int64 é bem mais rápido que unique(axis=0)
+    keys = np.sort(edges[:, 0] * (int(faces.max()) + 1) + edges[:, 1])
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    counts = np.diff(np.r_[starts, len(keys)])
+    return bool(np.all(counts == 2))
+
+
+def convex_hull_volume(vertices: np.ndarray) -> Optional[float]:
+    """Volume do fecho convexo (None se o qhull não estiver disponível ou a malha for plana)"""
+    try:
+        from scipy.spatial import ConvexHull
+        return float(ConvexHull(vertices).volume)
+    except Exception as e:
+        logger.debug(f"Fecho convexo indisponível: {e}")
+        return None
+
+
+def _printability_value(printability: Any, name: str):
+    if printability is None:
+        return None
+    if isinstance(printability, dict):
+        return printability.get(name)
+    return getattr(printability, name, None)
+
+
+def compute_geometry_metrics(mesh, printability: Any = None,
+                             source_sha256: Optional[str] = None,
+                             resolution: int = PROJECTED_AREA_RESOLUTION) -> GeometryMetrics:
+    """
+    Calcular o registro de métricas de uma malha
+
+    Args:
+        mesh: Objeto com `vertices` e `faces` (IngestedMesh ou Trimesh)
+        printability: PrintabilityMetrics (ou o dict `metrics` do relatório)
+            da mesma malha; estanqueidade, suporte e paredes são copiados
+        source_sha256: Hash do arquivo de origem (identifica a versão)
+    """
+    vertices = np.asarray(mesh.vertices, dtype=np.float64)
+    faces = np.asarray(mesh.faces, dtype=np.int64)
+    triangles = vertices[faces]
+
+    if len(vertices):
+        bounds = np.stack([vertices.min(axis=0), vertices.max(axis=0)])
+    else:
+        bounds = np.zeros((2, 3))
+    dimensions = bounds[1] - bounds[0]
+    area = float(0.5 * np.linalg.norm(
+        np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]), axis=1
+    ).sum()) if len(faces) else 0.0
+    mass = mass_properties(triangles) if len(faces) else {
+        "volume": 0.0, "centroid": np.zeros(3), "inertia": np.zeros((3, 3))
+    }
+
+    projected = {
+        axis: silhouette_area(vertices, faces, direction, resolution) if len(faces) else 0.0
+        for axis, direction in zip("xyz", np.eye(3))
+    }
+
+    extracted = {name: _printability_value(printability, name) for name in PRINTABILITY_FIELDS}
+    if extracted["watertight"] is None:
+        extracted["watertight"] = is_closed_manifold(faces)
+
+    return GeometryMetrics(
+        vertices=len(vertices),
+        faces=len(faces),
+        volume_mm3=mass["volume"],
+        surface_area_mm2=area,
+        bounds_mm=bounds.tolist(),
+        dimensions_mm={"x": float(dimensions[0]), "y": float(dimensions[1]), "z": float(dimensions[2])},
+        centroid_mm=np.asarray(mass["centroid"], dtype=np.float64).tolist(),
+        inertia_tensor_mm5=np.asarray(mass["inertia"], dtype=np.float64).tolist(),
+        projected_area_mm2=projected,
+        convex_hull_volume_mm3=convex_hull_volume(vertices) if len(vertices) >= 4 else None,
+        source_sha256=source_sha256,
+        **extracted
+    )
+
+
+def model_geometry(model_3d) -> Optional[GeometryMetrics]:
+    """Registro persistido do modelo, se existir e for da versão atual do cálculo"""
+    metrics = getattr(model_3d, "metricas_geometria", None)
+    if isinstance(metrics, dict):
+        metrics = GeometryMetrics.from_dict(metrics)
+    if isinstance(metrics, GeometryMetrics) and metrics.is_current:
+        return metrics
+    return None
+
+
+def model_volume_mm3(model_3d, include_support: bool = False,
+                     default: Optional[float] = 0.0) -> Optional[float]:
+    """
+    Volume do modelo a partir do registro de métricas
+
+    Modelos anteriores ao registro caem para `volume_calculado`; com
+    `include_support` soma o volume de suporte estimado, quando conhecido.
+    """
+    metrics = model_geometry(model_3d)
+    if metrics is not None:
+        return metrics.material_volume_mm3(include_support)
+    volume = getattr(model_3d, "volume_calculado", None)
+    return float(volume) if volume else default
+
+
+def ensure_model_geometry(model_3d, db=None, mesh=None,
+                          printability: Any = None) -> Optional[GeometryMetrics]:
+    """
+    Registro de métricas do modelo, calculado e persistido se ausente
+
+    Modelos criados antes do registro (ou com versão de cálculo antiga)
+    são analisados uma vez a partir de `arquivo_path`; as consultas
+    seguintes leem a coluna.
+    """
+    metrics = model_geometry(model_3d)
+    if metrics is not None:
+        return metrics
+
+    from backend.services.mesh_ingest import file_content_hash, ingest_mesh
+
+    path = getattr(model_3d, "arquivo_path", None)
+    try:
+        path = Path(path)
+        if mesh is None:
+            mesh = ingest_mesh(path, min_component_faces=None)
+        metrics = compute_geometry_metrics(mesh, printability, file_content_hash(path))
+    except Exception as e:
+        logger.warning(f"Falha na análise geométrica de {path}: {e}")
+        return None
+
+    model_3d.metricas_geometria = metrics
+    if db is not None:
+        db.commit()
+    return metrics
@@ -27,6 +27,8 @@ from backend.schemas.budgeting import (
     MaterialRecommendation, SupplierComparison, BudgetTimeline,
     Slant3DQuote, SimulationIntegration
 )
+from backend.services.gcode_analyzer import estimate_model_print
+from backend.services.geometry_metrics import ensure_model_geometry, model_geometry, model_volume_mm3
 
 logger = logging.getLogger(__name__)
 
@@ -113,6 +115,8 @@ class IntelligentBudgetingService:
             model_3d = db.query(Model3D).filter(Model3D.projeto_id == project.id).first()
             if not model_3d:
                 raise ValueError("Modelo 3D não encontrado para o projeto")
+            # Modelos anteriores ao registro de métricas são analisados uma vez
+            ensure_model_geometry(model_3d, db)
             
             # 2. Obter resultados da simulação (Sprint 4)
             simulation_results = None
@@ -483,7 +487,7 @@ class IntelligentBudgetingService:
                 base_price *= 1.2
         
         # Calcular volume e peso
-        volume_mm3 = model_3d.volume_calculado or 100000  # Default
+        volume_mm3 = model_volume_mm3(model_3d, include_support=True, default=100000)  # Default
         volume_cm3 = volume_mm3 / 1000
         
         # Densidades por material (g/cm³)
@@ -526,7 +530,7 @@ class IntelligentBudgetingService:
     ) -> Dict[str, Any]:
         """Calcular custo de impressão ajustado pela qualidade"""
         
-        volume_mm3 = model_3d.volume_calculado or 100000
+        volume_mm3 = model_volume_mm3(model_3d, include_support=True, default=100000)
         volume_cm3 = volume_mm3 / 1000
         
         # Velocidades de impressão por material (cm³/hora) - base
@@ -546,8 +550,14 @@ class IntelligentBudgetingService:
         else:
             quality_speed_multiplier = 1.2  # Mais rápido para qualidade baixa
         
-        adjusted_speed = base_speed * quality_speed_multiplier
-        print_time_hours = volume_cm3 / adjusted_speed
+        try:
+            # Tempo das trajetórias fatiadas com aceleração, no perfil padrão
+            analysis = await asyncio.to_thread(estimate_model_print, model_3d.arquivo_path)
+            print_time_hours = analysis.print_time_s / 3600 / quality_speed_multiplier
+        except Exception as e:
+            logger.warning(f"Análise de G-code indisponível, usando velocidade volumétrica: {e}")
+            adjusted_speed = base_speed * quality_speed_multiplier
+            print_time_hours = volume_cm3 / adjusted_speed
         
         # Custo ajustado pela qualidade
         base_print_cost = print_time_hours * self.base_printing_cost_per_hour
@@ -757,10 +767,16 @@ class IntelligentBudgetingService:
         complexity_factors = []
         
         # Fator de volume
-        volume_mm3 = model_3d.volume_calculado or 100000
+        volume_mm3 = model_volume_mm3(model_3d, default=100000)
         volume_score = min(1.0, volume_mm3 / 1000000)  # Normalizar por 1M mm³
         complexity_factors.append(volume_score)
         
+        # Fator de forma: peças côncavas ocupam pouco do fecho convexo
+        geometry = model_geometry(model_3d)
+        if geometry is not None and geometry.convex_hull_volume_mm3:
+            solidity = min(1.0, geometry.volume_mm3 / geometry.convex_hull_volume_mm3)
+            complexity_factors.append(1.0 - solidity)
+        
         # Fator de qualidade (modelos de baixa qualidade podem ser mais simples)
         quality_score = quality_analysis["quality_score"] / 100
         complexity_factors.append(1.0 - quality_score * 0.5)  # Inverter
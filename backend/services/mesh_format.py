@@ -0,0 +1,250 @@
+"""
+Formato Compacto de Malha (.3dpm)
+Formato binário próprio do 3dPot: cabeçalho fixo com limites, volume e área
+pré-calculados, vértices quantizados (ou float32) e triângulos indexados.
+Lido sem cópia via `np.frombuffer`/memmap e convertido de volta para STL sem
+perda de geometria
+
+Layout (little-endian, seções alinhadas em 8 bytes):
+    cabeçalho   HEADER_DTYPE (128 bytes)
+    vértices    (V, 3) uint16 | uint32 | float32
+    faces       (F, 3) uint16 | uint32
+"""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from backend.services.mesh_ingest import (
+    IndexedTriangles,
+    MeshStats,
+    is_binary_stl,
+    open_binary_stl,
+    stream_mesh_stats,
+    weld_vertices,
+)
+from backend.services.mesh_lod import encode_binary_stl
+
+logger = logging.getLogger(__name__)
+
+COMPACT_MESH_SUFFIX = ".3dpm"
+COMPACT_MESH_MEDIA_TYPE = "application/vnd.3dpot.mesh"
+COMPACT_MESH_MAGIC = b"3DPMESH\x00"
+COMPACT_MESH_VERSION = 1
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u2"),
+    ("position_bits", "<u2"),      # 16/32 = quantizado, 0 = float32
+    ("index_bytes", "<u2"),        # 2 ou 4
+    ("reserved", "<u2"),
+    ("vertex_count", "<u4"),
+    ("face_count", "<u4"),
+    ("bounds", "<f8", (2, 3)),     # [mínimo, máximo]
+    ("step", "<f8", (3,)),         # passo de quantização por eixo
+    ("volume", "<f8"),
+    ("area", "<f8"),
+    ("padding", "V16"),
+])
+HEADER_BYTES = HEADER_DTYPE.itemsize
+
+# Resoluções tentadas na quantização sem perda, da mais compacta para a maior
+LOSSLESS_POSITION_BITS = (16, 32)
+
+_POSITION_DTYPES = {16: np.dtype("<u2"), 32: np.dtype("<u4"), 0: np.dtype("<f4")}
+_INDEX_DTYPES = {2: np.dtype("<u2"), 4: np.dtype("<u4")}
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def quantize_positions(vertices: np.ndarray, bounds: np.ndarray,
+                       bits: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantizar posições na grade de `bits` bits sobre os limites
+
+    Returns:
+        (valores inteiros, passo por eixo)
+    """
+    lower, upper = bounds
+    levels = (1 << bits) - 1
+    step = np.where(upper > lower, (upper - lower) / levels, 1.0)
+    quantized = np.clip(np.rint((vertices - lower) / step), 0, levels)
+    return quantized.astype(_POSITION_DTYPES[bits]), step
+
+
+def dequantize_positions(quantized: np.ndarray, bounds: np.ndarray,
+                         step: np.ndarray) -> np.ndarray:
+    return bounds[0] + quantized.astype(np.float64) * step
+
+
+def _lossless_positions(vertices: np.ndarray, bounds: np.ndarray):
+    """Menor representação que reproduz exatamente as coordenadas float32"""
+    exact = vertices.astype(np.float32)
+    for bits in LOSSLESS_POSITION_BITS:
+        quantized, step = quantize_positions(vertices, bounds, bits)
+        if np.array_equal(dequantize_positions(quantized, bounds, step).astype(np.float32), exact):
+            return bits, quantized, step
+    return 0, exact, np.zeros(3)
+
+
+def encode_compact_mesh(vertices: np.ndarray, faces: np.ndarray,
+                        stats: Optional[MeshStats] = None,
+                        position_bits: Optional[int] = None) -> bytes:
+    """
+    Serializar a malha indexada no formato .3dpm
+
+    Com `position_bits` None as posições só são quantizadas quando isso não
+    altera nenhuma coordenada float32 (sem perda); 16 ou 32 forçam a grade
+    (com perda limitada a meio passo por eixo).
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces)
+    if stats is None:
+        stats = stream_mesh_stats(IndexedTriangles(vertices, faces))
+    bounds = np.asarray(stats.bounds, dtype=np.float64)
+
+    if position_bits is None:
+        position_bits, positions, step = _lossless_positions(vertices, bounds)
+    elif position_bits == 0:
+        positions, step = vertices.astype(np.float32), np.zeros(3)
+    else:
+        positions, step = quantize_positions(vertices, bounds, position_bits)
+
+    index_bytes = 2 if len(vertices) <= 0xFFFF else 4
+    indices = faces.astype(_INDEX_DTYPES[index_bytes])
+
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = COMPACT_MESH_MAGIC
+    header["version"] = COMPACT_MESH_VERSION
+    header["position_bits"] = position_bits
+    header["index_bytes"] = index_bytes
+    header["vertex_count"] = len(vertices)
+    header["face_count"] = len(faces)
+    header["bounds"] = bounds
+    header["step"] = step
+    header["volume"] = stats.volume
+    header["area"] = stats.area
+
+    position_bytes = positions.tobytes()
+    parts = [header.tobytes(), position_bytes,
+             b"\x00" * (_align(len(position_bytes)) - len(position_bytes)), indices.tobytes()]
+    return b"".join(parts)
+
+
+class CompactMesh:
+    """
+    Malha .3dpm sobre um buffer (bytes, mmap ou memmap), sem cópia
+
+    `positions` e `faces` são vistas do buffer; `vertices` devolve as
+    posições em float64 (desquantizadas quando necessário).
+    """
+
+    def __init__(self, buffer):
+        header = np.frombuffer(buffer, dtype=HEADER_DTYPE, count=1)[0]
+        if bytes(header["magic"]) != COMPACT_MESH_MAGIC.rstrip(b"\x00"):
+            raise ValueError("Arquivo não está no formato .3dpm")
+        if int(header["version"]) != COMPACT_MESH_VERSION:
+            raise ValueError(f"Versão .3dpm não suportada: {int(header['version'])}")
+
+        self.header = header
+        self.position_bits = int(header["position_bits"])
+        vertex_count = int(header["vertex_count"])
+        face_count = int(header["face_count"])
+        position_dtype = _POSITION_DTYPES[self.position_bits]
+        index_dtype = _INDEX_DTYPES[int(header["index_bytes"])]
+
+        offset = HEADER_BYTES
+        self.positions = np.frombuffer(buffer, dtype=position_dtype, count=vertex_count * 3,
+                                       offset=offset).reshape(-1, 3)
+        offset = _align(offset + self.positions.nbytes)
+        self.faces = np.frombuffer(buffer, dtype=index_dtype, count=face_count * 3,
+                                   offset=offset).reshape(-1, 3)
+        self.stats = MeshStats(
+            faces=face_count,
+            volume=float(header["volume"]),
+            area=float(header["area"]),
+            bounds=header["bounds"].tolist()
+        )
+
+    @property
+    def vertices(self) -> np.ndarray:
+        if self.position_bits == 0:
+            return self.positions.astype(np.float64)
+        return dequantize_positions(self.positions, self.header["bounds"], self.header["step"])
+
+    @property
+    def triangles(self) -> np.ndarray:
+        return self.vertices[self.faces]
+
+
+def open_compact_mesh(path: Union[str, Path]) -> CompactMesh:
+    """Abrir um arquivo .3dpm mapeado em memória (somente leitura)"""
+    return CompactMesh(np.memmap(path, dtype=np.uint8, mode="r"))
+
+
+def compact_mesh_path(model_path: Union[str, Path]) -> Path:
+    """Caminho da versão .3dpm, ao lado do arquivo (`modelo.stl.3dpm`)"""
+    model_path = Path(model_path)
+    return model_path.with_name(model_path.name + COMPACT_MESH_SUFFIX)
+
+
+def _atomic_write(path: Path, data: bytes):
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_name, path)
+
+
+def convert_to_compact(model_path: Union[str, Path],
+                       output_path: Optional[Union[str, Path]] = None,
+                       position_bits: Optional[int] = None) -> Path:
+    """
+    Converter STL/OBJ para .3dpm
+
+    Vértices idênticos (bit a bit) são unificados e as faces mantêm a
+    ordem e a orientação do arquivo; nenhuma face é removida, para que a
+    conversão de volta reproduza os mesmos triângulos.
+    """
+    model_path = Path(model_path)
+    output_path = Path(output_path) if output_path else compact_mesh_path(model_path)
+
+    if is_binary_stl(model_path):
+        triangles = open_binary_stl(model_path)
+    else:
+        import trimesh
+        loaded = trimesh.load(str(model_path), force="mesh", process=False)
+        if not isinstance(loaded, trimesh.Trimesh):
+            raise ValueError("Arquivo não contém uma malha válida")
+        triangles = np.asarray(loaded.triangles, dtype=np.float32)
+
+    stats = stream_mesh_stats(triangles)
+    vertices, faces = weld_vertices(triangles, tolerance=None)
+    _atomic_write(output_path, encode_compact_mesh(vertices, faces, stats, position_bits))
+    return output_path
+
+
+def ensure_compact(model_path: Union[str, Path]) -> Path:
+    """Versão .3dpm ao lado do arquivo, convertida apenas se ausente ou desatualizada"""
+    model_path = Path(model_path)
+    compact_path = compact_mesh_path(model_path)
+    try:
+        if compact_path.stat().st_mtime_ns >= model_path.stat().st_mtime_ns:
+            return compact_path
+    except FileNotFoundError:
+        pass
+    convert_to_compact(model_path, compact_path)
+    logger.info(f"Malha compacta gerada: {compact_path.name} "
+                f"({model_path.stat().st_size} -> {compact_path.stat().st_size} bytes)")
+    return compact_path
+
+
+def compact_to_stl(source: Union[str, Path, CompactMesh]) -> bytes:
+    """STL binário com os triângulos da malha .3dpm (normais recalculadas)"""
+    mesh = source if isinstance(source, CompactMesh) else open_compact_mesh(source)
+    return encode_binary_stl(mesh.vertices, mesh.faces)
@@ -0,0 +1,313 @@
+"""
+Ingestão de Malhas em Fluxo
+STL binário mapeado em memória com dtypes estruturados do NumPy, solda de
+vértices por hash e estatísticas (volume, área, limites) em uma única
+passada por blocos; o `Trimesh` completo só é criado quando uma etapa
+precisa de topologia
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STL_HEADER_BYTES = 80
+STL_COUNT_BYTES = 4
+
+# Registro de 50 bytes de cada triângulo do STL binário
+STL_TRIANGLE_DTYPE = np.dtype([
+    ("normal", "<f4", (3,)),
+    ("vertices", "<f4", (3, 3)),
+    ("attribute", "<u2"),
+])
+
+# Triângulos lidos por bloco nas passadas sobre o arquivo mapeado
+DEFAULT_CHUNK_FACES = 1 << 18
+
+# Vértices a menos desta distância (mm, por eixo) são soldados
+DEFAULT_WELD_TOLERANCE = 1e-5
+
+# Componentes desconexos com menos faces são descartados como detritos
+SMALL_COMPONENT_FACES = 10
+
+# Constantes do hash espacial (combinação polinomial + finalizador do MurmurHash3)
+_HASH_MULTIPLIERS = (np.uint64(0x9E3779B185EBCA87), np.uint64(0xC2B2AE3D27D4EB4F))
+_FMIX_CONSTANTS = (np.uint64(0xFF51AFD7ED558CCD), np.uint64(0xC4CEB9FE1A85EC53))
+
+
+def file_content_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 do conteúdo de um arquivo, lido em blocos"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_binary_stl(path: Union[str, Path]) -> bool:
+    """STL binário: o tamanho bate com cabeçalho + 50 bytes por triângulo"""
+    path = Path(path)
+    if path.suffix.lower() != ".stl":
+        return False
+    size = path.stat().st_size
+    if size < STL_HEADER_BYTES + STL_COUNT_BYTES:
+        return False
+    with open(path, "rb") as f:
+        f.seek(STL_HEADER_BYTES)
+        count = int(np.frombuffer(f.read(STL_COUNT_BYTES), dtype="<u4")[0])
+    return size == STL_HEADER_BYTES + STL_COUNT_BYTES + count * STL_TRIANGLE_DTYPE.itemsize
+
+
+def open_binary_stl(path: Union[str, Path]) -> np.ndarray:
+    """Triângulos do STL binário como memmap somente leitura (F,) de STL_TRIANGLE_DTYPE"""
+    size = Path(path).stat().st_size
+    count = (size - STL_HEADER_BYTES - STL_COUNT_BYTES) // STL_TRIANGLE_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=STL_TRIANGLE_DTYPE)
+    return np.memmap(path, dtype=STL_TRIANGLE_DTYPE, mode="r",
+                     offset=STL_HEADER_BYTES + STL_COUNT_BYTES, shape=(count,))
+
+
+def iter_triangle_chunks(triangles: np.ndarray,
+                         chunk_faces: int = DEFAULT_CHUNK_FACES) -> Iterator[np.ndarray]:
+    """Blocos (n, 3, 3) float64 dos vértices; só o bloco atual fica em memória"""
+    for start in range(0, len(triangles), chunk_faces):
+        block = triangles[start:start + chunk_faces]
+        if block.dtype == STL_TRIANGLE_DTYPE:
+            block = block["vertices"]
+        yield np.asarray(block, dtype=np.float64)
+
+
+class IndexedTriangles:
+    """Vista (F, 3, 3) sob demanda de vértices indexados por faces"""
+
+    def __init__(self, vertices: np.ndarray, faces: np.ndarray):
+        self.vertices = vertices
+        self.faces = faces
+
+    def __len__(self) -> int:
+        return len(self.faces)
+
+    def __getitem__(self, index) -> np.ndarray:
+        return self.vertices[self.faces[index]]
+
+
+@dataclass
+class MeshStats:
+    """Estatísticas globais da malha (unidades do arquivo, normalmente mm)"""
+    faces: int
+    volume: float
+    area: float
+    bounds: List[List[float]]
+
+    @property
+    def dimensions(self) -> List[float]:
+        return [hi - lo for lo, hi in zip(*self.bounds)]
+
+
+def stream_mesh_stats(triangles: np.ndarray,
+                      chunk_faces: int = DEFAULT_CHUNK_FACES) -> MeshStats:
+    """
+    Volume (teorema da divergência), área e limites em uma passada
+
+    O volume só é significativo para malhas fechadas, como em `Trimesh.volume`.
+    """
+    volume = 0.0
+    area = 0.0
+    lower = np.full(3, np.inf)
+    upper = np.full(3, -np.inf)
+    for block in iter_triangle_chunks(triangles, chunk_faces):
+        v0, v1, v2 = block[:, 0], block[:, 1], block[:, 2]
+        cross = np.cross(v1 - v0, v2 - v0)
+        area += 0.5 * float(np.linalg.norm(cross, axis=1).sum())
+        volume += float(np.einsum("ij,ij->i", v0, np.cross(v1, v2)).sum()) / 6.0
+        flat = block.reshape(-1, 3)
+        lower = np.minimum(lower, flat.min(axis=0))
+        upper = np.maximum(upper, flat.max(axis=0))
+
+    if not len(triangles):
+        lower = upper = np.zeros(3)
+    return MeshStats(faces=len(triangles), volume=volume, area=area,
+                     bounds=[lower.tolist(), upper.tolist()])
+
+
+def weld_vertices(triangles: np.ndarray, tolerance: Optional[float] = DEFAULT_WELD_TOLERANCE,
+                  chunk_faces: int = DEFAULT_CHUNK_FACES) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Solda de vértices por hash espacial
+
+    Os cantos são quantizados em `tolerance` e reduzidos a um hash de 64
+    bits por bloco; a deduplicação ordena apenas os hashes (1D). Uma
+    segunda passada confere as coordenadas quantizadas e, no caso raro de
+    colisão, refaz a solda comparando as coordenadas completas. Com
+    `tolerance` None só cantos idênticos em float32 são unidos (sem perda).
+
+    Returns:
+        (vértices (V, 3) float64, faces (F, 3) int64)
+    """
+    hashes = np.empty(len(triangles) * 3, dtype=np.uint64)
+    offset = 0
+    for block in iter_triangle_chunks(triangles, chunk_faces):
+        keys = _quantize(block.reshape(-1, 3), tolerance)
+        hashes[offset:offset + len(keys)] = _spatial_hash(keys)
+        offset += len(keys)
+
+    _, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    del hashes
+    inverse = inverse.ravel()
+    representative = _corners(triangles, first)
+
+    # Conferir colisões de hash comparando as coordenadas quantizadas
+    expected = _quantize(representative, tolerance)
+    offset = 0
+    for block in iter_triangle_chunks(triangles, chunk_faces):
+        keys = _quantize(block.reshape(-1, 3), tolerance)
+        if np.any(keys != expected[inverse[offset:offset + len(keys)]]):
+            logger.warning("Colisão de hash na solda de vértices; usando comparação completa")
+            corners = np.concatenate([b.reshape(-1, 3) for b in iter_triangle_chunks(triangles, chunk_faces)])
+            _, first, inverse = np.unique(_quantize(corners, tolerance), axis=0,
+                                          return_index=True, return_inverse=True)
+            return corners[first], inverse.ravel().reshape(-1, 3)
+        offset += len(keys)
+
+    return representative, inverse.reshape(-1, 3)
+
+
+def _quantize(points: np.ndarray, tolerance: Optional[float]) -> np.ndarray:
+    if tolerance is None:
+        # Padrão de bits do float32: igualdade exata das coordenadas
+        return points.astype(np.float32).view(np.uint32).astype(np.int64)
+    return np.round(points / tolerance).astype(np.int64)
+
+
+def _spatial_hash(keys: np.ndarray) -> np.ndarray:
+    """Hash de 64 bits das coordenadas quantizadas (aritmética com overflow)"""
+    shift = np.uint64(33)
+    with np.errstate(over="ignore"):
+        unsigned = keys.astype(np.uint64)
+        h = (unsigned[:, 0] * _HASH_MULTIPLIERS[0] + unsigned[:, 1]) * _HASH_MULTIPLIERS[1] + unsigned[:, 2]
+        h ^= h >> shift
+        h *= _FMIX_CONSTANTS[0]
+        h ^= h >> shift
+        h *= _FMIX_CONSTANTS[1]
+        h ^= h >> shift
+    return h
+
+
+def _corners(triangles: np.ndarray, corner_index: np.ndarray) -> np.ndarray:
+    """Coordenadas dos cantos (índice plano face * 3 + canto), sem carregar tudo"""
+    face, corner = corner_index // 3, corner_index % 3
+    block = triangles[face]
+    if block.dtype == STL_TRIANGLE_DTYPE:
+        block = block["vertices"]
+    return np.asarray(block, dtype=np.float64)[np.arange(len(face)), corner]
+
+
+def clean_faces(faces: np.ndarray, vertex_count: int) -> np.ndarray:
+    """Remover faces degeneradas (índices repetidos) e duplicadas, mantendo a ordem"""
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])]
+    ordered = np.sort(faces, axis=1)
+    if vertex_count ** 3 < 2 ** 63:
+        key = (ordered[:, 0] * vertex_count + ordered[:, 1]) * vertex_count + ordered[:, 2]
+        _, keep = np.unique(key, return_index=True)
+    else:
+        _, keep = np.unique(ordered, axis=0, return_index=True)
+    return faces[np.sort(keep)]
+
+
+def remove_small_components(vertices: np.ndarray, faces: np.ndarray,
+                            min_faces: int = SMALL_COMPONENT_FACES) -> Tuple[np.ndarray, np.ndarray]:
+    """Descartar componentes conectados (por vértices) com menos de `min_faces` faces"""
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    if not len(faces):
+        return vertices, faces
+    edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]]])
+    graph = coo_matrix((np.ones(len(edges), dtype=np.int8), (edges[:, 0], edges[:, 1])),
+                       shape=(len(vertices), len(vertices)))
+    _, labels = connected_components(graph, directed=False)
+    face_labels = labels[faces[:, 0]]
+    sizes = np.bincount(face_labels)
+    faces = faces[sizes[face_labels] >= min_faces]
+    return compact_vertices(vertices, faces)
+
+
+def compact_vertices(vertices: np.ndarray, faces: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Remover vértices não referenciados e reindexar as faces"""
+    used = np.zeros(len(vertices), dtype=bool)
+    used[faces.ravel()] = True
+    remap = np.cumsum(used) - 1
+    return vertices[used], remap[faces]
+
+
+class IngestedMesh:
+    """
+    Malha ingerida como arrays (vértices soldados e faces limpas)
+
+    `stats` vem da passada em fluxo sobre o arquivo; `to_trimesh()` cria o
+    `Trimesh` (sem reprocessamento) apenas quando a topologia é necessária.
+    """
+
+    def __init__(self, path: Path, vertices: np.ndarray, faces: np.ndarray, stats: MeshStats):
+        self.path = path
+        self.vertices = vertices
+        self.faces = faces
+        self.stats = stats
+        self._trimesh = None
+
+    def to_trimesh(self):
+        if self._trimesh is None:
+            import trimesh
+            self._trimesh = trimesh.Trimesh(vertices=self.vertices, faces=self.faces, process=False)
+        return self._trimesh
+
+
+def ingest_mesh(path: Union[str, Path], tolerance: float = DEFAULT_WELD_TOLERANCE,
+                min_component_faces: Optional[int] = SMALL_COMPONENT_FACES,
+                chunk_faces: int = DEFAULT_CHUNK_FACES) -> IngestedMesh:
+    """
+    Carregar e limpar uma malha
+
+    STL binário é lido por memmap em blocos; .3dpm já vem indexado e com
+    estatísticas no cabeçalho (sem solda); outros formatos passam pelo
+    `trimesh.load` e seguem a mesma limpeza sobre arrays.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".3dpm":
+        from backend.services.mesh_format import open_compact_mesh
+        compact = open_compact_mesh(path)
+        return _clean_ingested(path, compact.vertices, compact.faces.astype(np.int64),
+                               compact.stats, min_component_faces, chunk_faces)
+    if is_binary_stl(path):
+        triangles = open_binary_stl(path)
+    else:
+        import trimesh
+        loaded = trimesh.load(str(path), force="mesh", process=False)
+        if not isinstance(loaded, trimesh.Trimesh):
+            raise ValueError("Arquivo não contém uma malha válida")
+        triangles = np.asarray(loaded.triangles, dtype=np.float64)
+
+    stats = stream_mesh_stats(triangles, chunk_faces)
+    vertices, faces = weld_vertices(triangles, tolerance, chunk_faces)
+    del triangles
+    return _clean_ingested(path, vertices, faces, stats, min_component_faces, chunk_faces)
+
+
+def _clean_ingested(path: Path, vertices: np.ndarray, faces: np.ndarray, stats: MeshStats,
+                    min_component_faces: Optional[int], chunk_faces: int) -> IngestedMesh:
+    faces = clean_faces(faces, len(vertices))
+    if min_component_faces:
+        vertices, faces = remove_small_components(vertices, faces, min_component_faces)
+    else:
+        vertices, faces = compact_vertices(vertices, faces)
+
+    if len(faces) != stats.faces:
+        # Faces removidas mudam volume/área: recalcular sobre os arrays limpos
+        stats = stream_mesh_stats(IndexedTriangles(vertices, faces), chunk_faces)
+    return IngestedMesh(path, vertices, faces, stats)
@@ -0,0 +1,286 @@
+"""
+Níveis de Detalhe (LOD) de Malhas
+Variantes decimadas (100%, 25% e 5% das faces) gravadas ao lado do modelo
+original em `<arquivo>.lod/`, nomeadas pelo hash do conteúdo e descritas por
+um manifesto; pré-visualizações e shapes de colisão carregam a variante menor
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from backend.services.mesh_ingest import (
+    STL_HEADER_BYTES,
+    STL_TRIANGLE_DTYPE,
+    IngestedMesh,
+    file_content_hash,
+    ingest_mesh,
+)
+
+logger = logging.getLogger(__name__)
+
+# Fração das faces originais mantida em cada nível
+LOD_LEVELS: Dict[str, float] = {"full": 1.0, "medium": 0.25, "low": 0.05}
+
+# Variantes menores que isso não compensam: o nível reaproveita o anterior
+LOD_MIN_FACES = 500
+
+# Formatos de malha com variantes (STEP é B-rep e não é decimado)
+LOD_SUFFIXES = {".stl", ".obj"}
+
+LOD_MANIFEST = "manifest.json"
+
+# Incrementar quando o manifesto ou a decimação mudarem
+LOD_FORMAT_VERSION = 1
+
+
+def decimate_vertex_clustering(vertices: np.ndarray, faces: np.ndarray,
+                               max_faces: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decimação por agrupamento de vértices em grade
+
+    Vértices na mesma célula são fundidos no centróide; faces degeneradas
+    ou duplicadas resultantes são descartadas. A resolução da grade é
+    corrigida pela contagem observada até o número de faces ficar entre
+    80% e 100% de `max_faces`.
+    """
+    if len(faces) <= max_faces:
+        return vertices, faces
+
+    origin = vertices.min(axis=0)
+    extent = float(np.ptp(vertices, axis=0).max()) or 1.0
+    # A área superficial cresce com o quadrado da resolução da grade
+    resolution = max(int(np.sqrt(max_faces / 2)), 2)
+
+    best = None
+    for _ in range(8):
+        cell = extent / resolution
+        keys = np.floor((vertices - origin) / cell).astype(np.int64)
+        _, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+
+        counts = np.bincount(inverse)
+        clustered = np.stack(
+            [np.bincount(inverse, weights=vertices[:, axis]) for axis in range(3)], axis=1
+        ) / counts[:, None]
+
+        new_faces = inverse[faces]
+        valid = ((new_faces[:, 0] != new_faces[:, 1]) &
+                 (new_faces[:, 1] != new_faces[:, 2]) &
+                 (new_faces[:, 0] != new_faces[:, 2]))
+        new_faces = new_faces[valid]
+        _, unique_idx = np.unique(np.sort(new_faces, axis=1), axis=0, return_index=True)
+        new_faces = new_faces[np.sort(unique_idx)]
+
+        if len(new_faces) > max_faces and best is not None:
+            break
+        if len(new_faces) <= max_faces:
+            best = (clustered, new_faces)
+            if len(new_faces) >= 0.8 * max_faces:
+                break
+        elif resolution <= 2:
+            return clustered, new_faces
+
+        # Faces ~ resolução²: corrigir pela razão observada (com folga)
+        scale = np.sqrt(max_faces / max(len(new_faces), 1)) * 0.97
+        next_resolution = max(int(resolution * (min(scale, 0.9) if len(new_faces) > max_faces else scale)), 2)
+        if next_resolution == resolution:
+            break
+        resolution = next_resolution
+
+    return best if best is not None else (clustered, new_faces)
+
+
+def encode_binary_stl(vertices: np.ndarray, faces: np.ndarray) -> bytes:
+    """Serializar a malha indexada como STL binário (normais recalculadas)"""
+    triangles = vertices[faces]
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    normals[lengths > 0] /= lengths[lengths > 0, None]
+
+    records = np.zeros(len(faces), dtype=STL_TRIANGLE_DTYPE)
+    records["normal"] = normals
+    records["vertices"] = triangles
+    header = b"3dPot LOD".ljust(STL_HEADER_BYTES, b" ")
+    return header + np.uint32(len(faces)).tobytes() + records.tobytes()
+
+
+def _encode(vertices: np.ndarray, faces: np.ndarray, suffix: str) -> bytes:
+    if suffix == ".stl":
+        return encode_binary_stl(vertices, faces)
+    import trimesh
+    mesh = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+    return mesh.export(file_type=suffix.lstrip(".")).encode("utf-8")
+
+
+def _atomic_write(path: Path, data: bytes):
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_name, path)
+
+
+def lod_dir(model_path: Union[str, Path]) -> Path:
+    """Diretório das variantes, ao lado do arquivo original"""
+    model_path = Path(model_path)
+    return model_path.with_name(f"{model_path.name}.lod")
+
+
+@dataclass
+class LodVariant:
+    """Uma variante; `file` None indica o próprio arquivo original"""
+    level: str
+    ratio: float
+    faces: int
+    sha256: str
+    file: Optional[str] = None
+
+
+@dataclass
+class LodSet:
+    """Variantes de um modelo, como descritas no manifesto"""
+    model_path: Path
+    source_sha256: str
+    variants: Dict[str, LodVariant]
+
+    def path(self, level: str) -> Path:
+        variant = self.variants[level]
+        if variant.file is None:
+            return self.model_path
+        return lod_dir(self.model_path) / variant.file
+
+    def smallest(self, min_faces: int = 0) -> LodVariant:
+        """Menor variante com pelo menos `min_faces` faces (o original se nenhuma tiver)"""
+        candidates = [v for v in self.variants.values() if v.faces >= min_faces]
+        if not candidates:
+            return max(self.variants.values(), key=lambda v: v.faces)
+        return min(candidates, key=lambda v: v.faces)
+
+
+def generate_lods(model_path: Union[str, Path], mesh: Optional[IngestedMesh] = None,
+                  levels: Dict[str, float] = LOD_LEVELS) -> LodSet:
+    """
+    Gerar as variantes e gravar o manifesto
+
+    Cada nível é decimado a partir do anterior (mais barato que partir do
+    original). Níveis que não reduziriam a malha apontam para o anterior
+    em vez de gravar uma cópia.
+    """
+    model_path = Path(model_path)
+    suffix = model_path.suffix.lower()
+    if suffix not in LOD_SUFFIXES:
+        raise ValueError(f"LOD indisponível para arquivos {suffix}")
+
+    stat = model_path.stat()
+    source_sha256 = file_content_hash(model_path)
+    mesh = mesh or ingest_mesh(model_path, min_component_faces=None)
+    directory = lod_dir(model_path)
+    directory.mkdir(exist_ok=True)
+
+    vertices, faces = mesh.vertices, mesh.faces
+    total = len(faces)
+    previous = LodVariant(level="full", ratio=1.0, faces=total, sha256=source_sha256)
+    variants: Dict[str, LodVariant] = {}
+    for level, ratio in sorted(levels.items(), key=lambda item: -item[1]):
+        target = max(int(total * ratio), min(total, LOD_MIN_FACES))
+        if target < len(faces):
+            new_vertices, new_faces = decimate_vertex_clustering(vertices, faces, target)
+            if len(new_faces):
+                vertices, faces = new_vertices, new_faces
+                data = _encode(vertices, faces, suffix)
+                sha256 = hashlib.sha256(data).hexdigest()
+                name = f"{level}-{sha256[:16]}{suffix}"
+                if not (directory / name).exists():
+                    _atomic_write(directory / name, data)
+                previous = LodVariant(level=level, ratio=ratio, faces=len(faces),
+                                      sha256=sha256, file=name)
+        variants[level] = replace(previous, level=level, ratio=ratio)
+
+    manifest = {
+        "version": LOD_FORMAT_VERSION,
+        "source": {
+            "file": model_path.name,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": source_sha256,
+            "faces": total
+        },
+        "levels": {level: asdict(variant) for level, variant in variants.items()}
+    }
+    _atomic_write(directory / LOD_MANIFEST, json.dumps(manifest, indent=2).encode("utf-8"))
+
+    # Variantes de versões anteriores do arquivo
+    current = {variant.file for variant in variants.values()} | {LOD_MANIFEST}
+    for path in directory.iterdir():
+        if path.name not in current and path.suffix != ".tmp":
+            path.unlink(missing_ok=True)
+
+    logger.info(
+        f"LODs de {model_path.name}: " +
+        ", ".join(f"{v.level}={v.faces}" for v in variants.values()) + " faces"
+    )
+    return LodSet(model_path=model_path, source_sha256=source_sha256, variants=variants)
+
+
+def load_lods(model_path: Union[str, Path]) -> Optional[LodSet]:
+    """Variantes já geradas; None se não existirem ou o original mudou"""
+    model_path = Path(model_path)
+    manifest_path = lod_dir(model_path) / LOD_MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        stat = model_path.stat()
+        source = manifest["source"]
+        if (manifest["version"] != LOD_FORMAT_VERSION or source["size"] != stat.st_size or
+                source["mtime_ns"] != stat.st_mtime_ns):
+            return None
+        lods = LodSet(
+            model_path=model_path,
+            source_sha256=source["sha256"],
+            variants={level: LodVariant(**variant) for level, variant in manifest["levels"].items()}
+        )
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Manifesto de LOD corrompido {manifest_path}: {e}")
+        return None
+
+    if not all(lods.path(level).exists() for level in lods.variants):
+        return None
+    return lods
+
+
+def get_lods(model_path: Union[str, Path], mesh: Optional[IngestedMesh] = None) -> LodSet:
+    """Variantes do modelo, gerando-as se ainda não existirem"""
+    return load_lods(model_path) or generate_lods(model_path, mesh)
+
+
+def collision_source(model_path: Union[str, Path], min_faces: int) -> Path:
+    """
+    Arquivo a carregar para colisão: a menor variante já gerada com pelo
+    menos `min_faces` faces, ou o original
+    """
+    model_path = Path(model_path)
+    if model_path.suffix.lower() not in LOD_SUFFIXES:
+        return model_path
+    lods = load_lods(model_path)
+    if lods is None:
+        return model_path
+    return lods.path(lods.smallest(min_faces).level)
+
+
+def remove_lods(model_path: Union[str, Path]) -> bool:
+    """Apagar as variantes de um modelo"""
+    directory = lod_dir(model_path)
+    if not directory.is_dir():
+        return False
+    for path in directory.iterdir():
+        path.unlink(missing_ok=True)
+    directory.rmdir()
+    return True
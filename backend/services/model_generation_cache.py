@@ -0,0 +1,199 @@
+"""
+Cache de Geração de Modelos Paramétricos
+Arquivos exportados e relatórios de validação endereçados pelo hash canônico
+das especificações normalizadas, engine, formato e versão do engine
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from backend.core.config import MODEL_GENERATION_CACHE_MAX_BYTES, MODEL_GENERATION_CACHE_PATH
+from backend.observability.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Incrementar quando o código de geração de geometria mudar
+MODEL_GENERATOR_VERSION = "2"
+
+# Casas decimais mantidas nas dimensões (mm) ao normalizar as especificações
+_FLOAT_PRECISION = 6
+
+
+def normalize_spec_value(value: Any) -> Any:
+    """
+    Forma canônica de um valor das especificações
+
+    Números viram float arredondado (50 e 50.0 geram o mesmo hash), strings
+    perdem espaços nas bordas e dicionários são ordenados por chave.
+    """
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return round(float(value), _FLOAT_PRECISION)
+    if isinstance(value, str):
+        return value.strip()
+    if hasattr(value, "value"):  # Enum
+        return normalize_spec_value(value.value)
+    if isinstance(value, dict):
+        return {str(k): normalize_spec_value(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [normalize_spec_value(v) for v in value]
+    return str(value)
+
+
+def spec_hash(specs: Dict[str, Any], engine: str, format: str, engine_version: str) -> str:
+    """SHA-256 da representação canônica de (especificações, engine, formato, versões)"""
+    canonical = json.dumps({
+        "specs": normalize_spec_value(specs),
+        "engine": engine,
+        "format": format,
+        "engine_version": engine_version,
+        "generator_version": MODEL_GENERATOR_VERSION,
+    }, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedModel:
+    """Entrada do cache: arquivo exportado e resultados da análise"""
+    key: str
+    model_path: Path
+    specs: Dict[str, Any]
+    validation: Dict[str, Any]
+
+
+class ModelGenerationCache:
+    """
+    Armazenamento endereçado por conteúdo dos modelos gerados
+
+    Cada entrada é o arquivo exportado `<key>.<formato>` mais um `<key>.json`
+    com as especificações extraídas e o relatório de validação. O disco é
+    limitado por `max_bytes` com despejo LRU (mtime marca o último acesso).
+    """
+
+    def __init__(self, cache_dir: Path = MODEL_GENERATION_CACHE_PATH,
+                 max_bytes: int = MODEL_GENERATION_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _metadata_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[CachedModel]:
+        """Obter a entrada, marcando-a como usada; None em caso de falta"""
+        metadata_path = self._metadata_path(key)
+        try:
+            metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+            model_path = self.cache_dir / metadata["file"]
+            if not model_path.exists():
+                raise FileNotFoundError(model_path)
+        except FileNotFoundError:
+            metrics.model_generation_cache_miss()
+            return None
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Entrada de cache de modelo corrompida {metadata_path}: {e}")
+            self._remove(key)
+            metrics.model_generation_cache_miss()
+            return None
+
+        os.utime(metadata_path)
+        metrics.model_generation_cache_hit()
+        return CachedModel(key=key, model_path=model_path,
+                           specs=metadata["specs"], validation=metadata["validation"])
+
+    def put(self, key: str, source_path: Path, specs: Dict[str, Any],
+            validation: Dict[str, Any]) -> CachedModel:
+        """Copiar o arquivo gerado para o cache e gravar os metadados"""
+        source_path = Path(source_path)
+        model_path = self.cache_dir / f"{key}{source_path.suffix}"
+
+        # Escritas atômicas: outro worker nunca vê arquivos parciais
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(source_path, tmp_name)
+        os.replace(tmp_name, model_path)
+
+        metadata = {"file": model_path.name, "specs": specs, "validation": validation}
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".json.tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(metadata, f, default=str)
+        os.replace(tmp_name, self._metadata_path(key))
+
+        self._evict()
+        return CachedModel(key=key, model_path=model_path, specs=specs, validation=validation)
+
+    @staticmethod
+    def materialize(entry: CachedModel, output_path: Path) -> Path:
+        """
+        Disponibilizar o arquivo do cache em `output_path`
+
+        Usa hard link quando possível (instantâneo e sem cópia); o arquivo
+        continua válido mesmo se a entrada for despejada depois.
+        """
+        output_path = Path(output_path)
+        output_path.unlink(missing_ok=True)
+        try:
+            os.link(entry.model_path, output_path)
+        except OSError:
+            shutil.copyfile(entry.model_path, output_path)
+        return output_path
+
+    def _remove(self, key: str):
+        for path in self.cache_dir.glob(f"{key}.*"):
+            path.unlink(missing_ok=True)
+
+    def _evict(self):
+        """Despejar as entradas menos usadas até caber em `max_bytes`"""
+        with self._lock:
+            sizes: Dict[str, int] = {}
+            for path in self.cache_dir.iterdir():
+                if path.suffix == ".tmp" or not path.is_file():
+                    continue
+                key = path.name.split(".", 1)[0]
+                sizes[key] = sizes.get(key, 0) + path.stat().st_size
+
+            total = sum(sizes.values())
+            if total <= self.max_bytes:
+                return
+
+            def last_used(key: str) -> float:
+                try:
+                    return self._metadata_path(key).stat().st_mtime
+                except FileNotFoundError:
+                    return 0.0
+
+            for key in sorted(sizes, key=last_used):
+                if total <= self.max_bytes:
+                    break
+                self._remove(key)
+                metrics.model_generation_cache_eviction()
+                total -= sizes[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Número de entradas e bytes em disco"""
+        files = [path for path in self.cache_dir.iterdir() if path.is_file()]
+        return {
+            "entries": sum(1 for path in files if path.suffix == ".json"),
+            "bytes": sum(path.stat().st_size for path in files),
+        }
+
+
+_default_cache: Optional[ModelGenerationCache] = None
+
+
+def get_model_generation_cache() -> ModelGenerationCache:
+    """Cache compartilhado pelo processo"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ModelGenerationCache()
+    return _default_cache
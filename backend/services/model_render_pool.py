@@ -0,0 +1,237 @@
+"""
+Pool de Renderização de Modelos
+Execução assíncrona e limitada de jobs OpenSCAD (subprocessos) e CadQuery
+(processos worker), cada um em um diretório de trabalho exclusivo
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Set
+from uuid import uuid4
+
+from backend.core.config import MODELING_MAX_CONCURRENCY, MODELING_RENDER_TIMEOUT, TEMP_STORAGE_PATH
+from backend.observability.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RenderError(RuntimeError):
+    """Falha do engine ao renderizar o modelo"""
+
+
+class RenderTimeout(RenderError):
+    """Renderização excedeu o tempo limite"""
+
+
+class RenderCancelled(RenderError):
+    """Job cancelado por `ModelRenderPool.cancel`"""
+
+
+class ModelRenderPool:
+    """
+    Fila de renderização com concorrência limitada
+
+    No máximo `max_concurrency` jobs rodam ao mesmo tempo; os demais
+    aguardam um slot sem bloquear o event loop. Cada job escreve em um
+    diretório próprio sob `scratch_root` e o arquivo final só é movido para
+    `output_path` em caso de sucesso, então jobs cancelados ou com erro não
+    deixam arquivos parciais. Jobs com `job_id` podem ser cancelados por
+    `cancel`; subprocessos OpenSCAD são encerrados na hora.
+    """
+
+    def __init__(self, max_concurrency: int = MODELING_MAX_CONCURRENCY,
+                 scratch_root: Path = TEMP_STORAGE_PATH / "render",
+                 timeout: float = MODELING_RENDER_TIMEOUT,
+                 openscad_command: Sequence[str] = ("openscad",),
+                 mp_context: Optional[multiprocessing.context.BaseContext] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.scratch_root = Path(scratch_root)
+        self.scratch_root.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self.openscad_command = list(openscad_command)
+        self._mp_context = mp_context or multiprocessing.get_context("spawn")
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[str, asyncio.Task] = {}
+        self._cancelled: Set[str] = set()
+        self._waiting = 0
+        self._running = 0
+
+    async def run_openscad(self, code: str, output_path: Path,
+                           job_id: Optional[str] = None,
+                           timeout: Optional[float] = None) -> Path:
+        """
+        Renderizar código OpenSCAD; o formato segue a extensão de `output_path`
+
+        Raises:
+            RenderError: OpenSCAD terminou com erro
+            RenderTimeout: tempo limite excedido (o processo é encerrado)
+        """
+        output_path = Path(output_path)
+
+        async def render(scratch: Path) -> Path:
+            source = scratch / "model.scad"
+            source.write_text(code, encoding="utf-8")
+            target = scratch / f"model{output_path.suffix}"
+
+            process = await asyncio.create_subprocess_exec(
+                *self.openscad_command, "-o", str(target), str(source),
+                cwd=str(scratch),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                _, stderr = await asyncio.wait_for(process.communicate(), timeout or self.timeout)
+            except BaseException:
+                # Timeout ou cancelamento: não deixar o OpenSCAD consumindo CPU
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+
+            if process.returncode != 0:
+                raise RenderError(f"Erro do OpenSCAD: {stderr.decode(errors='replace').strip()}")
+            return target
+
+        return await self._run("openscad", render, output_path, job_id)
+
+    async def run_in_worker(self, engine: str, func: Callable[..., Any], args: Sequence[Any],
+                            output_path: Path, job_id: Optional[str] = None,
+                            timeout: Optional[float] = None) -> Path:
+        """
+        Executar `func(*args, scratch_output)` em um processo worker
+
+        `func` deve ser importável no nível do módulo (contexto spawn) e
+        escrever o modelo no caminho recebido como último argumento. Um job
+        cancelado ou expirado já em execução termina no worker, mas o
+        resultado é descartado.
+        """
+        output_path = Path(output_path)
+
+        async def render(scratch: Path) -> Path:
+            target = scratch / f"model{output_path.suffix}"
+            future = self._get_executor().submit(func, *args, str(target))
+            try:
+                await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+            except BaseException:
+                future.cancel()
+                raise
+            return target
+
+        return await self._run(engine, render, output_path, job_id)
+
+    async def _run(self, engine: str, render: Callable[[Path], Any],
+                   output_path: Path, job_id: Optional[str]) -> Path:
+        job_id = job_id or uuid4().hex
+        if job_id in self._jobs:
+            raise ValueError(f"Job de renderização {job_id} já está em andamento")
+
+        # Task própria por job: `cancel` não atinge o restante do chamador
+        task = asyncio.ensure_future(self._queue(engine, render, output_path, job_id))
+        self._jobs[job_id] = task
+        try:
+            return await task
+        except asyncio.CancelledError:
+            # Cancelado pelo `cancel` e não pelo chamador: vira erro comum
+            if job_id in self._cancelled:
+                raise RenderCancelled(f"Job de renderização {job_id} cancelado") from None
+            raise
+        finally:
+            self._jobs.pop(job_id, None)
+            self._cancelled.discard(job_id)
+
+    async def _queue(self, engine: str, render: Callable[[Path], Any],
+                     output_path: Path, job_id: str) -> Path:
+        self._waiting += 1
+        metrics.model_render_queued(engine)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+            metrics.model_render_queued(engine, -1)
+
+        try:
+            return await self._render(engine, render, output_path, job_id)
+        finally:
+            self._semaphore.release()
+
+    async def _render(self, engine: str, render: Callable[[Path], Any],
+                      output_path: Path, job_id: str) -> Path:
+        scratch = Path(tempfile.mkdtemp(prefix=f"{engine}-{job_id}-", dir=self.scratch_root))
+        self._running += 1
+        metrics.model_render_started(engine)
+        start = time.perf_counter()
+        status = "error"
+        try:
+            target = await render(scratch)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(target), str(output_path))
+            status = "ok"
+            return output_path
+        except asyncio.TimeoutError:
+            status = "timeout"
+            raise RenderTimeout(f"Renderização {engine} excedeu o tempo limite (job {job_id})")
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self._running -= 1
+            metrics.model_render_started(engine, -1)
+            metrics.model_render_finished(engine, status, duration)
+            shutil.rmtree(scratch, ignore_errors=True)
+            logger.debug(f"Job de renderização {job_id} ({engine}): {status} em {duration:.2f}s")
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancelar um job na fila ou em execução; False se ele não existir"""
+        task = self._jobs.get(job_id)
+        if task is None or task.done():
+            return False
+        self._cancelled.add(job_id)
+        task.cancel()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Jobs aguardando slot, em execução e limite de concorrência"""
+        return {
+            "queued": self._waiting,
+            "running": self._running,
+            "max_concurrency": self.max_concurrency,
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_concurrency,
+                                                 mp_context=self._mp_context)
+        return self._executor
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Encerrar os processos worker"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+_default_pool: Optional[ModelRenderPool] = None
+
+
+def get_model_render_pool() -> ModelRenderPool:
+    """Pool compartilhado pelo processo"""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = ModelRenderPool()
+    return _default_pool
+
+
+def shutdown_model_render_pool(wait: bool = True) -> None:
+    """Encerrar os workers do pool compartilhado, se ele foi criado"""
+    global _default_pool
+    if _default_pool is not None:
+        _default_pool.shutdown(wait=wait)
+        _default_pool = None
@@ -17,23 +17,29 @@ import os
 import json
 import logging
 import subprocess
+import asyncio
 import tempfile
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple, Union
-from uuid import UUID
-from dataclasses import dataclass
+from uuid import UUID, uuid4
+from dataclasses import dataclass, asdict
 from enum import Enum
 import time
 
 import cadquery as cq
-import trimesh
 from sqlalchemy.orm import Session
-from trimesh import Trimesh
 import numpy as np
 
-from backend.core.config import MODELS_STORAGE_PATH, TEMP_STORAGE_PATH
-from backend.models import Model3D, Project
+from backend.core.config import MODELING_RENDER_TIMEOUT, MODELS_STORAGE_PATH, TEMP_STORAGE_PATH
+from backend.models import GeometryMetrics, Model3D, Project
 from backend.schemas import Model3DCreate
+from backend.services.cadquery_feature_tree import FeatureStage, FeatureTreeCache, FeatureTreeEvaluator
+from backend.services.model_generation_cache import get_model_generation_cache, spec_hash
+from backend.services.geometry_metrics import compute_geometry_metrics
+from backend.services.mesh_ingest import IngestedMesh, file_content_hash, ingest_mesh
+from backend.services.mesh_lod import LOD_SUFFIXES, LodSet, generate_lods
+from backend.services.model_render_pool import RenderError, get_model_render_pool
+from backend.services.printability import analyze_printability, printability_report
 
 logger = logging.getLogger(__name__)
 
@@ -94,8 +100,18 @@ class ModelingService:
         self.temp_path.mkdir(parents=True, exist_ok=True)
         
         # Configurar engines disponíveis
+        self._engine_versions: Dict[ModelingEngine, str] = {}
         self._available_engines = self._check_engines()
         
+        # Cache de geração (arquivo exportado + validação), por hash das especificações
+        self.generation_cache = get_model_generation_cache()
+        
+        # Sólidos intermediários do CadQuery, por prefixo da árvore de features
+        self.feature_tree = FeatureTreeEvaluator(
+            FeatureTreeCache(dump=_dump_brep, load=_load_brep),
+            root=f"cadquery-{self._engine_versions.get(ModelingEngine.CADQUERY, '')}"
+        )
+        
         # Configurações padrão
         self.default_engine = ModelingEngine.CADQUERY
         self.default_format = ModelFormat.STL
@@ -110,6 +126,7 @@ class ModelingService:
         try:
             import cadquery
             engines[ModelingEngine.CADQUERY] = True
+            self._engine_versions[ModelingEngine.CADQUERY] = getattr(cadquery, "__version__", "")
             logger.info("Engine CadQuery disponível")
         except ImportError:
             engines[ModelingEngine.CADQUERY] = False
@@ -120,6 +137,8 @@ class ModelingService:
             result = subprocess.run(['openscad', '--version'], 
                                   capture_output=True, text=True, timeout=5)
             engines[ModelingEngine.OPENSCAD] = result.returncode == 0
+            # OpenSCAD imprime a versão em stderr
+            self._engine_versions[ModelingEngine.OPENSCAD] = (result.stdout or result.stderr).strip()
             if engines[ModelingEngine.OPENSCAD]:
                 logger.info("Engine OpenSCAD disponível")
             else:
@@ -166,29 +185,71 @@ class ModelingService:
             # Converter especificações
             specs = self._convert_specifications(specifications)
             
+            # Especificações idênticas reutilizam o arquivo e a validação já calculados
+            cache_key = self._generation_cache_key(specs, engine, format)
+            cached = self._cached_result(cache_key, engine, format, project_id, start_time)
+            if cached is not None:
+                return cached
+            
             # Gerar modelo usando o engine selecionado
             model_path = self._generate_model(specs, engine, format, project_id)
             
-            # Validar modelo gerado
-            validation_result = self._validate_model(model_path)
-            
-            # Extrair especificações do modelo
-            model_specs = self._extract_model_specs(model_path)
-            
-            generation_time = time.time() - start_time
+            return self._finish_generation(cache_key, model_path, engine, format, start_time)
             
+        except Exception as e:
+            logger.error(f"Erro na modelagem: {str(e)}")
             return ModelingResult(
-                success=True,
-                model_path=model_path,
+                success=False,
+                message=f"Erro na modelagem: {str(e)}",
                 engine_used=engine,
                 format_used=format,
-                message="Modelo gerado com sucesso",
-                specs=model_specs,
-                validation_passed=validation_result["printable"],
-                printability_report=validation_result,
-                generation_time=generation_time
+                generation_time=time.time() - start_time
+            )
+    
+    async def generate_model_from_specs_async(self, specifications: Dict[str, Any],
+                                             project_id: Optional[UUID] = None,
+                                             engine: Optional[ModelingEngine] = None,
+                                             format: Optional[ModelFormat] = None,
+                                             job_id: Optional[str] = None) -> ModelingResult:
+        """
+        Versão assíncrona de `generate_model_from_specs` para a API.
+        
+        A renderização roda no pool de renderização (concorrência limitada,
+        subprocesso OpenSCAD ou processo worker CadQuery) e a validação da
+        malha em uma thread, sem bloquear o event loop. Um job com `job_id`
+        pode ser cancelado por `cancel_generation`.
+        """
+        start_time = time.time()
+        engine = engine or self.default_engine
+        format = format or self.default_format
+        
+        try:
+            if not self._available_engines.get(engine, False):
+                return ModelingResult(
+                    success=False,
+                    message=f"Engine {engine.value} não disponível",
+                    engine_used=engine,
+                    format_used=format,
+                    generation_time=time.time() - start_time
+                )
+            
+            specs = self._convert_specifications(specifications)
+            
+            cache_key = self._generation_cache_key(specs, engine, format)
+            cached = await asyncio.to_thread(
+                self._cached_result, cache_key, engine, format, project_id, start_time
             )
+            if cached is not None:
+                return cached
             
+            model_path = await self._render_model(specs, engine, format, project_id, job_id)
+            
+            return await asyncio.to_thread(
+                self._finish_generation, cache_key, model_path, engine, format, start_time
+            )
+            
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Erro na modelagem: {str(e)}")
             return ModelingResult(
@@ -199,6 +260,84 @@ class ModelingService:
                 generation_time=time.time() - start_time
             )
     
+    def generation_key(self, specifications: Dict[str, Any],
+                       engine: Optional[ModelingEngine] = None,
+                       format: Optional[ModelFormat] = None) -> str:
+        """Hash canônico que identifica modelos idênticos (chave do cache de geração)."""
+        return self._generation_cache_key(
+            self._convert_specifications(specifications),
+            engine or self.default_engine,
+            format or self.default_format
+        )
+    
+    def cancel_generation(self, job_id: str) -> bool:
+        """Cancela um job de renderização na fila ou em execução."""
+        return get_model_render_pool().cancel(job_id)
+    
+    def _cached_result(self, cache_key: str, engine: ModelingEngine, format: ModelFormat,
+                       project_id: Optional[UUID], start_time: float) -> Optional[ModelingResult]:
+        """Resultado a partir do cache de geração, ou None em caso de falta"""
+        cached = self.generation_cache.get(cache_key)
+        if cached is None:
+            return None
+        
+        model_path = str(self.generation_cache.materialize(
+            cached, self._get_output_path(format, project_id)
+        ))
+        return ModelingResult(
+            success=True,
+            model_path=model_path,
+            engine_used=engine,
+            format_used=format,
+            message="Modelo recuperado do cache",
+            specs=cached.specs,
+            validation_passed=cached.validation["printable"],
+            printability_report=cached.validation,
+            generation_time=time.time() - start_time
+        )
+    
+    def _finish_generation(self, cache_key: str, model_path: str, engine: ModelingEngine,
+                           format: ModelFormat, start_time: float) -> ModelingResult:
+        """Validar o arquivo gerado, guardá-lo no cache e montar o resultado"""
+        validation_result = self._validate_model(model_path)
+        model_specs = self._extract_model_specs(model_path, validation_result["metrics"])
+        
+        self.generation_cache.put(cache_key, Path(model_path), model_specs, validation_result)
+        self._generate_lods(Path(model_path))
+        
+        return ModelingResult(
+            success=True,
+            model_path=model_path,
+            engine_used=engine,
+            format_used=format,
+            message="Modelo gerado com sucesso",
+            specs=model_specs,
+            validation_passed=validation_result["printable"],
+            printability_report=validation_result,
+            generation_time=time.time() - start_time
+        )
+    
+    def _generate_lods(self, model_path: Path,
+                       mesh: Optional[IngestedMesh] = None) -> Optional[LodSet]:
+        """Variantes de nível de detalhe do modelo; uma falha não invalida a geração"""
+        if model_path.suffix.lower() not in LOD_SUFFIXES:
+            return None
+        try:
+            return generate_lods(model_path, mesh)
+        except Exception as e:
+            logger.warning(f"Falha ao gerar LODs de {model_path}: {e}")
+            return None
+    
+    def _analyze_geometry(self, model_path: Path, mesh: IngestedMesh,
+                          validation: Dict[str, Any]) -> Optional[GeometryMetrics]:
+        """Métricas geométricas da versão gerada (persistidas no Model3D)"""
+        try:
+            return compute_geometry_metrics(mesh, validation.get("metrics"),
+                                            file_content_hash(model_path))
+        except Exception as e:
+            logger.warning(f"Falha na análise geométrica de {model_path}: {e}")
+            return None
+    
     def _convert_specifications(self, specifications: Dict[str, Any]) -> ModelingSpecs:
         """Converte especificações do formato extraído para ModelingSpecs."""
         dims = specifications.get("dimensoes", {})
@@ -216,6 +355,51 @@ class ModelingService:
             features=specifications.get("funcionalidades", [])
         )
     
+    def _generation_cache_key(self, specs: ModelingSpecs, engine: ModelingEngine,
+                              format: ModelFormat) -> str:
+        """Hash canônico das especificações normalizadas, engine, formato e versão"""
+        return spec_hash(asdict(specs), engine.value, format.value,
+                         self._engine_versions.get(engine, ""))
+    
+    def _get_output_path(self, format: ModelFormat, project_id: Optional[UUID] = None) -> str:
+        """Caminho único do arquivo de saída (o ID do projeto entra no nome para busca)"""
+        name = f"model_{project_id}_{uuid4().hex[:8]}" if project_id else f"model_{uuid4().hex}"
+        return str(self.storage_path / f"{name}.{format.value}")
+    
+    def _validate_model(self, model_path: str) -> Dict[str, Any]:
+        """Relatório de imprimibilidade (formato PrintabilityReport) do arquivo gerado"""
+        try:
+            mesh = ingest_mesh(model_path, min_component_faces=None).to_trimesh()
+            report = printability_report(analyze_printability(mesh))
+            report["metrics"]["file_size_bytes"] = os.path.getsize(model_path)
+        except Exception as e:
+            report = {"printable": False, "warnings": [],
+                      "errors": [f"Erro na validação: {str(e)}"], "metrics": {}}
+        
+        return report
+    
+    def _extract_model_specs(self, model_path: str,
+                             metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Especificações geométricas do arquivo gerado (reusa as métricas da validação)"""
+        if not metrics:
+            mesh = ingest_mesh(model_path, min_component_faces=None).to_trimesh()
+            metrics = analyze_printability(mesh, samples=0).to_dict()
+        dimensions = metrics["dimensions_mm"]
+        
+        return {
+            "volume": metrics["volume_mm3"],
+            "surface_area": metrics["surface_area_mm2"],
+            "vertices": metrics["vertices"],
+            "faces": metrics["faces"],
+            "bbox": metrics["bounds_mm"],
+            "file_size": os.path.getsize(model_path),
+            "dimensions": {
+                "largura": dimensions["x"],
+                "altura": dimensions["z"],
+                "profundidade": dimensions["y"]
+            }
+        }
+    
     def _generate_model(self, specs: ModelingSpecs, engine: ModelingEngine, 
                       format: ModelFormat, project_id: Optional[UUID] = None) -> str:
         """Gera modelo 3D usando o engine especificado."""
@@ -226,33 +410,86 @@ class ModelingService:
         else:
             raise ValueError(f"Engine {engine.value} não suportado")
     
+    async def _render_model(self, specs: ModelingSpecs, engine: ModelingEngine,
+                            format: ModelFormat, project_id: Optional[UUID] = None,
+                            job_id: Optional[str] = None) -> str:
+        """Gera modelo 3D no pool de renderização (sem bloquear o event loop)."""
+        pool = get_model_render_pool()
+        output_path = self._get_output_path(format, project_id)
+        
+        if engine == ModelingEngine.CADQUERY:
+            await pool.run_in_worker("cadquery", render_cadquery_model, (specs, format.value),
+                                     output_path, job_id=job_id)
+        elif engine == ModelingEngine.OPENSCAD:
+            await pool.run_openscad(self._generate_openscad_code(self._specs_to_dict(specs)),
+                                    output_path, job_id=job_id)
+        else:
+            raise ValueError(f"Engine {engine.value} não suportado")
+        
+        logger.info(f"Modelo {engine.value} gerado: {output_path}")
+        return output_path
+    
     def _generate_cadquery_model(self, specs: ModelingSpecs, format: ModelFormat, 
                                project_id: Optional[UUID] = None) -> str:
         """Gera modelo usando CadQuery."""
+        model = self._build_cadquery_model(specs)
+        
+        # Gerar arquivo de saída
+        output_path = self._get_output_path(format, project_id)
+        self._export_cadquery_model(model, format, output_path)
+        
+        logger.info(f"Modelo CadQuery gerado: {output_path}")
+        return output_path
+    
+    def _build_cadquery_model(self, specs: ModelingSpecs) -> cq.Workplane:
+        """
+        Monta a geometria CadQuery a partir das especificações.
+        
+        A construção é avaliada como árvore de features: os estágios cujo
+        prefixo já foi calculado vêm do cache e só o restante é executado.
+        """
+        result = self.feature_tree.evaluate(self._cadquery_feature_stages(specs))
+        if result.reused_stages:
+            logger.info(f"Árvore de features CadQuery: {result.reused_stages} estágios do cache, "
+                        f"{result.executed_stages} executados")
+        return result.model
+    
+    def _cadquery_feature_stages(self, specs: ModelingSpecs) -> List[FeatureStage]:
+        """Estágios da geometria: caixa base, especificações da categoria e uma feature por estágio"""
         # Converter dimensões (considerando unidade padrão em mm)
         width = specs.dimensions.get('largura', 50.0)
         height = specs.dimensions.get('altura', 50.0)
         depth = specs.dimensions.get('profundidade', 50.0)
         
         # Iniciar criação do modelo
-        model = cq.Workplane("XY").box(width, depth, height)
+        stages = [FeatureStage(
+            "base", {"largura": width, "altura": height, "profundidade": depth},
+            lambda _: _solid_workplane(cq.Workplane("XY").box(width, depth, height))
+        )]
         
         # Aplicar especificações baseado na categoria
-        if specs.category == "mecanico":
-            model = self._apply_mechanical_specs_cadquery(model, specs)
-        elif specs.category == "eletronico":
-            model = self._apply_electronic_specs_cadquery(model, specs)
-        elif specs.category == "arquitetura":
-            model = self._apply_architectural_specs_cadquery(model, specs)
+        category_specs = {
+            "mecanico": self._apply_mechanical_specs_cadquery,
+            "eletronico": self._apply_electronic_specs_cadquery,
+            "arquitetura": self._apply_architectural_specs_cadquery
+        }.get(specs.category)
+        if category_specs is not None:
+            stages.append(FeatureStage(
+                f"categoria:{specs.category}", {"dimensoes": specs.dimensions},
+                lambda model: _solid_workplane(category_specs(model, specs))
+            ))
         
         # Aplicar funcionalidades específicas
-        if specs.features:
-            model = self._apply_features_cadquery(model, specs.features)
+        for feature in specs.features or []:
+            stages.append(FeatureStage(
+                "feature", feature,
+                lambda model, feature=feature: _solid_workplane(self._apply_feature_cadquery(model, feature))
+            ))
         
-        # Gerar arquivo de saída
-        output_path = self._get_output_path(format, project_id)
-        
-        # Exportar no formato solicitado
+        return stages
+    
+    def _export_cadquery_model(self, model: cq.Workplane, format: ModelFormat, output_path: str):
+        """Exporta a geometria no formato solicitado."""
         if format == ModelFormat.STL:
             cq.exporters.export(model, output_path, exportType='STL')
         elif format == ModelFormat.STEP:
@@ -261,34 +498,39 @@ class ModelingService:
             cq.exporters.export(model, output_path, exportType='OBJ')
         else:
             raise ValueError(f"Formato {format.value} não suportado para CadQuery")
-        
-        logger.info(f"Modelo CadQuery gerado: {output_path}")
-        return output_path
+    
+    def _specs_to_dict(self, specs: ModelingSpecs) -> Dict[str, Any]:
+        """Converte ModelingSpecs de volta ao formato das especificações extraídas."""
+        return {
+            "categoria": specs.category,
+            "material": specs.material,
+            "dimensoes": specs.dimensions,
+            "especificacoes_adicionais": specs.additional_specs or {},
+            "componentes": specs.components or [],
+            "funcionalidades": specs.features or []
+        }
     
     def _generate_openscad_model(self, specs: ModelingSpecs, format: ModelFormat,
                                project_id: Optional[UUID] = None) -> str:
         """Gera modelo usando OpenSCAD."""
         # Converter especificações para código OpenSCAD
-        openscad_code = self._generate_openscad_code(specs)
-        
-        # Escrever código temporário
-        temp_scad = os.path.join(self.temp_path, f"temp_{project_id or 'model'}.scad")
-        with open(temp_scad, 'w', encoding='utf-8') as f:
-            f.write(openscad_code)
+        openscad_code = self._generate_openscad_code(self._specs_to_dict(specs))
         
-        # Executar OpenSCAD
         output_path = self._get_output_path(format, project_id)
-        command = [
-            'openscad',
-            '-o', output_path,
-            temp_scad
-        ]
-        
-        result = subprocess.run(command, capture_output=True, text=True, timeout=30)
         
-        # Limpar arquivo temporário
-        if os.path.exists(temp_scad):
-            os.remove(temp_scad)
+        # Diretório de trabalho exclusivo: gerações simultâneas não colidem
+        with tempfile.TemporaryDirectory(prefix="openscad-", dir=self.temp_path) as scratch:
+            temp_scad = os.path.join(scratch, "model.scad")
+            with open(temp_scad, 'w', encoding='utf-8') as f:
+                f.write(openscad_code)
+            
+            command = [
+                'openscad',
+                '-o', output_path,
+                temp_scad
+            ]
+            result = subprocess.run(command, capture_output=True, text=True,
+                                    timeout=MODELING_RENDER_TIMEOUT, cwd=scratch)
         
         if result.returncode != 0:
             raise RuntimeError(f"Erro do OpenSCAD: {result.stderr}")
@@ -296,10 +538,10 @@ class ModelingService:
         logger.info(f"Modelo OpenSCAD gerado: {output_path}")
         return output_path
     
-    async def generate_model_from_specs(self, db: Session, project_id: UUID, 
-                                      specifications: Dict[str, Any]) -> Model3D:
+    async def create_model_from_specs(self, db: Session, project_id: UUID, 
+                                    specifications: Dict[str, Any]) -> Model3D:
         """
-        Gerar modelo 3D a partir de especificações
+        Gerar modelo 3D a partir de especificações e registrá-lo no banco
         
         Args:
             db: Sessão do banco de dados
@@ -324,10 +566,18 @@ class ModelingService:
             # Validar imprimibilidade
             validation_result = await self._validate_printability(processed_mesh)
             
+            # Variantes decimadas para pré-visualização e colisão
+            await asyncio.to_thread(self._generate_lods, Path(file_path), processed_mesh)
+            
+            # Métricas geométricas: calculadas uma vez e lidas pelos demais serviços
+            geometry = await asyncio.to_thread(
+                self._analyze_geometry, Path(file_path), processed_mesh, validation_result
+            )
+            
             # Criar registro no banco
             model = await self._create_model_record(
                 db, project_id, specifications, file_path, metadata, 
-                processed_mesh, validation_result, engine
+                processed_mesh, validation_result, engine, geometry
             )
             
             return model
@@ -367,53 +617,39 @@ class ModelingService:
         # Gerar código OpenSCAD
         openscad_code = self._generate_openscad_code(specifications)
         
-        # Criar arquivo temporário
-        temp_scad = self.temp_path / f"{project_id}.scad"
-        temp_scad.write_text(openscad_code, encoding='utf-8')
-        
-        # Executar OpenSCAD
         output_stl = self.storage_path / f"{project_id}.stl"
-        cmd = [
-            "openscad", 
-            "-o", str(output_stl),
-            str(temp_scad)
-        ]
+        start_time = time.time()
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            result.check_returncode()
-            
-            # Limpar arquivo temporário
-            temp_scad.unlink()
-            
-            metadata = {
-                "engine": "openscad",
-                "source_code": openscad_code,
-                "generation_time": 0,  # Implementar medição real
-                "parameters": specifications
-            }
-            
-            return output_stl, metadata
-            
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Erro no OpenSCAD: {e.stderr}")
-            raise Exception(f"Falha na geração OpenSCAD: {e.stderr}")
+            await get_model_render_pool().run_openscad(openscad_code, output_stl)
+        except RenderError as e:
+            logger.error(f"Erro no OpenSCAD: {e}")
+            raise Exception(f"Falha na geração OpenSCAD: {e}")
+        
+        metadata = {
+            "engine": "openscad",
+            "source_code": openscad_code,
+            "generation_time": time.time() - start_time,
+            "parameters": specifications
+        }
+        
+        return output_stl, metadata
     
     async def _generate_with_cadquery(self, specifications: Dict[str, Any], 
                                     project_id: UUID) -> Tuple[Path, Dict[str, Any]]:
         """Gerar modelo usando CadQuery"""
         try:
-            # Gerar geometria CadQuery
-            geometry = self._generate_cadquery_geometry(specifications)
-            
-            # Exportar para STL
+            # Gerar e exportar a geometria CadQuery em um processo worker
             output_stl = self.storage_path / f"{project_id}.stl"
-            cq.exporters.export(geometry, str(output_stl), "STL")
+            start_time = time.time()
+            await get_model_render_pool().run_in_worker(
+                "cadquery", render_cadquery_geometry, (specifications,), output_stl
+            )
             
             metadata = {
                 "engine": "cadquery",
                 "geometry_type": "cadquery_geometry",
-                "generation_time": 0,  # Implementar medição real
+                "generation_time": time.time() - start_time,
                 "parameters": specifications
             }
             
@@ -594,93 +830,38 @@ color("gray") {
         
         return result
     
-    async def _post_process_mesh(self, file_path: Path, engine: str) -> Trimesh:
-        """Processar malha 3D com Trimesh"""
+    async def _post_process_mesh(self, file_path: Path, engine: str) -> IngestedMesh:
+        """Processar malha 3D (STL binário lido em fluxo, sem carregar o arquivo inteiro)"""
         try:
-            # Carregar malha
-            mesh = trimesh.load(str(file_path))
-            
-            if not isinstance(mesh, Trimesh):
-                raise ValueError("Arquivo não contém uma malha válida")
-            
-            # Limpeza da malha
-            mesh.remove_duplicate_faces()
-            mesh.remove_degenerate_faces()
-            mesh.remove_unreferenced_vertices()
-            
-            # Consertar problemas de manifold
-            mesh.remove_small_components()
-            
-            return mesh
+            # Solda de vértices, faces degeneradas/duplicadas e componentes pequenos
+            return await asyncio.to_thread(ingest_mesh, file_path)
             
         except Exception as e:
             logger.error(f"Erro no pós-processamento da malha: {e}")
             raise
     
-    async def _validate_printability(self, mesh: Trimesh) -> Dict[str, Any]:
-        """Validar se o modelo é imprimível"""
-        validation = {
-            " imprimivel": True,
-            "warnings": [],
-            "errors": [],
-            "metrics": {}
-        }
-        
+    async def _validate_printability(self, mesh: IngestedMesh) -> Dict[str, Any]:
+        """Validar se o modelo é imprimível (análise vetorizada em uma thread)"""
         try:
-            # Verificar se é manifold
-            if not mesh.is_watertight:
-                validation["errors"].append("Modelo não é manifold (vazios internos)")
-                validation[" imprimivel"] = False
-            
-            # Verificar volume muito pequeno
-            volume = mesh.volume
-            if volume < 1.0:  # 1 mm³
-                validation["warnings"].append("Volume muito pequeno (< 1 mm³)")
-            
-            # Verificar geometria muito fina
-            bounding_box = mesh.bounds
-            dimensions = bounding_box[1] - bounding_box[0]
-            
-            if dimensions[0] < 0.1 or dimensions[1] < 0.1 or dimensions[2] < 0.1:
-                validation["warnings"].append("Dimensões muito pequenas (< 0.1mm)")
-            
-            # Verificar overhang (simplificado)
-            if self._check_overhangs(mesh):
-                validation["warnings"].append("Possível overhang - verificar ângulos")
-            
-            # Métricas
-            validation["metrics"] = {
-                "volume_mm3": volume,
-                "surface_area_mm2": mesh.area,
-                "vertices": len(mesh.vertices),
-                "faces": len(mesh.faces),
-                "dimensions_mm": {
-                    "x": float(dimensions[0]),
-                    "y": float(dimensions[1]),
-                    "z": float(dimensions[2])
-                }
-            }
-            
+            # Estanqueidade exige topologia: aqui o Trimesh é materializado
+            metrics = await asyncio.to_thread(lambda: analyze_printability(mesh.to_trimesh()))
+            return printability_report(metrics)
         except Exception as e:
-            validation["errors"].append(f"Erro na validação: {str(e)}")
-            validation[" imprimivel"] = False
-        
-        return validation
-    
-    def _check_overhangs(self, mesh: Trimesh) -> bool:
-        """Verificação simplificada de overhangs"""
-        # Implementação simplificada - expandir com algoritmo mais robusto
-        normals = mesh.face_normals
-        upside_down_faces = normals[:, 2] < -0.5  # Faces viradas para baixo
-        return upside_down_faces.any()
+            return {"printable": False, "warnings": [],
+                    "errors": [f"Erro na validação: {str(e)}"], "metrics": {}}
     
     async def _create_model_record(self, db: Session, project_id: UUID, 
                                  specifications: Dict[str, Any], file_path: Path,
-                                 metadata: Dict[str, Any], mesh: Trimesh,
-                                 validation: Dict[str, Any], engine: str) -> Model3D:
+                                 metadata: Dict[str, Any], mesh: IngestedMesh,
+                                 validation: Dict[str, Any], engine: str,
+                                 geometry: Optional[GeometryMetrics] = None) -> Model3D:
         """Criar registro do modelo no banco de dados"""
-        # Calcular métricas do arquivo
+        # Calcular métricas do arquivo (volume e área já vêm da análise de imprimibilidade)
         file_size = file_path.stat().st_size
+        metrics = validation.get("metrics", {})
+        if geometry is not None:
+            metrics = {**metrics, "volume_mm3": geometry.volume_mm3,
+                       "surface_area_mm2": geometry.surface_area_mm2}
         
         model = Model3D(
             projeto_id=project_id,
@@ -692,9 +873,10 @@ color("gray") {
             parametros_geracao=metadata.get("parameters", {}),
             numero_vertices=len(mesh.vertices),
             numero_faces=len(mesh.faces),
-            volume_calculado=float(mesh.volume),
-            area_superficie=float(mesh.area),
-            imprimavel=validation[" imprimivel"],
+            volume_calculado=metrics.get("volume_mm3", mesh.stats.volume),
+            area_superficie=metrics.get("surface_area_mm2", mesh.stats.area),
+            metricas_geometria=geometry,
+            imprimivel=validation["printable"],
             erros_validacao=validation["errors"],
             warnings=validation["warnings"],
             otimizado=False,
@@ -757,28 +939,26 @@ color("gray") {
         
         return model
     
-    def _apply_features_cadquery(self, model: cq.Workplane, features: List[Dict[str, Any]]) -> cq.Workplane:
-        """Aplica funcionalidades específicas."""
-        for feature in features:
-            feature_type = feature.get("tipo", "")
-            feature_name = feature.get("nome", "").lower()
-            
-            if "furo" in feature_name:
-                # Adicionar furo específico
-                radius = feature.get("diametro", 5.0) / 2
-                position = feature.get("posicao", {"x": 0, "y": 0})
-                model = model.faces(">Z").workplane().center(
-                    position.get("x", 0), position.get("y", 0)
-                ).circle(radius).cutThruAll()
-            
-            elif "suporte" in feature_name:
-                # Adicionar suporte
-                height = feature.get("altura", 10.0)
-                radius = feature.get("raio", 3.0)
-                position = feature.get("posicao", {"x": 0, "y": 0})
-                model = model.faces("<Z").workplane().center(
-                    position.get("x", 0), position.get("y", 0)
-                ).circle(radius).extrude(height)
+    def _apply_feature_cadquery(self, model: cq.Workplane, feature: Dict[str, Any]) -> cq.Workplane:
+        """Aplica uma funcionalidade (um estágio da árvore de features)."""
+        feature_name = feature.get("nome", "").lower()
+        
+        if "furo" in feature_name:
+            # Adicionar furo específico
+            radius = feature.get("diametro", 5.0) / 2
+            position = feature.get("posicao", {"x": 0, "y": 0})
+            model = model.faces(">Z").workplane().center(
+                position.get("x", 0), position.get("y", 0)
+            ).circle(radius).cutThruAll()
+        
+        elif "suporte" in feature_name:
+            # Adicionar suporte
+            height = feature.get("altura", 10.0)
+            radius = feature.get("raio", 3.0)
+            position = feature.get("posicao", {"x": 0, "y": 0})
+            model = model.faces("<Z").workplane().center(
+                position.get("x", 0), position.get("y", 0)
+            ).circle(radius).extrude(height)
         
         return model
     
@@ -833,4 +1013,32 @@ def get_modeling_service() -> ModelingService:
     global _modeling_service_instance
     if _modeling_service_instance is None:
         _modeling_service_instance = ModelingService()
-    return _modeling_service_instance
\ No newline at end of file
+    return _modeling_service_instance
+
+
+def _solid_workplane(model: cq.Workplane) -> cq.Workplane:
+    """Workplane com apenas o sólido resultante (mesma forma vinda do cache ou recalculada)"""
+    return cq.Workplane("XY").newObject([model.findSolid()])
+
+
+def _dump_brep(model: cq.Workplane, path: Path):
+    model.findSolid().exportBrep(str(path))
+
+
+def _load_brep(path: Path) -> cq.Workplane:
+    return cq.Workplane("XY").newObject([cq.Shape.importBrep(str(path))])
+
+
+def render_cadquery_model(specs: ModelingSpecs, format_value: str, output_path: str) -> str:
+    """Job do pool de renderização: gera e exporta o modelo em um processo worker."""
+    service = get_modeling_service()
+    model = service._build_cadquery_model(specs)
+    service._export_cadquery_model(model, ModelFormat(format_value), output_path)
+    return output_path
+
+
+def render_cadquery_geometry(specifications: Dict[str, Any], output_path: str) -> str:
+    """Job do pool de renderização: geometria a partir das especificações extraídas (STL)."""
+    geometry = get_modeling_service()._generate_cadquery_geometry(specifications)
+    cq.exporters.export(geometry, output_path, "STL")
+    return output_path
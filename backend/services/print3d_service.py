@@ -20,20 +20,26 @@ import logging
 import asyncio
 import subprocess
 import hashlib
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple, Union
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Any, Tuple, Union
 from uuid import UUID
 from pathlib import Path
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_, desc
 import numpy as np
 
-from backend.core.config import settings
+from backend.core.config import GCODE_COMPRESSION, GCODE_STORAGE_PATH
 from backend.models import (
     Printer, Material, PrintJob, PrintQueue, PrintSettings, PrintJobLog,
     User, Project, Model3D
 )
+from backend.services.geometry_metrics import ensure_model_geometry, model_geometry, model_volume_mm3
+from backend.services.gcode_stream import GcodeFileSink, discard_abandoned, gcode_filename, write_gcode
+from backend.services.farm_scheduler import FarmScheduler
+from backend.services.print_queue import ACTIVE_QUEUE_STATUSES, PrintQueueManager
+from backend.services.gcode_analyzer import GcodeAnalysis, analyze_gcode, estimate_model_print
+from backend.services.slicer import SliceResult, SliceSettings, iter_gcode
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +50,9 @@ class Print3DService:
     def __init__(self):
         self.printer_apis = {}
         self.active_jobs = {}
+        self.gcode_tasks: Dict[str, asyncio.Task] = {}
+        self.queues = PrintQueueManager()
+        self.farm = FarmScheduler(self.queues)
         self.gcode_generators = {
             'cura': self._generate_gcode_cura,
             'slic3r': self._generate_gcode_slic3r,
@@ -288,26 +297,38 @@ class Print3DService:
             model_3d = db.query(Model3D).filter(Model3D.id == job_data.modelo_3d_id).first()
             if not model_3d:
                 raise ValueError("Modelo 3D não encontrado")
-            
-            # Verificar impressora
-            printer = db.query(Printer).filter(
-                and_(
-                    Printer.id == job_data.printer_id,
-                    Printer.user_id == user_id
-                )
-            ).first()
-            
-            if not printer:
-                raise ValueError("Impressora não encontrada")
+            # Modelos anteriores ao registro de métricas são analisados uma vez
+            ensure_model_geometry(model_3d, db)
             
             # Verificar material
             material = db.query(Material).filter(Material.id == job_data.material_id).first()
             if not material:
                 raise ValueError("Material não encontrado")
             
-            # Verificar compatibilidade
-            if material.id not in printer.materiais_compatíveis:
-                raise ValueError("Material não compatível com a impressora")
+            if job_data.printer_id:
+                # Verificar impressora
+                printer = db.query(Printer).filter(
+                    and_(
+                        Printer.id == job_data.printer_id,
+                        Printer.user_id == user_id
+                    )
+                ).first()
+                
+                if not printer:
+                    raise ValueError("Impressora não encontrada")
+                
+                # Verificar compatibilidade
+                if material.id not in printer.materiais_compatíveis:
+                    raise ValueError("Material não compatível com a impressora")
+            else:
+                # Sem impressora: o escalonador da fazenda escolhe; métricas com uma compatível
+                printer = next((
+                    candidate for candidate in db.query(Printer).filter(Printer.user_id == user_id)
+                    if str(material.id) in {str(m) for m in candidate.materiais_compatíveis or []}
+                ), None)
+                
+                if not printer:
+                    raise ValueError("Nenhuma impressora compatível com o material")
             
             # Calcular métricas do job
             metrics = await self._calculate_job_metrics(db, model_3d, material, printer, job_data)
@@ -327,8 +348,11 @@ class Print3DService:
             db.commit()
             db.refresh(print_job)
             
-            # Adicionar à fila
-            await self._add_to_queue(db, print_job)
+            # Adicionar à fila ou deixar para a fazenda
+            if print_job.printer_id:
+                await self._add_to_queue(db, print_job)
+            else:
+                await self._replan_farm(db, user_id)
             
             logger.info(f"Job de impressão criado: {print_job.id}")
             return print_job
@@ -419,6 +443,10 @@ class Print3DService:
             db.commit()
             db.refresh(job)
             
+            # Fila encurtou ou impressora liberada: replanejar os jobs pendentes
+            if status_update.status in ['completed', 'failed', 'cancelled']:
+                await self._replan_farm(db, user_id)
+            
             logger.info(f"Status do job {job.id} atualizado para: {status_update.status}")
             return job
             
@@ -435,9 +463,17 @@ class Print3DService:
         db: Session,
         job_id: UUID,
         user_id: UUID,
-        slicer_type: str = 'cura'
+        slicer_type: str = 'cura',
+        wait: bool = True
     ) -> str:
-        """Gerar G-code para job de impressão"""
+        """
+        Gerar G-code para job de impressão
+        
+        O caminho é gravado no job antes do fatiamento, então o download pode
+        acompanhar o arquivo enquanto ele é escrito. Com `wait=False` a geração
+        segue em segundo plano e o caminho é devolvido imediatamente.
+        """
+        sink = None
         try:
             job = db.query(PrintJob).filter(
                 and_(
@@ -449,8 +485,8 @@ class Print3DService:
             if not job:
                 raise ValueError("Job não encontrado")
             
-            # Verificar se G-code já existe
-            if job.arquivo_gcode and Path(job.arquivo_gcode).exists():
+            # Verificar se G-code já existe (parcial de geração interrompida é refeito)
+            if job.arquivo_gcode and Path(job.arquivo_gcode).exists() and not discard_abandoned(job.arquivo_gcode):
                 return job.arquivo_gcode
             
             # Obter dados necessários
@@ -462,19 +498,75 @@ class Print3DService:
                 raise ValueError(f"Slicer não suportado: {slicer_type}")
             
             generator_func = self.gcode_generators[slicer_type]
-            gcode_path = await generator_func(job, printer, material)
             
-            # Atualizar job com caminho do G-code
-            job.arquivo_gcode = gcode_path
+            # Atualizar job com caminho do G-code (marcado como em gravação)
+            sink = GcodeFileSink(self._gcode_output_path(job), compress=GCODE_COMPRESSION).open()
+            job.arquivo_gcode = str(sink.path)
             db.commit()
             
+            generation = generator_func(job, printer, material, sink)
+            if not wait:
+                task = asyncio.create_task(self._finish_gcode_background(job, generation))
+                self.gcode_tasks[str(job.id)] = task
+                task.add_done_callback(lambda done, key=str(job.id), out=sink: self._gcode_task_done(key, out, done))
+                return job.arquivo_gcode
+            
+            gcode_path = await generation
+            # Duração do G-code gerado entra nos horários previstos da fila
+            try:
+                self.queues.update_duration(db, job)
+                db.commit()
+            except Exception:
+                self._rollback_queues(db, [job.printer_id])
+                raise
+            
             logger.info(f"G-code gerado para job {job.id}: {gcode_path}")
             return gcode_path
             
         except Exception as e:
+            if sink is not None:
+                sink.close(failed=True)
             logger.error(f"Erro ao gerar G-code: {e}")
             raise
     
+    async def _finish_gcode_background(self, job: PrintJob, generation) -> str:
+        """
+        Concluir geração em segundo plano
+        
+        A sessão da requisição já foi fechada: os dados do G-code são gravados
+        numa sessão própria, com o job recarregado.
+        """
+        from backend.database import SessionLocal
+        
+        gcode_path = await generation
+        db = SessionLocal()
+        try:
+            stored = db.query(PrintJob).filter(PrintJob.id == job.id).first()
+            if stored is None:
+                return gcode_path
+            stored.camadas_totais = job.camadas_totais
+            stored.tempo_estimado_segundos = job.tempo_estimado_segundos
+            stored.peso_material_g = job.peso_material_g
+            try:
+                self.queues.update_duration(db, stored)
+                db.commit()
+            except Exception:
+                self._rollback_queues(db, [stored.printer_id])
+                raise
+            return gcode_path
+        finally:
+            db.close()
+    
+    def _gcode_task_done(self, job_key: str, sink: GcodeFileSink, task: asyncio.Task):
+        """Encerrar uma geração em segundo plano"""
+        self.gcode_tasks.pop(job_key, None)
+        if task.cancelled() or task.exception() is not None:
+            sink.close(failed=True)
+            error = "cancelada" if task.cancelled() else task.exception()
+            logger.error(f"Geração de G-code do job {job_key} falhou: {error}")
+        else:
+            logger.info(f"G-code gerado para job {job_key}: {sink.path}")
+    
     # =============================================================================
     # FILA DE IMPRESSÃO
     # =============================================================================
@@ -484,41 +576,39 @@ class Print3DService:
         db: Session,
         printer_id: UUID
     ) -> Dict[str, Any]:
-        """Obter status da fila de impressão"""
+        """Obter status da fila de impressão (uma consulta com job e material)"""
         try:
-            # Jobs na fila
-            queue_items = db.query(PrintQueue).filter(
-                PrintQueue.printer_id == printer_id
-            ).order_by(PrintQueue.posicao).all()
-            
-            # Job atual (se houver)
-            current_job = None
-            current_queue = db.query(PrintQueue).filter(
+            queue_items = db.query(PrintQueue).options(
+                joinedload(PrintQueue.print_job).joinedload(PrintJob.material)
+            ).filter(
                 and_(
                     PrintQueue.printer_id == printer_id,
-                    PrintQueue.status == 'processing'
+                    PrintQueue.status.in_(ACTIVE_QUEUE_STATUSES)
                 )
-            ).first()
+            ).order_by(PrintQueue.posicao).all()
             
-            if current_queue:
-                current_job = db.query(PrintJob).filter(
-                    PrintJob.id == current_queue.print_job_id
-                ).first()
+            queue = self.queues.loaded(printer_id) or self.queues.load(printer_id, [
+                (item.print_job_id, item.print_job.tempo_estimado_segundos, item.status)
+                for item in queue_items
+            ])
+            
+            # Job atual (se houver)
+            current_job = next(
+                (item.print_job for item in queue_items if item.status == 'processing'), None
+            )
             
             queue_data = {
                 'printer_id': printer_id,
                 'current_job': current_job.to_dict() if current_job else None,
                 'queue_length': len(queue_items),
-                'estimated_total_time': sum(
-                    item.print_job.tempo_estimado_segundos or 0 
-                    for item in queue_items if item.print_job.tempo_estimado_segundos
-                ),
+                'estimated_total_time': queue.total_seconds,
                 'queue_items': [
                     {
                         'position': item.posicao,
                         'job_id': item.print_job_id,
                         'job_name': item.print_job.nome,
                         'estimated_time': item.print_job.tempo_estimado_segundos,
+                        'estimated_start': queue.start_offset(item.print_job_id),
                         'material': item.print_job.material.nome
                     }
                     for item in queue_items
@@ -560,23 +650,16 @@ class Print3DService:
                 )
             ).all()
             
-            if len(jobs_in_order) != len(job_order):
+            if len(jobs_in_order) != len(set(job_order)):
                 raise ValueError("Alguns jobs não foram encontrados ou não pertencem ao usuário")
             
-            # Atualizar posições na fila
-            for index, job_id in enumerate(job_order, 1):
-                queue_item = db.query(PrintQueue).filter(
-                    and_(
-                        PrintQueue.printer_id == printer_id,
-                        PrintQueue.print_job_id == job_id
-                    )
-                ).first()
-                
-                if queue_item:
-                    queue_item.posicao = index
-                    queue_item.updated_at = datetime.utcnow()
-            
-            db.commit()
+            # Nova ordem no índice e posições gravadas em lote
+            try:
+                self.queues.reorder(db, printer_id, job_order)
+                db.commit()
+            except Exception:
+                self._rollback_queues(db, [printer_id])
+                raise
             
             logger.info(f"Fila reordenada para impressora {printer_id}")
             return True
@@ -585,6 +668,38 @@ class Print3DService:
             logger.error(f"Erro ao reordenar fila: {e}")
             raise
     
+    # =============================================================================
+    # FAZENDA DE IMPRESSÃO
+    # =============================================================================
+    
+    async def schedule_farm(
+        self,
+        db: Session,
+        user_id: UUID,
+        dry_run: bool = True
+    ) -> Dict[str, Any]:
+        """Distribuir os jobs sem impressora entre as impressoras do usuário"""
+        try:
+            plan = await self.farm.plan(db, user_id, dry_run=dry_run)
+            return {'dry_run': dry_run, **plan.to_dict()}
+            
+        except Exception as e:
+            logger.error(f"Erro ao planejar fazenda: {e}")
+            raise
+    
+    async def _replan_farm(self, db: Session, user_id: UUID):
+        """
+        Replanejamento incremental: só os jobs ainda sem impressora
+        
+        Se a gravação falhar, `FarmScheduler` desfaz a transação e descarta
+        os índices das impressoras do plano (recarregados do banco).
+        """
+        try:
+            await self.farm.plan(db, user_id, dry_run=False)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Replanejamento da fazenda falhou: {e}")
+    
     # =============================================================================
     # MONITORAMENTO E LOGS
     # =============================================================================
@@ -657,31 +772,41 @@ class Print3DService:
         printer: Printer,
         job_data: dict
     ) -> Dict[str, Any]:
-        """Calcular métricas estimadas do job"""
+        """Calcular métricas do job a partir das trajetórias fatiadas"""
         try:
-            # Volume estimado (assumindo material densidade 1.0 g/cm³ por padrão)
-            volume_cm3 = model.volume_calculado or 0
-            peso_estimado_g = volume_cm3 * (material.densidade or 1.0)
+            geometry = model_geometry(model)
+            layer_height = getattr(job_data, 'altura_camada', None) or printer.resolucao_camada_padrao
+            dimensions = geometry.dimensions_mm if geometry else {"x": 100, "y": 100, "z": layer_height * 100}
+            
+            try:
+                # Fatiamento sem escrita analisado com os limites de aceleração do cabeçalho
+                slice_settings = self._slice_settings(job_data, printer, material)
+                analysis = await asyncio.to_thread(
+                    estimate_model_print, model.arquivo_path, slice_settings,
+                    self._start_gcode(job_data, printer, slice_settings)
+                )
+                volume_cm3 = analysis.filament_volume_mm3 / 1000
+                peso_estimado_g = analysis.material_g(material.densidade or 1.0)
+                tempo_estimado_segundos = int(round(analysis.print_time_s))
+            except Exception as e:
+                logger.warning(f"Fatiamento indisponível para {model.arquivo_path}, usando estimativa: {e}")
+                # Volume da peça e do suporte (mm³ nas métricas geométricas do modelo)
+                volume_cm3 = model_volume_mm3(model, include_support=True) / 1000
+                peso_estimado_g = volume_cm3 * (material.densidade or 1.0)
+                speed_mm_s = getattr(job_data, 'velocidade_impressao', None) or printer.velocidade_impressao_padrao
+                tempo_estimado_segundos = int(volume_cm3 * 60 / (speed_mm_s * layer_height * 100)) * 60
             
             # Custo do material
             custo_material = (peso_estimado_g / 1000) * float(material.preco_por_kg or 0)
             
-            # Tempo estimado (simplificado)
-            # Baseado em volume, velocidade de impressão e altura de camada
-            speed_mm_s = job_data.velocidade_impressao or printer.velocidade_impressao_padrao
-            layer_height = job_data.altura_camada or printer.resolucao_camada_padrao
-            
-            # Estimativa simplificada (precisaria de análise geométrica real)
-            estimated_time_minutes = int(volume_cm3 * 60 / (speed_mm_s * layer_height * 100))  # Adjust factor
-            
             metrics = {
                 'peso_material_g': peso_estimado_g,
                 'custo_material': custo_material,
-                'tempo_estimado_segundos': estimated_time_minutes * 60,
+                'tempo_estimado_segundos': tempo_estimado_segundos,
                 'volume_impressao_cm3': volume_cm3,
-                'dimensao_x': model.numero_vertices or 100,  # Placeholder
-                'dimensao_y': model.numero_faces or 100,     # Placeholder
-                'dimensao_z': layer_height * 100  # Placeholder
+                'dimensao_x': dimensions["x"],
+                'dimensao_y': dimensions["y"],
+                'dimensao_z': dimensions["z"]
             }
             
             return metrics
@@ -706,47 +831,36 @@ class Print3DService:
     ):
         """Adicionar job à fila de impressão"""
         try:
-            # Obter próxima posição na fila
-            last_position = db.query(PrintQueue).filter(
-                PrintQueue.printer_id == print_job.printer_id
-            ).count()
-            
             queue_item = PrintQueue(
                 printer_id=print_job.printer_id,
                 print_job_id=print_job.id,
-                posicao=last_position + 1,
                 status='queued',
                 created_at=datetime.utcnow()
             )
             
-            db.add(queue_item)
-            
-            # Calcular tempos estimados
-            if print_job.tempo_estimado_segundos:
-                estimated_start = datetime.utcnow() + timedelta(
-                    seconds=sum([
-                        job.tempo_estimado_segundos or 0
-                        for job in db.query(PrintJob).join(PrintQueue).filter(
-                            PrintQueue.printer_id == print_job.printer_id,
-                            PrintQueue.posicao <= last_position
-                        ).all()
-                    ])
-                )
-                
-                estimated_end = estimated_start + timedelta(
-                    seconds=print_job.tempo_estimado_segundos
-                )
-                
-                queue_item.estimado_inicio = estimated_start
-                queue_item.estimado_conclusao = estimated_end
-            
-            print_job.fila_posicao = last_position + 1
-            db.commit()
+            # Posição e horários previstos a partir do índice da impressora
+            try:
+                self.queues.add(db, queue_item, print_job)
+                db.add(queue_item)
+                db.commit()
+            except Exception:
+                self._rollback_queues(db, [print_job.printer_id])
+                raise
             
         except Exception as e:
             logger.error(f"Erro ao adicionar job à fila: {e}")
             raise
     
+    def _rollback_queues(self, db: Session, printer_ids: Iterable[UUID]):
+        """
+        Desfazer a transação e descartar os índices das filas afetadas
+        
+        O índice em memória muda antes do commit; sem descartá-lo ele
+        ficaria à frente do banco. O próximo acesso recarrega do banco.
+        """
+        db.rollback()
+        self.queues.discard(printer_ids)
+    
     async def _update_queue_position(
         self,
         db: Session,
@@ -756,55 +870,30 @@ class Print3DService:
         try:
             if print_job.status in ['printing', 'completed', 'failed', 'cancelled']:
                 # Remover da fila ou marcar como processado
-                queue_item = db.query(PrintQueue).filter(
+                queue_status = 'processing' if print_job.status == 'printing' else 'cancelled'
+                # Carregar o índice antes do UPDATE: recarregado depois, viria
+                # sem o job e os seguintes não seriam renumerados
+                self.queues.get(db, print_job.printer_id)
+                db.query(PrintQueue).filter(
                     and_(
                         PrintQueue.printer_id == print_job.printer_id,
                         PrintQueue.print_job_id == print_job.id
                     )
-                ).first()
+                ).update({'status': queue_status, 'updated_at': datetime.utcnow()}, synchronize_session=False)
                 
-                if queue_item:
-                    if print_job.status == 'printing':
-                        queue_item.status = 'processing'
-                    else:
-                        queue_item.status = 'cancelled'
-                        # Reorganizar fila
-                        await self._reorganize_queue(db, print_job.printer_id)
+                if queue_status == 'processing':
+                    self.queues.mark(db, print_job, queue_status)
+                else:
+                    # Renumerar os seguintes; só depois do UPDATE, pois o item
+                    # precisa sair da fila antes que outro ocupe sua posição
+                    self.queues.remove(db, print_job)
                 
                 db.commit()
                 
         except Exception as e:
+            self._rollback_queues(db, [print_job.printer_id])
             logger.error(f"Erro ao atualizar fila: {e}")
     
-    async def _reorganize_queue(
-        self,
-        db: Session,
-        printer_id: UUID
-    ):
-        """Reorganizar posições na fila"""
-        try:
-            queue_items = db.query(PrintQueue).filter(
-                and_(
-                    PrintQueue.printer_id == printer_id,
-                    PrintQueue.status == 'queued'
-                )
-            ).order_by(PrintQueue.posicao).all()
-            
-            for index, item in enumerate(queue_items, 1):
-                if item.posicao != index:
-                    item.posicao = index
-                    item.updated_at = datetime.utcnow()
-                    
-                    # Atualizar job também
-                    job = db.query(PrintJob).filter(PrintJob.id == item.print_job_id).first()
-                    if job:
-                        job.fila_posicao = index
-            
-            db.commit()
-            
-        except Exception as e:
-            logger.error(f"Erro ao reorganizar fila: {e}")
-    
     # =============================================================================
     # GERADORES DE G-CODE
     # =============================================================================
@@ -813,24 +902,33 @@ class Print3DService:
         self,
         job: PrintJob,
         printer: Printer,
-        material: Material
+        material: Material,
+        sink: GcodeFileSink
     ) -> str:
-        """Gerar G-code usando Cura (UCONF)"""
+        """Gerar G-code com o fatiador interno (perfil Cura)"""
         try:
-            # Gerar arquivo G-code usando configurações do job
-            gcode_content = self._generate_basic_gcode(job, printer, material)
+            slice_settings = self._slice_settings(job, printer, material)
             
-            # Salvar arquivo
-            output_dir = Path(settings.TEMP_STORAGE_PATH) / "gcode"
-            output_dir.mkdir(exist_ok=True)
-            
-            filename = f"job_{job.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.gcode"
-            filepath = output_dir / filename
+            def write_sliced() -> Tuple[SliceResult, GcodeAnalysis]:
+                from backend.services.mesh_ingest import ingest_mesh
+                
+                mesh = ingest_mesh(job.arquivo_modelo, min_component_faces=None)
+                chunks = iter_gcode(
+                    mesh.vertices, mesh.faces, slice_settings,
+                    self._start_gcode(job, printer, slice_settings),
+                    self._end_gcode(printer)
+                )
+                result = write_gcode(chunks, sink)
+                # Tempo com aceleração do arquivo final (cabeçalho e finalização incluídos)
+                return result, analyze_gcode(sink.path, slice_settings.filament_diameter)
             
-            with open(filepath, 'w') as f:
-                f.write(gcode_content)
+            # Fatiamento e gravação em fluxo fora do event loop
+            result, analysis = await asyncio.to_thread(write_sliced)
+            job.camadas_totais = result.layers
+            job.tempo_estimado_segundos = int(round(analysis.print_time_s))
+            job.peso_material_g = analysis.material_g(getattr(material, 'densidade', None) or 1.0)
             
-            return str(filepath)
+            return str(sink.path)
             
         except Exception as e:
             logger.error(f"Erro ao gerar G-code Cura: {e}")
@@ -840,100 +938,116 @@ class Print3DService:
         self,
         job: PrintJob,
         printer: Printer,
-        material: Material
+        material: Material,
+        sink: GcodeFileSink
     ) -> str:
         """Gerar G-code usando Slic3r"""
-        return await self._generate_gcode_cura(job, printer, material)  # Simplified
+        return await self._generate_gcode_cura(job, printer, material, sink)  # Simplified
     
     async def _generate_gcode_simplify3d(
         self,
         job: PrintJob,
         printer: Printer,
-        material: Material
+        material: Material,
+        sink: GcodeFileSink
     ) -> str:
         """Gerar G-code usando Simplify3D"""
-        return await self._generate_gcode_cura(job, printer, material)  # Simplified
+        return await self._generate_gcode_cura(job, printer, material, sink)  # Simplified
     
     async def _generate_gcode_custom(
         self,
         job: PrintJob,
         printer: Printer,
-        material: Material
+        material: Material,
+        sink: GcodeFileSink
     ) -> str:
         """Gerar G-code customizado"""
-        return await self._generate_gcode_cura(job, printer, material)  # Simplified
+        return await self._generate_gcode_cura(job, printer, material, sink)  # Simplified
+    
+    def _gcode_output_path(self, job: PrintJob) -> Path:
+        """Arquivo de saída do G-code do job"""
+        stem = f"job_{job.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        return Path(GCODE_STORAGE_PATH) / gcode_filename(stem, GCODE_COMPRESSION)
     
-    def _generate_basic_gcode(
+    def _slice_settings(
         self,
-        job: PrintJob,
+        job: Any,
         printer: Printer,
         material: Material
-    ) -> str:
-        """Gerar G-code básico"""
-        gcode_lines = []
-        
-        # Header
-        gcode_lines.append("; 3D Print Job G-code")
-        gcode_lines.append(f"; Job ID: {job.id}")
-        gcode_lines.append(f"; Created: {datetime.now().isoformat()}")
-        gcode_lines.append("")
-        
-        # Inicialização
-        gcode_lines.append("G28 ; Home all axes")
-        gcode_lines.append("G90 ; Absolute positioning")
-        gcode_lines.append("M82 ; Absolute E")
-        gcode_lines.append("")
-        
-        # Temperaturas
-        if job.temperatura_bico or material.temperatura_bico_recomendada:
-            temp_nozzle = job.temperatura_bico or material.temperatura_bico_recomendada
-            gcode_lines.append(f"M104 S{temp_nozzle} ; Set nozzle temperature")
+    ) -> SliceSettings:
+        """Parâmetros do fatiador a partir do job (ou dos dados de criação), impressora e material"""
+        def value(source, name, default=None):
+            found = getattr(source, name, None)
+            return default if found is None else found
         
-        if job.temperatura_mesa or material.temperatura_mesa_recomendada:
-            temp_bed = job.temperatura_mesa or material.temperatura_mesa_recomendada
-            gcode_lines.append(f"M140 S{temp_bed} ; Set bed temperature")
+        retraction = value(material, 'retração_ativada', True)
+        return SliceSettings(
+            layer_height=float(value(job, 'altura_camada', value(printer, 'resolucao_camada_padrao', 0.2))),
+            perimeters=2 if value(job, 'paredes_duplas', True) else 1,
+            infill_density=float(value(job, 'percentual_preenchimento',
+                                       value(material, 'percentual_preenchimento_padrao', 20))),
+            print_speed=float(value(job, 'velocidade_impressao', value(printer, 'velocidade_impressao_padrao', 50))),
+            travel_speed=float(value(printer, 'velocidade_viagem_padrao', 150)),
+            retraction_distance=float(value(material, 'distancia_retração', 4.0)) if retraction else 0.0,
+            retraction_speed=float(value(material, 'velocidade_retração', 25)),
+            nozzle_temperature=value(job, 'temperatura_bico', value(material, 'temperatura_bico_recomendada')),
+            bed_temperature=value(job, 'temperatura_mesa', value(material, 'temperatura_mesa_recomendada')),
+            fan_speed=float(value(job, 'velocidade_ventilador', value(material, 'ventilador_camadas_normais', 50))),
+            bed_center=(float(value(printer, 'volume_impressao_x', 200)) / 2,
+                        float(value(printer, 'volume_impressao_y', 200)) / 2)
+        )
+    
+    def _start_gcode(
+        self,
+        job: PrintJob,
+        printer: Printer,
+        slice_settings: SliceSettings
+    ) -> List[str]:
+        """Cabeçalho e aquecimento"""
+        gcode_lines = [
+            "; 3D Print Job G-code",
+            f"; Job ID: {getattr(job, 'id', None)}",
+            f"; Created: {datetime.now().isoformat()}",
+            "",
+            "G28 ; Home all axes",
+            "G90 ; Absolute positioning",
+            "M82 ; Absolute E",
+        ]
         
-        gcode_lines.append("M190 S ; Wait for bed temperature")
-        gcode_lines.append("M109 S ; Wait for nozzle temperature")
-        gcode_lines.append("")
+        # Temperaturas: aquecer os dois e aguardar a mesa antes do bico
+        if slice_settings.bed_temperature:
+            gcode_lines.append(f"M140 S{slice_settings.bed_temperature} ; Set bed temperature")
+        if slice_settings.nozzle_temperature:
+            gcode_lines.append(f"M104 S{slice_settings.nozzle_temperature} ; Set nozzle temperature")
+        if slice_settings.bed_temperature:
+            gcode_lines.append(f"M190 S{slice_settings.bed_temperature} ; Wait for bed temperature")
+        if slice_settings.nozzle_temperature:
+            gcode_lines.append(f"M109 S{slice_settings.nozzle_temperature} ; Wait for nozzle temperature")
         
         # Configurações de velocidade
-        speed = job.velocidade_impressao or printer.velocidade_impressao_padrao
+        speed = slice_settings.print_speed
         gcode_lines.append(f"M201 X{5000} Y{5000} Z{200} E{5000} ; Set accelerations")
-        gcode_lines.append(f"M203 X{speed*60} Y{speed*60} Z{1200} E{speed*60} ; Set max feedrates")
+        gcode_lines.append(f"M203 X{slice_settings.travel_speed:.0f} Y{slice_settings.travel_speed:.0f} "
+                           f"Z{20} E{speed:.0f} ; Set max feedrates")
         gcode_lines.append(f"M204 R{3000} P{3000} T{3000} ; Set retract acceleration")
-        gcode_lines.append("")
-        
-        # Coordenadas de impressão (simulado)
-        gcode_lines.append("G1 X0 Y0 Z0.3 F3000")
         gcode_lines.append("G92 E0")
-        gcode_lines.append("G1 Z1 F3000")
         gcode_lines.append("")
-        
-        # Simulação básica do modelo (seria substituída por slicing real)
-        for layer in range(int(job.camadas_totais or 100)):
-            z_height = layer * (job.altura_camada or 0.2)
-            gcode_lines.append(f"; Layer {layer + 1}")
-            gcode_lines.append(f"G1 Z{z_height:.2f}")
-            gcode_lines.append("G1 X10 Y10 E1")
-            gcode_lines.append("G1 X90 Y10 E5")
-            gcode_lines.append("G1 X90 Y90 E9")
-            gcode_lines.append("G1 X10 Y90 E13")
-            gcode_lines.append("G1 X10 Y10 E17")
-        
-        gcode_lines.append("")
-        gcode_lines.append("; Print complete")
-        gcode_lines.append("M104 S0 ; Turn off hotend")
-        gcode_lines.append("M140 S0 ; Turn off bed")
-        gcode_lines.append("G91 ; Relative positioning")
-        gcode_lines.append("G1 E-1 F300 ; Retract filament")
-        gcode_lines.append("G1 E-1 Z1 F240 ; Retract filament")
-        gcode_lines.append("G1 X0 Y0 Z5 F900 ; Move Z up")
-        gcode_lines.append("G90 ; Absolute positioning")
-        gcode_lines.append("G1 X0 Y{printer.volume_impressao_y/2} F3000 ; Move to park position")
-        gcode_lines.append("M84 ; Disable motors")
-        
-        return "\n".join(gcode_lines)
+        return gcode_lines
+    
+    def _end_gcode(self, printer: Printer) -> List[str]:
+        """Resfriamento e estacionamento"""
+        return [
+            "",
+            "; Print complete",
+            "M107 ; Fan off",
+            "M104 S0 ; Turn off hotend",
+            "M140 S0 ; Turn off bed",
+            "G91 ; Relative positioning",
+            "G1 Z5 F900 ; Move Z up",
+            "G90 ; Absolute positioning",
+            f"G1 X0 Y{printer.volume_impressao_y / 2:.0f} F3000 ; Move to park position",
+            "M84 ; Disable motors",
+        ]
     
     # =============================================================================
     # MÉTODOS DE ASSISTÊNCIA
@@ -0,0 +1,354 @@
+"""
+Índice da Fila de Impressão
+Ordem dos jobs de cada impressora e somas prefixadas das durações estimadas
+em memória (árvores de Fenwick), reconstruídas do banco na inicialização.
+Posição e início estimado de um job saem em O(log n); inserção, remoção e
+troca de duração não consultam o banco, e as posições alteradas são gravadas
+com UPDATEs em lote, em número fixo qualquer que seja o tamanho da fila
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+
+from backend.models import PrintJob, PrintQueue
+from backend.models.printing3d_models import ACTIVE_QUEUE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# Compactar as posições vagas quando passarem do número de jobs (e deste mínimo)
+COMPACT_MIN_SLOTS = 64
+
+QueueEntry = Tuple[UUID, int, str]
+
+
+class _Fenwick:
+    """Árvore de Fenwick sobre uma lista que só cresce no fim"""
+
+    __slots__ = ("tree",)
+
+    def __init__(self, values: Iterable[int] = ()):
+        tree = [0]
+        tree.extend(values)
+        for index in range(1, len(tree)):
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self.tree = tree
+
+    def append(self, value: int):
+        index = len(self.tree)
+        # O nó cobre o intervalo (index - lowbit, index]
+        self.tree.append(value + self.prefix(index - 1) - self.prefix(index - (index & -index)))
+
+    def add(self, slot: int, delta: int):
+        index = slot + 1
+        while index < len(self.tree):
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix(self, count: int) -> int:
+        """Soma das `count` primeiras posições"""
+        total = 0
+        while count > 0:
+            total += self.tree[count]
+            count -= count & -count
+        return total
+
+
+class PrinterQueueIndex:
+    """
+    Fila de uma impressora
+
+    Cada job ocupa uma posição interna fixa (slot); removidos deixam o slot
+    vago até a próxima compactação. Duas árvores de Fenwick contam os jobs
+    e somam as durações antes de cada slot.
+    """
+
+    def __init__(self, entries: Iterable[QueueEntry] = ()):
+        self._build(list(entries))
+
+    def _build(self, entries: List[QueueEntry]):
+        self._jobs: List[Optional[UUID]] = [job_id for job_id, _, _ in entries]
+        self._durations: List[int] = [max(int(duration or 0), 0) for _, duration, _ in entries]
+        self._status: Dict[UUID, str] = {job_id: status for job_id, _, status in entries}
+        self._slots: Dict[UUID, int] = {job_id: slot for slot, job_id in enumerate(self._jobs)}
+        self._counts = _Fenwick([1] * len(self._jobs))
+        self._times = _Fenwick(self._durations)
+        self._total = sum(self._durations)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, job_id) -> bool:
+        return job_id in self._slots
+
+    @property
+    def total_seconds(self) -> int:
+        """Duração somada de todos os jobs da fila"""
+        return self._total
+
+    def entries(self) -> Iterator[QueueEntry]:
+        """Jobs na ordem da fila"""
+        for slot, job_id in enumerate(self._jobs):
+            if job_id is not None:
+                yield job_id, self._durations[slot], self._status[job_id]
+
+    def job_ids(self) -> List[UUID]:
+        return [job_id for job_id, _, _ in self.entries()]
+
+    def last_job(self) -> Optional[UUID]:
+        """Último job da fila"""
+        return next((job_id for job_id in reversed(self._jobs) if job_id is not None), None)
+
+    def append(self, job_id: UUID, duration_s: Optional[int], status: str = 'queued') -> int:
+        """Adicionar ao fim da fila; retorna a posição (1 = próximo)"""
+        if job_id in self._slots:
+            return self.position(job_id)
+        duration = max(int(duration_s or 0), 0)
+        self._slots[job_id] = len(self._jobs)
+        self._jobs.append(job_id)
+        self._durations.append(duration)
+        self._status[job_id] = status
+        self._counts.append(1)
+        self._times.append(duration)
+        self._total += duration
+        return len(self._slots)
+
+    def remove(self, job_id: UUID) -> Optional[int]:
+        """Tirar da fila; retorna a posição que o job ocupava"""
+        slot = self._slots.pop(job_id, None)
+        if slot is None:
+            return None
+        position = self._counts.prefix(slot + 1)
+        self._counts.add(slot, -1)
+        self._times.add(slot, -self._durations[slot])
+        self._total -= self._durations[slot]
+        self._jobs[slot] = None
+        self._durations[slot] = 0
+        del self._status[job_id]
+        if len(self._jobs) > max(2 * len(self._slots), COMPACT_MIN_SLOTS):
+            self._build(list(self.entries()))
+        return position
+
+    def set_duration(self, job_id: UUID, duration_s: Optional[int]) -> bool:
+        """Trocar a duração estimada; retorna se mudou"""
+        slot = self._slots.get(job_id)
+        duration = max(int(duration_s or 0), 0)
+        if slot is None or self._durations[slot] == duration:
+            return False
+        delta = duration - self._durations[slot]
+        self._times.add(slot, delta)
+        self._durations[slot] = duration
+        self._total += delta
+        return True
+
+    def set_status(self, job_id: UUID, status: str):
+        if job_id in self._slots:
+            self._status[job_id] = status
+
+    def status(self, job_id: UUID) -> Optional[str]:
+        return self._status.get(job_id)
+
+    def position(self, job_id: UUID) -> Optional[int]:
+        slot = self._slots.get(job_id)
+        return None if slot is None else self._counts.prefix(slot + 1)
+
+    def start_offset(self, job_id: UUID) -> Optional[int]:
+        """Segundos de fila antes do job começar"""
+        slot = self._slots.get(job_id)
+        return None if slot is None else self._times.prefix(slot)
+
+    def schedule(self, from_position: int = 1) -> List[Tuple[UUID, int, int, int]]:
+        """(job, posição, início, fim) em segundos a partir de agora, desde `from_position`"""
+        rows = []
+        elapsed = 0
+        for position, (job_id, duration, _) in enumerate(self.entries(), 1):
+            if position >= from_position:
+                rows.append((job_id, position, elapsed, elapsed + duration))
+            elapsed += duration
+        return rows
+
+    def reorder(self, job_order: Sequence[UUID]):
+        """
+        Nova ordem dos jobs aguardando
+
+        Jobs em andamento continuam à frente; os que não aparecem em
+        `job_order` vão para o fim, na ordem em que estavam.
+        """
+        requested = list(dict.fromkeys(job_order))
+        unknown = [job_id for job_id in requested if job_id not in self._slots]
+        if unknown:
+            raise ValueError(f"Jobs fora da fila: {', '.join(str(job_id) for job_id in unknown)}")
+        entries = {job_id: (job_id, duration, status) for job_id, duration, status in self.entries()}
+        running = [entry for entry in entries.values() if entry[2] != 'queued']
+        chosen = [entries[job_id] for job_id in requested if entries[job_id][2] == 'queued']
+        picked = set(requested)
+        rest = [entry for entry in entries.values() if entry[2] == 'queued' and entry[0] not in picked]
+        self._build(running + chosen + rest)
+
+
+class PrintQueueManager:
+    """Índices de todas as impressoras e gravação das posições no banco"""
+
+    def __init__(self):
+        self._queues: Dict[UUID, PrinterQueueIndex] = {}
+
+    def rebuild(self, db: Session, printer_id: Optional[UUID] = None) -> int:
+        """
+        Recarregar do banco (uma consulta); retorna o número de jobs na fila
+
+        Posições com buracos são renumeradas na sessão, sem commit.
+        """
+        return self._rebuild(db, None if printer_id is None else [printer_id])
+
+    def _rebuild(self, db: Session, printer_ids: Optional[Sequence[UUID]]) -> int:
+        query = db.query(
+            PrintQueue.printer_id, PrintQueue.print_job_id, PrintJob.tempo_estimado_segundos,
+            PrintQueue.status, PrintQueue.posicao
+        ).join(PrintJob, PrintJob.id == PrintQueue.print_job_id).filter(
+            PrintQueue.status.in_(ACTIVE_QUEUE_STATUSES)
+        )
+        if printer_ids is not None:
+            query = query.filter(PrintQueue.printer_id.in_(printer_ids))
+
+        grouped: Dict[UUID, List[QueueEntry]] = {}
+        positions: Dict[UUID, List[int]] = {}
+        for row_printer, job_id, duration, status, position in query.order_by(PrintQueue.posicao, PrintQueue.created_at):
+            grouped.setdefault(row_printer, []).append((job_id, duration, status))
+            positions.setdefault(row_printer, []).append(position)
+
+        if printer_ids is None:
+            self._queues = {key: PrinterQueueIndex(entries) for key, entries in grouped.items()}
+        else:
+            for key in printer_ids:
+                self._queues[key] = PrinterQueueIndex(grouped.get(key, []))
+        for key, stored in positions.items():
+            self._renumber_gaps(db, key, stored)
+        total = sum(len(entries) for entries in grouped.values())
+        logger.info(f"Índice de filas reconstruído: {total} jobs em {len(grouped)} impressoras")
+        return total
+
+    def _renumber_gaps(self, db: Session, printer_id: UUID, stored: Sequence[int]) -> bool:
+        """
+        Regravar as posições 1..n se as lidas do banco tiverem buracos
+
+        Uma posição vaga faria a próxima inserção (posição n + 1) colidir
+        com a última da fila. Não faz commit.
+        """
+        if list(stored) == list(range(1, len(stored) + 1)):
+            return False
+        logger.warning(f"Posições da fila da impressora {printer_id} com buracos; renumerando")
+        self.persist(db, printer_id)
+        return True
+
+    def discard(self, printer_ids: Iterable[UUID]):
+        """Descartar índices (p.ex. após rollback); o próximo acesso recarrega do banco"""
+        for printer_id in printer_ids:
+            self._queues.pop(printer_id, None)
+
+    def get(self, db: Session, printer_id: UUID) -> PrinterQueueIndex:
+        if printer_id not in self._queues:
+            self.rebuild(db, printer_id)
+        return self._queues[printer_id]
+
+    def get_many(self, db: Session, printer_ids: Sequence[UUID]) -> Dict[UUID, PrinterQueueIndex]:
+        """Índices de várias impressoras, carregando as que faltam numa consulta só"""
+        missing = [printer_id for printer_id in printer_ids if printer_id not in self._queues]
+        if missing:
+            self._rebuild(db, missing)
+        return {printer_id: self._queues[printer_id] for printer_id in printer_ids}
+
+    def loaded(self, printer_id: UUID) -> Optional[PrinterQueueIndex]:
+        """Índice já carregado, sem consultar o banco"""
+        return self._queues.get(printer_id)
+
+    def load(self, printer_id: UUID, entries: Iterable[QueueEntry]) -> PrinterQueueIndex:
+        """Instalar um índice a partir de linhas já consultadas"""
+        self._queues[printer_id] = PrinterQueueIndex(entries)
+        return self._queues[printer_id]
+
+    def add(self, db: Session, queue_item: PrintQueue, print_job: PrintJob):
+        """Pôr o item no fim da fila, preenchendo posição e horários previstos"""
+        queue = self.get(db, print_job.printer_id)
+        position = queue.append(print_job.id, print_job.tempo_estimado_segundos)
+        now = datetime.utcnow()
+        start = now + timedelta(seconds=queue.start_offset(print_job.id))
+
+        queue_item.posicao = position
+        queue_item.estimado_inicio = start
+        queue_item.estimado_conclusao = start + timedelta(seconds=print_job.tempo_estimado_segundos or 0)
+        print_job.fila_posicao = position
+
+    def mark(self, db: Session, print_job: PrintJob, status: str):
+        """Atualizar o status do item sem mexer nas posições"""
+        self.get(db, print_job.printer_id).set_status(print_job.id, status)
+
+    def remove(self, db: Session, print_job: PrintJob) -> Optional[int]:
+        """Tirar o job da fila e renumerar os seguintes"""
+        queue = self.get(db, print_job.printer_id)
+        position = queue.remove(print_job.id)
+        if position is not None:
+            self.persist(db, print_job.printer_id, position)
+        return position
+
+    def update_duration(self, db: Session, print_job: PrintJob):
+        """Nova duração estimada: recalcular os horários do job em diante"""
+        queue = self.get(db, print_job.printer_id)
+        if queue.set_duration(print_job.id, print_job.tempo_estimado_segundos):
+            self.persist(db, print_job.printer_id, queue.position(print_job.id))
+
+    def reorder(self, db: Session, printer_id: UUID, job_order: Sequence[UUID]):
+        queue = self.get(db, printer_id)
+        queue.reorder(job_order)
+        self.persist(db, printer_id)
+
+    def persist(self, db: Session, printer_id: UUID, from_position: int = 1):
+        """
+        Gravar posição e horários previstos a partir de `from_position`
+
+        UPDATEs com CASE em lote, sem carregar as linhas. A posição é única
+        por impressora e verificada linha a linha, então as posições
+        afetadas passam antes para negativo. Não faz commit.
+        """
+        rows = self._queues[printer_id].schedule(from_position)
+        if not rows:
+            return
+        now = datetime.utcnow()
+        job_ids = [job_id for job_id, _, _, _ in rows]
+        positions = {job_id: position for job_id, position, _, _ in rows}
+        starts = {job_id: now + timedelta(seconds=start) for job_id, _, start, _ in rows}
+        ends = {job_id: now + timedelta(seconds=end) for job_id, _, _, end in rows}
+        affected = (
+            PrintQueue.printer_id == printer_id,
+            PrintQueue.print_job_id.in_(job_ids),
+            PrintQueue.status.in_(ACTIVE_QUEUE_STATUSES)
+        )
+
+        db.execute(
+            update(PrintQueue)
+            .where(*affected)
+            .values(posicao=-PrintQueue.posicao)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(PrintQueue)
+            .where(*affected)
+            .values(
+                posicao=case(positions, value=PrintQueue.print_job_id),
+                estimado_inicio=case(starts, value=PrintQueue.print_job_id),
+                estimado_conclusao=case(ends, value=PrintQueue.print_job_id),
+                updated_at=now
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(PrintJob)
+            .where(PrintJob.id.in_(job_ids))
+            .values(fila_posicao=case(positions, value=PrintJob.id))
+            .execution_options(synchronize_session=False)
+        )
@@ -0,0 +1,504 @@
+"""
+Motor de Simulação em Lote - PyBullet
+Executa várias cópias independentes de um corpo num único mundo físico
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pybullet as p
+
+from backend.services.fluid_drag import FluidDragEngine, ProjectedAreaTable
+
+logger = logging.getLogger(__name__)
+
+# Versão do motor de simulação; entra nas chaves de cache de resultados
+SIMULATION_ENGINE_VERSION = "2.2"
+
+# Grupos de colisão: o solo colide com os corpos, os corpos não colidem entre si
+GROUND_COLLISION_GROUP = 1
+BODY_COLLISION_GROUP = 2
+
+# Intervalo (em passos) entre chamadas do callback de progresso: 0.1 s a 240 Hz
+PROGRESS_INTERVAL_STEPS = 24
+
+
+class BatchedDropTestEngine:
+    """
+    Teste de queda em lote.
+
+    Em vez de reiniciar o mesmo corpo N vezes em série, cria N cópias do
+    shape de colisão num único cliente PyBullet, avança todas juntas e
+    amostra o estado em arrays NumPy pré-alocados.
+    """
+
+    def __init__(self, physics_client: int, collision_shape: int, mass: float = 1.0,
+                 time_step: float = 1 / 240, max_time: float = 5.0,
+                 settle_window: int = 10, settle_min_steps: int = 60,
+                 settle_velocity: float = 0.1):
+        self.physics_client = physics_client
+        self.collision_shape = collision_shape
+        self.mass = mass
+        self.time_step = time_step
+        self.max_steps = int(round(max_time / time_step))
+        self.settle_window = settle_window
+        self.settle_min_steps = settle_min_steps
+        self.settle_velocity = settle_velocity
+        self.ground_id: Optional[int] = None
+        self.body_ids: List[int] = []
+
+    def _create_ground(self) -> int:
+        """Criar plano de solo estático"""
+        plane_shape = p.createCollisionShape(p.GEOM_PLANE, physicsClientId=self.physics_client)
+        ground_id = p.createMultiBody(
+            baseMass=0,
+            baseCollisionShapeIndex=plane_shape,
+            physicsClientId=self.physics_client
+        )
+        p.setCollisionFilterGroupMask(
+            ground_id, -1, GROUND_COLLISION_GROUP, BODY_COLLISION_GROUP,
+            physicsClientId=self.physics_client
+        )
+        return ground_id
+
+    def _grid_spacing(self) -> float:
+        """Espaçamento entre cópias a partir da AABB de um corpo de prova"""
+        aabb_min, aabb_max = p.getAABB(self.body_ids[0], physicsClientId=self.physics_client)
+        extent = np.asarray(aabb_max) - np.asarray(aabb_min)
+        return float(max(extent[0], extent[1]) * 1.5 + 0.1)
+
+    def setup(self, num_bodies: int) -> List[int]:
+        """Criar solo e garantir exatamente N cópias do corpo no mundo físico"""
+        if self.ground_id is None:
+            self.ground_id = self._create_ground()
+
+        while len(self.body_ids) < num_bodies:
+            body_id = p.createMultiBody(
+                baseMass=self.mass,
+                baseCollisionShapeIndex=self.collision_shape,
+                basePosition=[0, 0, 0],
+                physicsClientId=self.physics_client
+            )
+            p.setCollisionFilterGroupMask(
+                body_id, -1, BODY_COLLISION_GROUP, GROUND_COLLISION_GROUP,
+                physicsClientId=self.physics_client
+            )
+            self.body_ids.append(body_id)
+
+        # Cópias excedentes de uma execução anterior maior são removidas
+        for body_id in self.body_ids[num_bodies:]:
+            p.removeBody(body_id, physicsClientId=self.physics_client)
+        del self.body_ids[num_bodies:]
+
+        return self.body_ids
+
+    def set_mass(self, mass: float):
+        """Alterar a massa de todas as cópias já criadas"""
+        if mass == self.mass:
+            return
+        self.mass = mass
+        for body_id in self.body_ids:
+            p.changeDynamics(body_id, -1, mass=mass, physicsClientId=self.physics_client)
+
+    def run(self, num_drops: int, drop_height: float, gravity: float = -9.8,
+            orientations: Optional[Sequence[Sequence[float]]] = None,
+            mass: Optional[float] = None,
+            progress: Optional[Callable[[float, Dict[str, Any]], None]] = None) -> Dict[str, np.ndarray]:
+        """
+        Executar N quedas simultâneas
+
+        Args:
+            num_drops: Número de quedas (cópias do corpo)
+            drop_height: Altura inicial em metros
+            gravity: Aceleração gravitacional no eixo Z
+            orientations: Quaternions iniciais por queda (padrão: identidade)
+            mass: Massa do corpo em kg (padrão: a do motor)
+            progress: Callback (fração, métricas parciais) chamado periodicamente
+
+        Returns:
+            Arrays com posições, velocidades, passo de contato e passo de repouso
+        """
+        if mass is not None:
+            self.set_mass(mass)
+        bodies = self.setup(num_drops)
+        client = self.physics_client
+
+        if orientations is None:
+            orientations = [[0, 0, 0, 1]] * num_drops
+
+        spacing = self._grid_spacing()
+        columns = int(np.ceil(np.sqrt(num_drops)))
+        offsets = np.zeros((num_drops, 2))
+        offsets[:, 0] = (np.arange(num_drops) % columns) * spacing
+        offsets[:, 1] = (np.arange(num_drops) // columns) * spacing
+
+        p.setGravity(0, 0, gravity, physicsClientId=client)
+        p.setTimeStep(self.time_step, physicsClientId=client)
+        for i, body_id in enumerate(bodies):
+            p.resetBasePositionAndOrientation(
+                body_id, [offsets[i, 0], offsets[i, 1], drop_height], orientations[i],
+                physicsClientId=client
+            )
+            p.resetBaseVelocity(body_id, [0, 0, 0], [0, 0, 0], physicsClientId=client)
+
+        positions = np.zeros((self.max_steps, num_drops, 3))
+        velocities = np.zeros((self.max_steps, num_drops, 3))
+        contact_step = np.full(num_drops, -1, dtype=np.int64)
+        settle_step = np.full(num_drops, -1, dtype=np.int64)
+        active = np.ones(num_drops, dtype=bool)
+
+        # Mapa body_id -> índice da queda para leitura vetorizada dos contatos
+        index_of = np.full(max(bodies) + 1, -1, dtype=np.int64)
+        index_of[bodies] = np.arange(num_drops)
+
+        step = 0
+        for step in range(self.max_steps):
+            p.stepSimulation(physicsClientId=client)
+
+            for i in np.flatnonzero(active):
+                pos, _ = p.getBasePositionAndOrientation(bodies[i], physicsClientId=client)
+                vel, _ = p.getBaseVelocity(bodies[i], physicsClientId=client)
+                positions[step, i] = pos
+                velocities[step, i] = vel
+
+            # Corpos parados mantêm o último estado amostrado
+            if not active.all():
+                frozen = ~active
+                positions[step, frozen] = positions[step - 1, frozen]
+                velocities[step, frozen] = velocities[step - 1, frozen]
+
+            # Uma única consulta de contatos com o solo para todas as cópias
+            contacts = p.getContactPoints(bodyA=self.ground_id, physicsClientId=client)
+            if contacts:
+                touching = index_of[np.fromiter((c[2] for c in contacts), dtype=np.int64)]
+                new_contacts = touching[(touching >= 0) & (contact_step[touching] < 0)]
+                contact_step[new_contacts] = step
+
+            # Critério de repouso vetorizado sobre a janela recente de vz
+            if step + 1 > self.settle_min_steps:
+                window = np.abs(velocities[step + 1 - self.settle_window:step + 1, :, 2])
+                settled = active & (window < self.settle_velocity).all(axis=0)
+                settle_step[settled] = step
+                active &= ~settled
+
+            if not active.any():
+                break
+
+            if progress is not None and step % PROGRESS_INTERVAL_STEPS == 0:
+                progress(step / self.max_steps, {
+                    "passo": step,
+                    "quedas_em_movimento": int(active.sum()),
+                    "quedas_com_contato": int((contact_step >= 0).sum())
+                })
+
+        num_steps = step + 1
+        settle_step[settle_step < 0] = num_steps - 1
+
+        return {
+            "positions": positions[:num_steps],
+            "velocities": velocities[:num_steps],
+            "contact_step": contact_step,
+            "settle_step": settle_step,
+            "num_steps": num_steps
+        }
+
+    def analyze(self, run: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Converter arrays de uma execução no formato de resultado por queda"""
+        positions = run["positions"]
+        velocities = run["velocities"]
+        dt = self.time_step
+        testes = []
+
+        for i in range(positions.shape[1]):
+            last = int(run["settle_step"][i])
+            vz = velocities[:last + 1, i, 2]
+            contact = int(run["contact_step"][i])
+
+            if contact < 0:
+                testes.append({
+                    "numero_teste": i,
+                    "altura_queda": float(positions[0, i, 2]),
+                    "velocidade_impacto": float(vz[0]),
+                    "rebotes": 0,
+                    "tempo_ate_repouso": 0
+                })
+                continue
+
+            # Rebotes (simplificado): amostras da segunda metade com |vz| > 1 m/s
+            rebotes = int(np.count_nonzero(np.abs(vz[len(vz) // 2 + 1:]) > 1.0))
+
+            testes.append({
+                "numero_teste": i,
+                "altura_queda": float(positions[0, i, 2]),
+                "velocidade_impacto": float(velocities[contact, i, 2]),
+                "tempo_impacto": (contact + 1) * dt,
+                "posicao_impacto": positions[contact, i].tolist(),
+                "rebotes": rebotes,
+                "tempo_ate_repouso": len(vz) * dt
+            })
+
+        return testes
+
+    def close(self):
+        """Remover corpos criados pelo motor"""
+        for body_id in self.body_ids:
+            p.removeBody(body_id, physicsClientId=self.physics_client)
+        if self.ground_id is not None:
+            p.removeBody(self.ground_id, physicsClientId=self.physics_client)
+        self.body_ids = []
+        self.ground_id = None
+
+
+class StressTestEngine:
+    """
+    Teste de stress com busca do ponto de ruptura.
+
+    O corpo é carregado uma vez, assentado sobre o solo e o estado do mundo
+    é salvo; cada avaliação de força restaura esse estado em vez de recriar
+    ou reposicionar o corpo. A ruptura é aproximada por deslocamento
+    excessivo a partir da pose de repouso.
+    """
+
+    def __init__(self, physics_client: int, collision_shape: int, mass: float = 1.0,
+                 time_step: float = 1 / 240, duration: float = 1.0,
+                 rupture_displacement: float = 0.5, settle_steps: int = 120):
+        self.physics_client = physics_client
+        self.collision_shape = collision_shape
+        self.mass = mass
+        self.time_step = time_step
+        self.num_steps = int(round(duration / time_step))
+        self.rupture_displacement = rupture_displacement
+        self.settle_steps = settle_steps
+        self.ground_id: Optional[int] = None
+        self.body_id: Optional[int] = None
+        self.rest_position: Optional[np.ndarray] = None
+        self._state_id: Optional[int] = None
+
+    def setup(self, gravity: float = -9.8) -> int:
+        """Criar solo e corpo, assentar o corpo e salvar o estado de repouso"""
+        if self._state_id is not None:
+            return self.body_id
+
+        client = self.physics_client
+        p.setGravity(0, 0, gravity, physicsClientId=client)
+        p.setTimeStep(self.time_step, physicsClientId=client)
+
+        self.ground_id = p.createMultiBody(
+            baseMass=0,
+            baseCollisionShapeIndex=p.createCollisionShape(p.GEOM_PLANE, physicsClientId=client),
+            physicsClientId=client
+        )
+        p.setCollisionFilterGroupMask(
+            self.ground_id, -1, GROUND_COLLISION_GROUP, BODY_COLLISION_GROUP,
+            physicsClientId=client
+        )
+
+        self.body_id = p.createMultiBody(
+            baseMass=self.mass,
+            baseCollisionShapeIndex=self.collision_shape,
+            physicsClientId=client
+        )
+        p.setCollisionFilterGroupMask(
+            self.body_id, -1, BODY_COLLISION_GROUP, GROUND_COLLISION_GROUP,
+            physicsClientId=client
+        )
+
+        # Apoiar a base da AABB no solo e deixar assentar
+        aabb_min, _ = p.getAABB(self.body_id, physicsClientId=client)
+        p.resetBasePositionAndOrientation(
+            self.body_id, [0, 0, -aabb_min[2]], [0, 0, 0, 1], physicsClientId=client
+        )
+        for _ in range(self.settle_steps):
+            p.stepSimulation(physicsClientId=client)
+
+        pos, _ = p.getBasePositionAndOrientation(self.body_id, physicsClientId=client)
+        self.rest_position = np.asarray(pos)
+        self._state_id = p.saveState(physicsClientId=client)
+        return self.body_id
+
+    def evaluate(self, force: float, direction: Sequence[float]) -> Dict[str, Any]:
+        """
+        Aplicar uma força constante durante `duration` a partir do repouso
+
+        A simulação é interrompida assim que o deslocamento excede o limite
+        de ruptura.
+        """
+        client = self.physics_client
+        p.restoreState(self._state_id, physicsClientId=client)
+
+        force_vector = [d * force for d in direction]
+        rest = self.rest_position
+        limit_sq = self.rupture_displacement ** 2
+        displacement_sq = 0.0
+
+        for _ in range(self.num_steps):
+            # Forças externas são zeradas a cada passo pelo PyBullet
+            p.applyExternalForce(
+                self.body_id, -1, force_vector, [0, 0, 0], p.LINK_FRAME,
+                physicsClientId=client
+            )
+            p.stepSimulation(physicsClientId=client)
+            pos, _ = p.getBasePositionAndOrientation(self.body_id, physicsClientId=client)
+            displacement_sq = ((pos[0] - rest[0]) ** 2 + (pos[1] - rest[1]) ** 2 +
+                               (pos[2] - rest[2]) ** 2)
+            if displacement_sq > limit_sq:
+                break
+
+        vel, _ = p.getBaseVelocity(self.body_id, physicsClientId=client)
+        displacement = float(np.sqrt(displacement_sq))
+        return {
+            "forca": force,
+            "posicao_final": list(pos),
+            "velocidade_final": list(vel),
+            "deslocamento": displacement,
+            "ruptura": displacement > self.rupture_displacement
+        }
+
+    @staticmethod
+    def _report(progress, testes: List[Dict[str, Any]], max_force: float):
+        """Publicar a última avaliação como progresso parcial"""
+        if progress is None:
+            return
+        teste = testes[-1]
+        progress(teste["forca"] / max_force if max_force > 0 else 1.0, {
+            "avaliacoes": len(testes),
+            "forca": teste["forca"],
+            "deslocamento": teste["deslocamento"],
+            "ruptura": teste["ruptura"]
+        })
+
+    def linear_search(self, max_force: float, force_increment: float,
+                      direction: Sequence[float],
+                      progress: Optional[Callable[[float, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Busca linear: força crescente em passos fixos até a ruptura"""
+        self.setup()
+        testes = []
+        ponto_ruptura = None
+
+        force = 0.0
+        while force <= max_force:
+            teste = self.evaluate(force, direction)
+            testes.append(teste)
+            self._report(progress, testes, max_force)
+            if teste["ruptura"]:
+                ponto_ruptura = force
+                break
+            force += force_increment
+
+        return {"testes_forca": testes, "ponto_ruptura": ponto_ruptura, "avaliacoes": len(testes)}
+
+    def adaptive_search(self, max_force: float, direction: Sequence[float],
+                        initial_step: float, tolerance: float,
+                        progress: Optional[Callable[[float, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Busca adaptativa: delimita a ruptura com passos exponenciais e
+        refina por bisseção até o intervalo ficar menor que `tolerance`
+
+        O ponto de ruptura reportado é o limite superior do intervalo final,
+        ou seja, uma força que comprovadamente rompe.
+        """
+        if initial_step <= 0 or tolerance <= 0:
+            raise ValueError("Passo inicial e tolerância devem ser positivos")
+        self.setup()
+        testes = []
+
+        def rompe(force: float) -> bool:
+            teste = self.evaluate(force, direction)
+            testes.append(teste)
+            self._report(progress, testes, max_force)
+            return teste["ruptura"]
+
+        ponto_ruptura = None
+        if rompe(0.0):
+            ponto_ruptura = 0.0
+        else:
+            # Delimitação: dobrar o passo até romper ou atingir max_force
+            lower, step = 0.0, initial_step
+            upper = None
+            while lower < max_force:
+                candidate = min(lower + step, max_force)
+                if rompe(candidate):
+                    upper = candidate
+                    break
+                lower, step = candidate, step * 2
+
+            if upper is not None:
+                while upper - lower > tolerance:
+                    middle = (lower + upper) / 2
+                    if rompe(middle):
+                        upper = middle
+                    else:
+                        lower = middle
+                ponto_ruptura = upper
+
+        testes.sort(key=lambda t: t["forca"])
+        return {"testes_forca": testes, "ponto_ruptura": ponto_ruptura, "avaliacoes": len(testes)}
+
+    def close(self):
+        """Remover corpo, solo e estado salvo"""
+        client = self.physics_client
+        if self._state_id is not None:
+            p.removeState(self._state_id, physicsClientId=client)
+        for body_id in (self.body_id, self.ground_id):
+            if body_id is not None:
+                p.removeBody(body_id, physicsClientId=client)
+        self.body_id = self.ground_id = self._state_id = None
+
+
+class SimulationWorld:
+    """
+    Cliente PyBullet persistente para workers de simulação
+
+    Mantém os shapes de colisão já carregados e o motor (queda, stress ou
+    fluido) do último modelo, para que execuções sucessivas (ex.: pontos de uma varredura de
+    parâmetros) não reconectem nem recarreguem a malha.
+    """
+
+    def __init__(self, shape_factory: Callable[[Path, int], int]):
+        self.shape_factory = shape_factory
+        self.physics_client = p.connect(p.DIRECT)
+        self._shapes: Dict[str, int] = {}
+        self._engine: Optional[Any] = None
+        self._engine_key: Optional[tuple] = None
+
+    def collision_shape(self, model_path: Path) -> int:
+        """Shape de colisão do modelo, criado uma única vez por mundo"""
+        key = str(model_path)
+        if key not in self._shapes:
+            self._shapes[key] = self.shape_factory(Path(model_path), self.physics_client)
+        return self._shapes[key]
+
+    def _engine_for(self, engine_class, model_path: Path, **kwargs):
+        """Motor ativo do mundo; um motor de outro tipo ou modelo é descartado"""
+        key = (engine_class.__name__, str(model_path))
+        if self._engine is not None and self._engine_key != key:
+            self._engine.close()
+            self._engine = None
+
+        if self._engine is None:
+            self._engine = engine_class(
+                self.physics_client, self.collision_shape(model_path), **kwargs
+            )
+            self._engine_key = key
+        return self._engine
+
+    def drop_engine(self, model_path: Path) -> BatchedDropTestEngine:
+        """Motor de queda do modelo, com os corpos já carregados"""
+        return self._engine_for(BatchedDropTestEngine, model_path)
+
+    def stress_engine(self, model_path: Path) -> StressTestEngine:
+        """Motor de stress do modelo, com o corpo já assentado"""
+        return self._engine_for(StressTestEngine, model_path)
+
+    def fluid_engine(self, model_path: Path, area_table: ProjectedAreaTable) -> FluidDragEngine:
+        """Motor de arrasto do modelo, com o corpo já carregado"""
+        return self._engine_for(FluidDragEngine, model_path, area_table=area_table)
+
+    def close(self):
+        """Desconectar o cliente PyBullet"""
+        p.disconnect(self.physics_client)
+        self._shapes.clear()
+        self._engine = None
+        self._engine_key = None
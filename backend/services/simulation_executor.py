@@ -0,0 +1,193 @@
+"""
+Backends de Execução de Simulações
+Submissão não bloqueante de simulações a partir do processo FastAPI: inline
+(testes), pool de processos local ou a task Celery `run_simulation_task`
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from backend.core.config import SIMULATION_EXECUTOR, SIMULATION_EXECUTOR_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# Assinatura do job: (simulation_id, model_path, simulation_data) -> resultado
+SimulationJob = Callable[[str, str, Dict[str, Any]], Any]
+
+
+def run_simulation_job(simulation_id: str, model_path: str,
+                       simulation_data: Dict[str, Any]) -> Any:
+    """Job padrão: ciclo de vida completo com progresso via `update_simulation_status`"""
+    from backend.celery_app import execute_simulation_job
+    return execute_simulation_job(simulation_id, model_path, simulation_data)
+
+
+def mark_simulation_cancelled(simulation_id: str) -> None:
+    """Marcar a simulação como cancelada no banco (sem passar pelo broker)"""
+    from backend.celery_app import cancel_simulation_task
+    cancel_simulation_task(simulation_id)
+
+
+class SimulationExecutor:
+    """Interface comum dos backends de execução"""
+
+    name = "base"
+
+    def submit(self, simulation_id: str, model_path: str,
+               simulation_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Enfileirar a simulação e retornar imediatamente
+
+        Returns:
+            Identificador da tarefa no backend, quando houver
+        """
+        raise NotImplementedError
+
+    def cancel(self, simulation_id: str, task_id: Optional[str] = None) -> bool:
+        """Cancelar uma simulação pendente; retorna True se ela não chegará a rodar"""
+        raise NotImplementedError
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Liberar recursos do backend"""
+
+
+class InlineExecutor(SimulationExecutor):
+    """Executa a simulação na própria chamada de `submit` (uso em testes)"""
+
+    name = "inline"
+
+    def __init__(self, job: SimulationJob = run_simulation_job,
+                 on_cancel: Callable[[str], None] = mark_simulation_cancelled):
+        self.job = job
+        self.on_cancel = on_cancel
+        self.results: Dict[str, Any] = {}
+
+    def submit(self, simulation_id: str, model_path: str,
+               simulation_data: Dict[str, Any]) -> Optional[str]:
+        try:
+            self.results[simulation_id] = self.job(simulation_id, model_path, simulation_data)
+        except Exception as e:
+            # O job já registrou a falha via update_simulation_status
+            logger.error(f"Simulação {simulation_id} falhou no executor inline: {e}")
+            self.results[simulation_id] = e
+        return None
+
+    def cancel(self, simulation_id: str, task_id: Optional[str] = None) -> bool:
+        # Já executou durante o submit; apenas refletir o cancelamento no banco
+        self.on_cancel(simulation_id)
+        return False
+
+
+class LocalProcessExecutor(SimulationExecutor):
+    """
+    Pool de processos local (sem broker)
+
+    Usa `spawn` por padrão: o PyBullet e o driver do banco não sobrevivem
+    bem a um fork do processo do servidor.
+    """
+
+    name = "process"
+
+    def __init__(self, max_workers: int = SIMULATION_EXECUTOR_WORKERS,
+                 job: SimulationJob = run_simulation_job,
+                 on_cancel: Callable[[str], None] = mark_simulation_cancelled,
+                 mp_context=None):
+        self.job = job
+        self.on_cancel = on_cancel
+        self._pool = ProcessPoolExecutor(
+            max_workers=max(1, max_workers),
+            mp_context=mp_context or multiprocessing.get_context("spawn")
+        )
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, simulation_id: str, model_path: str,
+               simulation_data: Dict[str, Any]) -> Optional[str]:
+        future = self._pool.submit(self.job, simulation_id, model_path, simulation_data)
+        with self._lock:
+            self._futures[simulation_id] = future
+        future.add_done_callback(lambda f, sid=simulation_id: self._on_done(sid, f))
+        return None
+
+    def _on_done(self, simulation_id: str, future: Future) -> None:
+        with self._lock:
+            if self._futures.get(simulation_id) is future:
+                del self._futures[simulation_id]
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Simulação {simulation_id} falhou no pool local: {error}")
+
+    def future(self, simulation_id: str) -> Optional[Future]:
+        """Future de uma simulação ainda em andamento"""
+        with self._lock:
+            return self._futures.get(simulation_id)
+
+    def cancel(self, simulation_id: str, task_id: Optional[str] = None) -> bool:
+        future = self.future(simulation_id)
+        cancelled = future.cancel() if future is not None else False
+        self.on_cancel(simulation_id)
+        return cancelled
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+class CeleryExecutor(SimulationExecutor):
+    """Encaminha para a task Celery `run_simulation_task`"""
+
+    name = "celery"
+
+    def submit(self, simulation_id: str, model_path: str,
+               simulation_data: Dict[str, Any]) -> Optional[str]:
+        from backend.celery_app import run_simulation_task
+        task = run_simulation_task.delay(simulation_id, model_path, simulation_data)
+        return task.id
+
+    def cancel(self, simulation_id: str, task_id: Optional[str] = None) -> bool:
+        from backend.celery_app import celery_app, cancel_simulation_task
+        if task_id:
+            celery_app.control.revoke(task_id)
+        cancel_simulation_task.delay(simulation_id)
+        return bool(task_id)
+
+
+_EXECUTORS = {
+    InlineExecutor.name: InlineExecutor,
+    LocalProcessExecutor.name: LocalProcessExecutor,
+    CeleryExecutor.name: CeleryExecutor,
+}
+
+_executor: Optional[SimulationExecutor] = None
+
+
+def create_simulation_executor(name: str = SIMULATION_EXECUTOR) -> SimulationExecutor:
+    """Instanciar o backend configurado"""
+    try:
+        executor_class = _EXECUTORS[name]
+    except KeyError:
+        raise ValueError(
+            f"Backend de execução inválido: {name}. Use um de {sorted(_EXECUTORS)}"
+        )
+    return executor_class()
+
+
+def get_simulation_executor() -> SimulationExecutor:
+    """Backend de execução compartilhado pelo processo (criado sob demanda)"""
+    global _executor
+    if _executor is None:
+        _executor = create_simulation_executor()
+        logger.info(f"Backend de execução de simulações: {_executor.name}")
+    return _executor
+
+
+def set_simulation_executor(executor: Optional[SimulationExecutor]) -> None:
+    """Substituir o backend compartilhado (testes ou configuração no startup)"""
+    global _executor
+    if _executor is not None and _executor is not executor:
+        _executor.shutdown(wait=False)
+    _executor = executor
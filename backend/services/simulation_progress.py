@@ -0,0 +1,237 @@
+"""
+Progresso de Simulações em Tempo Real
+Eventos de progresso e métricas parciais limitados por taxa, publicados via
+Redis pub/sub e entregues à sala WebSocket "simulation_<id>"
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+import redis
+
+from backend.core.config import (
+    REDIS_URL,
+    SIMULATION_PROGRESS_CHANNEL,
+    SIMULATION_PROGRESS_MAX_RATE,
+)
+from backend.services.simulation_result_store import json_default
+
+logger = logging.getLogger(__name__)
+
+# Assinatura dos callbacks dos motores: (fração concluída 0-1, métricas parciais)
+ProgressCallback = Callable[[float, Dict[str, Any]], None]
+
+# Intervalo entre tentativas de reconexão quando o Redis está indisponível (s)
+REDIS_RETRY_INTERVAL = 60.0
+
+# Espera do relay antes de assinar de novo após perder o Redis (dobra até o máximo)
+RELAY_RECONNECT_MIN_SECONDS = 1.0
+RELAY_RECONNECT_MAX_SECONDS = 30.0
+
+_redis_client = None
+_redis_failed_at: Optional[float] = None
+
+
+def progress_channel(simulation_id: Any) -> str:
+    """Canal Redis dos eventos de uma simulação"""
+    return f"{SIMULATION_PROGRESS_CHANNEL}:{simulation_id}"
+
+
+def progress_room(simulation_id: Any) -> str:
+    """Sala WebSocket que recebe os eventos de uma simulação"""
+    return f"simulation_{simulation_id}"
+
+
+def get_redis_client():
+    """Cliente Redis compartilhado pelo processo; None se indisponível"""
+    global _redis_client, _redis_failed_at
+    if _redis_client is None:
+        if _redis_failed_at is not None and time.monotonic() - _redis_failed_at < REDIS_RETRY_INTERVAL:
+            return None
+        try:
+            client = redis.from_url(REDIS_URL)
+            client.ping()
+            _redis_client = client
+            _redis_failed_at = None
+        except Exception as e:
+            logger.warning(f"Redis não disponível para eventos de progresso: {e}")
+            _redis_failed_at = time.monotonic()
+            return None
+    return _redis_client
+
+
+def publish_simulation_event(simulation_id: Any, event: Dict[str, Any],
+                             redis_client=None) -> bool:
+    """
+    Publicar um evento no canal da simulação
+
+    Falhas de publicação só são registradas: o progresso em tempo real
+    nunca interrompe a simulação.
+    """
+    client = redis_client or get_redis_client()
+    if client is None:
+        return False
+    message = {
+        "type": "simulation_progress",
+        "simulation_id": str(simulation_id),
+        "timestamp": time.time(),
+        **event
+    }
+    try:
+        client.publish(progress_channel(simulation_id), json.dumps(message, default=json_default))
+        return True
+    except Exception as e:
+        logger.warning(f"Falha ao publicar progresso da simulação {simulation_id}: {e}")
+        return False
+
+
+class SimulationProgressReporter:
+    """
+    Callback de progresso passado aos motores de simulação
+
+    Os motores chamam o reporter com frequência (a cada poucos passos); ele
+    descarta eventos acima de `max_rate` por segundo, mapeia a fração do
+    motor para o intervalo [start, end] do progresso global e nunca
+    regride o valor publicado.
+    """
+
+    def __init__(self, simulation_id: Any, redis_client=None,
+                 max_rate: float = SIMULATION_PROGRESS_MAX_RATE,
+                 start: float = 25.0, end: float = 80.0,
+                 publisher: Optional[Callable[[Any, Dict[str, Any]], Any]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.simulation_id = simulation_id
+        self.min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.start = start
+        self.end = end
+        self.clock = clock
+        self._publish = publisher or (
+            lambda sid, event: publish_simulation_event(sid, event, redis_client)
+        )
+        self._last_emit: Optional[float] = None
+        self._fraction = 0.0
+        self.emitted = 0
+
+    @property
+    def progress(self) -> float:
+        return self.start + (self.end - self.start) * self._fraction
+
+    def __call__(self, fraction: float, metrics: Optional[Dict[str, Any]] = None,
+                 force: bool = False) -> bool:
+        """Registrar progresso; retorna True se o evento foi publicado"""
+        self._fraction = max(self._fraction, min(max(fraction, 0.0), 1.0))
+
+        now = self.clock()
+        if not force and self._last_emit is not None and now - self._last_emit < self.min_interval:
+            return False
+        self._last_emit = now
+
+        self._publish(self.simulation_id, {
+            "event": "progress",
+            "progress": round(self.progress, 2),
+            "metrics": metrics or {}
+        })
+        self.emitted += 1
+        return True
+
+
+class SimulationProgressRelay:
+    """
+    Encaminha os eventos publicados pelos workers para as salas WebSocket
+
+    Roda no processo FastAPI: assina o padrão de canais de progresso e
+    repassa cada mensagem para `manager.send_to_room("simulation_<id>")`.
+    `channel`, `room` e `id_field` permitem reutilizar o relay para outros
+    eventos publicados pelo mesmo esquema (ex.: geração de modelos em lote).
+    Se a conexão com o Redis cair, a assinatura é refeita com espera
+    exponencial até `stop`.
+    """
+
+    def __init__(self, manager, redis_url: str = REDIS_URL,
+                 channel: str = SIMULATION_PROGRESS_CHANNEL,
+                 room: Callable[[Any], str] = progress_room,
+                 id_field: str = "simulation_id"):
+        self.manager = manager
+        self.redis_url = redis_url
+        self.channel = channel
+        self.room = room
+        self.id_field = id_field
+        self._task: Optional[asyncio.Task] = None
+        self._pubsub = None
+        self._client = None
+
+    async def handle_message(self, data: Any) -> bool:
+        """Entregar uma mensagem publicada à sala correspondente"""
+        try:
+            message = json.loads(data)
+            target_id = message[self.id_field]
+        except (TypeError, ValueError, KeyError) as e:
+            logger.warning(f"Evento de progresso inválido ignorado: {e}")
+            return False
+        await self.manager.send_to_room(self.room(target_id), message)
+        return True
+
+    async def start(self):
+        """Assinar os canais de progresso e iniciar o encaminhamento"""
+        import redis.asyncio as aioredis
+
+        self._client = aioredis.from_url(self.redis_url)
+        await self._subscribe()
+        self._task = asyncio.create_task(self._listen())
+        logger.info(f"Relay de eventos {self.channel} iniciado")
+
+    async def _subscribe(self):
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.psubscribe(f"{self.channel}:*")
+
+    async def _close_pubsub(self):
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = None
+
+    async def _listen(self):
+        delay = RELAY_RECONNECT_MIN_SECONDS
+        while True:
+            try:
+                if self._pubsub is None:
+                    await self._subscribe()
+                    logger.info(f"Relay de eventos {self.channel} reconectado")
+                async for message in self._pubsub.listen():
+                    delay = RELAY_RECONNECT_MIN_SECONDS
+                    if message.get("type") != "pmessage":
+                        continue
+                    try:
+                        await self.handle_message(message["data"])
+                    except Exception as e:
+                        logger.error(f"Erro ao encaminhar progresso de simulação: {e}")
+                raise ConnectionError("assinatura encerrada pelo servidor")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"Relay de eventos {self.channel} perdeu o Redis: {e}; "
+                    f"nova tentativa em {delay:.0f}s"
+                )
+                await self._close_pubsub()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RELAY_RECONNECT_MAX_SECONDS)
+
+    async def stop(self):
+        """Cancelar o encaminhamento e fechar a conexão"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close_pubsub()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,317 @@
+"""
+Armazenamento de Resultados de Simulação
+Resumo em JSON separado das séries numéricas, que ficam em colunas comprimidas
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.core.config import SIMULATION_RESULTS_PATH, SIMULATION_RESULT_TTL
+from backend.services.mesh_ingest import file_content_hash
+from backend.services.simulation_engine import SIMULATION_ENGINE_VERSION
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SERIES_MAGIC = b"SIMR"
+SERIES_FORMAT_VERSION = 1
+
+# Listas de registros com pelo menos este tamanho viram séries colunares
+MIN_SERIES_LENGTH = 8
+
+# Hashes de conteúdo memorizados por (caminho, mtime, tamanho)
+HASH_MEMO_ENTRIES = 1024
+
+_hash_memo: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_hash_lock = threading.Lock()
+
+
+def mesh_content_hash(model_path: Path) -> str:
+    """Hash do conteúdo da malha, relido só quando o arquivo muda"""
+    stat = model_path.stat()
+    memo_key = (str(model_path), stat.st_mtime_ns, stat.st_size)
+    with _hash_lock:
+        content_hash = _hash_memo.get(memo_key)
+        if content_hash is not None:
+            _hash_memo.move_to_end(memo_key)
+            return content_hash
+    content_hash = file_content_hash(model_path)
+    with _hash_lock:
+        _hash_memo[memo_key] = content_hash
+        while len(_hash_memo) > HASH_MEMO_ENTRIES:
+            _hash_memo.popitem(last=False)
+    return content_hash
+
+
+def json_default(value: Any) -> Any:
+    """Converter tipos NumPy para JSON"""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def _to_columns(records: List[Any]) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Converter lista de registros homogêneos em colunas NumPy
+
+    Retorna None se os registros não tiverem as mesmas chaves ou se algum
+    valor não for numérico (escalar ou vetor de tamanho fixo).
+    """
+    if len(records) < MIN_SERIES_LENGTH or not isinstance(records[0], dict):
+        return None
+
+    keys = list(records[0].keys())
+    if not all(isinstance(r, dict) and list(r.keys()) == keys for r in records):
+        return None
+
+    columns = {}
+    for key in keys:
+        try:
+            column = np.asarray([r[key] for r in records])
+        except ValueError:
+            return None
+        if column.dtype.kind not in "biuf" or column.dtype == object:
+            return None
+        columns[key] = column
+    return columns
+
+
+def split_result(result: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, np.ndarray]]]:
+    """
+    Separar resultado em resumo e séries numéricas
+
+    Listas de registros no primeiro nível (trajetórias, amostras de arrasto,
+    etc.) saem do resumo e são substituídas por um descritor com o tamanho
+    e as colunas disponíveis.
+    """
+    summary: Dict[str, Any] = {}
+    series: Dict[str, Dict[str, np.ndarray]] = {}
+
+    for name, value in result.items():
+        columns = _to_columns(value) if isinstance(value, list) else None
+        if columns is None:
+            summary[name] = value
+            continue
+        series[name] = columns
+
+    if series:
+        summary["series"] = {
+            name: {"length": len(next(iter(cols.values()))), "columns": list(cols)}
+            for name, cols in series.items()
+        }
+    return summary, series
+
+
+def join_result(summary: Dict[str, Any], series: Dict[str, Dict[str, np.ndarray]]) -> Dict[str, Any]:
+    """Reconstruir o resultado original (listas de registros) a partir das colunas"""
+    result = {k: v for k, v in summary.items() if k != "series"}
+    for name, columns in series.items():
+        keys = list(columns)
+        values = [columns[k].tolist() for k in keys]
+        result[name] = [dict(zip(keys, row)) for row in zip(*values)]
+    return result
+
+
+def _compress(payload: bytes) -> Tuple[str, bytes]:
+    if ZSTD_AVAILABLE:
+        return "zstd", zstandard.ZstdCompressor(level=3).compress(payload)
+    return "zlib", zlib.compress(payload, 6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Série comprimida com zstd, mas zstandard não está instalado")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Codec desconhecido: {codec}")
+
+
+def encode_series(series: Dict[str, Dict[str, np.ndarray]]) -> bytes:
+    """
+    Serializar séries em formato colunar comprimido
+
+    Layout: MAGIC | u32 tamanho do cabeçalho | cabeçalho JSON | payload comprimido.
+    O cabeçalho descreve dtype, shape e offset de cada coluna no payload.
+    """
+    columns = []
+    chunks = []
+    offset = 0
+    for name, cols in series.items():
+        for column_name, array in cols.items():
+            array = np.ascontiguousarray(array)
+            columns.append({
+                "series": name,
+                "column": column_name,
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "offset": offset
+            })
+            chunks.append(array.tobytes())
+            offset += array.nbytes
+
+    codec, compressed = _compress(b"".join(chunks))
+    header = json.dumps({
+        "version": SERIES_FORMAT_VERSION,
+        "codec": codec,
+        "columns": columns
+    }).encode()
+    return SERIES_MAGIC + struct.pack("<I", len(header)) + header + compressed
+
+
+def decode_series(blob: bytes, names: Optional[Iterable[str]] = None,
+                  columns: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Desserializar séries; os arrays são views somente-leitura do buffer descomprimido
+
+    Args:
+        blob: Bytes produzidos por `encode_series`
+        names: Séries desejadas (padrão: todas)
+        columns: Colunas desejadas (padrão: todas)
+    """
+    if blob[:4] != SERIES_MAGIC:
+        raise ValueError("Blob de séries inválido")
+    (header_len,) = struct.unpack_from("<I", blob, 4)
+    header = json.loads(blob[8:8 + header_len])
+    payload = _decompress(header["codec"], blob[8 + header_len:])
+
+    names = set(names) if names is not None else None
+    columns = set(columns) if columns is not None else None
+
+    series: Dict[str, Dict[str, np.ndarray]] = {}
+    for col in header["columns"]:
+        if names is not None and col["series"] not in names:
+            continue
+        if columns is not None and col["column"] not in columns:
+            continue
+        dtype = np.dtype(col["dtype"])
+        count = int(np.prod(col["shape"])) if col["shape"] else 1
+        array = np.frombuffer(payload, dtype=dtype, count=count, offset=col["offset"])
+        series.setdefault(col["series"], {})[col["column"]] = array.reshape(col["shape"])
+    return series
+
+
+class SimulationResultStore:
+    """
+    Store de resultados de simulação
+
+    - Cache em Redis endereçado por conteúdo: hash da malha, tipo, parâmetros e
+      versão do motor. Resumo e séries ficam em chaves separadas.
+    - Persistência por simulação em disco para servir o endpoint de
+      resultados sem carregar as séries.
+    """
+
+    def __init__(self, redis_client=None, results_path: Path = SIMULATION_RESULTS_PATH,
+                 ttl: int = SIMULATION_RESULT_TTL):
+        self.redis_client = redis_client
+        self.results_path = Path(results_path)
+        self.results_path.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+
+    @staticmethod
+    def cache_key(model_path: str, simulation_type: str, parameters: Dict[str, Any]) -> str:
+        """Chave de cache com hash do conteúdo da malha e versão do motor"""
+        mesh_hash = mesh_content_hash(Path(model_path))
+        param_str = json.dumps(parameters, sort_keys=True, default=json_default)
+        param_hash = hashlib.sha256(param_str.encode()).hexdigest()[:32]
+        return f"simulation:v{SIMULATION_ENGINE_VERSION}:{simulation_type}:{mesh_hash[:32]}:{param_hash}"
+
+    # ========== CACHE (REDIS) ==========
+
+    def cache(self, cache_key: str, result: Dict[str, Any]):
+        """Cachear resultado com resumo e séries em chaves separadas"""
+        if not self.redis_client:
+            return
+        try:
+            summary, series = split_result(result)
+            pipe = self.redis_client.pipeline()
+            pipe.setex(f"{cache_key}:summary", self.ttl,
+                       json.dumps(summary, default=json_default))
+            if series:
+                pipe.setex(f"{cache_key}:series", self.ttl, encode_series(series))
+            pipe.execute()
+            logger.debug(f"Resultado cacheado: {cache_key}")
+        except Exception as e:
+            logger.warning(f"Erro ao cachear resultado: {e}")
+
+    def get_cached_summary(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Recuperar apenas o resumo do cache"""
+        if not self.redis_client:
+            return None
+        try:
+            data = self.redis_client.get(f"{cache_key}:summary")
+            return json.loads(data) if data else None
+        except Exception as e:
+            logger.warning(f"Erro ao recuperar cache: {e}")
+            return None
+
+    def get_cached(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Recuperar resultado completo do cache"""
+        summary = self.get_cached_summary(cache_key)
+        if summary is None:
+            return None
+        if "series" not in summary:
+            return summary
+        try:
+            blob = self.redis_client.get(f"{cache_key}:series")
+            if not blob:
+                return None
+            return join_result(summary, decode_series(blob))
+        except Exception as e:
+            logger.warning(f"Erro ao recuperar séries do cache: {e}")
+            return None
+
+    # ========== PERSISTÊNCIA POR SIMULAÇÃO ==========
+
+    def _series_path(self, simulation_id: Any) -> Path:
+        return self.results_path / f"{simulation_id}.simr"
+
+    def save_for_simulation(self, simulation_id: Any, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Persistir séries da simulação em disco
+
+        Returns:
+            Resumo (sem séries) para gravar em `Simulation.results`
+        """
+        summary, series = split_result(result)
+        if series:
+            path = self._series_path(simulation_id)
+            tmp_path = path.with_suffix(".simr.tmp")
+            tmp_path.write_bytes(encode_series(series))
+            os.replace(tmp_path, path)
+        # Normalizar tipos NumPy para a coluna JSON do banco
+        return json.loads(json.dumps(summary, default=json_default))
+
+    def load_series(self, simulation_id: Any, names: Optional[Iterable[str]] = None,
+                    columns: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+        """Carregar séries persistidas de uma simulação"""
+        path = self._series_path(simulation_id)
+        if not path.exists():
+            return {}
+        return decode_series(path.read_bytes(), names=names, columns=columns)
+
+    def delete_for_simulation(self, simulation_id: Any):
+        """Remover séries persistidas de uma simulação"""
+        self._series_path(simulation_id).unlink(missing_ok=True)
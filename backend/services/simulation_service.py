@@ -3,12 +3,10 @@ Serviço de Simulação Física - PyBullet
 Testes de queda, stress, movimento e fluidos
 """
 
-import json
 import logging
 import os
 import time
 import tempfile
-import hashlib
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple, Union
 from uuid import UUID
@@ -16,14 +14,25 @@ from datetime import datetime
 
 import numpy as np
 import pybullet as p
-import trimesh
 from sqlalchemy.orm import Session
 import redis
-import pickle
 
 from backend.core.config import MODELS_STORAGE_PATH, TEMP_STORAGE_PATH, REDIS_URL
 from backend.models import Simulation, Model3D
 from backend.schemas import SimulationCreate
+from backend.services import motion_analysis
+from backend.services.collision_shape_cache import get_collision_shape_cache
+from backend.services.geometry_metrics import DEFAULT_MATERIAL_DENSITY, ensure_model_geometry, model_geometry
+from backend.services.fluid_drag import (
+    FluidDragEngine, ProjectedAreaTable, TelemetryRingBuffer,
+    get_projected_area_table, terminal_velocity_step
+)
+from backend.services.simulation_executor import get_simulation_executor
+from backend.services.simulation_progress import ProgressCallback, SimulationProgressReporter
+from backend.services.simulation_engine import (
+    BatchedDropTestEngine, SimulationWorld, StressTestEngine
+)
+from backend.services.simulation_result_store import SimulationResultStore
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +43,9 @@ class SimulationService:
         self.storage_path = MODELS_STORAGE_PATH
         self.temp_path = TEMP_STORAGE_PATH
         self.redis_client = None
+        self.collision_cache = get_collision_shape_cache()
+        # Mundo PyBullet persistente (usado por workers de varredura)
+        self.world: Optional[SimulationWorld] = None
         
         # Garantir que os diretórios existam
         self.storage_path.mkdir(parents=True, exist_ok=True)
@@ -41,6 +53,7 @@ class SimulationService:
         
         # Inicializar Redis
         self._initialize_redis()
+        self.result_store = SimulationResultStore(self.redis_client)
         
         # Configurações de simulação
         self.simulation_configs = {
@@ -56,7 +69,8 @@ class SimulationService:
                 "default_max_force": 1000,
                 "max_force": 10000,
                 "default_increment": 100,
-                "max_increment": 1000
+                "max_increment": 1000,
+                "search_modes": ["adaptive", "linear"]
             },
             "motion_test": {
                 "default_duration": 10.0,
@@ -85,33 +99,19 @@ class SimulationService:
             self.redis_client = None
     
     def _get_cache_key(self, model_path: str, simulation_type: str, parameters: Dict) -> str:
-        """Gerar chave de cache para simulação"""
-        param_str = json.dumps(parameters, sort_keys=True)
-        content_hash = hashlib.md5(f"{model_path}{param_str}".encode()).hexdigest()
-        return f"simulation:{simulation_type}:{content_hash}"
+        """Gerar chave de cache (hash do conteúdo da malha + versão do motor)"""
+        return self.result_store.cache_key(model_path, simulation_type, parameters)
     
-    def _cache_result(self, cache_key: str, result: Dict[str, Any], ttl: int = 3600):
-        """Cachear resultado da simulação"""
-        if self.redis_client:
-            try:
-                serialized_result = pickle.dumps(result)
-                self.redis_client.setex(cache_key, ttl, serialized_result)
-                logger.debug(f"Resultado cacheado: {cache_key}")
-            except Exception as e:
-                logger.warning(f"Erro ao cachear resultado: {e}")
+    def _cache_result(self, cache_key: str, result: Dict[str, Any]):
+        """Cachear resultado da simulação (resumo e séries separados)"""
+        self.result_store.cache(cache_key, result)
     
     def _get_cached_result(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """Recuperar resultado do cache"""
-        if self.redis_client:
-            try:
-                cached_data = self.redis_client.get(cache_key)
-                if cached_data:
-                    result = pickle.loads(cached_data)
-                    logger.debug(f"Resultado recuperado do cache: {cache_key}")
-                    return result
-            except Exception as e:
-                logger.warning(f"Erro ao recuperar cache: {e}")
-        return None
+        result = self.result_store.get_cached(cache_key)
+        if result:
+            logger.debug(f"Resultado recuperado do cache: {cache_key}")
+        return result
     
     async def start_simulation(self, db: Session, simulation_data: SimulationCreate) -> Simulation:
         """
@@ -129,6 +129,8 @@ class SimulationService:
             model_3d = db.query(Model3D).filter(Model3D.id == simulation_data.modelo_3d_id).first()
             if not model_3d:
                 raise ValueError("Modelo 3D não encontrado")
+            # Modelos anteriores ao registro de métricas são analisados uma vez
+            geometry = ensure_model_geometry(model_3d, db)
             
             # Criar registro da simulação
             simulation = Simulation(
@@ -144,8 +146,18 @@ class SimulationService:
             db.commit()
             db.refresh(simulation)
             
-            # Iniciar simulação em background (implementar Celery)
-            await self._run_simulation_async(simulation.id, model_3d, simulation_data)
+            # Enfileirar no backend de execução; retorna sem esperar a simulação.
+            # As métricas vão junto para o worker calcular a massa sem o banco.
+            get_simulation_executor().submit(
+                simulation.id,
+                str(model_3d.arquivo_path),
+                {
+                    "tipo": simulation_data.tipo_simulacao,
+                    "parametros": simulation_data.parametros,
+                    "condicoes_iniciais": simulation_data.condicoes_iniciais,
+                    "metricas_geometria": geometry.to_dict() if geometry else None
+                }
+            )
             
             return simulation
             
@@ -154,366 +166,38 @@ class SimulationService:
             db.rollback()
             raise
     
-    async def _run_simulation_async(self, simulation_id: UUID, model_3d: Model3D, 
-                                  simulation_data: SimulationCreate):
-        """Executar simulação de forma assíncrona"""
-        try:
-            # Esta função será executada via Celery em produção
-            # Por enquanto, executar sincronamente para demonstração
-            
-            result = await self._execute_simulation(
-                simulation_id, model_3d, simulation_data
-            )
-            
-            # Atualizar resultado (implementar via Celery callback)
-            # update_simulation_result.delay(simulation_id, result)
-            
-        except Exception as e:
-            logger.error(f"Erro na simulação {simulation_id}: {e}")
-            # update_simulation_status.delay(simulation_id, "failed", str(e))
-    
-    async def _execute_simulation(self, simulation_id: UUID, model_3d: Model3D, 
-                                simulation_data: SimulationCreate) -> Dict[str, Any]:
-        """Executar simulação específica"""
-        tipo = simulation_data.tipo_simulacao
-        
-        if tipo == "drop_test":
-            return await self._run_drop_test(simulation_id, model_3d, simulation_data)
-        elif tipo == "stress_test":
-            return await self._run_stress_test(simulation_id, model_3d, simulation_data)
-        elif tipo == "motion":
-            return await self._run_motion_test(simulation_id, model_3d, simulation_data)
-        elif tipo == "fluid":
-            return await self._run_fluid_test(simulation_id, model_3d, simulation_data)
-        else:
-            raise ValueError(f"Tipo de simulação não suportado: {tipo}")
-    
-    async def _run_drop_test(self, simulation_id: UUID, model_3d: Model3D, 
-                           simulation_data: SimulationCreate) -> Dict[str, Any]:
-        """Executar teste de queda"""
-        try:
-            # Inicializar PyBullet
-            physics_client = self._initialize_pybullet()
-            
-            # Carregar modelo 3D
-            model_path = Path(model_3d.arquivo_path)
-            body_id = self._load_3d_model_to_pybullet(model_path, physics_client)
-            
-            # Configurar parâmetros do teste
-            drop_height = simulation_data.parametros.get("drop_height", 1.0)  # metros
-            num_drops = simulation_data.parametros.get("num_drops", 10)
-            gravity = -9.8
-            
-            results = {
-                "tipo": "drop_test",
-                "testes": [],
-                "metricas": {},
-                "duracao_total": 0
-            }
-            
-            start_time = time.time()
-            
-            for drop_num in range(num_drops):
-                # Resetar posição do objeto
-                p.resetBasePositionAndOrientation(body_id, [0, 0, drop_height], [0, 0, 0, 1])
-                p.resetBaseVelocity(body_id, [0, 0, 0], [0, 0, 0])
-                
-                # Definir gravidade
-                p.setGravity(0, 0, gravity)
-                
-                # Simular queda
-                velocities = []
-                positions = []
-                collision_points = []
-                
-                simulation_time = 0
-                dt = 1/240  # 240 Hz
-                
-                while simulation_time < 5.0:  # 5 segundos max
-                    # Simular física
-                    p.stepSimulation()
-                    simulation_time += dt
-                    
-                    # Coletar dados
-                    pos, orn = p.getBasePositionAndOrientation(body_id)
-                    vel, ang_vel = p.getBaseVelocity(body_id)
-                    
-                    velocities.append(vel)
-                    positions.append(pos)
-                    
-                    # Detectar contato com solo
-                    contact_points = p.getContactPoints(body_id, -1)
-                    if contact_points and not collision_points:
-                        collision_points.append({
-                            "time": simulation_time,
-                            "position": pos,
-                            "velocity": vel
-                        })
-                    
-                    # Parar se objeto parar de se mover
-                    if len(velocities) > 60:  # 1/4 de segundo
-                        recent_vel = velocities[-10:]
-                        if all(abs(v[2]) < 0.1 for v in recent_vel):  # Velocidade Z baixa
-                            break
-                
-                # Analisar resultado do teste
-                teste_resultado = self._analyze_drop_test(
-                    drop_num, positions, velocities, collision_points
-                )
-                results["testes"].append(teste_resultado)
-            
-            # Calcular métricas gerais
-            results["metricas"] = self._calculate_drop_test_metrics(results["testes"])
-            results["duracao_total"] = time.time() - start_time
-            
-            # Limpar
-            p.disconnect(physics_client)
-            
-            return results
-            
-        except Exception as e:
-            logger.error(f"Erro no teste de queda: {e}")
-            raise
-    
-    async def _run_stress_test(self, simulation_id: UUID, model_3d: Model3D, 
-                             simulation_data: SimulationCreate) -> Dict[str, Any]:
-        """Executar teste de stress/pressão"""
-        try:
-            physics_client = self._initialize_pybullet()
-            
-            model_path = Path(model_3d.arquivo_path)
-            body_id = self._load_3d_model_to_pybullet(model_path, physics_client)
-            
-            # Configurar teste
-            max_force = simulation_data.parametros.get("max_force", 1000)  # N
-            force_direction = simulation_data.parametros.get("force_direction", [0, 0, 1])
-            force_increment = simulation_data.parametros.get("force_increment", 100)
-            
-            results = {
-                "tipo": "stress_test",
-                "testes_forca": [],
-                "metricas": {},
-                "ponto_ruptura": None
-            }
-            
-            current_force = 0
-            while current_force <= max_force:
-                # Resetar posição
-                p.resetBasePositionAndOrientation(body_id, [0, 0, 0.5], [0, 0, 0, 1])
-                p.resetBaseVelocity(body_id, [0, 0, 0], [0, 0, 0])
-                
-                # Aplicar força crescente
-                force = [f * current_force for f in force_direction]
-                p.applyExternalForce(body_id, -1, force, [0, 0, 0], p.LINK_FRAME)
-                
-                # Simular por um tempo
-                for _ in range(240):  # 1 segundo
-                    p.stepSimulation()
-                
-                # Coletar resultado
-                pos, orn = p.getBasePositionAndOrientation(body_id)
-                vel, ang_vel = p.getBaseVelocity(body_id)
-                
-                # Verificar se houve ruptura/deformação excessiva
-                displacement = np.linalg.norm(np.array(pos))
-                
-                teste_result = {
-                    "forca": current_force,
-                    "posicao_final": pos,
-                    "velocidade_final": vel,
-                    "deslocamento": displacement
-                }
-                
-                results["testes_forca"].append(teste_result)
-                
-                # Verificar ruptura (deslocamento excessivo)
-                if displacement > 0.5:  # 50cm
-                    results["ponto_ruptura"] = current_force
-                    break
-                
-                current_force += force_increment
-            
-            results["metricas"] = self._calculate_stress_test_metrics(results)
-            
-            p.disconnect(physics_client)
-            
-            return results
-            
-        except Exception as e:
-            logger.error(f"Erro no teste de stress: {e}")
-            raise
-    
-    async def _run_motion_test(self, simulation_id: UUID, model_3d: Model3D, 
-                             simulation_data: SimulationCreate) -> Dict[str, Any]:
-        """Executar teste de movimento/dinâmica"""
-        try:
-            physics_client = self._initialize_pybullet()
-            
-            model_path = Path(model_3d.arquivo_path)
-            body_id = self._load_3d_model_to_pybullet(model_path, physics_client)
-            
-            # Configurar trajetória
-            trajectory_type = simulation_data.parametros.get("trajectory_type", "circular")
-            duration = simulation_data.parametros.get("duration", 10.0)  # segundos
-            velocity = simulation_data.parametros.get("velocity", 1.0)  # m/s
-            
-            results = {
-                "tipo": "motion_test",
-                "trajetoria": [],
-                "metricas": {},
-                "energia_consumida": 0
-            }
-            
-            # Definir trajetória
-            if trajectory_type == "circular":
-                radius = 1.0  # metros
-                angular_velocity = velocity / radius
-                trajectory_points = self._generate_circular_trajectory(
-                    radius, angular_velocity, duration
-                )
-            else:
-                # Trajetória linear
-                trajectory_points = self._generate_linear_trajectory(
-                    velocity, duration
-                )
-            
-            # Simular movimento
-            total_energy = 0
-            for i, target_pos in enumerate(trajectory_points):
-                # Mover objeto para posição alvo
-                p.resetBasePositionAndOrientation(body_id, target_pos, [0, 0, 0, 1])
-                
-                # Calcular energia potencial
-                mass = p.getDynamicsInfo(body_id, -1)[0]
-                potential_energy = mass * 9.8 * target_pos[2]
-                
-                total_energy += potential_energy
-                
-                results["trajetoria"].append({
-                    "tempo": i * 0.1,
-                    "posicao": target_pos,
-                    "energia_potencial": potential_energy
-                })
-                
-                # Simular física por um pequeno intervalo
-                for _ in range(24):  # 0.1 segundos a 240 Hz
-                    p.stepSimulation()
-            
-            results["metricas"]["energia_total"] = total_energy
-            results["metricas"]["distancia_percorrida"] = self._calculate_distance(trajectory_points)
-            results["metricas"]["velocidade_media"] = velocity
-            
-            p.disconnect(physics_client)
-            
-            return results
-            
-        except Exception as e:
-            logger.error(f"Erro no teste de movimento: {e}")
-            raise
-    
-    async def _run_fluid_test(self, simulation_id: UUID, model_3d: Model3D, 
-                            simulation_data: SimulationCreate) -> Dict[str, Any]:
-        """Executar teste de fluido (simplificado)"""
-        # Nota: PyBullet tem suporte limitado para fluidos
-        # Esta implementação simula efeitos básicos de fluido
-        
-        try:
-            physics_client = self._initialize_pybullet()
-            
-            model_path = Path(model_3d.arquivo_path)
-            body_id = self._load_3d_model_to_pybullet(model_path, physics_client)
-            
-            # Configurar "fluido" como resistência do ar
-            fluid_density = simulation_data.parametros.get("fluid_density", 1.2)  # kg/m³
-            drag_coefficient = simulation_data.parametros.get("drag_coefficient", 0.47)
-            
-            results = {
-                "tipo": "fluid_test",
-                "resistencia": [],
-                "metricas": {}
-            }
-            
-            # Simular queda com resistência do ar
-            p.resetBasePositionAndOrientation(body_id, [0, 0, 10], [0, 0, 0, 1])
-            p.resetBaseVelocity(body_id, [0, 0, 0], [0, 0, 0])
-            
-            terminal_velocity = 0
-            velocities = []
-            
-            for _ in range(2400):  # 10 segundos
-                p.stepSimulation()
-                
-                pos, orn = p.getBasePositionAndOrientation(body_id)
-                vel, ang_vel = p.getBaseVelocity(body_id)
-                velocities.append(vel)
-                
-                # Calcular resistência do ar
-                if vel[2] != 0:
-                    force_drag = self._calculate_drag_force(
-                        vel, fluid_density, drag_coefficient, body_id
-                    )
-                    
-                    results["resistencia"].append({
-                        "velocidade": vel[2],
-                        "forca_arrasto": force_drag
-                    })
-                    
-                    # Verificar velocidade terminal
-                    if abs(vel[2]) > terminal_velocity:
-                        terminal_velocity = abs(vel[2])
-            
-            results["metricas"]["velocidade_terminal"] = terminal_velocity
-            results["metricas"]["coeficiente_arrasto"] = drag_coefficient
-            
-            p.disconnect(physics_client)
-            
-            return results
-            
-        except Exception as e:
-            logger.error(f"Erro no teste de fluido: {e}")
-            raise
-    
     def _initialize_pybullet(self):
         """Inicializar cliente PyBullet"""
         try:
             # Usar DIRECT para simulação sem interface gráfica
             physics_client = p.connect(p.DIRECT)
-            p.setGravity(0, 0, -9.8)
+            p.setGravity(0, 0, -9.8, physicsClientId=physics_client)
             return physics_client
         except Exception as e:
             logger.error(f"Erro ao inicializar PyBullet: {e}")
             raise
     
+    def _create_collision_shape(self, model_path: Path, physics_client) -> int:
+        """Criar shape de colisão a partir da malha do modelo"""
+        # PyBullet suporta formatos URDF, SDF, MJCF
+        # Para STL, usamos shapes GEOM_MESH convexos vindos do cache de colisão
+        # (malha decimada e decomposta, endereçada pelo hash do arquivo).
+        # Malhas com índices são côncavas e só colidem como corpos estáticos.
+        return self.collision_cache.create_collision_shape(model_path, physics_client)
+    
     def _load_3d_model_to_pybullet(self, model_path: Path, physics_client) -> int:
         """Carregar modelo 3D no PyBullet"""
         try:
-            # PyBullet suporta formatos URDF, SDF, MJCF
-            # Para STL, precisamos converter ou usar mesh shape
-            
-            # Usar createMeshShape para carregar STL
-            import meshcat
-            import trimesh
-            
-            # Carregar malha
-            mesh = trimesh.load(str(model_path))
-            
-            # Criar shape de colisão
-            vertices = mesh.vertices.flatten().tolist()
-            faces = mesh.faces.flatten().tolist()
-            
-            body_id = p.createCollisionShape(
-                p.GEOM_MESH,
-                vertices=vertices,
-                indices=faces
-            )
+            shape_id = self._create_collision_shape(model_path, physics_client)
             
             # Criar corpo físico
             mass = 1.0  # massa padrão de 1kg
             body_id = p.createMultiBody(
                 baseMass=mass,
-                baseCollisionShapeIndex=body_id,
+                baseCollisionShapeIndex=shape_id,
                 basePosition=[0, 0, 1],
-                baseOrientation=[0, 0, 0, 1]
+                baseOrientation=[0, 0, 0, 1],
+                physicsClientId=physics_client
             )
             
             return body_id
@@ -522,35 +206,127 @@ class SimulationService:
             logger.error(f"Erro ao carregar modelo no PyBullet: {e}")
             raise
     
-    def _analyze_drop_test(self, drop_num: int, positions: List, velocities: List, 
-                          collision_points: List) -> Dict[str, Any]:
-        """Analisar resultado de um teste de queda"""
-        if not collision_points:
-            return {
-                "numero_teste": drop_num,
-                "altura_queda": positions[0][2],
-                "velocidade_impacto": velocities[0][2],
-                "rebotes": 0,
-                "tempo_ate_repouso": 0
-            }
+    def _run_batched_drop_test(self, model_path: Path, drop_height: float, 
+                               num_drops: int, gravity: float = -9.8, mass: float = 1.0,
+                               world: Optional[SimulationWorld] = None,
+                               progress: Optional[ProgressCallback] = None) -> List[Dict[str, Any]]:
+        """
+        Executar todas as quedas de uma vez num único mundo PyBullet
         
-        collision = collision_points[0]
+        Com `world` o cliente e os corpos já carregados são reutilizados;
+        sem ele um cliente temporário é criado e desconectado ao final.
+        """
+        if world is not None:
+            engine = world.drop_engine(model_path)
+            return engine.analyze(engine.run(num_drops, drop_height, gravity=gravity, mass=mass,
+                                             progress=progress))
         
-        # Contar rebotes (simplificado)
-        rebotes = 0
-        for i, vel in enumerate(velocities):
-            if i > len(velocities) // 2 and abs(vel[2]) > 1.0:
-                rebotes += 1
+        physics_client = self._initialize_pybullet()
+        try:
+            shape_id = self._create_collision_shape(model_path, physics_client)
+            engine = BatchedDropTestEngine(physics_client, shape_id, mass=mass)
+            run = engine.run(num_drops, drop_height, gravity=gravity, progress=progress)
+            return engine.analyze(run)
+        finally:
+            p.disconnect(physics_client)
+    
+
+    def _run_stress_search(self, model_path: Path, params: Dict[str, Any],
+                           world: Optional[SimulationWorld] = None,
+                           progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        Buscar o ponto de ruptura do modelo
         
-        return {
-            "numero_teste": drop_num,
-            "altura_queda": positions[0][2],
-            "velocidade_impacto": collision["velocity"][2],
-            "tempo_impacto": collision["time"],
-            "posicao_impacto": collision["position"],
-            "rebotes": rebotes,
-            "tempo_ate_repouso": len(velocities) * (1/240)
-        }
+        Modo "adaptive" (padrão): passos exponenciais a partir de
+        `force_increment` e bisseção até `tolerance` (padrão: o próprio
+        incremento). Modo "linear": varredura em passos de `force_increment`.
+        """
+        max_force = params.get("max_force", 1000)  # N
+        force_direction = params.get("force_direction", [0, 0, 1])
+        force_increment = params.get("force_increment", 100)
+        search_mode = params.get("search_mode", "adaptive")
+        tolerance = params.get("tolerance", force_increment)
+        
+        def search(engine: StressTestEngine) -> Dict[str, Any]:
+            if search_mode == "linear":
+                result = engine.linear_search(max_force, force_increment, force_direction,
+                                              progress=progress)
+            else:
+                result = engine.adaptive_search(
+                    max_force, force_direction, initial_step=force_increment, tolerance=tolerance,
+                    progress=progress
+                )
+            result["modo_busca"] = search_mode
+            return result
+        
+        if world is not None:
+            return search(world.stress_engine(model_path))
+        
+        physics_client = self._initialize_pybullet()
+        try:
+            shape_id = self._create_collision_shape(model_path, physics_client)
+            return search(StressTestEngine(physics_client, shape_id))
+        finally:
+            p.disconnect(physics_client)
+
+    def _model_mass(self, model_3d: Any, params: Dict[str, Any]) -> float:
+        """
+        Massa do corpo em kg: `mass` explícito ou volume das métricas
+        geométricas vezes `material_density` (g/cm³, PLA por padrão)
+        """
+        if params.get("mass") is not None:
+            return params["mass"]
+        geometry = model_geometry(model_3d)
+        if geometry is None or geometry.volume_mm3 <= 0:
+            return 1.0
+        return geometry.mass_kg(params.get("material_density", DEFAULT_MATERIAL_DENSITY))
+    
+    def _projected_area_table(self, model_path: Path) -> ProjectedAreaTable:
+        """Áreas projetadas da malha de colisão, calculadas uma vez por malha"""
+        data = self.collision_cache.get(model_path)
+        return get_projected_area_table(data.key, data.vertices, data.faces)
+    
+    def _run_fluid_drag(self, model_path: Path, params: Dict[str, Any],
+                        world: Optional[SimulationWorld] = None,
+                        progress: Optional[ProgressCallback] = None,
+                        mass: float = 1.0) -> Tuple[Dict[str, Any], TelemetryRingBuffer]:
+        """
+        Executar a queda com arrasto aplicado a cada passo
+        
+        `mass` é a massa do corpo em kg (ver `_model_mass`). A telemetria
+        vai para um buffer circular de `telemetry_samples` linhas; sem
+        `telemetry_decimation` explícito a decimação é escolhida para que a
+        duração inteira caiba no buffer.
+        """
+        dt = 1 / 240  # 240 Hz
+        test_duration = params.get("test_duration", 10.0)
+        capacity = params.get("telemetry_samples", 2400)
+        decimation = params.get("telemetry_decimation") or int(np.ceil(test_duration / dt / capacity))
+        telemetry = TelemetryRingBuffer(capacity, decimation=decimation)
+        
+        def run(engine: FluidDragEngine) -> Dict[str, Any]:
+            return engine.run(
+                test_duration,
+                fluid_density=params.get("fluid_density", 1.2),  # kg/m³ (ar)
+                drag_coefficient=params.get("drag_coefficient", 0.47),
+                initial_velocity=params.get("initial_velocity", 10.0),
+                start_height=params.get("start_height", 10.0),
+                gravity=params.get("gravity", -9.8),
+                mass=mass,
+                telemetry=telemetry,
+                progress=progress
+            )
+        
+        area_table = self._projected_area_table(model_path)
+        if world is not None:
+            return run(world.fluid_engine(model_path, area_table)), telemetry
+        
+        physics_client = self._initialize_pybullet()
+        try:
+            shape_id = self._create_collision_shape(model_path, physics_client)
+            return run(FluidDragEngine(physics_client, shape_id, area_table)), telemetry
+        finally:
+            p.disconnect(physics_client)
     
     def _calculate_drop_test_metrics(self, testes: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Calcular métricas do teste de queda"""
@@ -581,117 +357,38 @@ class SimulationService:
             "forca_maxima": max(forcas),
             "deslocamento_maximo": max(deslocamentos),
             "rigidez_aproximada": forcas[-1] / deslocamentos[-1] if deslocamentos[-1] > 0 else 0,
-            "ponto_ruptura": results["ponto_ruptura"]
+            "ponto_ruptura": results["ponto_ruptura"],
+            "avaliacoes": results.get("avaliacoes", len(testes))
         }
     
-    def _generate_circular_trajectory(self, radius: float, angular_velocity: float, 
-                                    duration: float) -> List[List[float]]:
-        """Gerar trajetória circular"""
-        trajectory = []
-        time_points = np.arange(0, duration, 0.1)
-        
-        for t in time_points:
-            x = radius * np.cos(angular_velocity * t)
-            y = radius * np.sin(angular_velocity * t)
-            z = 1.0  # altura constante
-            trajectory.append([x, y, z])
-        
-        return trajectory
-    
-    def _generate_linear_trajectory(self, velocity: float, duration: float) -> List[List[float]]:
-        """Gerar trajetória linear"""
-        trajectory = []
-        time_points = np.arange(0, duration, 0.1)
-        
-        for t in time_points:
-            x = velocity * t
-            y = 0
-            z = 1.0
-            trajectory.append([x, y, z])
-        
-        return trajectory
-    
-    def _calculate_distance(self, trajectory: List[List[float]]) -> float:
-        """Calcular distância total percorrida"""
-        distance = 0
-        for i in range(1, len(trajectory)):
-            prev = np.array(trajectory[i-1])
-            curr = np.array(trajectory[i])
-            distance += np.linalg.norm(curr - prev)
-        return distance
-
     # ========== MÉTODOS AUXILIARES PARA SIMULAÇÕES MOTION E FLUID ==========
 
-    def _generate_circular_trajectory_sync(self, radius: float, velocity: float, duration: float) -> List[List[float]]:
+    def _generate_circular_trajectory_sync(self, radius: float, velocity: float, duration: float) -> np.ndarray:
         """Gerar trajetória circular sincronizada"""
-        trajectory = []
-        time_points = np.arange(0, duration, 0.1)
-        angular_velocity = velocity / radius  # ω = v/r
-        
-        for t in time_points:
-            x = radius * np.cos(angular_velocity * t)
-            y = radius * np.sin(angular_velocity * t)
-            z = 1.0  # altura constante
-            trajectory.append([x, y, z])
-        
-        return trajectory
+        return motion_analysis.circular_trajectory(radius, velocity / radius, duration)  # ω = v/r
 
-    def _generate_figure_8_trajectory_sync(self, radius: float, velocity: float, duration: float) -> List[List[float]]:
+    def _generate_figure_8_trajectory_sync(self, radius: float, velocity: float, duration: float) -> np.ndarray:
         """Gerar trajetória em forma de 8"""
-        trajectory = []
-        time_points = np.arange(0, duration, 0.1)
-        
-        for t in time_points:
-            # Lemniscata de Bernoulli simplificada
-            x = radius * np.sin(2 * np.pi * t / duration)
-            y = radius * np.sin(2 * np.pi * t / duration) * np.cos(2 * np.pi * t / duration)
-            z = 1.0  # altura constante
-            trajectory.append([x, y, z])
-        
-        return trajectory
+        return motion_analysis.figure_8_trajectory(radius, duration)
 
-    def _generate_linear_trajectory_sync(self, velocity: float, duration: float, acceleration: float) -> List[List[float]]:
+    def _generate_linear_trajectory_sync(self, velocity: float, duration: float, acceleration: float) -> np.ndarray:
         """Gerar trajetória linear com aceleração"""
-        trajectory = []
-        time_points = np.arange(0, duration, 0.1)
-        
-        for t in time_points:
-            # Movimento com aceleração constante
-            x = velocity * t + 0.5 * acceleration * t**2
-            y = 0
-            z = 1.0  # altura constante
-            trajectory.append([x, y, z])
-        
-        return trajectory
+        return motion_analysis.linear_trajectory(velocity, duration, acceleration)
 
-    def _generate_spiral_trajectory_sync(self, radius: float, velocity: float, duration: float) -> List[List[float]]:
+    def _generate_spiral_trajectory_sync(self, radius: float, velocity: float, duration: float) -> np.ndarray:
         """Gerar trajetória espiral"""
-        trajectory = []
-        time_points = np.arange(0, duration, 0.1)
-        max_radius = radius * 2
-        angular_velocity = 2 * np.pi / duration
-        
-        for t in time_points:
-            # Espiral logarítmica
-            current_radius = radius + (max_radius - radius) * (t / duration)
-            x = current_radius * np.cos(angular_velocity * t)
-            y = current_radius * np.sin(angular_velocity * t)
-            z = 1.0 + 0.5 * t / duration  # Subida suave
-            trajectory.append([x, y, z])
-        
-        return trajectory
+        return motion_analysis.spiral_trajectory(radius, duration)
 
-    def _analyze_motion_stability(self, trajectory: List[List[float]], 
-                                velocity_profile: List[float], duration: float) -> Dict[str, Any]:
+    def _analyze_motion_stability(self, trajectory: np.ndarray, 
+                                velocity_profile: np.ndarray, duration: float) -> Dict[str, Any]:
         """Analisar estabilidade do movimento"""
         try:
-            if not trajectory or not velocity_profile:
+            if len(trajectory) == 0 or len(velocity_profile) == 0:
                 return {"status": "insufficient_data"}
             
             # Calcular variação de velocidade
-            velocity_mean = np.mean(velocity_profile)
-            velocity_std = np.std(velocity_profile)
-            coefficient_of_variation = velocity_std / velocity_mean if velocity_mean > 0 else 0
+            stats = motion_analysis.velocity_statistics(velocity_profile)
+            coefficient_of_variation = stats["coefficient_of_variation"]
             
             # Verificar suavidade da trajetória
             trajectory_smoothness = self._calculate_trajectory_smoothness(trajectory)
@@ -700,8 +397,8 @@ class SimulationService:
             directional_consistency = self._calculate_directional_consistency(trajectory)
             
             return {
-                "velocidade_media": velocity_mean,
-                "velocidade_std": velocity_std,
+                "velocidade_media": stats["mean"],
+                "velocidade_std": stats["std"],
                 "coeficiente_variacao": coefficient_of_variation,
                 "suavidade_trajetoria": trajectory_smoothness,
                 "consistencia_direcional": directional_consistency,
@@ -713,77 +410,18 @@ class SimulationService:
             logger.error(f"Erro na análise de estabilidade: {e}")
             return {"status": "error", "message": str(e)}
 
-    def _calculate_trajectory_smoothness(self, trajectory: List[List[float]]) -> float:
+    def _calculate_trajectory_smoothness(self, trajectory: np.ndarray) -> float:
         """Calcular suavidade da trajetória (0-1, onde 1 é muito suave)"""
         try:
-            if len(trajectory) < 3:
-                return 0.0
-            
-            # Calcular segunda derivada (curvatura)
-            curvatures = []
-            for i in range(1, len(trajectory) - 1):
-                p0 = np.array(trajectory[i-1])
-                p1 = np.array(trajectory[i])
-                p2 = np.array(trajectory[i+1])
-                
-                # Vetores tangentes
-                v1 = p1 - p0
-                v2 = p2 - p1
-                
-                # Curvatura aproximada
-                cross_product = np.linalg.norm(np.cross(v1, v2))
-                dot_product = np.dot(v1, v2)
-                
-                if np.linalg.norm(v1) > 0 and np.linalg.norm(v2) > 0:
-                    curvature = cross_product / (np.linalg.norm(v1) * np.linalg.norm(v2) * 
-                                                (np.linalg.norm(v1) + np.linalg.norm(v2)))
-                    curvatures.append(abs(curvature))
-            
-            if not curvatures:
-                return 1.0
-            
-            # Converter para score de suavidade (inverso da curvatura média)
-            avg_curvature = np.mean(curvatures)
-            smoothness = 1.0 / (1.0 + avg_curvature * 10)  # Fator de escala
-            
-            return min(1.0, max(0.0, smoothness))
-            
+            return motion_analysis.trajectory_smoothness(trajectory)
         except Exception as e:
             logger.error(f"Erro no cálculo de suavidade: {e}")
             return 0.5
 
-    def _calculate_directional_consistency(self, trajectory: List[List[float]]) -> float:
+    def _calculate_directional_consistency(self, trajectory: np.ndarray) -> float:
         """Calcular consistência direcional da trajetória"""
         try:
-            if len(trajectory) < 2:
-                return 1.0
-            
-            # Calcular direções entre pontos consecutivos
-            directions = []
-            for i in range(1, len(trajectory)):
-                prev = np.array(trajectory[i-1])
-                curr = np.array(trajectory[i])
-                
-                direction = curr - prev
-                norm = np.linalg.norm(direction)
-                
-                if norm > 0:
-                    directions.append(direction / norm)
-            
-            if len(directions) < 2:
-                return 1.0
-            
-            # Calcular variância direcional
-            # Usar produto escalar médio para medir consistência
-            consistency_scores = []
-            for i in range(len(directions) - 1):
-                dot_prod = np.dot(directions[i], directions[i + 1])
-                # Produto escalar normalizado
-                consistency = max(0, dot_prod)  # Apenas direções similares
-                consistency_scores.append(consistency)
-            
-            return np.mean(consistency_scores) if consistency_scores else 1.0
-            
+            return motion_analysis.directional_consistency(trajectory)
         except Exception as e:
             logger.error(f"Erro no cálculo de consistência direcional: {e}")
             return 0.5
@@ -799,80 +437,11 @@ class SimulationService:
         else:
             return "Movimento instável. Recomendado revisar os parâmetros de controle."
 
-    def _calculate_cross_sectional_area(self, body_id: int) -> float:
-        """Calcular área da seção transversal aproximada"""
-        try:
-            # Obter informações de dinâmica do corpo
-            dynamics_info = p.getDynamicsInfo(body_id, -1)
-            mass = dynamics_info[0]
-            
-            # Aproximação simplificada baseada na massa
-            # Para objetos reais, seria melhor usar geometria real
-            density_approximation = 1000  # kg/m³ (densidade típica de objetos)
-            volume_approximation = mass / density_approximation
-            
-            # Assumir forma aproximada e calcular área da seção transversal
-            # Para uma esfera: A = πr², onde r³ = 3V/4π
-            if volume_approximation > 0:
-                radius_approx = (3 * volume_approximation / (4 * np.pi)) ** (1/3)
-                cross_sectional_area = np.pi * radius_approx ** 2
-            else:
-                cross_sectional_area = 0.01  # 10 cm² como fallback
-            
-            return cross_sectional_area
-            
-        except Exception as e:
-            logger.warning(f"Erro ao calcular área da seção transversal: {e}")
-            return 0.01  # Valor padrão de 10 cm²
-
-    def _process_resistance_data(self, resistance_forces: List[float], 
-                               velocities: List[List[float]], positions: List[List[float]]) -> List[Dict[str, Any]]:
-        """Processar dados de resistência do fluido"""
-        processed_data = []
-        
-        for i in range(len(resistance_forces)):
-            velocity = velocities[i] if i < len(velocities) else [0, 0, 0]
-            position = positions[i] if i < len(positions) else [0, 0, 0]
-            speed = np.linalg.norm(velocity)
-            
-            processed_data.append({
-                "tempo": i * (1/240),  # Assumindo 240 Hz
-                "velocidade": speed,
-                "velocidade_x": velocity[0],
-                "velocidade_y": velocity[1],
-                "velocidade_z": velocity[2],
-                "posicao_x": position[0],
-                "posicao_y": position[1],
-                "posicao_z": position[2],
-                "força_arrasto": resistance_forces[i]
-            })
-        
-        return processed_data
-
-    def _calculate_time_to_terminal(self, velocities: List[List[float]], dt: float) -> float:
+    def _calculate_time_to_terminal(self, speeds: np.ndarray, dt: float) -> float:
         """Calcular tempo até atingir velocidade terminal"""
         try:
-            if len(velocities) < 120:  # Precisa de pelo menos 0.5 segundos
-                return 0.0
-            
-            # Verificar últimos 0.5 segundos
-            terminal_candidates = []
-            for i in range(len(velocities) - 120, len(velocities)):
-                speed = np.linalg.norm(velocities[i])
-                terminal_candidates.append(speed)
-            
-            if not terminal_candidates:
-                return 0.0
-            
-            # Calcular variância das velocidades
-            speed_variance = np.var(terminal_candidates)
-            
-            # Se a variância for baixa, считаем que atingiu velocidade terminal
-            if speed_variance < 0.1:
-                return (len(velocities) - 120) * dt
-            
-            return 0.0
-            
+            terminal_step = terminal_velocity_step(speeds)
+            return (terminal_step + 1) * dt if terminal_step >= 0 else 0.0
         except Exception as e:
             logger.error(f"Erro no cálculo do tempo até terminal: {e}")
             return 0.0
@@ -909,39 +478,37 @@ class SimulationService:
             logger.error(f"Erro na classificação aerodinâmica: {e}")
             return "indefinido"
 
-    def _analyze_aerodynamics(self, velocities: List[List[float]], resistance_forces: List[float],
-                            fluid_density: float, drag_coefficient: float) -> Dict[str, Any]:
+    def _analyze_aerodynamics(self, speeds: np.ndarray, resistance_forces: np.ndarray,
+                            areas: np.ndarray, fluid_density: float) -> Dict[str, Any]:
         """Análise aerodinâmica detalhada"""
         try:
-            if not velocities or not resistance_forces:
+            if len(speeds) == 0 or len(resistance_forces) == 0:
                 return {"status": "insufficient_data"}
             
-            speeds = [np.linalg.norm(v) for v in velocities]
-            drag_coeffs = []
-            
-            # Calcular coeficiente de arrasto em diferentes pontos
-            for i in range(len(speeds)):
-                if speeds[i] > 0:
-                    F_d = resistance_forces[i]
-                    A = self._calculate_cross_sectional_area(-1)  # Simplificado
-                    Cd = (2 * F_d) / (fluid_density * A * speeds[i]**2)
-                    drag_coeffs.append(Cd)
-            
-            if not drag_coeffs:
+            # Coeficiente de arrasto efetivo em cada passo com movimento
+            moving = (speeds > 0) & (areas > 0)
+            if not moving.any():
                 return {"status": "error", "message": "Não foi possível calcular coeficientes"}
+            drag_coeffs = (2 * resistance_forces[moving]) / (
+                fluid_density * areas[moving] * speeds[moving] ** 2
+            )
+            cd_mean = float(drag_coeffs.mean())
             
             return {
-                "Cd_medio": np.mean(drag_coeffs),
-                "Cd_std": np.std(drag_coeffs),
-                "Cd_min": np.min(drag_coeffs),
-                "Cd_max": np.max(drag_coeffs),
-                "velocidade_media": np.mean(speeds),
-                "velocidade_max": np.max(speeds),
-                "arrasto_medio": np.mean(resistance_forces),
-                "arrasto_max": np.max(resistance_forces),
-                "qualidade_aerodinamica": "alta" if np.mean(drag_coeffs) < 0.3 else 
-                                        "moderada" if np.mean(drag_coeffs) < 0.6 else "baixa",
-                "recomendacoes": self._generate_aerodynamic_recommendations(np.mean(drag_coeffs))
+                "Cd_medio": cd_mean,
+                "Cd_std": float(drag_coeffs.std()),
+                "Cd_min": float(drag_coeffs.min()),
+                "Cd_max": float(drag_coeffs.max()),
+                "area_projetada_media": float(areas[moving].mean()),
+                "area_projetada_min": float(areas[moving].min()),
+                "area_projetada_max": float(areas[moving].max()),
+                "velocidade_media": float(speeds.mean()),
+                "velocidade_max": float(speeds.max()),
+                "arrasto_medio": float(resistance_forces.mean()),
+                "arrasto_max": float(resistance_forces.max()),
+                "qualidade_aerodinamica": "alta" if cd_mean < 0.3 else 
+                                        "moderada" if cd_mean < 0.6 else "baixa",
+                "recomendacoes": self._generate_aerodynamic_recommendations(cd_mean)
             }
             
         except Exception as e:
@@ -970,22 +537,6 @@ class SimulationService:
         
         return recommendations
     
-    def _calculate_drag_force(self, velocity: List[float], density: float, 
-                            drag_coefficient: float, body_id: int) -> float:
-        """Calcular força de arrasto do fluido"""
-        speed = np.linalg.norm(velocity)
-        if speed == 0:
-            return 0
-        
-        # Área da seção transversal simplificada
-        mass = p.getDynamicsInfo(body_id, -1)[0]
-        cross_sectional_area = mass / 1000  # aproximação
-        
-        # Força de arrasto: F = 0.5 * ρ * Cd * A * v²
-        drag_force = 0.5 * density * drag_coefficient * cross_sectional_area * speed**2
-        
-        return drag_force
-    
     def get_simulation_status(self, db: Session, simulation_id: UUID) -> Optional[Simulation]:
         """Obter status da simulação"""
         return db.query(Simulation).filter(Simulation.id == simulation_id).first()
@@ -1012,10 +563,21 @@ class SimulationService:
                 return {"status": "completed", "result": cached_result, "cached": True}
             
             # Executar simulação
-            model_3d_mock = type('MockModel', (), {'arquivo_path': model_path})()
-            simulation_data_mock = type('MockSimulationData', (), simulation_data)()
-            
-            result = self._execute_simulation_sync(simulation_id, model_3d_mock, simulation_data_mock)
+            model_3d_mock = type('MockModel', (), {
+                'arquivo_path': model_path,
+                'metricas_geometria': simulation_data.get("metricas_geometria")
+            })()
+            simulation_data_mock = type('MockSimulationData', (), {
+                **simulation_data,
+                'tipo_simulacao': simulation_data["tipo"],
+                'parametros': simulation_data.get("parametros", {})
+            })()
+            
+            # Progresso e métricas parciais em tempo real (sala "simulation_<id>")
+            reporter = SimulationProgressReporter(simulation_id, self.redis_client)
+            result = self._execute_simulation_sync(simulation_id, model_3d_mock, simulation_data_mock,
+                                                   progress=reporter)
+            reporter(1.0, result.get("metricas"), force=True)
             
             # Cachear resultado
             if result.get("status") == "completed":
@@ -1032,102 +594,50 @@ class SimulationService:
             }
     
     def _execute_simulation_sync(self, simulation_id: UUID, model_3d: Any, 
-                               simulation_data: Any) -> Dict[str, Any]:
+                               simulation_data: Any,
+                               progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
         """Executar simulação síncrona (usado pelo Celery)"""
         tipo = simulation_data.tipo_simulacao if hasattr(simulation_data, 'tipo_simulacao') else simulation_data["tipo"]
         
         if tipo == "drop_test":
-            return self._run_drop_test_sync(simulation_id, model_3d, simulation_data)
+            return self._run_drop_test_sync(simulation_id, model_3d, simulation_data, progress)
         elif tipo == "stress_test":
-            return self._run_stress_test_sync(simulation_id, model_3d, simulation_data)
+            return self._run_stress_test_sync(simulation_id, model_3d, simulation_data, progress)
         elif tipo == "motion":
-            return self._run_motion_test_sync(simulation_id, model_3d, simulation_data)
+            return self._run_motion_test_sync(simulation_id, model_3d, simulation_data, progress)
         elif tipo == "fluid":
-            return self._run_fluid_test_sync(simulation_id, model_3d, simulation_data)
+            return self._run_fluid_test_sync(simulation_id, model_3d, simulation_data, progress)
         else:
             raise ValueError(f"Tipo de simulação não suportado: {tipo}")
     
     # ========== MÉTODOS SINCRONIZADOS PARA CELERY ==========
     
     def _run_drop_test_sync(self, simulation_id: UUID, model_3d: Any, 
-                          simulation_data: Any) -> Dict[str, Any]:
+                          simulation_data: Any,
+                          progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
         """Versão síncrona do teste de queda"""
         try:
-            # Inicializar PyBullet
-            physics_client = self._initialize_pybullet()
-            
-            # Carregar modelo 3D
-            model_path = Path(model_3d.arquivo_path)
-            body_id = self._load_3d_model_to_pybullet(model_path, physics_client)
-            
             # Configurar parâmetros
             params = simulation_data.parametros if hasattr(simulation_data, 'parametros') else simulation_data.get("parametros", {})
             drop_height = params.get("drop_height", 1.0)
             num_drops = params.get("num_drops", 5)
-            gravity = -9.8
+            mass = self._model_mass(model_3d, params)
             
-            results = {
+            start_time = time.time()
+            testes = self._run_batched_drop_test(
+                Path(model_3d.arquivo_path), drop_height, num_drops, mass=mass,
+                world=self.world, progress=progress
+            )
+            
+            return {
                 "tipo": "drop_test",
-                "testes": [],
-                "metricas": {},
+                "testes": testes,
+                "metricas": self._calculate_drop_test_metrics(testes),
                 "status": "completed",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now().isoformat(),
+                "duracao_total": time.time() - start_time
             }
             
-            start_time = time.time()
-            
-            for drop_num in range(num_drops):
-                # Resetar posição
-                p.resetBasePositionAndOrientation(body_id, [0, 0, drop_height], [0, 0, 0, 1])
-                p.resetBaseVelocity(body_id, [0, 0, 0], [0, 0, 0])
-                p.setGravity(0, 0, gravity)
-                
-                # Simular queda
-                velocities = []
-                positions = []
-                collision_points = []
-                
-                simulation_time = 0
-                dt = 1/240
-                
-                while simulation_time < 5.0:
-                    p.stepSimulation()
-                    simulation_time += dt
-                    
-                    pos, orn = p.getBasePositionAndOrientation(body_id)
-                    vel, ang_vel = p.getBaseVelocity(body_id)
-                    
-                    velocities.append(vel)
-                    positions.append(pos)
-                    
-                    # Detectar contato
-                    contact_points = p.getContactPoints(body_id, -1)
-                    if contact_points and not collision_points:
-                        collision_points.append({
-                            "time": simulation_time,
-                            "position": pos,
-                            "velocity": vel
-                        })
-                    
-                    # Parar se objeto parar
-                    if len(velocities) > 60:
-                        recent_vel = velocities[-10:]
-                        if all(abs(v[2]) < 0.1 for v in recent_vel):
-                            break
-                
-                # Analisar resultado
-                teste_resultado = self._analyze_drop_test(
-                    drop_num, positions, velocities, collision_points
-                )
-                results["testes"].append(teste_resultado)
-            
-            results["metricas"] = self._calculate_drop_test_metrics(results["testes"])
-            results["duracao_total"] = time.time() - start_time
-            
-            p.disconnect(physics_client)
-            
-            return results
-            
         except Exception as e:
             logger.error(f"Erro no teste de queda síncrono: {e}")
             return {
@@ -1137,62 +647,21 @@ class SimulationService:
             }
     
     def _run_stress_test_sync(self, simulation_id: UUID, model_3d: Any, 
-                            simulation_data: Any) -> Dict[str, Any]:
+                            simulation_data: Any,
+                            progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
         """Versão síncrona do teste de stress"""
         try:
-            physics_client = self._initialize_pybullet()
-            
-            model_path = Path(model_3d.arquivo_path)
-            body_id = self._load_3d_model_to_pybullet(model_path, physics_client)
-            
             params = simulation_data.parametros if hasattr(simulation_data, 'parametros') else simulation_data.get("parametros", {})
-            max_force = params.get("max_force", 1000)
-            force_direction = params.get("force_direction", [0, 0, 1])
-            force_increment = params.get("force_increment", 100)
             
             results = {
                 "tipo": "stress_test",
-                "testes_forca": [],
-                "metricas": {},
-                "ponto_ruptura": None,
                 "status": "completed",
                 "timestamp": datetime.now().isoformat()
             }
-            
-            current_force = 0
-            while current_force <= max_force:
-                p.resetBasePositionAndOrientation(body_id, [0, 0, 0.5], [0, 0, 0, 1])
-                p.resetBaseVelocity(body_id, [0, 0, 0], [0, 0, 0])
-                
-                force = [f * current_force for f in force_direction]
-                p.applyExternalForce(body_id, -1, force, [0, 0, 0], p.LINK_FRAME)
-                
-                for _ in range(240):
-                    p.stepSimulation()
-                
-                pos, orn = p.getBasePositionAndOrientation(body_id)
-                vel, ang_vel = p.getBaseVelocity(body_id)
-                displacement = np.linalg.norm(np.array(pos))
-                
-                teste_result = {
-                    "forca": current_force,
-                    "posicao_final": pos,
-                    "velocidade_final": vel,
-                    "deslocamento": displacement
-                }
-                
-                results["testes_forca"].append(teste_result)
-                
-                if displacement > 0.5:
-                    results["ponto_ruptura"] = current_force
-                    break
-                
-                current_force += force_increment
-            
+            results.update(self._run_stress_search(Path(model_3d.arquivo_path), params,
+                                                   world=self.world, progress=progress))
             results["metricas"] = self._calculate_stress_test_metrics(results)
             
-            p.disconnect(physics_client)
-            
             return results
             
         except Exception as e:
@@ -1204,7 +673,8 @@ class SimulationService:
             }
     
     def _run_motion_test_sync(self, simulation_id: UUID, model_3d: Any, 
-                            simulation_data: Any) -> Dict[str, Any]:
+                            simulation_data: Any,
+                            progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
         """Versão síncrona do teste de movimento"""
         try:
             physics_client = self._initialize_pybullet()
@@ -1251,54 +721,52 @@ class SimulationService:
                     radius, velocity, duration
                 )
             
-            # Executar movimento e coletar dados
-            total_distance = 0
-            total_energy = 0
-            velocity_profile = []
+            # Grandezas por ponto calculadas sobre os arrays da trajetória
+            mass = p.getDynamicsInfo(body_id, -1, physicsClientId=physics_client)[0]
+            num_points = len(trajectory_points)
+            time_step = duration / num_points if num_points else 0
+            
+            distances = motion_analysis.segment_lengths(trajectory_points)
+            cumulative_distance = np.concatenate(([0.0], np.cumsum(distances)))
+            potential_energy = mass * 9.8 * trajectory_points[:, 2]
+            
+            # Aproximação da velocidade instantânea (a partir do segundo ponto)
+            velocity_profile = distances / time_step if time_step > 0 else np.zeros(0)
+            kinetic_energy = 0.5 * mass * velocity_profile ** 2
+            total_energy = float((potential_energy[1:] + kinetic_energy).sum())
+            total_distance = float(cumulative_distance[-1]) if num_points else 0.0
             
             for i, target_pos in enumerate(trajectory_points):
-                # Resetar posição e orientação
-                p.resetBasePositionAndOrientation(body_id, target_pos, [0, 0, 0, 1])
-                p.resetBaseVelocity(body_id, [0, 0, 0], [0, 0, 0])
-                
-                # Calcular energia potencial
-                mass = p.getDynamicsInfo(body_id, -1)[0]
-                height = target_pos[2]
-                potential_energy = mass * 9.8 * height
-                
-                # Calcular energia cinética (se applicable)
-                if i > 0:
-                    prev_pos = trajectory_points[i-1]
-                    distance = np.linalg.norm(np.array(target_pos) - np.array(prev_pos))
-                    total_distance += distance
-                    
-                    # Aproximação da velocidade instantânea
-                    time_step = duration / len(trajectory_points)
-                    instantaneous_velocity = distance / time_step
-                    kinetic_energy = 0.5 * mass * instantaneous_velocity**2
-                    
-                    total_energy += potential_energy + kinetic_energy
-                    velocity_profile.append(instantaneous_velocity)
+                if progress is not None:
+                    progress(i / num_points, {
+                        "ponto": i,
+                        "posicao": target_pos,
+                        "distancia_acumulada": cumulative_distance[i]
+                    })
                 
-                # Coletar dados do ponto
-                results["trajetoria"].append({
-                    "tempo": i * (duration / len(trajectory_points)),
-                    "posicao": target_pos,
-                    "energia_potencial": potential_energy,
-                    "distancia_acumulada": total_distance
-                })
+                # Resetar posição e orientação
+                p.resetBasePositionAndOrientation(body_id, target_pos, [0, 0, 0, 1],
+                                                  physicsClientId=physics_client)
+                p.resetBaseVelocity(body_id, [0, 0, 0], [0, 0, 0], physicsClientId=physics_client)
                 
                 # Simular física por um pequeno intervalo para estabilidade
                 for _ in range(24):  # 0.1 segundos a 240 Hz
-                    p.stepSimulation()
+                    p.stepSimulation(physicsClientId=physics_client)
+            
+            tempos = np.arange(num_points) * time_step
+            results["trajetoria"] = [
+                {"tempo": t, "posicao": pos, "energia_potencial": ep, "distancia_acumulada": d}
+                for t, pos, ep, d in zip(tempos.tolist(), trajectory_points.tolist(),
+                                         potential_energy.tolist(), cumulative_distance.tolist())
+            ]
             
             # Calcular métricas finais
             results["metricas"] = {
                 "distancia_total": total_distance,
                 "energia_total": total_energy,
                 "velocidade_media": total_distance / duration if duration > 0 else 0,
-                "velocidade_maxima": max(velocity_profile) if velocity_profile else 0,
-                "velocidade_minima": min(velocity_profile) if velocity_profile else 0,
+                "velocidade_maxima": float(velocity_profile.max()) if len(velocity_profile) else 0,
+                "velocidade_minima": float(velocity_profile.min()) if len(velocity_profile) else 0,
                 "eficiência_energética": total_distance / total_energy if total_energy > 0 else 0,
                 "tipo_trajetoria": trajectory_type,
                 "tempo_execução": time.time() - start_time,
@@ -1324,22 +792,16 @@ class SimulationService:
             }
     
     def _run_fluid_test_sync(self, simulation_id: UUID, model_3d: Any, 
-                           simulation_data: Any) -> Dict[str, Any]:
+                           simulation_data: Any,
+                           progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
         """Versão síncrona do teste de fluido"""
         try:
-            physics_client = self._initialize_pybullet()
-            
-            model_path = Path(model_3d.arquivo_path)
-            body_id = self._load_3d_model_to_pybullet(model_path, physics_client)
-            
             params = simulation_data.parametros if hasattr(simulation_data, 'parametros') else simulation_data.get("parametros", {})
             
             # Configurações do teste de fluido
             fluid_density = params.get("fluid_density", 1.2)  # kg/m³ (ar)
             drag_coefficient = params.get("drag_coefficient", 0.47)
-            test_duration = params.get("test_duration", 10.0)
-            initial_velocity = params.get("initial_velocity", 10.0)
-            gravity = params.get("gravity", -9.8)
+            dt = 1/240  # 240 Hz
             
             results = {
                 "tipo": "fluid",
@@ -1354,88 +816,41 @@ class SimulationService:
             }
             
             start_time = time.time()
+            run, telemetry = self._run_fluid_drag(Path(model_3d.arquivo_path), params,
+                                                  world=self.world, progress=progress,
+                                                  mass=self._model_mass(model_3d, params))
             
-            # Inicializar objeto em movimento
-            p.resetBasePositionAndOrientation(body_id, [0, 0, 10], [0, 0, 0, 1])
-            p.resetBaseVelocity(body_id, [0, 0, -initial_velocity], [0, 0, 0])
-            p.setGravity(0, 0, gravity)
-            
-            # Coletar dados durante a queda
-            velocities = []
-            positions = []
-            resistance_forces = []
-            terminal_velocity_reached = False
-            terminal_velocity = 0
-            max_velocity = 0
-            
-            simulation_time = 0
-            dt = 1/240  # 240 Hz
-            max_iterations = int(test_duration / dt)
-            
-            for iteration in range(max_iterations):
-                p.stepSimulation()
-                simulation_time += dt
-                
-                # Coletar dados atuais
-                pos, orn = p.getBasePositionAndOrientation(body_id)
-                vel, ang_vel = p.getBaseVelocity(body_id)
-                
-                velocities.append(vel)
-                positions.append(pos)
-                
-                # Calcular força de arrasto
-                speed = np.linalg.norm(vel)
-                cross_sectional_area = self._calculate_cross_sectional_area(body_id)
-                
-                # Força de arrasto: F = 0.5 * ρ * Cd * A * v²
-                drag_force = 0.5 * fluid_density * drag_coefficient * cross_sectional_area * speed**2
-                resistance_forces.append(drag_force)
-                
-                # Verificar velocidade terminal (quando a velocidade se estabiliza)
-                if len(velocities) > 120:  # 0.5 segundos a 240 Hz
-                    recent_velocities = [np.linalg.norm(v) for v in velocities[-120:]]
-                    velocity_variance = np.var(recent_velocities)
-                    
-                    if velocity_variance < 0.1 and not terminal_velocity_reached:
-                        terminal_velocity = speed
-                        terminal_velocity_reached = True
-                
-                # Registrar velocidade máxima
-                if speed > max_velocity:
-                    max_velocity = speed
-                
-                # Parar se chegou ao chão
-                if pos[2] <= 0:
-                    break
+            speeds = run["speeds"]
+            drag_forces = run["drag_forces"]
+            areas = run["areas"]
+            terminal_step = terminal_velocity_step(speeds)
+            terminal_velocity = float(speeds[terminal_step]) if terminal_step >= 0 else 0
+            mean_area = float(areas[areas > 0].mean()) if (areas > 0).any() else 0
             
-            # Calcular métricas finais
-            results["resistencia"] = self._process_resistance_data(
-                resistance_forces, velocities, positions
-            )
+            results["resistencia"] = telemetry.to_records()
             
             results["metricas"] = {
                 "velocidade_terminal": terminal_velocity,
-                "velocidade_maxima": max_velocity,
+                "velocidade_maxima": float(speeds.max()) if len(speeds) else 0,
                 "coeficiente_arrasto": drag_coefficient,
                 "densidade_fluido": fluid_density,
-                "tempo_ate_terminal": self._calculate_time_to_terminal(velocities, dt),
-                "distancia_percorrida": positions[-1][2] - positions[0][2] if positions else 0,
-                "força_arrasto_media": np.mean(resistance_forces) if resistance_forces else 0,
-                "força_arrasto_maxima": max(resistance_forces) if resistance_forces else 0,
+                "area_projetada_media": mean_area,
+                "tempo_ate_terminal": self._calculate_time_to_terminal(speeds, dt),
+                "distancia_percorrida": float(run["final_position"][2] - run["start_position"][2]),
+                "força_arrasto_media": float(drag_forces.mean()) if len(drag_forces) else 0,
+                "força_arrasto_maxima": float(drag_forces.max()) if len(drag_forces) else 0,
                 "tempo_execução": time.time() - start_time,
                 "aerodinamic_classification": self._classify_aerodynamics(
-                    terminal_velocity, drag_coefficient, cross_sectional_area, fluid_density
+                    terminal_velocity, drag_coefficient, mean_area, fluid_density
                 )
             }
             
             # Análise detalhada
             aerodynamic_analysis = self._analyze_aerodynamics(
-                velocities, resistance_forces, fluid_density, drag_coefficient
+                speeds, drag_forces, areas, fluid_density
             )
             results["metricas"]["análise_aerodinâmica"] = aerodynamic_analysis
             
-            p.disconnect(physics_client)
-            
             return results
             
         except Exception as e:
@@ -1471,6 +886,16 @@ class SimulationService:
             increment = parameters.get("force_increment", 100)
             if increment > config.get("max_increment", 1000):
                 errors.append(f"Incremento máximo: {config['max_increment']}N")
+            if increment <= 0:
+                errors.append("Incremento de força deve ser positivo")
+            
+            search_mode = parameters.get("search_mode", "adaptive")
+            if search_mode not in config.get("search_modes", ["adaptive", "linear"]):
+                errors.append(f"Modo de busca inválido: {search_mode}")
+            
+            tolerance = parameters.get("tolerance", increment)
+            if tolerance <= 0:
+                errors.append("Tolerância deve ser positiva")
         
         return {
             "valid": len(errors) == 0,
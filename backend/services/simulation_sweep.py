@@ -0,0 +1,227 @@
+"""
+Varredura de Parâmetros de Simulação
+Distribui os pontos de uma grade de parâmetros entre processos que reutilizam
+o mundo PyBullet já carregado
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.core.config import SIMULATION_SWEEP_MAX_POINTS, SIMULATION_SWEEP_MAX_WORKERS
+from backend.services.simulation_result_store import split_result
+
+logger = logging.getLogger(__name__)
+
+
+def _expand_values(name: str, spec: Any) -> List[Any]:
+    """Valores de um eixo da grade: lista, escalar ou intervalo {start, stop, step}"""
+    if isinstance(spec, dict):
+        try:
+            start, stop, step = float(spec["start"]), float(spec["stop"]), float(spec["step"])
+        except KeyError as e:
+            raise ValueError(f"Intervalo de '{name}' sem a chave {e}")
+        if step <= 0 or stop < start:
+            raise ValueError(f"Intervalo inválido para '{name}'")
+        # Tolerância para incluir `stop` apesar do arredondamento
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        return [round(start + i * step, 10) for i in range(count)]
+    if isinstance(spec, (list, tuple)):
+        if not spec:
+            raise ValueError(f"Lista de valores vazia para '{name}'")
+        return list(spec)
+    return [spec]
+
+
+def expand_parameter_grid(base: Dict[str, Any], grid: Dict[str, Any],
+                          max_points: int = SIMULATION_SWEEP_MAX_POINTS) -> List[Dict[str, Any]]:
+    """
+    Produto cartesiano da grade sobre os parâmetros base
+
+    Raises:
+        ValueError: eixo inválido ou número de pontos acima de `max_points`
+    """
+    names = list(grid)
+    axes = [_expand_values(name, grid[name]) for name in names]
+
+    total = int(np.prod([len(axis) for axis in axes])) if axes else 1
+    if total > max_points:
+        raise ValueError(f"Grade com {total} pontos excede o limite de {max_points}")
+
+    return [{**base, **dict(zip(names, values))} for values in itertools.product(*axes)]
+
+
+# ========== ESTADO POR PROCESSO ==========
+
+_worker_service = None
+
+
+def _init_worker():
+    """Criar serviço e mundo PyBullet uma única vez por processo do pool"""
+    global _worker_service
+    from backend.services.simulation_engine import SimulationWorld
+    from backend.services.simulation_service import SimulationService
+
+    _worker_service = SimulationService()
+    _worker_service.world = SimulationWorld(_worker_service._create_collision_shape)
+
+
+def _get_worker_service():
+    if _worker_service is None:
+        _init_worker()
+    return _worker_service
+
+
+def run_sweep_point(index: int, model_path: str, simulation_type: str,
+                    parameters: Dict[str, Any],
+                    geometry: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Executar um ponto da varredura no processo atual
+
+    `geometry` é o registro `metricas_geometria` do modelo (dict), usado
+    para a massa quando o ponto não fixa `mass`.
+    """
+    service = _get_worker_service()
+    start_time = time.time()
+
+    cache_key = service._get_cache_key(model_path, simulation_type, parameters)
+    result = service._get_cached_result(cache_key)
+    cached = result is not None
+
+    if not cached:
+        model_3d = type('SweepModel', (), {
+            'arquivo_path': model_path,
+            'metricas_geometria': geometry
+        })()
+        simulation_data = type('SweepSimulationData', (), {
+            'tipo_simulacao': simulation_type,
+            'parametros': parameters
+        })()
+        result = service._execute_simulation_sync(None, model_3d, simulation_data)
+        if result.get("status") == "completed":
+            service._cache_result(cache_key, result)
+
+    # Séries ficam fora do stream; o cliente recebe só o resumo de cada ponto
+    summary, _ = split_result(result)
+    return {
+        "index": index,
+        "parametros": parameters,
+        "status": summary.pop("status", "completed"),
+        "cached": cached,
+        "duracao": time.time() - start_time,
+        "resultado": summary
+    }
+
+
+class SimulationSweepRunner:
+    """
+    Executor de varreduras de parâmetros
+
+    O pool usa processos 'spawn' (PyBullet não é seguro após fork com
+    clientes abertos) e cada processo mantém seu próprio `SimulationWorld`,
+    de modo que pontos do mesmo modelo não recarregam a malha.
+    """
+
+    def __init__(self, max_workers: int = SIMULATION_SWEEP_MAX_WORKERS,
+                 executor: Optional[Executor] = None):
+        self.max_workers = max_workers
+        self._executor = executor
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return self._executor
+
+    async def run(self, model_path: str, simulation_type: str,
+                  points: List[Dict[str, Any]],
+                  validator=None,
+                  geometry: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Executar os pontos e emitir cada resultado assim que fica pronto
+
+        Args:
+            model_path: Caminho do arquivo do modelo
+            simulation_type: Tipo de simulação
+            points: Parâmetros de cada ponto (ver `expand_parameter_grid`)
+            validator: Função (tipo, parâmetros) -> dict com "valid" e "errors"
+            geometry: Métricas geométricas do modelo (ver `run_sweep_point`)
+
+        Yields:
+            Um evento por ponto (fora de ordem) e um evento final "complete".
+            Se o consumidor parar antes do fim (cliente desconectado), os
+            pontos que ainda não começaram são cancelados.
+        """
+        loop = asyncio.get_running_loop()
+        start_time = time.time()
+        counts = {"completed": 0, "failed": 0, "invalid": 0}
+
+        pending: Dict[asyncio.Future, Tuple[int, Dict[str, Any]]] = {}
+        try:
+            for index, parameters in enumerate(points):
+                if validator is not None:
+                    validation = validator(simulation_type, parameters)
+                    if not validation["valid"]:
+                        counts["invalid"] += 1
+                        yield {
+                            "index": index,
+                            "parametros": parameters,
+                            "status": "invalid",
+                            "errors": validation["errors"]
+                        }
+                        continue
+                future = loop.run_in_executor(
+                    self._get_executor(), run_sweep_point,
+                    index, model_path, simulation_type, parameters, geometry
+                )
+                pending[future] = (index, parameters)
+
+            while pending:
+                done, _ = await asyncio.wait(set(pending), return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    index, parameters = pending.pop(future)
+                    try:
+                        event = future.result()
+                    except Exception as e:
+                        logger.error(f"Erro no ponto {index} da varredura: {e}")
+                        counts["failed"] += 1
+                        yield {"index": index, "parametros": parameters, "status": "failed", "error": str(e)}
+                        continue
+                    counts["completed" if event["status"] == "completed" else "failed"] += 1
+                    yield event
+        finally:
+            for future in pending:
+                future.cancel()
+
+        yield {
+            "status": "complete",
+            "total": len(points),
+            **counts,
+            "duracao_total": time.time() - start_time
+        }
+
+    def shutdown(self):
+        """Encerrar o pool de processos"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_default_runner: Optional[SimulationSweepRunner] = None
+
+
+def get_sweep_runner() -> SimulationSweepRunner:
+    """Runner compartilhado pela API (o pool é criado no primeiro uso)"""
+    global _default_runner
+    if _default_runner is None:
+        _default_runner = SimulationSweepRunner()
+    return _default_runner
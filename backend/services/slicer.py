@@ -0,0 +1,524 @@
+"""
+Fatiador de Malhas - G-code
+Interseção vetorizada da malha com os planos Z, costura dos segmentos em
+contornos fechados, perímetros por deslocamento dos contornos, preenchimento
+retilíneo e escrita do G-code em fluxo, com tempo e filamento calculados
+sobre as trajetórias reais
+"""
+
+import logging
+import math
+import time
+from dataclasses import asdict, dataclass, field
+from typing import IO, Dict, Generator, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Deslocamento máximo de um vértice no canto (múltiplos da distância)
+MITER_LIMIT = 4.0
+
+# Sobreposição do preenchimento com o perímetro mais interno (fração da largura)
+INFILL_OVERLAP = 0.15
+
+# Linhas acumuladas antes de cada escrita no arquivo
+WRITE_BATCH_LINES = 4096
+
+
+@dataclass
+class SliceSettings:
+    """Parâmetros do fatiamento (mm, mm/s, °C, %)"""
+    layer_height: float = 0.2
+    line_width: float = 0.4
+    perimeters: int = 2
+    infill_density: float = 20.0
+    infill_angle: float = 45.0
+    solid_layers: int = 3
+    print_speed: float = 50.0
+    first_layer_speed_factor: float = 0.5
+    travel_speed: float = 150.0
+    filament_diameter: float = 1.75
+    retraction_distance: float = 4.0
+    retraction_speed: float = 25.0
+    retraction_min_travel: float = 2.0
+    nozzle_temperature: Optional[int] = None
+    bed_temperature: Optional[int] = None
+    fan_speed: float = 50.0
+    bed_center: Tuple[float, float] = (100.0, 100.0)
+    simplify_tolerance: float = 0.02
+
+    @property
+    def extrusion_per_mm(self) -> float:
+        """Filamento (mm) por mm de trajetória: seção retangular de cantos arredondados"""
+        section = (self.line_width - self.layer_height * (1 - math.pi / 4)) * self.layer_height
+        return section / (math.pi * (self.filament_diameter / 2) ** 2)
+
+
+@dataclass
+class SliceResult:
+    """Totais das trajetórias geradas"""
+    layers: int = 0
+    print_time_s: float = 0.0
+    filament_length_mm: float = 0.0
+    extrusion_path_mm: float = 0.0
+    travel_path_mm: float = 0.0
+    retractions: int = 0
+    open_contours: int = 0
+    bounds_mm: List[List[float]] = field(default_factory=list)
+    slicing_time_s: float = 0.0
+    filament_diameter: float = 1.75
+
+    @property
+    def filament_volume_mm3(self) -> float:
+        return self.filament_length_mm * math.pi * (self.filament_diameter / 2) ** 2
+
+    def material_g(self, density_g_cm3: float) -> float:
+        return self.filament_volume_mm3 / 1000.0 * density_g_cm3
+
+    def to_dict(self) -> Dict[str, float]:
+        data = asdict(self)
+        data["filament_volume_mm3"] = self.filament_volume_mm3
+        return data
+
+
+# =============================================================================
+# FATIAMENTO
+# =============================================================================
+
+def layer_planes(z_min: float, z_max: float, layer_height: float) -> np.ndarray:
+    """Planos de corte no meio de cada camada"""
+    count = max(int(math.ceil((z_max - z_min) / layer_height - 1e-9)), 0)
+    return z_min + (np.arange(count) + 0.5) * layer_height
+
+
+def _expand(first: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Pares (item, first + k) para k < counts, sem laço em Python"""
+    owner = np.repeat(np.arange(len(counts)), counts)
+    offset = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, first[owner] + offset
+
+
+def slice_mesh(vertices: np.ndarray, faces: np.ndarray,
+               planes: np.ndarray) -> Tuple[List[List[np.ndarray]], int]:
+    """
+    Contornos fechados de cada plano
+
+    Cada triângulo que cruza um plano gera um segmento com extremidades nas
+    arestas cruzadas. A ponta é identificada pela aresta (par de vértices),
+    então triângulos vizinhos produzem exatamente o mesmo ponto e a costura
+    é topológica, sem tolerância. Os segmentos são orientados pela normal
+    para que o material fique à esquerda: contornos externos saem no
+    sentido anti-horário e furos no horário.
+
+    Returns:
+        (contornos por camada, número de cadeias abertas descartadas)
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    z = vertices[:, 2]
+
+    # Planos exatamente sobre um vértice são levemente deslocados
+    planes = np.array(planes, dtype=np.float64)
+    on_vertex = np.isin(planes, z)
+    while on_vertex.any():
+        planes[on_vertex] += 1e-7
+        on_vertex = np.isin(planes, z)
+
+    # Ordem global por (z, índice): todos os triângulos ordenam os vértices igual
+    rank = np.empty(len(vertices), dtype=np.int64)
+    rank[np.lexsort((np.arange(len(vertices)), z))] = np.arange(len(vertices))
+    order = np.argsort(rank[faces], axis=1)
+    lo, mid, hi = (np.take_along_axis(faces, order[:, i:i + 1], axis=1)[:, 0] for i in range(3))
+
+    first = np.searchsorted(planes, z[lo], side="right")
+    last = np.searchsorted(planes, z[hi], side="left")
+    tri, layer = _expand(first, np.maximum(last - first, 0))
+    if len(tri) == 0:
+        return [[] for _ in planes], 0
+    h = planes[layer]
+
+    def cut(a, b):
+        t = ((h - z[a]) / (z[b] - z[a]))[:, None]
+        return vertices[a, :2] + t * (vertices[b, :2] - vertices[a, :2])
+
+    n_vertices = len(vertices)
+    tri_lo, tri_mid, tri_hi = lo[tri], mid[tri], hi[tri]
+    below_mid = h < z[tri_mid]
+    edge_a = np.where(below_mid, tri_lo, tri_mid)
+    edge_b = np.where(below_mid, tri_mid, tri_hi)
+    p0, p1 = cut(tri_lo, tri_hi), cut(edge_a, edge_b)
+    key0 = tri_lo * n_vertices + tri_hi
+    key1 = edge_a * n_vertices + edge_b
+
+    # Orientação: direção do segmento ao longo de z x n
+    corners = vertices[faces[tri]]
+    normal = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    flip = ((p1 - p0) * np.stack([-normal[:, 1], normal[:, 0]], axis=1)).sum(axis=1) < 0
+    start = np.where(flip[:, None], p1, p0)
+    start_key = np.where(flip, key1, key0)
+    end_key = np.where(flip, key0, key1)
+
+    # Próximo segmento: o que começa na aresta onde este termina (mesma camada)
+    stride = n_vertices * n_vertices
+    start_key = start_key + layer * stride
+    end_key = end_key + layer * stride
+    by_start = np.argsort(start_key, kind="stable")
+    position = np.minimum(np.searchsorted(start_key[by_start], end_key), len(by_start) - 1)
+    following = by_start[position]
+    following[start_key[following] != end_key] = -1
+
+    contours: List[List[np.ndarray]] = [[] for _ in planes]
+    next_list = following.tolist()
+    visited = bytearray(len(next_list))
+    open_chains = 0
+    for seed in range(len(next_list)):
+        if visited[seed]:
+            continue
+        chain = []
+        current = seed
+        while current != -1 and not visited[current]:
+            visited[current] = 1
+            chain.append(current)
+            current = next_list[current]
+        if current == seed and len(chain) >= 3:
+            contours[int(layer[seed])].append(start[chain])
+        else:
+            open_chains += 1
+    return contours, open_chains
+
+
+# =============================================================================
+# GEOMETRIA 2D DOS CONTORNOS
+# =============================================================================
+
+def signed_area(points: np.ndarray) -> float:
+    """Área com sinal (positiva no sentido anti-horário)"""
+    x, y = points[:, 0], points[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def simplify_contour(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Remover pontos a menos de `tolerance` do anterior (malhas finas geram segmentos minúsculos)"""
+    if len(points) < 4 or tolerance <= 0:
+        return points
+    steps = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    bucket = np.floor(np.concatenate([[0.0], np.cumsum(steps)]) / tolerance)
+    keep = np.concatenate([[True], bucket[1:] != bucket[:-1]])
+    return points[keep] if keep.sum() >= 3 else points
+
+
+def offset_contour(points: np.ndarray, distance: float) -> Optional[np.ndarray]:
+    """
+    Deslocar o contorno `distance` para a esquerda (para dentro do material)
+
+    Deslocamento por bissetriz com limite de quina. Vértices cujas arestas
+    se invertem são removidos; o contorno inteiro é descartado se colapsar
+    (a área muda de sinal ou o contorno fica com menos de três pontos).
+    """
+    for _ in range(3):
+        if len(points) < 3:
+            return None
+        incoming = points - np.roll(points, 1, axis=0)
+        incoming /= np.maximum(np.linalg.norm(incoming, axis=1, keepdims=True), 1e-12)
+        outgoing = np.roll(incoming, -1, axis=0)
+        normal_in = np.stack([-incoming[:, 1], incoming[:, 0]], axis=1)
+        normal_out = np.stack([-outgoing[:, 1], outgoing[:, 0]], axis=1)
+        bisector = normal_in + normal_out
+        bisector /= np.maximum(np.linalg.norm(bisector, axis=1, keepdims=True), 1e-12)
+        cosine = np.maximum((bisector * normal_in).sum(axis=1), 1.0 / MITER_LIMIT)
+        shifted = points + bisector * (distance / cosine)[:, None]
+
+        # Arestas que inverteram de sentido indicam uma região estreita colapsada
+        before = np.roll(points, -1, axis=0) - points
+        after = np.roll(shifted, -1, axis=0) - shifted
+        reversed_edge = (before * after).sum(axis=1) <= 0
+        if not reversed_edge.any():
+            break
+        points = points[~reversed_edge]
+    else:
+        return None
+
+    original, result = signed_area(points), signed_area(shifted)
+    if len(shifted) < 3 or original == 0 or np.sign(result) != np.sign(original):
+        return None
+    if original > 0 and result >= original:
+        return None
+    return shifted
+
+
+def rectilinear_infill(contours: Sequence[np.ndarray], spacing: float,
+                       angle_deg: float) -> np.ndarray:
+    """
+    Linhas paralelas dentro dos contornos (regra par-ímpar), em zigue-zague
+
+    As linhas ficam numa grade global (múltiplos de `spacing` no sistema
+    girado), então camadas com o mesmo ângulo ficam alinhadas.
+
+    Returns:
+        Segmentos (N, 2, 2) na ordem de impressão
+    """
+    if not contours or spacing <= 0:
+        return np.empty((0, 2, 2))
+    angle = math.radians(angle_deg)
+    rotation = np.array([[math.cos(angle), -math.sin(angle)], [math.sin(angle), math.cos(angle)]])
+
+    a = np.concatenate([c for c in contours]) @ rotation
+    b = np.concatenate([np.roll(c, -1, axis=0) for c in contours]) @ rotation
+    y_low, y_high = np.minimum(a[:, 1], b[:, 1]), np.maximum(a[:, 1], b[:, 1])
+    first = np.ceil(y_low / spacing).astype(np.int64)
+    counts = np.maximum(np.ceil(y_high / spacing).astype(np.int64) - first, 0)
+    edge, line = _expand(first, counts)
+    if len(edge) == 0:
+        return np.empty((0, 2, 2))
+
+    y = line * spacing
+    ea, eb = a[edge], b[edge]
+    x = ea[:, 0] + (y - ea[:, 1]) * (eb[:, 0] - ea[:, 0]) / (eb[:, 1] - ea[:, 1])
+
+    order = np.lexsort((x, line))
+    x, y, line = x[order], y[order], line[order]
+    group_start = np.flatnonzero(np.r_[True, line[1:] != line[:-1]])
+    group_size = np.diff(np.r_[group_start, len(line)])
+    rank = np.arange(len(line)) - np.repeat(group_start, group_size)
+    size = np.repeat(group_size, group_size)
+    starts = np.flatnonzero((rank % 2 == 0) & (rank + 1 < size))
+
+    segments = np.stack([
+        np.stack([x[starts], y[starts]], axis=1),
+        np.stack([x[starts + 1], y[starts + 1]], axis=1)
+    ], axis=1)
+    # Zigue-zague: linhas ímpares no sentido oposto
+    odd = line[starts] % 2 == 1
+    segments[odd] = segments[odd, ::-1]
+    return segments @ rotation.T
+
+
+# =============================================================================
+# ESCRITA DE G-CODE
+# =============================================================================
+
+class GcodeWriter:
+    """
+    Escritor de G-code em fluxo (E absoluto, M82)
+
+    Acumula tempo (distância / avanço), filamento e distâncias; as linhas
+    são escritas em lotes em qualquer objeto com `write`. Sem `stream`
+    apenas os totais são calculados.
+    """
+
+    def __init__(self, stream: Optional[IO[str]], settings: SliceSettings):
+        self.stream = stream
+        self.settings = settings
+        self.position = np.zeros(2)
+        self.z = 0.0
+        self.e = 0.0
+        self.retracted = False
+        self.result = SliceResult(filament_diameter=settings.filament_diameter)
+        self._lines: List[str] = []
+
+    def line(self, text: str):
+        if self.stream is None:
+            return
+        self._lines.append(text)
+        if len(self._lines) >= WRITE_BATCH_LINES:
+            self.flush()
+
+    def lines(self, texts: Sequence[str]):
+        for text in texts:
+            self.line(text)
+
+    def flush(self):
+        if self.stream is not None and self._lines:
+            self.stream.write("\n".join(self._lines) + "\n")
+            self._lines = []
+
+    def _retract(self):
+        distance = self.settings.retraction_distance
+        if self.retracted or distance <= 0 or self.result.extrusion_path_mm == 0:
+            return
+        self.e -= distance
+        self.retracted = True
+        self.result.retractions += 1
+        self.result.print_time_s += distance / self.settings.retraction_speed
+        self.line(f"G1 E{self.e:.5f} F{self.settings.retraction_speed * 60:.0f}")
+
+    def _unretract(self):
+        if not self.retracted:
+            return
+        self.e += self.settings.retraction_distance
+        self.retracted = False
+        self.result.print_time_s += self.settings.retraction_distance / self.settings.retraction_speed
+        self.line(f"G1 E{self.e:.5f} F{self.settings.retraction_speed * 60:.0f}")
+
+    def move_z(self, z: float):
+        self.result.print_time_s += abs(z - self.z) / self.settings.travel_speed
+        self.z = z
+        self.line(f"G0 Z{z:.3f} F{self.settings.travel_speed * 60:.0f}")
+
+    def travel(self, point: np.ndarray):
+        distance = float(np.linalg.norm(point - self.position))
+        if distance < 1e-9:
+            return
+        if distance > self.settings.retraction_min_travel:
+            self._retract()
+        self.result.travel_path_mm += distance
+        self.result.print_time_s += distance / self.settings.travel_speed
+        self.position = np.asarray(point, dtype=np.float64)
+        self.line(f"G0 X{point[0]:.3f} Y{point[1]:.3f} F{self.settings.travel_speed * 60:.0f}")
+
+    def extrude(self, path: np.ndarray, speed: float):
+        """Extrudar ao longo da polilinha `path` (primeiro ponto = início)"""
+        if len(path) < 2:
+            return
+        self.travel(path[0])
+        self._unretract()
+        lengths = np.linalg.norm(np.diff(path, axis=0), axis=1)
+        e_values = self.e + np.cumsum(lengths) * self.settings.extrusion_per_mm
+        total = float(lengths.sum())
+        self.result.extrusion_path_mm += total
+        self.result.filament_length_mm += total * self.settings.extrusion_per_mm
+        self.result.print_time_s += total / speed
+        self.e = float(e_values[-1])
+        self.position = path[-1].astype(np.float64)
+        if self.stream is not None:
+            moves = [f"G1 X{x:.3f} Y{y:.3f} E{e:.5f}"
+                     for (x, y), e in zip(path[1:].tolist(), e_values.tolist())]
+            moves[0] += f" F{speed * 60:.0f}"
+            self.lines(moves)
+
+
+def _layer_paths(contours: List[np.ndarray], settings: SliceSettings,
+                 layer_index: int, solid: bool) -> Iterator[Tuple[str, np.ndarray]]:
+    """Perímetros (de dentro para fora) e segmentos de preenchimento de uma camada"""
+    width = settings.line_width
+    infill_boundary = []
+    for contour in contours:
+        contour = simplify_contour(contour, settings.simplify_tolerance)
+        if abs(signed_area(contour)) < width * width:
+            continue
+        loops = []
+        for i in range(settings.perimeters):
+            loop = offset_contour(contour, width * (i + 0.5))
+            if loop is None:
+                break
+            loops.append(loop)
+        for loop in reversed(loops):
+            yield "perimeter", np.vstack([loop, loop[:1]])
+        if len(loops) == settings.perimeters:
+            inner = offset_contour(contour, width * (settings.perimeters - INFILL_OVERLAP))
+            if inner is not None:
+                infill_boundary.append(inner)
+
+    density = 100.0 if solid else settings.infill_density
+    if density <= 0 or not infill_boundary:
+        return
+    spacing = width / min(density / 100.0, 1.0)
+    angle = settings.infill_angle + (90.0 if layer_index % 2 else 0.0)
+    for segment in rectilinear_infill(infill_boundary, spacing, angle):
+        if np.linalg.norm(segment[1] - segment[0]) > width / 2:
+            yield "infill", segment
+
+
+class _ChunkQueue:
+    """Destino do GcodeWriter que guarda os blocos até o gerador entregá-los"""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+
+    def write(self, text: str):
+        self.chunks.append(text)
+
+    def drain(self) -> List[str]:
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+
+def iter_gcode(vertices: np.ndarray, faces: np.ndarray, settings: SliceSettings,
+               start_gcode: Sequence[str] = (), end_gcode: Sequence[str] = (),
+               emit: bool = True) -> Generator[str, None, SliceResult]:
+    """
+    Fatiar a malha produzindo o G-code em blocos de texto
+
+    Os blocos são entregues ao fim de cada camada (ou a cada
+    `WRITE_BATCH_LINES` linhas), então nada além da camada atual fica em
+    memória. O `SliceResult` é o valor de retorno do gerador. Com
+    `emit=False` nenhuma linha é formatada e apenas os totais são calculados.
+
+    A peça é apoiada na mesa (z mínimo = 0) e centralizada em
+    `settings.bed_center`. As primeiras e as últimas `solid_layers`
+    camadas são preenchidas a 100%.
+    """
+    started = time.perf_counter()
+    vertices = np.asarray(vertices, dtype=np.float64).copy()
+    faces = np.asarray(faces, dtype=np.int64)
+    lower, upper = vertices.min(axis=0), vertices.max(axis=0)
+    vertices -= [(lower[0] + upper[0]) / 2 - settings.bed_center[0],
+                 (lower[1] + upper[1]) / 2 - settings.bed_center[1], lower[2]]
+
+    planes = layer_planes(0.0, upper[2] - lower[2], settings.layer_height)
+    contours, open_chains = slice_mesh(vertices, faces, planes)
+
+    queue = _ChunkQueue() if emit else None
+    writer = GcodeWriter(queue, settings)
+    writer.lines(start_gcode)
+    writer.line(f";LAYER_COUNT:{len(planes)}")
+    writer.line("G92 E0")
+
+    for index in range(len(planes)):
+        z = (index + 1) * settings.layer_height
+        writer.line(f";LAYER:{index}")
+        if index == 1 and settings.fan_speed > 0:
+            writer.line(f"M106 S{int(round(settings.fan_speed / 100 * 255))}")
+        writer.move_z(z)
+        speed = settings.print_speed * (settings.first_layer_speed_factor if index == 0 else 1.0)
+        solid = index < settings.solid_layers or index >= len(planes) - settings.solid_layers
+        current = None
+        for kind, path in _layer_paths(contours[index], settings, index, solid):
+            if kind != current:
+                writer.line(f";TYPE:{kind.upper()}")
+                current = kind
+            writer.extrude(path, speed)
+        if queue is not None:
+            writer.flush()
+            yield from queue.drain()
+
+    writer._retract()
+    writer.lines(end_gcode)
+
+    result = writer.result
+    result.layers = len(planes)
+    result.open_contours = open_chains
+    result.bounds_mm = [vertices.min(axis=0).tolist(), vertices.max(axis=0).tolist()]
+    result.slicing_time_s = time.perf_counter() - started
+    writer.line(f";PRINT_TIME_S:{result.print_time_s:.0f}")
+    writer.line(f";FILAMENT_USED_MM:{result.filament_length_mm:.1f}")
+    if queue is not None:
+        writer.flush()
+        yield from queue.drain()
+
+    if open_chains:
+        logger.warning(f"Fatiamento: {open_chains} contornos abertos descartados (malha não estanque)")
+    logger.info(f"Fatiamento: {result.layers} camadas, {result.print_time_s / 60:.1f} min, "
+                f"{result.filament_length_mm / 1000:.2f} m de filamento em {result.slicing_time_s:.2f}s")
+    return result
+
+
+def consume_gcode(chunks: Generator[str, None, SliceResult],
+                  stream: Optional[IO[str]] = None) -> SliceResult:
+    """Escrever os blocos de `iter_gcode` em `stream` e devolver o resultado"""
+    while True:
+        try:
+            chunk = next(chunks)
+        except StopIteration as stop:
+            return stop.value
+        if stream is not None:
+            stream.write(chunk)
+
+
+def slice_to_gcode(vertices: np.ndarray, faces: np.ndarray, settings: SliceSettings,
+                   stream: Optional[IO[str]] = None,
+                   start_gcode: Sequence[str] = (), end_gcode: Sequence[str] = ()) -> SliceResult:
+    """Fatiar a malha e escrever o G-code em `stream` (sem `stream` apenas os totais)"""
+    chunks = iter_gcode(vertices, faces, settings, start_gcode, end_gcode, emit=stream is not None)
+    return consume_gcode(chunks, stream)
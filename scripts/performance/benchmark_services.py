@@ -159,43 +159,35 @@ def benchmark_budgeting_calculations(benchmark: PerformanceBenchmark):
 
 
 def benchmark_simulation_operations(benchmark: PerformanceBenchmark):
-    """Benchmark de operações de simulação"""
-    
-    def simulate_stress_calculation():
-        """Simula cálculo de tensão estrutural"""
-        force_N = 1000.0
-        area_mm2 = 50.0
-        stress_MPa = force_N / area_mm2
-        return stress_MPa
-    
-    def simulate_displacement_calculation():
-        """Simula cálculo de deslocamento"""
-        force = 500.0
-        stiffness = 1000.0
-        displacement = force / stiffness
-        return displacement
-    
-    def simulate_safety_factor():
-        """Simula cálculo de fator de segurança"""
-        yield_strength = 250.0
-        max_stress = 125.5
-        safety_factor = yield_strength / max_stress
-        return safety_factor
-    
-    benchmark.measure_execution_time(
-        simulate_stress_calculation,
-        "Cálculo de Tensão (Stress)"
-    )
-    
-    benchmark.measure_execution_time(
-        simulate_displacement_calculation,
-        "Cálculo de Deslocamento"
-    )
-    
-    benchmark.measure_execution_time(
-        simulate_safety_factor,
-        "Cálculo de Fator de Segurança"
-    )
+    """
+    Benchmark de operações de simulação
+    
+    Executa o SimulationService real (PyBullet DIRECT) sobre a menor malha
+    de referência. Para a suíte completa (todas as malhas, níveis de
+    decimação, RSS e alocações em JSON) use benchmark_simulation.py.
+    """
+    from benchmark_simulation import DEFAULT_PARAMETERS, SIMULATION_TYPES, reference_meshes
+    from backend.services.simulation_service import SimulationService
+    
+    meshes = reference_meshes()
+    if not meshes:
+        print("   ⚠️  Nenhuma malha de referência encontrada, benchmark ignorado")
+        return
+    model_path = min(meshes, key=lambda mesh: mesh.stat().st_size)
+    
+    service = SimulationService()
+    model = type("BenchmarkModel", (), {"arquivo_path": str(model_path)})()
+    
+    for simulation_type in SIMULATION_TYPES:
+        simulation_data = type("BenchmarkSimulation", (), {
+            "tipo_simulacao": simulation_type,
+            "parametros": DEFAULT_PARAMETERS[simulation_type],
+        })()
+        benchmark.measure_execution_time(
+            service._execute_simulation_sync,
+            f"Simulação {simulation_type} ({model_path.name})",
+            "benchmark", model, simulation_data
+        )
 
 
 def benchmark_cost_optimization(benchmark: PerformanceBenchmark):
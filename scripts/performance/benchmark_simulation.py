@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Simulação - 3dPot v2.0
+===================================
+
+Executa o `SimulationService` real (PyBullet DIRECT, sem rede) para cada
+tipo de simulação sobre as malhas de referência em
+`modelos-3d/central-inteligente/*.stl`, em vários níveis de decimação da
+malha de colisão.
+
+Cada caso roda num processo novo (spawn), de modo que o pico de RSS é o do
+caso e não o acumulado da suíte. Métricas por caso:
+
+- tempo de parede (melhor e médio das repetições) e passos/segundo
+- pico de RSS do processo
+- bytes de pico alocados por passo e blocos retidos por passo (tracemalloc,
+  numa passada separada para não distorcer o tempo)
+
+Uso:
+    python scripts/performance/benchmark_simulation.py
+    python scripts/performance/benchmark_simulation.py --types drop_test fluid --faces 5000 1000
+    python scripts/performance/benchmark_simulation.py --output atual.json --compare base.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Adicionar backend ao path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+REFERENCE_MESHES_DIR = project_root / "modelos-3d" / "central-inteligente"
+
+# Orçamentos de faces da malha de colisão (decimação por agrupamento de vértices)
+DEFAULT_FACE_LEVELS = [20000, 5000, 1000]
+
+SIMULATION_TYPES = ["drop_test", "stress_test", "motion", "fluid"]
+
+# Parâmetros por tipo: os padrões do serviço, com durações de um teste típico
+DEFAULT_PARAMETERS = {
+    "drop_test": {"drop_height": 1.0, "num_drops": 5},
+    "stress_test": {"max_force": 1000, "force_increment": 100},
+    "motion": {"trajectory_type": "circular", "duration": 10.0},
+    "fluid": {"test_duration": 10.0, "start_height": 10.0},
+}
+
+# Queda de passos/s acima deste limite é reportada como regressão
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+
+def reference_meshes() -> List[Path]:
+    """Malhas STL de referência, em ordem estável"""
+    return sorted(REFERENCE_MESHES_DIR.glob("*.stl"))
+
+
+def _peak_rss_mb() -> float:
+    """Pico de RSS do processo atual (ru_maxrss é KiB no Linux, bytes no macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class _StepCounter:
+    """Conta chamadas a `pybullet.stepSimulation` feitas pelos motores"""
+
+    def __init__(self, pybullet_module):
+        self.module = pybullet_module
+        self.original = pybullet_module.stepSimulation
+        self.count = 0
+
+    def __enter__(self):
+        def counting_step(*args, **kwargs):
+            self.count += 1
+            return self.original(*args, **kwargs)
+
+        self.module.stepSimulation = counting_step
+        return self
+
+    def __exit__(self, *exc):
+        self.module.stepSimulation = self.original
+
+
+def _redirect_stdout_to_stderr():
+    """Inicializador dos processos filhos: o V-HACD escreve direto no fd 1"""
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), 1)
+
+
+def run_case(model_path: str, simulation_type: str, max_faces: int,
+             parameters: Dict[str, Any], repeats: int, cache_dir: str) -> Dict[str, Any]:
+    """
+    Executar um caso (malha x decimação x tipo) e medir
+
+    Roda no processo filho; a malha de colisão é preparada uma vez (tempo
+    reportado à parte) e as repetições medem apenas a simulação.
+    """
+    import pybullet as p
+
+    from backend.services.collision_shape_cache import CollisionShapeCache
+    from backend.services.simulation_service import SimulationService
+
+    service = SimulationService()
+    service.redis_client = None
+    service.collision_cache = CollisionShapeCache(cache_dir=Path(cache_dir), max_faces=max_faces)
+
+    model = type("BenchmarkModel", (), {"arquivo_path": model_path})()
+    simulation_data = type("BenchmarkSimulation", (), {
+        "tipo_simulacao": simulation_type,
+        "parametros": parameters,
+    })()
+
+    case = {
+        "modelo": Path(model_path).name,
+        "tipo": simulation_type,
+        "max_faces": max_faces,
+        "parametros": parameters,
+    }
+
+    start = time.perf_counter()
+    collision = service.collision_cache.get(Path(model_path))
+    case["preparo_s"] = time.perf_counter() - start
+    case["faces_colisao"] = int(len(collision.faces))
+    case["cascos"] = len(collision.hulls)
+
+    def simulate() -> Dict[str, Any]:
+        return service._execute_simulation_sync("benchmark", model, simulation_data)
+
+    # Aquecimento: tabelas de área projetada e imports tardios
+    result = simulate()
+    if result.get("status") != "completed":
+        case.update({"status": "failed", "erro": result.get("error")})
+        return case
+
+    times = []
+    steps = 0
+    for _ in range(repeats):
+        with _StepCounter(p) as counter:
+            start = time.perf_counter()
+            simulate()
+            times.append(time.perf_counter() - start)
+        steps = counter.count
+
+    # Passada instrumentada separada: tracemalloc deixa a simulação bem mais lenta
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    simulate()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained_blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+    best = min(times)
+    case.update({
+        "status": "completed",
+        "repeticoes": repeats,
+        "tempo_s": best,
+        "tempo_medio_s": sum(times) / len(times),
+        "passos": steps,
+        "passos_por_s": steps / best if best > 0 else 0.0,
+        "rss_pico_mb": _peak_rss_mb(),
+        "bytes_pico_alocados": peak - baseline,
+        "bytes_por_passo": (peak - baseline) / steps if steps else 0.0,
+        "blocos_retidos_por_passo": retained_blocks / steps if steps else 0.0,
+    })
+    return case
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_suite(meshes: List[Path], simulation_types: List[str], face_levels: List[int],
+              repeats: int = 3, isolate: bool = True) -> Dict[str, Any]:
+    """
+    Executar todos os casos e montar o relatório JSON
+
+    Com `isolate` cada caso roda num processo novo (pico de RSS por caso);
+    sem ele tudo roda no processo atual (útil para depuração e testes).
+    """
+    import pybullet
+
+    from backend.services.simulation_engine import SIMULATION_ENGINE_VERSION
+
+    report = {
+        "gerado_em": datetime.now().isoformat(),
+        "commit": _git_revision(),
+        "versao_motor": SIMULATION_ENGINE_VERSION,
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "pybullet_api": pybullet.getAPIVersion(),
+        },
+        "casos": [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix="bench-collision-") as cache_dir:
+        jobs = [
+            (str(mesh), simulation_type, max_faces,
+             DEFAULT_PARAMETERS[simulation_type], repeats, cache_dir)
+            for mesh in meshes
+            for max_faces in face_levels
+            for simulation_type in simulation_types
+        ]
+        for job in jobs:
+            print(f"  {Path(job[0]).name:<36} {job[2]:>6} faces  {job[1]:<12}", end="", flush=True)
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1,
+                                         mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_redirect_stdout_to_stderr) as pool:
+                    case = pool.submit(run_case, *job).result()
+            else:
+                case = run_case(*job)
+            report["casos"].append(case)
+
+            if case["status"] == "completed":
+                print(f" {case['tempo_s'] * 1000:9.1f} ms  {case['passos_por_s']:10.0f} passos/s  "
+                      f"{case['rss_pico_mb']:7.1f} MB")
+            else:
+                print(f" falhou: {case.get('erro')}")
+
+    return report
+
+
+def _case_key(case: Dict[str, Any]) -> tuple:
+    return case["modelo"], case["tipo"], case["max_faces"]
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Comparar passos/s e tempo de parede caso a caso com um relatório anterior
+
+    Returns:
+        Uma linha por caso presente nos dois relatórios, com a razão
+        atual/base e a marca de regressão
+    """
+    previous = {_case_key(case): case for case in baseline.get("casos", [])
+                if case.get("status") == "completed"}
+    rows = []
+    for case in current.get("casos", []):
+        base = previous.get(_case_key(case))
+        if base is None or case.get("status") != "completed":
+            continue
+        ratio = case["passos_por_s"] / base["passos_por_s"] if base["passos_por_s"] else 1.0
+        time_ratio = case["tempo_s"] / base["tempo_s"] if base["tempo_s"] else 1.0
+        rows.append({
+            "modelo": case["modelo"],
+            "tipo": case["tipo"],
+            "max_faces": case["max_faces"],
+            "passos_por_s_razao": ratio,
+            "tempo_razao": time_ratio,
+            "regressao": ratio < 1.0 - threshold or time_ratio > 1.0 + threshold,
+        })
+    return rows
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark headless do SimulationService com malhas de referência"
+    )
+    parser.add_argument("--types", nargs="+", choices=SIMULATION_TYPES, default=SIMULATION_TYPES,
+                        help="Tipos de simulação (default: todos)")
+    parser.add_argument("--faces", nargs="+", type=int, default=DEFAULT_FACE_LEVELS,
+                        help="Orçamentos de faces da malha de colisão (default: 20000 5000 1000)")
+    parser.add_argument("--models", nargs="+", default=None,
+                        help="Nomes dos STL de referência (default: todos)")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="Repetições medidas por caso (default: 3)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Arquivo JSON de saída (default: stdout)")
+    parser.add_argument("--compare", type=Path, default=None,
+                        help="Relatório JSON anterior para detectar regressões")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="Variação tolerada antes de marcar regressão (default: 0.10)")
+    parser.add_argument("--no-isolate", action="store_true",
+                        help="Rodar todos os casos no processo atual")
+
+    args = parser.parse_args()
+
+    meshes = reference_meshes()
+    if args.models:
+        meshes = [mesh for mesh in meshes if mesh.name in args.models or mesh.stem in args.models]
+    if not meshes:
+        parser.error(f"Nenhuma malha de referência encontrada em {REFERENCE_MESHES_DIR}")
+
+    print(f"\n🚀 BENCHMARK DE SIMULAÇÃO ({len(meshes)} malhas, {len(args.faces)} níveis, "
+          f"{len(args.types)} tipos)", file=sys.stderr)
+    # Progresso vai para stderr para manter o stdout limpo para o JSON
+    stdout, sys.stdout = sys.stdout, sys.stderr
+    try:
+        report = run_suite(meshes, args.types, args.faces, args.repeats,
+                           isolate=not args.no_isolate)
+    finally:
+        sys.stdout = stdout
+
+    regressions = []
+    if args.compare:
+        rows = compare_reports(json.loads(args.compare.read_text()), report, args.threshold)
+        report["comparacao"] = {"base": str(args.compare), "limite": args.threshold, "casos": rows}
+        regressions = [row for row in rows if row["regressao"]]
+        for row in regressions:
+            print(f"❌ Regressão: {row['modelo']} {row['tipo']} {row['max_faces']} faces "
+                  f"({row['passos_por_s_razao']:.2f}x passos/s)", file=sys.stderr)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(output)
+        print(f"✅ Relatório salvo em {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,9 @@ import subprocess
 import sys
 from pathlib import Path
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
 def run_openscad_check(file_path):
     """Executa verificação básica do OpenSCAD"""
@@ -38,6 +41,36 @@ def run_openscad_check(file_path):
     except Exception as e:
         return False, f"Erro: {str(e)}"
 
+def check_file(scad_file):
+    """Análise básica e verificação do OpenSCAD de um arquivo"""
+    try:
+        # Análise básica do arquivo
+        with open(scad_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        lines = content.split('\n')
+        
+        # Verificação sintática simplificada
+        start = time.perf_counter()
+        is_valid, message = run_openscad_check(scad_file)
+        
+        return {
+            "file": scad_file.name,
+            "lines": len(lines),
+            "code_lines": sum(1 for line in lines if line.strip() and not line.strip().startswith('//')),
+            "status": "VALID" if is_valid else "ERROR",
+            "message": message,
+            "size": len(content),
+            "check_time": round(time.perf_counter() - start, 3)
+        }
+        
+    except Exception as e:
+        return {
+            "file": scad_file.name,
+            "status": "PROCESSING_ERROR",
+            "message": str(e)
+        }
+
 def main():
     """Função principal de validação rápida"""
     print("🔍 VALIDAÇÃO RÁPIDA - Modelos OpenSCAD Central de Controle")
@@ -55,51 +88,21 @@ def main():
     print(f"📁 Encontrados {len(scad_files)} arquivos OpenSCAD")
     print()
     
-    results = []
-    valid_count = 0
-    error_count = 0
+    # Verificações em paralelo; a saída mantém a ordem dos arquivos
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+        results = list(executor.map(check_file, scad_files))
     
-    for scad_file in scad_files:
-        print(f"🔍 Validando: {scad_file.name}")
-        
-        try:
-            # Análise básica do arquivo
-            with open(scad_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            lines = content.split('\n')
-            total_lines = len(lines)
-            code_lines = sum(1 for line in lines if line.strip() and not line.strip().startswith('//'))
-            
-            # Verificação sintática simplificada
-            is_valid, message = run_openscad_check(scad_file)
-            
-            if is_valid:
-                print(f"   ✅ Válido - {code_lines} linhas de código")
-                valid_count += 1
-                status = "VALID"
-            else:
-                print(f"   ❌ Erro: {message[:80]}...")
-                error_count += 1
-                status = "ERROR"
-            
-            results.append({
-                "file": scad_file.name,
-                "lines": total_lines,
-                "code_lines": code_lines,
-                "status": status,
-                "message": message,
-                "size": len(content)
-            })
-            
-        except Exception as e:
-            print(f"   ❌ Erro ao processar: {str(e)}")
-            error_count += 1
-            results.append({
-                "file": scad_file.name,
-                "status": "PROCESSING_ERROR",
-                "message": str(e)
-            })
+    for result in results:
+        print(f"🔍 Validando: {result['file']}")
+        if result["status"] == "VALID":
+            print(f"   ✅ Válido - {result['code_lines']} linhas de código ({result['check_time']:.2f}s)")
+        elif result["status"] == "ERROR":
+            print(f"   ❌ Erro: {result['message'][:80]}...")
+        else:
+            print(f"   ❌ Erro ao processar: {result['message']}")
+    
+    valid_count = sum(1 for result in results if result["status"] == "VALID")
+    error_count = len(results) - valid_count
     
     print()
     print("📊 RELATÓRIO FINAL:")
@@ -122,7 +125,7 @@ def main():
     
     with open(report_path, "w") as f:
         json.dump({
-            "validation_time": "2025-11-10T14:35:00",
+            "validation_time": datetime.now().isoformat(),
             "summary": {
                 "total_files": len(scad_files),
                 "valid_files": valid_count,
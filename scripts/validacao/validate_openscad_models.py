@@ -1,16 +1,37 @@
 #!/usr/bin/env python3
 """
 Validador de Modelos OpenSCAD - Central de Controle Inteligente
-Valida sintaxe e renderiza os 6 modelos da Central de Controle 3dPot
+Valida sintaxe e renderiza os modelos OpenSCAD do 3dPot em paralelo
+
+Arquivos cujo código e includes (include/use/import) não mudaram desde a
+última execução são pulados com base em um manifesto de hashes em disco.
+
+Uso:
+    python scripts/validacao/validate_openscad_models.py [diretório] [-j N] [--force]
 """
 
+import argparse
+import hashlib
 import os
+import re
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import json
 from datetime import datetime
 
+MANIFEST_NAME = ".openscad-validation.json"
+MANIFEST_VERSION = 2
+
+# include <arquivo>, use <arquivo> e import("arquivo") / surface(file="arquivo")
+DEPENDENCY_PATTERN = re.compile(
+    r"""(?:\b(?:include|use)\s*<([^>]+)>)|(?:\b(?:import|surface)\s*\([^)]*?["']([^"']+)["'])"""
+)
+
 def setup_matplotlib_for_plotting():
     """Setup matplotlib for non-interactive plotting"""
     import warnings
@@ -24,105 +45,209 @@ def setup_matplotlib_for_plotting():
     plt.rcParams["font.sans-serif"] = ["Noto Sans CJK SC", "WenQuanYi Zen Hei", "PingFang SC", "Arial Unicode MS", "Hiragino Sans GB"]
     plt.rcParams["axes.unicode_minus"] = False
 
+def file_sha256(path):
+    """SHA-256 do conteúdo de um arquivo"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def find_dependencies(scad_file, search_paths=()):
+    """
+    Arquivos incluídos por um modelo, recursivamente
+
+    Resolve relativo ao próprio arquivo e depois aos diretórios do
+    OPENSCADPATH, como o OpenSCAD. Dependências não encontradas entram com
+    valor None (a ausência também muda o hash).
+    """
+    dependencies = {}
+    pending = [Path(scad_file)]
+    while pending:
+        current = pending.pop()
+        try:
+            content = current.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            continue
+        for match in DEPENDENCY_PATTERN.finditer(content):
+            name = match.group(1) or match.group(2)
+            candidates = [current.parent / name] + [Path(p) / name for p in search_paths]
+            resolved = next((c.resolve() for c in candidates if c.is_file()), None)
+            key = str(resolved) if resolved else f"?{name}"
+            if key in dependencies:
+                continue
+            dependencies[key] = resolved
+            if resolved is not None and resolved.suffix == ".scad":
+                pending.append(resolved)
+    return dependencies
+
+def source_fingerprint(scad_file, search_paths=()):
+    """Hash do arquivo e de todas as dependências (com os hashes individuais)"""
+    hashes = {str(Path(scad_file).resolve()): file_sha256(scad_file)}
+    for key, path in find_dependencies(scad_file, search_paths).items():
+        hashes[key] = file_sha256(path) if path is not None else None
+    combined = hashlib.sha256(json.dumps(hashes, sort_keys=True).encode("utf-8")).hexdigest()
+    return combined, hashes
+
 class OpenSCADValidator:
-    def __init__(self, models_dir="modelos-3d/central-inteligente"):
+    def __init__(self, models_dir="modelos-3d/central-inteligente", jobs=None,
+                 manifest_path=None, force=False, openscad_cmd=("openscad",), timeout=120):
         self.models_dir = Path(models_dir)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.manifest_path = Path(manifest_path) if manifest_path else self.models_dir / MANIFEST_NAME
+        self.force = force
+        self.openscad_cmd = list(openscad_cmd)
+        self.timeout = timeout
+        self.search_paths = [p for p in os.environ.get("OPENSCADPATH", "").split(os.pathsep) if p]
+        self._print_lock = threading.Lock()
         self.results = {
             "validation_time": datetime.now().isoformat(),
-            "validator_version": "1.0",
+            "validator_version": "2.0",
             "total_files": 0,
             "valid_files": [],
             "error_files": [],
             "warning_files": [],
             "stl_generated": [],
-            "stl_failed": []
+            "stl_failed": [],
+            "skipped_files": [],
+            "render_times": {},
+            "wall_time": 0.0
         }
     
     def find_openscad_files(self):
-        """Encontra todos os arquivos .scad no diretório especificado"""
+        """Encontra todos os arquivos .scad no diretório especificado (e subdiretórios)"""
         scad_files = []
         if self.models_dir.exists():
-            scad_files = list(self.models_dir.glob("*.scad"))
+            scad_files = list(self.models_dir.rglob("*.scad"))
             scad_files.sort()
         return scad_files
     
+    def _openscad_env(self):
+        return dict(os.environ, DISPLAY=":99")  # Usar display virtual se disponível
+    
     def validate_syntax(self, scad_file):
-        """Valida a sintaxe de um arquivo OpenSCAD"""
-        try:
-            # Comando para validar sintaxe sem gerar STL
-            cmd = [
-                "openscad", 
-                "--export-format", "stl",
-                "-o", "/tmp/validation_temp.stl",  # Arquivo temporário
-                str(scad_file)
-            ]
-            
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                timeout=60,
-                env=dict(os.environ, DISPLAY=":99")  # Usar display virtual se disponível
-            )
-            
-            return {
-                "valid": result.returncode == 0,
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "file": str(scad_file)
-            }
-            
-        except subprocess.TimeoutExpired:
-            return {
-                "valid": False,
-                "stdout": "",
-                "stderr": "Timeout durante validação",
-                "file": str(scad_file)
-            }
-        except Exception as e:
-            return {
-                "valid": False,
-                "stdout": "",
-                "stderr": f"Erro durante validação: {str(e)}",
-                "file": str(scad_file)
-            }
+        """Valida a sintaxe de um arquivo OpenSCAD (renderização descartada)"""
+        with tempfile.TemporaryDirectory() as scratch:
+            result = self.generate_stl(scad_file, Path(scratch) / "validation_temp.stl")
+        return {
+            "valid": result["success"],
+            "stdout": result["stdout"],
+            "stderr": result["stderr"],
+            "file": str(scad_file)
+        }
     
     def generate_stl(self, scad_file, stl_output_path):
         """Gera arquivo STL a partir do OpenSCAD"""
+        stl_output_path = Path(stl_output_path)
+        # Arquivo temporário no mesmo diretório: o STL anterior só é trocado em caso de sucesso
+        fd, tmp_name = tempfile.mkstemp(dir=stl_output_path.parent, suffix=".tmp.stl")
+        os.close(fd)
+        tmp_path = Path(tmp_name)
         try:
-            cmd = [
-                "openscad",
-                "-o", str(stl_output_path),
-                str(scad_file)
-            ]
+            cmd = self.openscad_cmd + ["-o", str(tmp_path), str(scad_file)]
             
             result = subprocess.run(
                 cmd,
                 capture_output=True,
                 text=True,
-                timeout=120,
-                env=dict(os.environ, DISPLAY=":99")
+                timeout=self.timeout,
+                env=self._openscad_env()
             )
             
             # Verifica se o arquivo STL foi criado e não está vazio
-            stl_created = stl_output_path.exists() and stl_output_path.stat().st_size > 0
+            stl_created = result.returncode == 0 and tmp_path.stat().st_size > 0
+            if stl_created:
+                os.replace(tmp_path, stl_output_path)
             
             return {
-                "success": result.returncode == 0 and stl_created,
+                "success": stl_created,
+                "rendered": True,
                 "stdout": result.stdout,
                 "stderr": result.stderr,
                 "stl_size": stl_output_path.stat().st_size if stl_created else 0,
                 "stl_path": str(stl_output_path)
             }
             
+        except subprocess.TimeoutExpired:
+            return {
+                "success": False,
+                "rendered": False,
+                "stdout": "",
+                "stderr": "Timeout durante renderização",
+                "stl_size": 0,
+                "stl_path": str(stl_output_path)
+            }
         except Exception as e:
             return {
                 "success": False,
+                "rendered": False,
                 "stdout": "",
                 "stderr": f"Erro ao gerar STL: {str(e)}",
                 "stl_size": 0,
                 "stl_path": str(stl_output_path)
             }
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    
+    def load_manifest(self):
+        """Resultados da última execução por arquivo (vazio se ausente ou inválido)"""
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            if manifest.get("version") == MANIFEST_VERSION:
+                return manifest.get("files", {})
+        except (OSError, ValueError):
+            pass
+        return {}
+    
+    def save_manifest(self, entries):
+        """Grava o manifesto de forma atômica"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.manifest_path.parent, suffix=".json.tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": entries}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_name, self.manifest_path)
+    
+    def _manifest_key(self, scad_file):
+        try:
+            return str(scad_file.resolve().relative_to(self.models_dir.resolve()))
+        except ValueError:
+            return str(scad_file.resolve())
+    
+    def validate_file(self, scad_file, previous=None):
+        """
+        Valida e renderiza um arquivo (uma única execução do OpenSCAD)
+        
+        Se o hash do código e das dependências for igual ao do manifesto e o
+        STL ainda existir, o resultado anterior é reaproveitado sem renderizar.
+        Só vão para o manifesto execuções em que o OpenSCAD terminou (com ou
+        sem erro); timeout e falha ao executar o binário não têm entrada e o
+        arquivo é renderizado de novo na próxima vez.
+        """
+        stl_path = scad_file.with_suffix('.stl')
+        fingerprint, hashes = source_fingerprint(scad_file, self.search_paths)
+        
+        if (not self.force and previous and previous.get("fingerprint") == fingerprint and
+                (not previous["result"]["success"] or stl_path.exists())):
+            return {**previous["result"], "cached": True}, previous
+        
+        start = time.perf_counter()
+        render = self.generate_stl(scad_file, stl_path)
+        result = {
+            "file": str(scad_file),
+            "success": render["success"],
+            "stdout": render["stdout"],
+            "stderr": render["stderr"],
+            "stl_path": render["stl_path"],
+            "stl_size": render["stl_size"],
+            "render_time": round(time.perf_counter() - start, 3),
+            "analysis": self.analyze_openscad_code(scad_file),
+            "cached": False
+        }
+        if not render["rendered"]:
+            return result, None
+        entry = {"fingerprint": fingerprint, "dependencies": hashes,
+                 "result": {k: v for k, v in result.items() if k != "cached"}}
+        return result, entry
     
     def analyze_openscad_code(self, scad_file):
         """Analisa o código OpenSCAD para informações detalhadas"""
@@ -162,7 +287,7 @@ class OpenSCADValidator:
             return {"error": f"Erro ao analisar código: {str(e)}"}
     
     def run_validation(self):
-        """Executa validação completa dos modelos OpenSCAD"""
+        """Executa validação completa dos modelos OpenSCAD (renderizações em paralelo)"""
         print("🔍 Iniciando validação dos modelos OpenSCAD...")
         print("=" * 60)
         
@@ -174,72 +299,74 @@ class OpenSCADValidator:
             print("❌ Nenhum arquivo OpenSCAD encontrado no diretório")
             return self.results
         
-        print(f"📁 Encontrados {len(scad_files)} arquivos OpenSCAD:")
-        for file in scad_files:
-            print(f"   - {file.name}")
+        print(f"📁 Encontrados {len(scad_files)} arquivos OpenSCAD ({self.jobs} em paralelo)")
         print()
         
-        # Valida cada arquivo
-        for scad_file in scad_files:
-            print(f"🔍 Validando: {scad_file.name}")
-            print("-" * 40)
-            
-            # Análise do código
-            code_analysis = self.analyze_openscad_code(scad_file)
-            print(f"   📊 Análise do código:")
-            print(f"      - Tamanho: {code_analysis.get('file_size', 0):,} bytes")
-            print(f"      - Linhas totais: {code_analysis.get('total_lines', 0)}")
-            print(f"      - Linhas de código: {code_analysis.get('code_lines', 0)}")
-            print(f"      - Módulos definidos: {len(code_analysis.get('modules', []))}")
-            print(f"      - Funções definidas: {len(code_analysis.get('functions', []))}")
-            
-            # Validação de sintaxe
-            syntax_result = self.validate_syntax(scad_file)
-            
-            if syntax_result["valid"]:
-                print(f"   ✅ Sintaxe válida")
-                self.results["valid_files"].append({
-                    "file": str(scad_file),
-                    "analysis": code_analysis
-                })
-                
-                # Geração de STL
-                stl_path = scad_file.with_suffix('.stl')
-                print(f"   🖨️  Gerando arquivo STL...")
-                
-                stl_result = self.generate_stl(scad_file, stl_path)
-                
-                if stl_result["success"]:
-                    print(f"   ✅ STL gerado com sucesso: {stl_result['stl_size']:,} bytes")
-                    self.results["stl_generated"].append({
-                        "scad_file": str(scad_file),
-                        "stl_file": str(stl_path),
-                        "stl_size": stl_result["stl_size"]
-                    })
-                else:
-                    print(f"   ❌ Falha na geração do STL: {stl_result['stderr']}")
-                    self.results["stl_failed"].append({
-                        "scad_file": str(scad_file),
-                        "error": stl_result["stderr"]
-                    })
-                
-            else:
-                print(f"   ❌ Erro de sintaxe encontrado:")
-                if syntax_result["stderr"]:
-                    print(f"      Erro: {syntax_result['stderr']}")
-                if syntax_result["stdout"]:
-                    print(f"      Saída: {syntax_result['stdout']}")
-                
-                self.results["error_files"].append({
-                    "file": str(scad_file),
-                    "error": syntax_result["stderr"],
-                    "output": syntax_result["stdout"]
-                })
-            
-            print()
+        manifest = {} if self.force else self.load_manifest()
+        new_manifest = {}
+        start = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            futures = {
+                executor.submit(self.validate_file, scad_file,
+                                manifest.get(self._manifest_key(scad_file))): scad_file
+                for scad_file in scad_files
+            }
+            for future in as_completed(futures):
+                scad_file = futures[future]
+                result, entry = future.result()
+                if entry is not None:
+                    new_manifest[self._manifest_key(scad_file)] = entry
+                self._record(scad_file, result)
+        
+        self.results["wall_time"] = round(time.perf_counter() - start, 3)
+        self.save_manifest(new_manifest)
         
+        # Ordem estável no relatório, independente da ordem de conclusão
+        for key in ("valid_files", "error_files", "stl_generated", "stl_failed", "skipped_files"):
+            self.results[key].sort(key=lambda item: item.get("file", item.get("scad_file", "")))
+        
+        print()
+        print(f"⏱️  Tempo total: {self.results['wall_time']:.2f}s "
+              f"({len(self.results['skipped_files'])} sem alterações)")
         return self.results
     
+    def _record(self, scad_file, result):
+        """Registra o resultado de um arquivo e imprime uma linha de progresso"""
+        cached = result.get("cached", False)
+        render_time = result.get("render_time", 0.0)
+        self.results["render_times"][str(scad_file)] = 0.0 if cached else render_time
+        if cached:
+            self.results["skipped_files"].append({"file": str(scad_file)})
+        
+        if result["success"]:
+            self.results["valid_files"].append({
+                "file": str(scad_file),
+                "analysis": result["analysis"]
+            })
+            self.results["stl_generated"].append({
+                "scad_file": str(scad_file),
+                "stl_file": result["stl_path"],
+                "stl_size": result["stl_size"],
+                "render_time": render_time
+            })
+            status = f"✅ {result['stl_size']:,} bytes"
+        else:
+            self.results["error_files"].append({
+                "file": str(scad_file),
+                "error": result["stderr"],
+                "output": result["stdout"]
+            })
+            self.results["stl_failed"].append({
+                "scad_file": str(scad_file),
+                "error": result["stderr"]
+            })
+            status = f"❌ {result['stderr'].strip()[:80]}"
+        
+        timing = "cache" if cached else f"{render_time:.2f}s"
+        with self._print_lock:
+            print(f"   {scad_file.name:<40} [{timing:>7}] {status}")
+    
     def generate_report(self):
         """Gera relatório detalhado da validação"""
         print("=" * 60)
@@ -260,6 +387,8 @@ class OpenSCADValidator:
         print(f"   ❌ Arquivos com erro: {error_count}")
         print(f"   🖨️  STL gerados: {stl_count}")
         print(f"   🚫 STL falharam: {stl_failed_count}")
+        print(f"   ♻️  Sem alterações (pulados): {len(self.results['skipped_files'])}")
+        print(f"   ⏱️  Tempo total: {self.results['wall_time']:.2f}s")
         print()
         
         # Detalhes dos arquivos válidos
@@ -288,7 +417,8 @@ class OpenSCADValidator:
             total_size = sum(stl["stl_size"] for stl in self.results["stl_generated"])
             for stl_info in self.results["stl_generated"]:
                 stl_path = Path(stl_info["stl_file"])
-                print(f"   📁 {stl_path.name}: {stl_info['stl_size']:,} bytes")
+                print(f"   📁 {stl_path.name}: {stl_info['stl_size']:,} bytes "
+                      f"({stl_info.get('render_time', 0.0):.2f}s)")
             print(f"   📊 Tamanho total: {total_size:,} bytes")
         
         # Recomendações
@@ -314,13 +444,29 @@ class OpenSCADValidator:
         
         return self.results
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Valida e renderiza modelos OpenSCAD em paralelo")
+    parser.add_argument("models_dir", nargs="?", default="modelos-3d/central-inteligente",
+                        help="Diretório com os arquivos .scad (busca recursiva)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Renderizações simultâneas (padrão: número de CPUs)")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignorar o manifesto e renderizar todos os arquivos")
+    parser.add_argument("--manifest", default=None,
+                        help=f"Caminho do manifesto (padrão: <diretório>/{MANIFEST_NAME})")
+    parser.add_argument("--timeout", type=float, default=120,
+                        help="Tempo máximo por renderização em segundos")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Função principal"""
+    args = parse_args(argv if argv is not None else [])
     print("🚀 VALIDADOR DE MODELOS OPENSCAD - CENTRAL DE CONTROLE INTELIGENTE 3dPot")
     print("=" * 80)
     
     # Inicializa validador
-    validator = OpenSCADValidator()
+    validator = OpenSCADValidator(args.models_dir, jobs=args.jobs, manifest_path=args.manifest,
+                                  force=args.force, timeout=args.timeout)
     
     # Executa validação
     results = validator.run_validation()
@@ -337,4 +483,4 @@ def main():
         return 0
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,65 @@
+"""
+Unit tests for the headless simulation benchmark
+Testing per-case measurements and regression comparison
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "scripts" / "performance"))
+
+import benchmark_simulation
+from benchmark_simulation import compare_reports
+
+
+def _case(modelo, passos_por_s, tempo_s, tipo="drop_test", max_faces=5000):
+    return {"modelo": modelo, "tipo": tipo, "max_faces": max_faces, "status": "completed",
+            "passos_por_s": passos_por_s, "tempo_s": tempo_s}
+
+
+class TestCompareReports:
+    """Test regression detection between two reports"""
+
+    def test_flags_slower_cases_only(self):
+        """Test only cases beyond the threshold are marked as regressions"""
+        baseline = {"casos": [_case("a.stl", 1000, 1.0), _case("b.stl", 1000, 1.0)]}
+        current = {"casos": [_case("a.stl", 950, 1.05), _case("b.stl", 700, 1.4)]}
+
+        rows = compare_reports(baseline, current, threshold=0.10)
+
+        assert [(row["modelo"], row["regressao"]) for row in rows] == [
+            ("a.stl", False), ("b.stl", True)
+        ]
+        assert rows[1]["passos_por_s_razao"] == pytest.approx(0.7)
+
+    def test_ignores_cases_missing_from_baseline(self):
+        """Test new or failed cases are not compared"""
+        baseline = {"casos": [_case("a.stl", 1000, 1.0)]}
+        current = {"casos": [_case("a.stl", 1000, 1.0, max_faces=1000),
+                             {**_case("a.stl", 0, 0), "status": "failed"}]}
+
+        assert compare_reports(baseline, current) == []
+
+
+def test_run_case_measures_steps_and_memory(tmp_path):
+    """Test a real drop test case reports steps, throughput and allocations"""
+    trimesh = pytest.importorskip("trimesh")
+    pytest.importorskip("pybullet")
+
+    model_path = tmp_path / "box.stl"
+    trimesh.creation.box(extents=[0.05, 0.05, 0.05]).export(str(model_path))
+
+    case = benchmark_simulation.run_case(
+        str(model_path), "drop_test", 1000, {"drop_height": 0.5, "num_drops": 2},
+        repeats=1, cache_dir=str(tmp_path)
+    )
+
+    assert case["status"] == "completed"
+    assert case["passos"] > 0
+    assert case["passos_por_s"] > 0
+    assert case["rss_pico_mb"] > 0
+    assert case["faces_colisao"] == 12
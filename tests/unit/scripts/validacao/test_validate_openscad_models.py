@@ -0,0 +1,158 @@
+"""
+Unit tests for the parallel OpenSCAD validator
+Testing dependency hashing, the skip manifest and parallel rendering
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "scripts" / "validacao"))
+
+from validate_openscad_models import OpenSCADValidator, find_dependencies, source_fingerprint
+
+# OpenSCAD falso: grava o arquivo de saída após `RENDER_DELAY` segundos;
+# modelos contendo "erro" falham como um erro de sintaxe
+FAKE_OPENSCAD = """
+import sys, time
+output, source = sys.argv[sys.argv.index("-o") + 1], sys.argv[-1]
+time.sleep(float(sys.argv[1]))
+if "erro" in open(source).read():
+    sys.stderr.write("ERROR: Parser error")
+    sys.exit(1)
+open(output, "w").write("solid fake\\nendsolid fake\\n")
+"""
+
+
+@pytest.fixture
+def models_dir(tmp_path):
+    models = tmp_path / "modelos"
+    (models / "lib").mkdir(parents=True)
+    (models / "lib" / "parafusos.scad").write_text("module m3() { cylinder(d=3, h=10); }\n")
+    (models / "base.scad").write_text("include <lib/parafusos.scad>\ncube(10);\n")
+    (models / "tampa.scad").write_text("cube(5);\n")
+    return models
+
+
+def make_validator(tmp_path, models_dir, delay=0.0, **kwargs):
+    fake = tmp_path / "fake_openscad.py"
+    fake.write_text(FAKE_OPENSCAD)
+    return OpenSCADValidator(models_dir, openscad_cmd=[sys.executable, str(fake), str(delay)],
+                             **kwargs)
+
+
+def rendered(results):
+    return {Path(path).name for path, seconds in results["render_times"].items() if seconds > 0}
+
+
+class TestDependencies:
+    """Test include/use/import resolution"""
+
+    def test_resolves_includes_recursively(self, tmp_path):
+        (tmp_path / "a.scad").write_text('use <b.scad>\nimport("peca.stl");\n')
+        (tmp_path / "b.scad").write_text("include <c.scad>\ninclude <falta.scad>\n")
+        (tmp_path / "c.scad").write_text("cube(1);\n")
+        (tmp_path / "peca.stl").write_text("solid x\nendsolid x\n")
+
+        dependencies = find_dependencies(tmp_path / "a.scad")
+
+        names = {Path(key).name for key, path in dependencies.items() if path is not None}
+        assert names == {"b.scad", "c.scad", "peca.stl"}
+        assert dependencies["?falta.scad"] is None
+
+    def test_fingerprint_changes_with_included_file(self, models_dir):
+        before, _ = source_fingerprint(models_dir / "base.scad")
+        (models_dir / "lib" / "parafusos.scad").write_text("module m3() { cylinder(d=3.2, h=10); }\n")
+
+        assert source_fingerprint(models_dir / "base.scad")[0] != before
+
+
+class TestOpenSCADValidator:
+    """Test the manifest skips unchanged models"""
+
+    def test_second_run_skips_unchanged_files(self, tmp_path, models_dir):
+        first = make_validator(tmp_path, models_dir).run_validation()
+        second = make_validator(tmp_path, models_dir).run_validation()
+
+        assert len(first["stl_generated"]) == 3
+        assert rendered(second) == set()
+        assert len(second["skipped_files"]) == 3
+        assert len(second["valid_files"]) == 3
+
+    def test_changed_include_rerenders_dependents_only(self, tmp_path, models_dir):
+        make_validator(tmp_path, models_dir).run_validation()
+        (models_dir / "lib" / "parafusos.scad").write_text("module m3() { cylinder(d=3.2, h=10); }\n")
+
+        results = make_validator(tmp_path, models_dir).run_validation()
+
+        assert rendered(results) == {"base.scad", "parafusos.scad"}
+
+    def test_missing_stl_is_rendered_again(self, tmp_path, models_dir):
+        make_validator(tmp_path, models_dir).run_validation()
+        (models_dir / "tampa.stl").unlink()
+
+        results = make_validator(tmp_path, models_dir).run_validation()
+
+        assert rendered(results) == {"tampa.scad"}
+        assert (models_dir / "tampa.stl").exists()
+
+    def test_force_renders_everything(self, tmp_path, models_dir):
+        make_validator(tmp_path, models_dir).run_validation()
+
+        results = make_validator(tmp_path, models_dir, force=True).run_validation()
+
+        assert len(rendered(results)) == 3
+        assert results["skipped_files"] == []
+
+    def test_failed_render_is_reported(self, tmp_path, models_dir):
+        (models_dir / "quebrado.scad").write_text("erro(\n")
+
+        results = make_validator(tmp_path, models_dir).run_validation()
+
+        assert [Path(e["file"]).name for e in results["error_files"]] == ["quebrado.scad"]
+        assert "Parser error" in results["error_files"][0]["error"]
+        assert not (models_dir / "quebrado.stl").exists()
+        assert not list(models_dir.glob("*.tmp.stl"))
+
+    def test_parse_error_is_cached(self, tmp_path, models_dir):
+        (models_dir / "quebrado.scad").write_text("erro(\n")
+        make_validator(tmp_path, models_dir).run_validation()
+
+        results = make_validator(tmp_path, models_dir).run_validation()
+
+        assert rendered(results) == set()
+        assert [Path(e["file"]).name for e in results["error_files"]] == ["quebrado.scad"]
+
+    def test_missing_binary_is_not_cached(self, tmp_path, models_dir):
+        broken = OpenSCADValidator(models_dir, openscad_cmd=[str(tmp_path / "sem-openscad")])
+        assert len(broken.run_validation()["error_files"]) == 3
+
+        results = make_validator(tmp_path, models_dir).run_validation()
+
+        assert len(rendered(results)) == 3
+        assert len(results["stl_generated"]) == 3
+
+    def test_timeout_is_not_cached(self, tmp_path, models_dir):
+        make_validator(tmp_path, models_dir, delay=5, timeout=0.2, jobs=3).run_validation()
+
+        results = make_validator(tmp_path, models_dir).run_validation()
+
+        assert len(results["stl_generated"]) == 3
+
+    def test_renders_in_parallel(self, tmp_path):
+        models = tmp_path / "paralelo"
+        models.mkdir()
+        for i in range(4):
+            (models / f"peca{i}.scad").write_text(f"cube({i + 1});\n")
+
+        start = time.perf_counter()
+        results = make_validator(tmp_path, models, delay=0.5, jobs=4).run_validation()
+        elapsed = time.perf_counter() - start
+
+        assert len(results["stl_generated"]) == 4
+        assert all(seconds >= 0.5 for seconds in results["render_times"].values())
+        assert elapsed < 1.5
@@ -0,0 +1,155 @@
+"""
+Unit tests for batch model generation
+Testing spec-hash deduplication, streaming order and published events
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.batch_generation import (
+    BatchGenerationJob,
+    BatchItem,
+    batch_channel,
+    batch_room,
+)
+from backend.services.simulation_progress import SimulationProgressRelay
+
+
+class FakeModelingService:
+    """Serviço de modelagem falso: largura define o tempo de geração"""
+
+    def __init__(self, fail_width=None):
+        self.renders = []
+        self.fail_width = fail_width
+
+    def generation_key(self, specifications, engine=None, format=None):
+        return json.dumps(specifications, sort_keys=True)
+
+    async def generate_model_from_specs_async(self, specifications, project_id=None,
+                                              engine=None, format=None, job_id=None):
+        width = specifications["dimensoes"]["largura"]
+        if job_id is not None:
+            # Apenas o primeiro de cada grupo renderiza; duplicatas vêm do cache
+            self.renders.append(width)
+            await asyncio.sleep(width / 1000)
+        success = width != self.fail_width
+        return SimpleNamespace(
+            success=success,
+            model_path=f"/models/{width}_{project_id}.stl" if success else None,
+            message="Modelo gerado com sucesso" if job_id and success else "Modelo recuperado do cache",
+            validation_passed=success,
+            generation_time=width / 1000
+        )
+
+
+class FakeRedis:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+
+def make_items(widths):
+    return [
+        BatchItem(index=i, specifications={"categoria": "mecanico", "dimensoes": {"largura": w}},
+                  project_id=f"p{i}")
+        for i, w in enumerate(widths)
+    ]
+
+
+async def collect(job):
+    return [result async for result in job.run()]
+
+
+class TestBatchGenerationJob:
+    """Test deduplication and result streaming"""
+
+    def test_identical_specs_render_once(self):
+        """Test duplicates share one render and still get their own result"""
+        service = FakeModelingService()
+        job = BatchGenerationJob(service, make_items([30, 10, 30, 30, 10]))
+
+        results = asyncio.run(collect(job))
+
+        assert job.unique_models == 2
+        assert sorted(service.renders) == [10, 30]
+        assert sorted(r["request_index"] for r in results) == [0, 1, 2, 3, 4]
+        assert sum(r["deduplicated"] for r in results) == 3
+        assert all(r["success"] for r in results)
+
+    def test_results_stream_as_models_finish(self):
+        """Test fast models are delivered before slow ones regardless of order"""
+        job = BatchGenerationJob(FakeModelingService(), make_items([200, 50, 5]))
+
+        results = asyncio.run(collect(job))
+
+        assert [r["request_index"] for r in results] == [2, 1, 0]
+
+    def test_failed_render_fails_duplicates(self):
+        """Test duplicates of a failed model fail without another render"""
+        service = FakeModelingService(fail_width=20)
+        job = BatchGenerationJob(service, make_items([20, 20, 10]))
+
+        results = asyncio.run(collect(job))
+
+        assert service.renders.count(20) == 1
+        assert [r["success"] for r in sorted(results, key=lambda r: r["request_index"])] == [
+            False, False, True
+        ]
+
+    def test_ndjson_ends_with_summary(self):
+        """Test each NDJSON line is a result and the last one the batch summary"""
+        job = BatchGenerationJob(FakeModelingService(fail_width=10), make_items([10, 20, 20]))
+
+        async def body():
+            return b"".join([chunk async for chunk in job.ndjson()])
+
+        lines = [json.loads(line) for line in asyncio.run(body()).decode().splitlines()]
+
+        assert [line["event"] for line in lines] == ["result"] * 3 + ["completed"]
+        assert lines[-1] == {
+            "event": "completed",
+            "batch_id": job.batch_id,
+            "total_requests": 3,
+            "unique_models": 2,
+            "successful": 2,
+            "failed": 1,
+        }
+
+
+class TestBatchEvents:
+    """Test events published for the WebSocket room"""
+
+    def test_publish_started_results_and_summary(self):
+        """Test the batch channel receives started, one event per result and completed"""
+        redis = FakeRedis()
+        job = BatchGenerationJob(FakeModelingService(), make_items([10, 10]), batch_id="b1")
+
+        summary = asyncio.run(job.publish(redis))
+
+        channels = {channel for channel, _ in redis.published}
+        events = [message["event"] for _, message in redis.published]
+        assert channels == {batch_channel("b1")}
+        assert events == ["started", "result", "result", "completed"]
+        assert summary["successful"] == 2
+
+    def test_relay_delivers_to_batch_room(self):
+        """Test the progress relay can route batch events by batch_id"""
+        sent = []
+
+        class Manager:
+            async def send_to_room(self, room, message):
+                sent.append((room, message))
+
+        relay = SimulationProgressRelay(Manager(), channel="modeling_batch",
+                                        room=batch_room, id_field="batch_id")
+        message = {"type": "modeling_batch", "batch_id": "b1", "event": "completed"}
+
+        assert asyncio.run(relay.handle_message(json.dumps(message))) is True
+        assert sent == [("modeling_batch_b1", message)]
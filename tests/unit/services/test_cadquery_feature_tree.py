@@ -0,0 +1,154 @@
+"""
+Unit tests for the incremental feature-tree evaluator
+Testing prefix keys, partial re-evaluation and the disk-backed solid cache
+"""
+
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.cadquery_feature_tree import (
+    FeatureStage,
+    FeatureTreeCache,
+    FeatureTreeEvaluator,
+    stage_keys,
+)
+
+
+def pickle_dump(model, path):
+    path.write_bytes(pickle.dumps(model))
+
+
+def pickle_load(path):
+    return pickle.loads(path.read_bytes())
+
+
+class Recorder:
+    """Estágios falsos: a "geometria" é a tupla das operações aplicadas"""
+
+    def __init__(self):
+        self.executed = []
+
+    def stages(self, width, features):
+        def op(name):
+            def apply(model):
+                self.executed.append(name)
+                return (model or ()) + (name,)
+            return apply
+
+        stages = [FeatureStage("base", {"largura": width}, op(f"box{width}"))]
+        for feature in features:
+            stages.append(FeatureStage("feature", feature, op(f"{feature['nome']}{feature['diametro']}")))
+        return stages
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FeatureTreeCache(dump=pickle_dump, load=pickle_load, cache_dir=tmp_path / "features",
+                            suffix=".pkl")
+
+
+FEATURES = [{"nome": "furo", "diametro": 3}, {"nome": "furo", "diametro": 5}, {"nome": "furo", "diametro": 8}]
+
+
+class TestStageKeys:
+    """Test the prefix hash chain"""
+
+    def test_changing_a_stage_changes_it_and_all_later_keys(self):
+        recorder = Recorder()
+        original = stage_keys(recorder.stages(50, FEATURES))
+        edited = stage_keys(recorder.stages(50, FEATURES[:1] + [{"nome": "furo", "diametro": 6}] + FEATURES[2:]))
+
+        assert original[:2] == edited[:2]
+        assert original[2] != edited[2]
+        assert original[3] != edited[3]
+
+    def test_equivalent_numbers_share_keys(self):
+        recorder = Recorder()
+
+        assert stage_keys(recorder.stages(50, [])) == stage_keys(recorder.stages(50.0, []))
+
+
+class TestFeatureTreeEvaluator:
+    """Test only changed stages are re-executed"""
+
+    def test_editing_last_feature_reruns_only_it(self, cache):
+        recorder = Recorder()
+        evaluator = FeatureTreeEvaluator(cache)
+        evaluator.evaluate(recorder.stages(50, FEATURES))
+        recorder.executed.clear()
+
+        edited = FEATURES[:2] + [{"nome": "furo", "diametro": 10}]
+        result = evaluator.evaluate(recorder.stages(50, edited))
+
+        assert recorder.executed == ["furo10"]
+        assert result.model == ("box50", "furo3", "furo5", "furo10")
+        assert (result.reused_stages, result.executed_stages) == (3, 1)
+
+    def test_identical_tree_executes_nothing(self, cache):
+        recorder = Recorder()
+        evaluator = FeatureTreeEvaluator(cache)
+        first = evaluator.evaluate(recorder.stages(50, FEATURES))
+        recorder.executed.clear()
+
+        again = evaluator.evaluate(recorder.stages(50, FEATURES))
+
+        assert recorder.executed == []
+        assert again.model == first.model
+
+    def test_changing_base_rebuilds_everything(self, cache):
+        recorder = Recorder()
+        evaluator = FeatureTreeEvaluator(cache)
+        evaluator.evaluate(recorder.stages(50, FEATURES))
+        recorder.executed.clear()
+
+        evaluator.evaluate(recorder.stages(60, FEATURES))
+
+        assert len(recorder.executed) == 4
+
+    def test_disk_cache_is_shared_between_processes(self, tmp_path):
+        """Test a fresh cache (another worker) reuses solids written to disk"""
+        recorder = Recorder()
+        FeatureTreeEvaluator(FeatureTreeCache(pickle_dump, pickle_load, tmp_path, suffix=".pkl")).evaluate(
+            recorder.stages(50, FEATURES)
+        )
+        recorder.executed.clear()
+
+        other_worker = FeatureTreeEvaluator(FeatureTreeCache(pickle_dump, pickle_load, tmp_path, suffix=".pkl"))
+        result = other_worker.evaluate(recorder.stages(50, FEATURES + [{"nome": "furo", "diametro": 1}]))
+
+        assert recorder.executed == ["furo1"]
+        assert result.reused_stages == 4
+
+    def test_root_separates_engine_versions(self, cache):
+        recorder = Recorder()
+        FeatureTreeEvaluator(cache, root="cadquery-2.3").evaluate(recorder.stages(50, FEATURES))
+        recorder.executed.clear()
+
+        FeatureTreeEvaluator(cache, root="cadquery-2.4").evaluate(recorder.stages(50, FEATURES))
+
+        assert len(recorder.executed) == 4
+
+
+class TestFeatureTreeCache:
+    """Test the disk tier"""
+
+    def test_corrupt_entry_is_dropped(self, cache):
+        cache.put("k", ("box",))
+        cache._memory.clear()
+        cache._entry_path("k").write_bytes(b"not a pickle")
+
+        assert cache.get("k") is None
+        assert not cache._entry_path("k").exists()
+
+    def test_eviction_keeps_disk_under_limit(self, tmp_path):
+        cache = FeatureTreeCache(pickle_dump, pickle_load, tmp_path, max_bytes=600, suffix=".pkl")
+        for i in range(10):
+            cache.put(f"k{i}", ("x" * 100, i))
+
+        assert cache.stats()["bytes"] <= 600
+        assert cache.get("k9") == ("x" * 100, 9)
@@ -0,0 +1,199 @@
+"""
+Unit tests for the collision shape cache
+Testing content-addressed keys, decimation, npz persistence and LRU eviction
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+trimesh = pytest.importorskip("trimesh")
+p = pytest.importorskip("pybullet")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services import collision_shape_cache
+from backend.services.collision_shape_cache import (
+    CollisionShapeCache,
+    decimate_vertex_clustering,
+    file_content_hash,
+)
+
+
+@pytest.fixture
+def sphere_stl(tmp_path):
+    """Esfera de alta resolução salva como STL"""
+    path = tmp_path / "sphere.stl"
+    trimesh.creation.icosphere(subdivisions=4, radius=0.05).export(str(path))
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Cache isolado sem decomposição (casco único)"""
+    return CollisionShapeCache(tmp_path / "cache", max_faces=500, decompose=False)
+
+
+class TestDecimation:
+    """Test vertex clustering decimation"""
+
+    def test_small_mesh_is_untouched(self):
+        """Test meshes under the face budget are returned as-is"""
+        box = trimesh.creation.box()
+        vertices, faces = decimate_vertex_clustering(box.vertices, box.faces, 100)
+
+        assert vertices is box.vertices
+        assert faces is box.faces
+
+    def test_decimation_respects_face_budget(self):
+        """Test large meshes are reduced below the face budget"""
+        sphere = trimesh.creation.icosphere(subdivisions=4)
+        vertices, faces = decimate_vertex_clustering(
+            np.asarray(sphere.vertices), np.asarray(sphere.faces), 500
+        )
+
+        assert 0 < len(faces) <= 500
+        assert faces.max() < len(vertices)
+        assert np.allclose(np.abs(vertices).max(), 1.0, atol=0.1)
+
+
+class TestCollisionShapeCache:
+    """Test collision shape cache behaviour"""
+
+    def test_key_depends_on_content_not_path(self, cache, sphere_stl, tmp_path):
+        """Test identical files share a key and edited files do not"""
+        copy = tmp_path / "copy.stl"
+        copy.write_bytes(sphere_stl.read_bytes())
+        assert cache.cache_key(sphere_stl) == cache.cache_key(copy)
+
+        trimesh.creation.box().export(str(copy))
+        assert cache.cache_key(sphere_stl) != cache.cache_key(copy)
+
+    def test_miss_then_memory_hit(self, cache, sphere_stl):
+        """Test second lookup is served from memory"""
+        first = cache.get(sphere_stl)
+        second = cache.get(sphere_stl)
+
+        assert second is first
+        assert first.path.exists()
+        assert first.vertices.dtype == np.float32
+        assert first.faces.dtype == np.int32
+
+    def test_disk_hit_skips_mesh_parsing(self, cache, sphere_stl, monkeypatch):
+        """Test a fresh worker loads the npz blob without calling trimesh"""
+        cache.get(sphere_stl)
+        cache._memory.clear()
+
+        def fail_load(*args, **kwargs):
+            raise AssertionError("trimesh.load não deveria ser chamado")
+
+        monkeypatch.setattr(trimesh, "load", fail_load)
+        monkeypatch.setattr(collision_shape_cache, "ingest_mesh", fail_load)
+        data = cache.get(sphere_stl)
+
+        assert len(data.faces) <= 500
+
+    def test_lru_eviction_removes_oldest_entry(self, tmp_path):
+        """Test eviction keeps the cache under max_bytes"""
+        cache = CollisionShapeCache(tmp_path / "cache", max_faces=500, decompose=False)
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"box_{i}.stl"
+            trimesh.creation.box(extents=[1 + i, 1, 1]).export(str(path))
+            paths.append(path)
+
+        oldest = cache.get(paths[0])
+        old_time = time.time() - 3600
+        os.utime(oldest.path, (old_time, old_time))
+        entry_size = oldest.path.stat().st_size
+
+        cache.max_bytes = entry_size * 2 + entry_size // 2
+        cache.get(paths[1])
+        cache.get(paths[2])
+
+        assert not oldest.path.exists()
+        assert cache.stats()["entries"] == 2
+
+    def test_create_collision_shape_single_hull(self, cache, sphere_stl):
+        """Test cached data produces a valid PyBullet shape"""
+        client = p.connect(p.DIRECT)
+        try:
+            shape = cache.create_collision_shape(sphere_stl, client)
+            assert shape >= 0
+        finally:
+            p.disconnect(client)
+
+    def test_decomposed_shape_is_compound(self, tmp_path):
+        """Test convex decomposition stores several hulls and loads them"""
+        # Peça em "L": não convexa, deve gerar mais de um casco
+        part = trimesh.util.concatenate([
+            trimesh.creation.box(extents=[0.1, 0.02, 0.02]),
+            trimesh.creation.box(
+                extents=[0.02, 0.1, 0.02],
+                transform=trimesh.transformations.translation_matrix([0.04, 0.04, 0])
+            )
+        ])
+        path = tmp_path / "l_part.stl"
+        part.export(str(path))
+
+        cache = CollisionShapeCache(tmp_path / "cache", decompose=True)
+        data = cache.get(path)
+        assert len(data.hulls) >= 2
+
+        client = p.connect(p.DIRECT)
+        try:
+            assert cache.create_collision_shape(path, client) >= 0
+        finally:
+            p.disconnect(client)
+
+
+def test_hulls_obj_faces_match_vertices(tmp_path):
+    """Test each hull object indexes its own hull vertices, interior points dropped"""
+    rng = np.random.default_rng(0)
+    cube = trimesh.creation.box(extents=[1, 1, 1]).vertices
+    hulls = [np.vstack([cube, rng.uniform(-0.4, 0.4, (20, 3))]), cube + 5]
+    obj_path = tmp_path / "hulls.obj"
+
+    CollisionShapeCache._write_hulls_obj(hulls, obj_path)
+
+    objects, vertices = [], []
+    for line in obj_path.read_text().splitlines():
+        kind, *values = line.split()
+        if kind == "o":
+            objects.append((len(vertices), []))
+        elif kind == "v":
+            vertices.append([float(v) for v in values])
+        elif kind == "f":
+            objects[-1][1].append([int(v) - 1 for v in values])
+    assert len(objects) == 2
+    for index, (start, faces) in enumerate(objects):
+        end = objects[index + 1][0] if index + 1 < len(objects) else len(vertices)
+        faces = np.asarray(faces)
+        assert end - start == 8 and faces.min() >= start and faces.max() < end
+        part = trimesh.Trimesh(np.asarray(vertices)[start:end], faces - start, process=False)
+        assert part.is_watertight and part.volume == pytest.approx(1.0)
+
+
+def test_hash_memo_is_bounded(cache, tmp_path, monkeypatch):
+    """Test memoized content hashes are evicted least recently used first"""
+    monkeypatch.setattr(collision_shape_cache, "HASH_MEMO_ENTRIES", 2)
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"part_{i}.stl"
+        path.write_bytes(bytes([i]) * 16)
+        paths.append(path)
+
+    for path in paths:
+        cache.cache_key(path)
+
+    assert [key[0] for key in cache._hash_memo] == [str(paths[1]), str(paths[2])]
+
+
+def test_file_content_hash_is_stable(sphere_stl):
+    """Test hashing the same file twice gives the same digest"""
+    assert file_content_hash(sphere_stl) == file_content_hash(sphere_stl)
+    assert len(file_content_hash(sphere_stl)) == 64
@@ -0,0 +1,149 @@
+"""
+Unit tests for the print farm scheduler
+Testing compatibility filters, load balancing, material grouping and planning speed
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.farm_scheduler import FarmJob, FarmPrinter, schedule_jobs
+
+VOLUME = (220.0, 220.0, 250.0)
+
+
+def printer(name, materials=("pla",), volume=VOLUME, **kwargs):
+    return FarmPrinter(name, frozenset(materials), volume, **kwargs)
+
+
+def job(name, material="pla", duration=3600, **kwargs):
+    return FarmJob(name, material, duration, **kwargs)
+
+
+def placement(plan):
+    return {item.job_id: item.printer_id for item in plan.assignments}
+
+
+class TestCompatibility:
+    """Test material, build volume and nozzle matching"""
+
+    def test_material_must_be_supported(self):
+        plan = schedule_jobs([printer("pla", ["pla"]), printer("petg", ["petg"])],
+                             [job("a", "petg"), job("b", "abs")])
+
+        assert placement(plan) == {"a": "petg"}
+        assert "material" in plan.unassigned["b"]
+
+    def test_part_may_rotate_on_the_bed(self):
+        small = (200.0, 100.0, 100.0)
+
+        plan = schedule_jobs([printer("small", volume=small)],
+                             [job("rotated", dimensions_mm=(90, 190, 50)), job("tall", dimensions_mm=(50, 50, 150))])
+
+        assert placement(plan) == {"rotated": "small"}
+        assert "volume" in plan.unassigned["tall"]
+
+    def test_required_nozzle(self):
+        plan = schedule_jobs([printer("fine", nozzle_mm=0.4), printer("coarse", nozzle_mm=0.6)],
+                             [job("a", nozzle_mm=0.6), job("b", nozzle_mm=0.8)])
+
+        assert placement(plan) == {"a": "coarse"}
+        assert "bico" in plan.unassigned["b"]
+
+    def test_no_printers(self):
+        plan = schedule_jobs([], [job("a")])
+
+        assert plan.assignments == [] and "a" in plan.unassigned
+
+
+class TestBalancing:
+    """Test makespan against queue ETAs"""
+
+    def test_busy_printer_gets_less_work(self):
+        plan = schedule_jobs([printer("busy", ready_in_s=4 * 3600), printer("idle")],
+                             [job(i) for i in range(4)])
+
+        loads = {key: len(items) for key, items in plan.by_printer().items()}
+        assert loads == {"idle": 4} or loads["idle"] > loads.get("busy", 0)
+        assert plan.makespan_s == pytest.approx(4 * 3600)
+
+    def test_local_search_reaches_optimal_split(self):
+        # Lista gulosa (LPT) dá 7 + 5 + 4 = 16 contra 8 + 7 ; o ótimo é 12 / 12
+        durations = [7, 6, 5, 4, 2]
+        jobs = [job(i, duration=d * 3600) for i, d in enumerate(durations)]
+
+        plan = schedule_jobs([printer("a"), printer("b")], jobs)
+
+        assert plan.makespan_s == pytest.approx(12 * 3600)
+
+    def test_schedule_is_consistent(self):
+        plan = schedule_jobs([printer("a", ready_in_s=600), printer("b")], [job(i) for i in range(5)])
+
+        for items in plan.by_printer().values():
+            for previous, current in zip(items, items[1:]):
+                assert current.start_s >= previous.end_s
+        assert max(item.end_s for item in plan.assignments) == pytest.approx(plan.makespan_s)
+
+    def test_priority_jobs_start_first(self):
+        jobs = [job("low", duration=7200, priority="low"), job("urgent", priority="urgent")]
+
+        plan = schedule_jobs([printer("a")], jobs)
+
+        assert [item.job_id for item in plan.assignments] == ["urgent", "low"]
+
+
+class TestMaterialSwaps:
+    """Test material grouping"""
+
+    def test_groups_materials_per_printer(self):
+        printers = [printer(name, ["pla", "petg"]) for name in ("a", "b")]
+        jobs = [job(f"pla{i}", "pla") for i in range(2)] + [job(f"petg{i}", "petg") for i in range(2)]
+
+        plan = schedule_jobs(printers, jobs, swap_penalty_s=1800)
+
+        assert plan.material_swaps == 0
+        by_printer = {key: {item.job_id[:3] for item in items} for key, items in plan.by_printer().items()}
+        assert sorted(map(sorted, by_printer.values())) == [["pet"], ["pla"]]
+
+    def test_loaded_material_avoids_swap(self):
+        printers = [printer("has_petg", ["pla", "petg"], loaded_material="petg"),
+                    printer("has_pla", ["pla", "petg"], loaded_material="pla")]
+
+        plan = schedule_jobs(printers, [job("a", "petg"), job("b", "pla")])
+
+        assert placement(plan) == {"a": "has_petg", "b": "has_pla"}
+        assert plan.material_swaps == 0
+
+    def test_swap_penalty_in_timeline(self):
+        plan = schedule_jobs([printer("a", ["pla", "petg"], loaded_material="pla")],
+                             [job("x", "petg", 600)], swap_penalty_s=900)
+
+        assert plan.assignments[0].material_swap
+        assert plan.assignments[0].start_s == pytest.approx(900)
+
+
+class TestScale:
+    """Test the farm size from the request"""
+
+    def test_hundred_printers_thousand_jobs(self):
+        rng = random.Random(7)
+        materials = [f"m{i}" for i in range(6)]
+        printers = [printer(i, rng.sample(materials, 3), rng.choice([(220, 220, 250), (300, 300, 400)]),
+                            ready_in_s=rng.uniform(0, 7200), loaded_material=rng.choice(materials))
+                    for i in range(100)]
+        jobs = [job(i, rng.choice(materials), rng.uniform(600, 36000),
+                    dimensions_mm=(rng.uniform(10, 250), rng.uniform(10, 250), rng.uniform(5, 300)))
+                for i in range(1000)]
+
+        plan = schedule_jobs(printers, jobs)
+
+        assert len(plan.assignments) + len(plan.unassigned) == 1000
+        assert plan.planning_time_s < 1.0
+        greedy = schedule_jobs(printers, jobs, search_time_s=0)
+        assert plan.makespan_s <= greedy.makespan_s
@@ -0,0 +1,149 @@
+"""
+Unit tests for the fluid drag engine
+Testing silhouette areas, telemetry ring buffer and applied drag
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+trimesh = pytest.importorskip("trimesh")
+p = pytest.importorskip("pybullet")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.fluid_drag import (
+    FluidDragEngine,
+    ProjectedAreaTable,
+    TelemetryRingBuffer,
+    silhouette_area,
+    terminal_velocity_step,
+)
+
+
+@pytest.fixture
+def physics_client():
+    """Cliente PyBullet DIRECT isolado por teste"""
+    client = p.connect(p.DIRECT)
+    yield client
+    p.disconnect(client)
+
+
+@pytest.fixture
+def cube():
+    """Cubo de 5 cm"""
+    return trimesh.creation.box(extents=[0.05, 0.05, 0.05])
+
+
+class TestSilhouetteArea:
+    """Test projected area from the mesh silhouette"""
+
+    def test_cube_face_and_diagonal(self, cube):
+        """Test a cube projects a square along an axis and a hexagon along the diagonal"""
+        assert silhouette_area(cube.vertices, cube.faces, [0, 0, 1]) == pytest.approx(0.0025, rel=0.01)
+        assert silhouette_area(cube.vertices, cube.faces, [1, 1, 1]) == pytest.approx(
+            0.0025 * np.sqrt(3), rel=0.01
+        )
+
+    def test_sphere_is_a_disc(self):
+        """Test a sphere projects a disc in any direction"""
+        sphere = trimesh.creation.icosphere(subdivisions=3, radius=0.05)
+
+        for direction in ([0, 0, 1], [0.3, -0.7, 0.2]):
+            area = silhouette_area(sphere.vertices, sphere.faces, direction)
+            assert area == pytest.approx(np.pi * 0.05 ** 2, rel=0.02)
+
+    def test_hole_is_not_covered(self):
+        """Test overlapping faces count once and holes stay empty"""
+        ring = trimesh.creation.annulus(r_min=0.02, r_max=0.05, height=0.01)
+        area = silhouette_area(ring.vertices, ring.faces, [0, 0, 1])
+
+        assert area == pytest.approx(np.pi * (0.05 ** 2 - 0.02 ** 2), rel=0.02)
+
+    def test_table_lookup_is_symmetric(self, cube):
+        """Test opposite flow directions read the same area"""
+        table = ProjectedAreaTable.from_mesh(cube.vertices, cube.faces, num_directions=16)
+
+        assert table.lookup(np.array([0, 0, -1.0])) == table.lookup(np.array([0, 0, 1.0]))
+        assert table.lookup(np.array([0, 0, 1.0])) == pytest.approx(0.0025, rel=0.01)
+
+
+class TestTelemetryRingBuffer:
+    """Test preallocated telemetry storage"""
+
+    def test_decimation(self):
+        """Test only every N-th step is recorded"""
+        buffer = TelemetryRingBuffer(100, columns=("step",), decimation=4)
+        for step in range(20):
+            buffer.record(step, (step,))
+
+        assert buffer.to_array()[:, 0].tolist() == [0, 4, 8, 12, 16]
+
+    def test_wraps_keeping_latest_samples(self):
+        """Test a full buffer keeps the newest samples in chronological order"""
+        buffer = TelemetryRingBuffer(5, columns=("step",))
+        for step in range(12):
+            buffer.record(step, (step,))
+
+        assert len(buffer) == 5
+        assert buffer.to_columns()["step"].tolist() == [7, 8, 9, 10, 11]
+
+
+class TestFluidDragEngine:
+    """Test drag applied to the body in the step loop"""
+
+    def test_reaches_theoretical_terminal_velocity(self, physics_client, cube):
+        """Test a cube falling in water settles at sqrt(2mg / (rho Cd A))"""
+        shape = p.createCollisionShape(
+            p.GEOM_BOX, halfExtents=[0.025] * 3, physicsClientId=physics_client
+        )
+        table = ProjectedAreaTable.from_mesh(cube.vertices, cube.faces, num_directions=16)
+        engine = FluidDragEngine(physics_client, shape, table, mass=1.0)
+
+        run = engine.run(5.0, fluid_density=1000, drag_coefficient=0.47,
+                         initial_velocity=0, start_height=100)
+
+        expected = np.sqrt(2 * 9.8 / (1000 * 0.47 * 0.0025))
+        assert run["speeds"][-1] == pytest.approx(expected, rel=0.02)
+        assert run["drag_forces"][-1] == pytest.approx(9.8, rel=0.05)
+
+    def test_mass_override_scales_terminal_velocity(self, physics_client, cube):
+        """Test a four times heavier body settles twice as fast"""
+        shape = p.createCollisionShape(
+            p.GEOM_BOX, halfExtents=[0.025] * 3, physicsClientId=physics_client
+        )
+        table = ProjectedAreaTable.from_mesh(cube.vertices, cube.faces, num_directions=16)
+        engine = FluidDragEngine(physics_client, shape, table)
+
+        light = engine.run(5.0, fluid_density=1000, drag_coefficient=0.47, start_height=100)
+        heavy = engine.run(5.0, fluid_density=1000, drag_coefficient=0.47, start_height=100, mass=4.0)
+
+        assert engine.mass == 4.0
+        assert heavy["speeds"][-1] == pytest.approx(2 * light["speeds"][-1], rel=0.02)
+
+    def test_records_decimated_telemetry(self, physics_client, cube):
+        """Test telemetry rows follow the decimation and stop at the ground"""
+        shape = p.createCollisionShape(
+            p.GEOM_BOX, halfExtents=[0.025] * 3, physicsClientId=physics_client
+        )
+        table = ProjectedAreaTable.from_mesh(cube.vertices, cube.faces, num_directions=16)
+        engine = FluidDragEngine(physics_client, shape, table)
+        telemetry = TelemetryRingBuffer(1000, decimation=10)
+
+        run = engine.run(10.0, fluid_density=1.2, drag_coefficient=0.47,
+                         start_height=2.0, telemetry=telemetry)
+
+        assert run["num_steps"] < 2400
+        assert len(telemetry) == -(-run["num_steps"] // 10)
+        assert telemetry.to_columns()["posicao_z"][0] == pytest.approx(2.0)
+
+
+def test_terminal_velocity_step_matches_window_variance():
+    """Test the rolling-variance search matches a direct window check"""
+    speeds = np.concatenate([np.linspace(0, 5, 300), np.full(200, 5.0)])
+    step = terminal_velocity_step(speeds)
+
+    assert np.var(speeds[step - 119:step + 1]) < 0.1
+    assert np.var(speeds[step - 120:step]) >= 0.1
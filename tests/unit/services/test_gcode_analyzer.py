@@ -0,0 +1,184 @@
+"""
+Unit tests for the G-code analyzer
+Testing modal state, trapezoidal timing, layers, compressed files and the slicer cross-check
+"""
+
+import gzip
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+trimesh = pytest.importorskip("trimesh")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.gcode_analyzer import MachineLimits, analyze_gcode, analyze_gcode_chunks, estimate_model_print
+from backend.services.slicer import SliceSettings, iter_gcode, slice_to_gcode
+
+# Limites altos: movimentos à velocidade programada, como a estimativa do fatiador
+UNLIMITED = MachineLimits(max_feedrate=(1e6, 1e6, 1e6, 1e6), max_acceleration=(1e9, 1e9, 1e9, 1e9),
+                          print_acceleration=1e9, travel_acceleration=1e9, retract_acceleration=1e9)
+
+
+def analyze(text, limits=UNLIMITED, **kwargs):
+    return analyze_gcode(text.encode(), limits=limits, **kwargs)
+
+
+@pytest.fixture
+def box():
+    return trimesh.creation.box(extents=[20, 10, 5])
+
+
+class TestModalState:
+    """Test positions, extrusion modes and dwell"""
+
+    def test_absolute_moves_and_feedrate(self):
+        result = analyze("G90\nG1 X10 F600\nG1 Y10\nG0 X0 Y0 F1200\n")
+
+        assert result.moves == 3
+        assert result.travel_path_mm == pytest.approx(20 + np.hypot(10, 10))
+        assert result.print_time_s == pytest.approx(2 + np.hypot(10, 10) / 20)
+
+    def test_relative_positioning(self):
+        result = analyze("G91\nG1 X5 F600\nG1 X5\nG90\nG1 X0\n")
+
+        assert result.travel_path_mm == pytest.approx(20)
+
+    def test_absolute_extrusion_with_reset(self):
+        result = analyze("M82\nG1 X10 E2 F600\nG92 E0\nG1 X20 E3\n")
+
+        assert result.filament_length_mm == pytest.approx(5)
+        assert result.extrusion_path_mm == pytest.approx(20)
+
+    def test_relative_extrusion_and_retraction(self):
+        result = analyze("M83\nG1 X10 E1 F600\nG1 E-0.5 F1500\nG1 E0.5\nG1 X20 E1\n")
+
+        assert result.filament_length_mm == pytest.approx(2)
+        assert result.retractions == 1
+
+    def test_dwell_and_comments(self):
+        result = analyze("G4 P500 ; meio segundo\nG4 S2\n; G1 X100 F60\nG1 X1 F60 ; comentário X99\n")
+
+        assert result.dwell_time_s == pytest.approx(2.5)
+        assert result.travel_path_mm == pytest.approx(1)
+
+
+class TestTiming:
+    """Test acceleration and feedrate limits"""
+
+    def test_acceleration_adds_time(self):
+        text = "G1 X100 F6000\n"
+
+        fast = analyze(text)
+        slow = analyze("M204 T100\n" + text, limits=MachineLimits())
+
+        assert fast.print_time_s == pytest.approx(1)
+        # Triângulo: acelera até 50 mm e desacelera, v_pico = sqrt(100 * 100) < 100 mm/s
+        assert slow.print_time_s == pytest.approx(2 * np.sqrt(100 / 100))
+
+    def test_max_feedrate_caps_cruise(self):
+        result = analyze("M203 X10\nG1 X100 F6000\n")
+
+        assert result.print_time_s == pytest.approx(10)
+
+    def test_straight_line_keeps_speed_through_junction(self):
+        limits = MachineLimits(print_acceleration=1000, travel_acceleration=1000)
+
+        single = analyze("G1 X100 F3000\n", limits=limits)
+        split = analyze("G1 X50 F3000\nG1 X100\n", limits=limits)
+
+        assert split.print_time_s == pytest.approx(single.print_time_s)
+
+
+class TestLayers:
+    """Test per-layer times"""
+
+    def test_layer_markers(self):
+        result = analyze(";LAYER:0\nG1 X10 E1 F600\n;LAYER:1\nG1 Z0.4\nG1 X0 E2\nG1 Y10 E3\n")
+
+        assert result.layers == 2
+        assert result.layer_times_s == pytest.approx([1, 2 + 0.4 / 10])
+
+    def test_layers_from_z_without_markers(self):
+        result = analyze("G1 Z0.2 F600\nG1 X10 E1\nG1 Z0.4\nG1 X0 E2\nG1 Z0.6\nG1 X10 E3\n")
+
+        assert result.layers == 3
+        assert result.bounds_mm[1][2] == pytest.approx(0.6)
+
+
+class TestFiles:
+    """Test file input and block boundaries"""
+
+    def test_gzip_and_block_size_do_not_change_result(self, box, tmp_path):
+        gcode = "".join(iter_gcode(box.vertices, box.faces, SliceSettings()))
+        plain = tmp_path / "box.gcode"
+        plain.write_text(gcode)
+        packed = tmp_path / "box.gcode.gz"
+        with gzip.open(packed, "wt") as handle:
+            handle.write(gcode)
+
+        reference = analyze_gcode(plain)
+        small_blocks = analyze_gcode(packed, block_bytes=1000)
+
+        assert small_blocks.print_time_s == pytest.approx(reference.print_time_s)
+        assert small_blocks.layer_times_s == pytest.approx(reference.layer_times_s)
+        assert small_blocks.lines == reference.lines
+
+    def test_matches_slicer_estimate(self, box):
+        settings = SliceSettings()
+        expected = slice_to_gcode(box.vertices, box.faces, settings)
+
+        result = analyze_gcode_chunks(iter_gcode(box.vertices, box.faces, settings), limits=UNLIMITED)
+
+        assert result.layers == expected.layers == 25
+        assert result.print_time_s == pytest.approx(expected.print_time_s, rel=1e-3)
+        # Sem a retração final, que o fatiador não desconta
+        assert result.filament_length_mm == pytest.approx(expected.filament_length_mm, rel=0.05)
+
+    def test_model_estimate_uses_header_limits(self, box, tmp_path):
+        path = tmp_path / "box.stl"
+        box.export(str(path))
+
+        default = estimate_model_print(path)
+        gentle = estimate_model_print(path, start_gcode=["M204 P200 T200"])
+
+        assert gentle.print_time_s > default.print_time_s
+        assert gentle.material_g(1.24) == pytest.approx(default.material_g(1.24))
+
+    def test_model_estimate_is_cached_by_content(self, box, tmp_path, monkeypatch):
+        from backend.services import mesh_ingest
+
+        first, copy = tmp_path / "box.stl", tmp_path / "copia.stl"
+        box.export(str(first))
+        copy.write_bytes(first.read_bytes())
+        settings = SliceSettings(layer_height=0.25)
+        expected = estimate_model_print(first, settings)
+
+        def no_slicing(*args, **kwargs):
+            raise AssertionError("modelo fatiado de novo")
+
+        monkeypatch.setattr(mesh_ingest, "ingest_mesh", no_slicing)
+
+        assert estimate_model_print(copy, SliceSettings(layer_height=0.25)) is expected
+        with pytest.raises(AssertionError):
+            estimate_model_print(copy, SliceSettings(layer_height=0.3))
+
+    def test_model_estimate_ignores_header_metadata(self, box, tmp_path, monkeypatch):
+        from backend.services import mesh_ingest
+
+        path = tmp_path / "box.stl"
+        box.export(str(path))
+        settings = SliceSettings(layer_height=0.3)
+        expected = estimate_model_print(path, settings, ["; Job ID: 1", "G28 ; Home", "M204 P500 T500"])
+
+        def no_slicing(*args, **kwargs):
+            raise AssertionError("modelo fatiado de novo")
+
+        monkeypatch.setattr(mesh_ingest, "ingest_mesh", no_slicing)
+
+        header = ["; Job ID: 2", "; Created: agora", "", "g28", "M104 S210", "M204 P500 T500 ; limites"]
+        assert estimate_model_print(path, settings, header) is expected
+        with pytest.raises(AssertionError):
+            estimate_model_print(path, settings, ["G28", "M204 P800 T800"])
@@ -0,0 +1,192 @@
+"""
+Unit tests for streamed G-code output
+Testing the buffered/gzip file sink and downloads of files still being written
+"""
+
+import gzip
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend.core.http_range import IncompleteFileError, growing_file_response
+from backend.services.gcode_stream import (
+    MARKER_STALE_SECONDS, GcodeFileSink, discard_abandoned, in_progress_marker, is_abandoned, is_generating,
+    sweep_abandoned, write_gcode
+)
+
+
+def gcode_chunks(layers):
+    for layer in range(layers):
+        yield f";LAYER:{layer}\nG1 X{layer} Y{layer} E{layer}\n"
+    return layers
+
+
+class TestGcodeFileSink:
+    """Test the file sink lifecycle"""
+
+    def test_plain_write_returns_generator_value(self, tmp_path):
+        sink = GcodeFileSink(tmp_path / "job.gcode")
+
+        result = write_gcode(gcode_chunks(3), sink)
+
+        assert result == 3
+        assert (tmp_path / "job.gcode").read_text().count(";LAYER:") == 3
+        assert not is_generating(tmp_path / "job.gcode")
+
+    def test_gzip_by_suffix(self, tmp_path):
+        path = tmp_path / "job.gcode.gz"
+
+        write_gcode(gcode_chunks(100), GcodeFileSink(path))
+
+        assert gzip.decompress(path.read_bytes()).decode().count(";LAYER:") == 100
+
+    def test_marker_while_open(self, tmp_path):
+        path = tmp_path / "job.gcode"
+        sink = GcodeFileSink(path).open()
+
+        assert is_generating(path)
+        sink.close()
+        assert not in_progress_marker(path).exists()
+
+    def test_failure_removes_partial_file(self, tmp_path):
+        path = tmp_path / "job.gcode"
+
+        def broken():
+            yield "G28\n"
+            raise RuntimeError("malha inválida")
+
+        with pytest.raises(RuntimeError):
+            write_gcode(broken(), GcodeFileSink(path))
+
+        assert not path.exists()
+        assert not is_generating(path)
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def crashed_write(path):
+    """Partial file left by a process that died while writing"""
+    path.write_text("G28\n")
+    in_progress_marker(path).write_text(f"{socket.gethostname()} {dead_pid()}\n")
+
+
+class TestAbandonedGeneration:
+    """Test markers left behind by crashed generations"""
+
+    def test_marker_of_dead_process(self, tmp_path):
+        path = tmp_path / "job.gcode"
+        crashed_write(path)
+
+        assert not is_generating(path)
+        assert is_abandoned(path)
+
+    def test_marker_without_heartbeat(self, tmp_path):
+        path = tmp_path / "job.gcode"
+        sink = GcodeFileSink(path).open()
+        old = time.time() - MARKER_STALE_SECONDS - 1
+        os.utime(in_progress_marker(path), (old, old))
+
+        assert is_abandoned(path)
+        sink.close()
+
+    def test_discard_removes_partial_file(self, tmp_path):
+        path = tmp_path / "job.gcode"
+        crashed_write(path)
+
+        assert discard_abandoned(path)
+        assert not path.exists() and not in_progress_marker(path).exists()
+        assert not discard_abandoned(path)
+
+    def test_sweep_keeps_live_generations(self, tmp_path):
+        crashed_write(tmp_path / "old.gcode")
+        sink = GcodeFileSink(tmp_path / "live.gcode").open()
+
+        assert sweep_abandoned(tmp_path) == 1
+        assert is_generating(sink.path)
+        sink.close()
+
+
+class TestGrowingFileResponse:
+    """Test downloads that follow a file being written"""
+
+    @pytest.fixture
+    def sink(self, tmp_path):
+        sink = GcodeFileSink(tmp_path / "job.gcode", flush_bytes=1).open()
+        sink.write("A" * 100)
+        yield sink
+        sink.close()
+
+    @pytest.fixture
+    def client(self, sink):
+        app = FastAPI()
+
+        @app.get("/gcode")
+        def gcode(request: Request):
+            return growing_file_response(request, sink.path, "text/plain",
+                                         is_growing=lambda: is_generating(sink.path),
+                                         is_failed=lambda: is_abandoned(sink.path),
+                                         poll_interval=0.01, idle_timeout=5)
+
+        return TestClient(app)
+
+    def test_follows_until_written(self, client, sink):
+        def finish():
+            time.sleep(0.1)
+            sink.write("B" * 50)
+            sink.close()
+
+        writer = threading.Thread(target=finish)
+        writer.start()
+        response = client.get("/gcode")
+        writer.join()
+
+        assert response.status_code == 200
+        assert response.headers["x-content-complete"] == "false"
+        assert response.text == "A" * 100 + "B" * 50
+
+    def test_abandoned_write_aborts_response(self, client, sink):
+        def crash():
+            time.sleep(0.1)
+            in_progress_marker(sink.path).write_text(f"{socket.gethostname()} {dead_pid()}\n")
+
+        writer = threading.Thread(target=crash)
+        writer.start()
+        with pytest.raises(IncompleteFileError):
+            client.get("/gcode")
+        writer.join()
+
+    def test_range_serves_written_bytes(self, client):
+        response = client.get("/gcode", headers={"Range": "bytes=90-"})
+
+        assert response.status_code == 206
+        assert response.headers["content-range"] == "bytes 90-99/*"
+        assert response.text == "A" * 10
+
+    def test_range_beyond_written_bytes(self, client):
+        response = client.get("/gcode", headers={"Range": "bytes=100-"})
+
+        assert response.status_code == 416
+        assert response.headers["retry-after"] == "1"
+
+    def test_finished_file_has_length(self, client, sink):
+        sink.close()
+
+        response = client.get("/gcode", headers={"Range": "bytes=0-9"})
+
+        assert response.status_code == 206
+        assert response.headers["content-range"] == "bytes 0-9/100"
@@ -0,0 +1,165 @@
+"""
+Unit tests for the geometry metrics stage
+Testing mass properties, projected areas, the typed column and downstream lookups
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+np = pytest.importorskip("numpy")
+trimesh = pytest.importorskip("trimesh")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from sqlalchemy import Column, Integer, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from backend.models.geometry import GEOMETRY_METRICS_VERSION, GeometryMetrics, GeometryMetricsType
+from backend.services.geometry_metrics import (
+    compute_geometry_metrics,
+    ensure_model_geometry,
+    model_geometry,
+    model_volume_mm3,
+)
+
+
+@pytest.fixture
+def box():
+    mesh = trimesh.creation.box(extents=[10, 20, 30])
+    mesh.apply_translation([5, 10, 15])
+    return mesh
+
+
+class TestComputeGeometryMetrics:
+    """Test the metrics record against analytic values and trimesh"""
+
+    def test_box_metrics(self, box):
+        metrics = compute_geometry_metrics(box)
+
+        assert metrics.volume_mm3 == pytest.approx(6000)
+        assert metrics.surface_area_mm2 == pytest.approx(2 * (200 + 300 + 600))
+        assert metrics.centroid_mm == pytest.approx([5, 10, 15])
+        assert metrics.dimensions_mm == {"x": 10, "y": 20, "z": 30}
+        assert metrics.convex_hull_volume_mm3 == pytest.approx(6000)
+        assert metrics.watertight is True
+
+    def test_inertia_matches_trimesh(self):
+        mesh = trimesh.creation.annulus(r_min=3, r_max=5, height=4)
+        mesh.apply_translation([1, 2, 3])
+
+        metrics = compute_geometry_metrics(mesh)
+
+        assert np.allclose(metrics.inertia_tensor_mm5, mesh.moment_inertia)
+        assert metrics.convex_hull_volume_mm3 == pytest.approx(mesh.convex_hull.volume)
+
+    def test_projected_areas_along_axes(self, box):
+        areas = compute_geometry_metrics(box).projected_area_mm2
+
+        assert areas["x"] == pytest.approx(600, rel=0.02)
+        assert areas["y"] == pytest.approx(300, rel=0.02)
+        assert areas["z"] == pytest.approx(200, rel=0.02)
+
+    def test_inverted_faces_keep_positive_volume(self, box):
+        metrics = compute_geometry_metrics(SimpleNamespace(vertices=box.vertices, faces=box.faces[:, ::-1]))
+
+        assert metrics.volume_mm3 == pytest.approx(6000)
+        assert metrics.centroid_mm == pytest.approx([5, 10, 15])
+
+    def test_open_mesh_is_not_watertight(self, box):
+        metrics = compute_geometry_metrics(SimpleNamespace(vertices=box.vertices, faces=box.faces[2:]))
+
+        assert metrics.watertight is False
+
+    def test_printability_fields_are_copied(self, box):
+        printability = {"watertight": True, "support_volume_mm3": 120.0,
+                        "critical_overhang_area_mm2": 30.0, "min_wall_thickness_mm": 10.0}
+
+        metrics = compute_geometry_metrics(box, printability, source_sha256="abc")
+
+        assert metrics.support_volume_mm3 == 120.0
+        assert metrics.material_volume_mm3() == pytest.approx(6120)
+        assert metrics.material_volume_mm3(include_support=False) == pytest.approx(6000)
+        assert metrics.source_sha256 == "abc"
+
+
+class TestGeometryMetricsColumn:
+    """Test the typed JSON column round trip"""
+
+    def test_round_trip(self, box):
+        Base = declarative_base()
+
+        class Row(Base):
+            __tablename__ = "rows"
+            id = Column(Integer, primary_key=True)
+            metrics = Column(GeometryMetricsType, nullable=True)
+
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        original = compute_geometry_metrics(box)
+        try:
+            with sessionmaker(bind=engine)() as session:
+                session.add(Row(id=1, metrics=original))
+                session.add(Row(id=2, metrics=None))
+                session.commit()
+                session.expunge_all()
+
+                loaded = session.get(Row, 1).metrics
+                empty = session.get(Row, 2).metrics
+        finally:
+            engine.dispose()
+
+        assert isinstance(loaded, GeometryMetrics)
+        assert loaded == original
+        assert empty is None
+
+    def test_unknown_keys_are_kept(self, box):
+        data = {**compute_geometry_metrics(box).to_dict(), "novo_campo": 1}
+
+        assert GeometryMetrics.from_dict(data).extra == {"novo_campo": 1}
+
+
+class TestModelLookups:
+    """Test downstream services read the persisted record"""
+
+    def test_volume_prefers_record(self, box):
+        metrics = compute_geometry_metrics(box, {"support_volume_mm3": 500.0})
+        model = SimpleNamespace(metricas_geometria=metrics, volume_calculado=1.0)
+
+        assert model_volume_mm3(model) == pytest.approx(6000)
+        assert model_volume_mm3(model, include_support=True) == pytest.approx(6500)
+
+    def test_volume_falls_back_for_old_models(self):
+        assert model_volume_mm3(SimpleNamespace(volume_calculado=42)) == 42.0
+        assert model_volume_mm3(SimpleNamespace(volume_calculado=None), default=7) == 7
+
+    def test_outdated_record_is_ignored(self, box):
+        metrics = compute_geometry_metrics(box)
+        metrics.version = GEOMETRY_METRICS_VERSION - 1
+
+        assert model_geometry(SimpleNamespace(metricas_geometria=metrics)) is None
+
+    def test_ensure_computes_once(self, box, tmp_path):
+        path = tmp_path / "box.stl"
+        box.export(str(path))
+        model = SimpleNamespace(arquivo_path=str(path), metricas_geometria=None)
+        db = Mock()
+
+        first = ensure_model_geometry(model, db)
+        path.unlink()
+        second = ensure_model_geometry(model, db)
+
+        assert first.volume_mm3 == pytest.approx(6000)
+        assert first.source_sha256 is not None
+        assert second is first
+        assert db.commit.call_count == 1
+
+    def test_ensure_tolerates_missing_file(self, tmp_path):
+        db = Mock()
+
+        assert ensure_model_geometry(SimpleNamespace(arquivo_path=None), db) is None
+        assert ensure_model_geometry(SimpleNamespace(arquivo_path=str(tmp_path / "x.stl")), db) is None
+        assert db.commit.call_count == 0
@@ -0,0 +1,155 @@
+"""
+Unit tests for the compact .3dpm mesh format
+Testing lossless STL round trips, quantization, zero-copy reads and range responses
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+trimesh = pytest.importorskip("trimesh")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend.core.http_range import ranged_file_response
+from backend.services.mesh_format import (
+    CompactMesh,
+    compact_to_stl,
+    convert_to_compact,
+    encode_compact_mesh,
+    ensure_compact,
+    open_compact_mesh,
+)
+from backend.services.mesh_ingest import ingest_mesh, open_binary_stl
+
+
+@pytest.fixture
+def sphere_stl(tmp_path):
+    path = tmp_path / "sphere.stl"
+    trimesh.creation.icosphere(subdivisions=4, radius=12.3).export(str(path))
+    return path
+
+
+class TestCompactMesh:
+    """Test encoding, decoding and conversion"""
+
+    def test_stl_round_trip_is_lossless(self, sphere_stl):
+        """Test converting to .3dpm and back reproduces every STL triangle"""
+        compact = open_compact_mesh(convert_to_compact(sphere_stl))
+
+        original = open_binary_stl(sphere_stl)
+        restored = np.frombuffer(compact_to_stl(compact)[84:], dtype=original.dtype)
+        assert np.array_equal(restored["vertices"], original["vertices"])
+
+    def test_header_carries_stats(self, sphere_stl):
+        """Test bounds, volume and area are available without touching the arrays"""
+        sphere = trimesh.load(str(sphere_stl))
+        compact = open_compact_mesh(convert_to_compact(sphere_stl))
+
+        assert compact.stats.faces == len(sphere.faces)
+        assert compact.stats.volume == pytest.approx(sphere.volume, rel=1e-6)
+        assert compact.stats.area == pytest.approx(sphere.area, rel=1e-6)
+        assert np.allclose(compact.stats.bounds, sphere.bounds)
+        assert len(compact.positions) == len(sphere.vertices)
+
+    def test_grid_aligned_mesh_is_quantized(self):
+        """Test a mesh on a coarse grid uses 16-bit positions and 16-bit indices"""
+        box = trimesh.creation.box(extents=[10, 20, 30])
+        data = encode_compact_mesh(box.vertices, box.faces)
+        compact = CompactMesh(data)
+
+        assert compact.position_bits == 16
+        assert compact.positions.dtype == np.uint16
+        assert compact.faces.dtype == np.uint16
+        assert np.array_equal(compact.vertices, box.vertices)
+        assert len(data) == 128 + 8 * 3 * 2 + 12 * 3 * 2
+
+    def test_forced_quantization_error_is_bounded(self, sphere_stl):
+        """Test 16-bit positions stay within half a grid step of the original"""
+        sphere = trimesh.load(str(sphere_stl))
+        compact = CompactMesh(encode_compact_mesh(sphere.vertices, sphere.faces, position_bits=16))
+
+        step = compact.header["step"]
+        assert np.all(np.abs(compact.vertices - sphere.vertices) <= step / 2 + 1e-9)
+
+    def test_reads_are_zero_copy(self):
+        """Test positions and faces are views over the source buffer"""
+        box = trimesh.creation.box(extents=[1, 1, 1])
+        buffer = bytearray(encode_compact_mesh(box.vertices, box.faces))
+        compact = CompactMesh(buffer)
+
+        assert np.shares_memory(compact.faces, np.frombuffer(buffer, dtype=np.uint8))
+        assert not compact.faces.flags.owndata
+
+    def test_rejects_other_files(self, sphere_stl):
+        """Test a file without the magic bytes is refused"""
+        with pytest.raises(ValueError):
+            open_compact_mesh(sphere_stl)
+
+    def test_ensure_compact_converts_once(self, sphere_stl):
+        """Test the sidecar file is reused while newer than the source"""
+        first = ensure_compact(sphere_stl)
+        mtime = first.stat().st_mtime_ns
+
+        assert first.name == "sphere.stl.3dpm"
+        assert ensure_compact(sphere_stl).stat().st_mtime_ns == mtime
+
+    def test_ingest_reads_compact_mesh(self, sphere_stl):
+        """Test ingestion uses the indexed arrays and header stats directly"""
+        mesh = ingest_mesh(convert_to_compact(sphere_stl))
+        sphere = trimesh.load(str(sphere_stl))
+
+        assert len(mesh.faces) == len(sphere.faces)
+        assert mesh.stats.volume == pytest.approx(sphere.volume, rel=1e-6)
+
+
+class TestRangedFileResponse:
+    """Test HTTP range handling of file responses"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        path = tmp_path / "blob.bin"
+        path.write_bytes(bytes(range(256)) * 4)
+        app = FastAPI()
+
+        @app.get("/file")
+        async def get_file(request: Request):
+            return ranged_file_response(request, path, "application/octet-stream",
+                                        filename="blob.bin", headers={"ETag": '"v1"'})
+
+        return TestClient(app)
+
+    def test_full_file(self, client):
+        response = client.get("/file")
+
+        assert response.status_code == 200
+        assert response.headers["accept-ranges"] == "bytes"
+        assert len(response.content) == 1024
+
+    def test_partial_content(self, client):
+        response = client.get("/file", headers={"Range": "bytes=10-19"})
+
+        assert response.status_code == 206
+        assert response.headers["content-range"] == "bytes 10-19/1024"
+        assert response.content == bytes(range(10, 20))
+
+    def test_suffix_and_open_ranges(self, client):
+        assert client.get("/file", headers={"Range": "bytes=-4"}).content == bytes([252, 253, 254, 255])
+        assert len(client.get("/file", headers={"Range": "bytes=1000-"}).content) == 24
+
+    def test_unsatisfiable_range(self, client):
+        response = client.get("/file", headers={"Range": "bytes=5000-"})
+
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */1024"
+
+    def test_stale_if_range_returns_full_file(self, client):
+        response = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": '"v0"'})
+
+        assert response.status_code == 200
+        assert len(response.content) == 1024
@@ -0,0 +1,138 @@
+"""
+Unit tests for streaming mesh ingestion
+Testing memory-mapped STL reading, vertex welding, streamed stats and cleanup
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+trimesh = pytest.importorskip("trimesh")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.mesh_ingest import (
+    clean_faces,
+    ingest_mesh,
+    is_binary_stl,
+    open_binary_stl,
+    stream_mesh_stats,
+    weld_vertices,
+)
+
+
+def export_stl(mesh, path):
+    mesh.export(str(path), file_type="stl")
+    return path
+
+
+@pytest.fixture
+def sphere():
+    return trimesh.creation.icosphere(subdivisions=3, radius=10.0)
+
+
+class TestBinaryStl:
+    """Test binary STL detection and memory mapping"""
+
+    def test_detects_binary_and_ascii(self, tmp_path, sphere):
+        """Test binary STL is recognized by its size and ASCII STL is not"""
+        binary = export_stl(sphere, tmp_path / "binary.stl")
+        ascii_path = tmp_path / "ascii.stl"
+        ascii_path.write_text(trimesh.exchange.stl.export_stl_ascii(sphere))
+
+        assert is_binary_stl(binary) is True
+        assert is_binary_stl(ascii_path) is False
+
+    def test_memmap_matches_triangles(self, tmp_path, sphere):
+        """Test the memory-mapped records hold the same triangles"""
+        triangles = open_binary_stl(export_stl(sphere, tmp_path / "sphere.stl"))
+
+        assert isinstance(triangles, np.memmap)
+        assert np.allclose(triangles["vertices"], sphere.triangles, atol=1e-5)
+
+
+class TestStreaming:
+    """Test chunked stats and welding against trimesh"""
+
+    def test_stats_match_trimesh(self, tmp_path, sphere):
+        """Test volume, area and bounds agree with trimesh across chunk boundaries"""
+        triangles = open_binary_stl(export_stl(sphere, tmp_path / "sphere.stl"))
+
+        stats = stream_mesh_stats(triangles, chunk_faces=97)
+
+        assert stats.faces == len(sphere.faces)
+        assert stats.volume == pytest.approx(sphere.volume, rel=1e-5)
+        assert stats.area == pytest.approx(sphere.area, rel=1e-5)
+        assert np.allclose(stats.bounds, sphere.bounds, atol=1e-5)
+
+    def test_weld_recovers_shared_vertices(self, sphere):
+        """Test welding triangle soup gives back the indexed mesh"""
+        vertices, faces = weld_vertices(sphere.triangles, chunk_faces=100)
+
+        assert len(vertices) == len(sphere.vertices)
+        assert np.allclose(vertices[faces], sphere.triangles)
+
+    def test_weld_tolerance(self):
+        """Test corners closer than the tolerance are merged"""
+        triangles = np.array([
+            [[0, 0, 0], [1, 0, 0], [0, 1, 0]],
+            [[1, 0, 0], [1, 1, 0], [0, 1 + 1e-7, 0]],
+        ], dtype=np.float64)
+
+        vertices, faces = weld_vertices(triangles, tolerance=1e-5)
+
+        assert len(vertices) == 4
+        assert faces[0, 2] == faces[1, 2]
+
+
+def test_clean_faces_removes_degenerate_and_duplicates():
+    """Test repeated indices and repeated faces (any winding) are dropped"""
+    faces = np.array([[0, 1, 2], [0, 0, 3], [2, 0, 1], [1, 2, 3], [3, 2, 1]])
+
+    assert clean_faces(faces, 4).tolist() == [[0, 1, 2], [1, 2, 3]]
+
+
+class TestIngestMesh:
+    """Test the full ingestion pipeline"""
+
+    def test_removes_debris_and_recomputes_stats(self, tmp_path):
+        """Test a stray triangle is removed and the stats describe the clean mesh"""
+        box = trimesh.creation.box(extents=[10, 10, 10])
+        debris = trimesh.Trimesh(vertices=[[50, 0, 0], [51, 0, 0], [50, 1, 0]], faces=[[0, 1, 2]])
+        path = export_stl(trimesh.util.concatenate([box, debris]), tmp_path / "parts.stl")
+
+        mesh = ingest_mesh(path)
+
+        assert len(mesh.faces) == 12
+        assert len(mesh.vertices) == 8
+        assert mesh.stats.volume == pytest.approx(1000.0)
+        assert mesh.stats.dimensions == pytest.approx([10.0, 10.0, 10.0])
+
+    def test_keeps_small_components_when_disabled(self, tmp_path):
+        """Test min_component_faces=None only welds and cleans"""
+        box = trimesh.creation.box(extents=[10, 10, 10])
+        debris = trimesh.Trimesh(vertices=[[50, 0, 0], [51, 0, 0], [50, 1, 0]], faces=[[0, 1, 2]])
+        path = export_stl(trimesh.util.concatenate([box, debris]), tmp_path / "parts.stl")
+
+        assert len(ingest_mesh(path, min_component_faces=None).faces) == 13
+
+    def test_non_stl_falls_back_to_trimesh(self, tmp_path, sphere):
+        """Test other formats load through trimesh and go through the same cleanup"""
+        path = tmp_path / "sphere.obj"
+        sphere.export(str(path))
+
+        mesh = ingest_mesh(path)
+
+        assert len(mesh.faces) == len(sphere.faces)
+        assert mesh.stats.volume == pytest.approx(sphere.volume, rel=1e-5)
+
+    def test_trimesh_is_lazy_and_cached(self, tmp_path, sphere):
+        """Test the Trimesh is built on demand, once, and is watertight"""
+        mesh = ingest_mesh(export_stl(sphere, tmp_path / "sphere.stl"))
+
+        assert mesh._trimesh is None
+        built = mesh.to_trimesh()
+        assert built is mesh.to_trimesh()
+        assert built.is_watertight
@@ -0,0 +1,129 @@
+"""
+Unit tests for level-of-detail mesh variants
+Testing decimation ratios, content-hashed files, manifest validity and collision source
+"""
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+trimesh = pytest.importorskip("trimesh")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.mesh_lod import (
+    collision_source,
+    encode_binary_stl,
+    generate_lods,
+    get_lods,
+    load_lods,
+    lod_dir,
+    remove_lods,
+)
+
+
+@pytest.fixture
+def sphere_stl(tmp_path):
+    path = tmp_path / "model_sphere.stl"
+    trimesh.creation.icosphere(subdivisions=5, radius=20.0).export(str(path))
+    return path
+
+
+class TestGenerateLods:
+    """Test variant generation and the manifest"""
+
+    def test_levels_reduce_faces(self, sphere_stl):
+        """Test medium and low keep roughly 25% and 5% of the faces"""
+        lods = generate_lods(sphere_stl)
+        full, medium, low = (lods.variants[level].faces for level in ("full", "medium", "low"))
+
+        assert full == 20480
+        assert 0.15 * full <= medium <= 0.25 * full
+        assert 0.02 * full <= low <= 0.05 * full
+        assert lods.path("full") == sphere_stl
+
+    def test_files_are_content_hashed(self, sphere_stl):
+        """Test variants live next to the original and are named by their hash"""
+        lods = generate_lods(sphere_stl)
+        variant = lods.variants["low"]
+        path = lods.path("low")
+
+        assert path.parent == lod_dir(sphere_stl) == sphere_stl.parent / "model_sphere.stl.lod"
+        assert hashlib.sha256(path.read_bytes()).hexdigest() == variant.sha256
+        assert path.name == f"low-{variant.sha256[:16]}.stl"
+        assert len(trimesh.load(str(path)).faces) == variant.faces
+
+    def test_small_mesh_reuses_original(self, tmp_path):
+        """Test meshes below the minimum size point every level at the original"""
+        path = tmp_path / "box.stl"
+        trimesh.creation.box(extents=[10, 10, 10]).export(str(path))
+
+        lods = generate_lods(path)
+
+        assert all(variant.file is None for variant in lods.variants.values())
+        assert lods.path("low") == path
+
+    def test_step_is_rejected(self, tmp_path):
+        """Test non-mesh formats have no variants"""
+        path = tmp_path / "part.step"
+        path.write_text("ISO-10303-21;")
+
+        with pytest.raises(ValueError):
+            generate_lods(path)
+
+
+class TestLoadLods:
+    """Test the manifest is only trusted while the original is unchanged"""
+
+    def test_roundtrip(self, sphere_stl):
+        """Test a fresh manifest is loaded without regenerating"""
+        generated = generate_lods(sphere_stl)
+
+        assert load_lods(sphere_stl) == generated
+        assert get_lods(sphere_stl) == generated
+
+    def test_modified_original_invalidates(self, sphere_stl):
+        """Test changing the original makes the variants stale and regeneration prunes them"""
+        old_low = generate_lods(sphere_stl).path("low")
+        trimesh.creation.icosphere(subdivisions=5, radius=30.0).export(str(sphere_stl))
+        os.utime(sphere_stl, ns=(0, 0))
+
+        assert load_lods(sphere_stl) is None
+        new_low = get_lods(sphere_stl).path("low")
+        assert new_low != old_low
+        assert not old_low.exists()
+
+    def test_remove_lods(self, sphere_stl):
+        """Test removing the variants deletes the directory"""
+        generate_lods(sphere_stl)
+
+        assert remove_lods(sphere_stl) is True
+        assert not lod_dir(sphere_stl).exists()
+        assert load_lods(sphere_stl) is None
+
+
+def test_collision_source_picks_smallest_sufficient_variant(sphere_stl):
+    """Test collision loads the smallest variant that still has enough faces"""
+    assert collision_source(sphere_stl, 500) == sphere_stl
+
+    lods = generate_lods(sphere_stl)
+
+    assert collision_source(sphere_stl, 500) == lods.path("low")
+    assert collision_source(sphere_stl, 2000) == lods.path("medium")
+    assert collision_source(sphere_stl, 10 ** 6) == sphere_stl
+
+
+def test_encode_binary_stl_roundtrip():
+    """Test the encoded STL loads back with the same triangles"""
+    box = trimesh.creation.box(extents=[2, 4, 6])
+    data = encode_binary_stl(box.vertices, box.faces)
+
+    loaded = trimesh.load(trimesh.util.wrap_as_stream(data), file_type="stl")
+
+    assert len(data) == 84 + 50 * 12
+    assert np.allclose(loaded.triangles, box.triangles)
+    assert loaded.volume == pytest.approx(48.0)
@@ -0,0 +1,113 @@
+"""
+Unit tests for the model generation cache
+Testing canonical spec hashing, content-addressed storage and LRU eviction
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.model_generation_cache import ModelGenerationCache, spec_hash
+
+
+@pytest.fixture
+def specs():
+    return {
+        "category": "mecanico",
+        "material": "PLA",
+        "dimensions": {"largura": 100.0, "altura": 50.0, "profundidade": 30.0},
+        "additional_specs": {},
+        "components": [],
+        "features": [{"nome": "furo_central", "diametro": 10.0}],
+    }
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    path = tmp_path / "model.stl"
+    path.write_bytes(b"solid model\n" * 100)
+    return path
+
+
+class TestSpecHash:
+    """Test canonical hashing of modeling specs"""
+
+    def test_equivalent_specs_share_hash(self, specs):
+        """Test key order, int/float and surrounding spaces do not change the hash"""
+        variant = {
+            "features": [{"diametro": 10, "nome": "furo_central "}],
+            "dimensions": {"profundidade": 30, "altura": 50, "largura": 100},
+            "material": "PLA",
+            "category": "mecanico",
+            "additional_specs": {},
+            "components": [],
+        }
+
+        assert spec_hash(specs, "cadquery", "stl", "2.4") == spec_hash(variant, "cadquery", "stl", "2.4")
+
+    def test_engine_format_and_version_change_hash(self, specs):
+        """Test every part of the key produces a different hash"""
+        base = spec_hash(specs, "cadquery", "stl", "2.4")
+
+        assert spec_hash(specs, "openscad", "stl", "2.4") != base
+        assert spec_hash(specs, "cadquery", "step", "2.4") != base
+        assert spec_hash(specs, "cadquery", "stl", "2.5") != base
+        assert spec_hash({**specs, "material": "ABS"}, "cadquery", "stl", "2.4") != base
+
+
+class TestModelGenerationCache:
+    """Test content-addressed storage of generated models"""
+
+    def test_put_then_get(self, tmp_path, model_file):
+        """Test a stored model returns its file and analysis results"""
+        cache = ModelGenerationCache(tmp_path / "cache", max_bytes=1 << 20)
+        cache.put("abc", model_file, {"volume": 1.0}, {"printable": True})
+
+        entry = cache.get("abc")
+
+        assert entry.model_path.read_bytes() == model_file.read_bytes()
+        assert entry.specs == {"volume": 1.0}
+        assert entry.validation["printable"] is True
+        assert cache.get("missing") is None
+
+    def test_materialize_survives_eviction(self, tmp_path, model_file):
+        """Test a materialized copy stays valid after the entry is evicted"""
+        cache = ModelGenerationCache(tmp_path / "cache", max_bytes=1 << 20)
+        entry = cache.put("abc", model_file, {}, {"printable": True})
+        output = cache.materialize(entry, tmp_path / "model_project.stl")
+
+        cache._remove("abc")
+
+        assert output.read_bytes() == model_file.read_bytes()
+
+    def test_evicts_least_recently_used(self, tmp_path, model_file):
+        """Test entries are evicted oldest access first when over the size limit"""
+        entry_size = model_file.stat().st_size
+        cache = ModelGenerationCache(tmp_path / "cache", max_bytes=int(entry_size * 2.9))
+
+        cache.put("a", model_file, {}, {"printable": True})
+        cache.put("b", model_file, {}, {"printable": True})
+        # Marcar "a" como usada mais recentemente que "b"
+        past = time.time() - 60
+        os.utime(cache._metadata_path("b"), (past, past))
+        cache.get("a")
+        cache.put("c", model_file, {}, {"printable": True})
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        assert cache.stats()["entries"] == 2
+
+    def test_corrupted_metadata_is_a_miss(self, tmp_path, model_file):
+        """Test unreadable metadata is dropped instead of raising"""
+        cache = ModelGenerationCache(tmp_path / "cache", max_bytes=1 << 20)
+        cache.put("abc", model_file, {}, {"printable": True})
+        cache._metadata_path("abc").write_text("{not json")
+
+        assert cache.get("abc") is None
+        assert not list((tmp_path / "cache").glob("abc.*"))
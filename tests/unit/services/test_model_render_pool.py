@@ -0,0 +1,170 @@
+"""
+Unit tests for the model render pool
+Testing bounded concurrency, scratch dirs, timeouts and cancellation
+"""
+
+import asyncio
+import multiprocessing
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.model_render_pool import (
+    ModelRenderPool,
+    RenderCancelled,
+    RenderError,
+    RenderTimeout,
+)
+
+# Substituto do OpenSCAD: `-o <saida> <fonte>`; a fonte controla espera e falha
+FAKE_OPENSCAD = """
+import sys, time
+target, source = sys.argv[2], sys.argv[3]
+code = open(source).read()
+if code.startswith("sleep"):
+    time.sleep(float(code.split()[1]))
+if code.startswith("fail"):
+    sys.stderr.write("parser error")
+    sys.exit(1)
+open(target, "w").write("solid " + code)
+"""
+
+
+def write_model(label: str, output_path: str) -> str:
+    """Job de worker: escreve um arquivo simples no caminho recebido"""
+    Path(output_path).write_text(f"solid {label}")
+    return output_path
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """Pool com OpenSCAD falso e workers via fork"""
+    pool = ModelRenderPool(
+        max_concurrency=2,
+        scratch_root=tmp_path / "scratch",
+        timeout=10,
+        openscad_command=(sys.executable, "-c", FAKE_OPENSCAD),
+        mp_context=multiprocessing.get_context("fork"),
+    )
+    yield pool
+    pool.shutdown()
+
+
+class TestOpenSCADJobs:
+    """Test OpenSCAD subprocess jobs"""
+
+    def test_renders_and_cleans_scratch(self, pool, tmp_path):
+        """Test the output is moved into place and the scratch dir removed"""
+        output = tmp_path / "out" / "model.stl"
+
+        result = asyncio.run(pool.run_openscad("cube(10);", output))
+
+        assert result == output
+        assert output.read_text() == "solid cube(10);"
+        assert list(pool.scratch_root.iterdir()) == []
+
+    def test_concurrency_is_bounded(self, pool, tmp_path):
+        """Test at most max_concurrency jobs run while the rest wait in the queue"""
+        observed = []
+
+        async def scenario():
+            jobs = [
+                asyncio.create_task(pool.run_openscad("sleep 0.3", tmp_path / f"m{i}.stl"))
+                for i in range(5)
+            ]
+            while not all(job.done() for job in jobs):
+                observed.append(pool.stats())
+                await asyncio.sleep(0.02)
+            return await asyncio.gather(*jobs)
+
+        results = asyncio.run(scenario())
+
+        assert len(set(results)) == 5
+        assert max(stats["running"] for stats in observed) == 2
+        assert max(stats["queued"] for stats in observed) >= 2
+        assert pool.stats()["queued"] == pool.stats()["running"] == 0
+
+    def test_engine_error(self, pool, tmp_path):
+        """Test a failing render raises RenderError and leaves no output"""
+        output = tmp_path / "model.stl"
+
+        with pytest.raises(RenderError, match="parser error"):
+            asyncio.run(pool.run_openscad("fail", output))
+
+        assert not output.exists()
+
+    def test_timeout_kills_process(self, pool, tmp_path):
+        """Test an expired render raises RenderTimeout and frees its slot"""
+        async def scenario():
+            with pytest.raises(RenderTimeout):
+                await pool.run_openscad("sleep 30", tmp_path / "slow.stl", timeout=0.3)
+            return await pool.run_openscad("cube(1);", tmp_path / "next.stl")
+
+        assert asyncio.run(scenario()).exists()
+        assert list(pool.scratch_root.iterdir()) == []
+
+
+class TestCancellation:
+    """Test cancelling queued and running jobs"""
+
+    def test_cancel_running_and_queued(self, pool, tmp_path):
+        """Test cancel stops both a running job and one still waiting for a slot"""
+        async def scenario():
+            jobs = {
+                job_id: asyncio.create_task(pool.run_openscad(
+                    "sleep 30", tmp_path / f"{job_id}.stl", job_id=job_id
+                ))
+                for job_id in ("a", "b", "c")
+            }
+            await asyncio.sleep(0.2)
+            assert pool.stats() == {"queued": 1, "running": 2, "max_concurrency": 2}
+
+            assert pool.cancel("a") and pool.cancel("c")
+            assert not pool.cancel("missing")
+            results = await asyncio.gather(jobs["a"], jobs["c"], return_exceptions=True)
+            pool.cancel("b")
+            await asyncio.gather(jobs["b"], return_exceptions=True)
+            return results
+
+        results = asyncio.run(scenario())
+
+        assert all(isinstance(result, RenderCancelled) for result in results)
+        assert not list(tmp_path.glob("*.stl"))
+        assert list(pool.scratch_root.iterdir()) == []
+
+    def test_caller_cancellation_propagates(self, pool, tmp_path):
+        """Test cancelling the awaiting task raises CancelledError, not RenderCancelled"""
+        async def scenario():
+            job = asyncio.create_task(pool.run_openscad("sleep 30", tmp_path / "a.stl", job_id="a"))
+            await asyncio.sleep(0.2)
+            job.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await job
+            return pool.cancel("a")
+
+        assert asyncio.run(scenario()) is False
+        assert list(pool.scratch_root.iterdir()) == []
+
+    def test_duplicate_job_id(self, pool, tmp_path):
+        """Test a job id cannot be reused while the job is active"""
+        async def scenario():
+            first = asyncio.create_task(pool.run_openscad("sleep 0.3", tmp_path / "a.stl", job_id="x"))
+            await asyncio.sleep(0)
+            with pytest.raises(ValueError):
+                await pool.run_openscad("cube(1);", tmp_path / "b.stl", job_id="x")
+            return await first
+
+        assert asyncio.run(scenario()).exists()
+
+
+def test_worker_job(pool, tmp_path):
+    """Test worker jobs write to the scratch path and are moved to the output"""
+    output = tmp_path / "worker.stl"
+
+    asyncio.run(pool.run_in_worker("cadquery", write_model, ("box",), output))
+
+    assert output.read_text() == "solid box"
+    assert list(pool.scratch_root.iterdir()) == []
@@ -0,0 +1,100 @@
+"""
+Unit tests for vectorized motion analysis
+Testing trajectory generation and metrics against the list-based reference
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services import motion_analysis
+from backend.services.motion_analysis import (
+    circular_trajectory,
+    directional_consistency,
+    figure_8_trajectory,
+    linear_trajectory,
+    path_length,
+    spiral_trajectory,
+    trajectory_smoothness,
+)
+
+
+@pytest.fixture
+def noisy_trajectory():
+    """Trajetória aleatória com um ponto repetido (segmento nulo)"""
+    rng = np.random.default_rng(42)
+    points = np.cumsum(rng.normal(size=(500, 3)), axis=0)
+    points[100] = points[99]
+    return points
+
+
+class TestTrajectoryGeneration:
+    """Test (N, 3) trajectory generators"""
+
+    @pytest.mark.parametrize("points", [
+        circular_trajectory(1.0, 1.0, 10.0),
+        linear_trajectory(1.0, 10.0, 0.5),
+        figure_8_trajectory(1.0, 10.0),
+        spiral_trajectory(1.0, 10.0),
+    ])
+    def test_shape_and_dtype(self, points):
+        """Test generators return (N, 3) float64 arrays sampled at 0.1 s"""
+        assert points.shape == (100, 3)
+        assert points.dtype == np.float64
+
+    def test_circular_matches_list_reference(self):
+        """Test circular generation matches the point-by-point version"""
+        reference = motion_analysis._list_circular_trajectory(2.0, 0.5, 6.0, 0.1)
+
+        assert np.allclose(circular_trajectory(2.0, 0.5, 6.0), reference)
+
+    def test_circular_stays_on_radius(self):
+        """Test circular points keep a constant radius and height"""
+        points = circular_trajectory(2.0, 1.0, 10.0)
+
+        assert np.allclose(np.linalg.norm(points[:, :2], axis=1), 2.0)
+        assert np.allclose(points[:, 2], 1.0)
+
+
+class TestMotionMetrics:
+    """Test vectorized metrics against the list-based implementation"""
+
+    def test_path_length(self, noisy_trajectory):
+        """Test total distance matches the reference"""
+        expected = motion_analysis._list_path_length(noisy_trajectory.tolist())
+
+        assert path_length(noisy_trajectory) == pytest.approx(expected)
+
+    def test_smoothness(self, noisy_trajectory):
+        """Test curvature-based smoothness matches the reference"""
+        expected = motion_analysis._list_smoothness(noisy_trajectory.tolist())
+
+        assert trajectory_smoothness(noisy_trajectory) == pytest.approx(expected)
+
+    def test_directional_consistency(self, noisy_trajectory):
+        """Test direction consistency matches the reference"""
+        expected = motion_analysis._list_directional_consistency(noisy_trajectory.tolist())
+
+        assert directional_consistency(noisy_trajectory) == pytest.approx(expected)
+
+    def test_straight_line_is_smooth_and_consistent(self):
+        """Test a straight line scores 1.0 on both metrics"""
+        points = linear_trajectory(1.0, 5.0)
+
+        assert trajectory_smoothness(points) == pytest.approx(1.0)
+        assert directional_consistency(points) == pytest.approx(1.0)
+
+    def test_degenerate_inputs(self):
+        """Test short or static trajectories keep the previous defaults"""
+        static = np.zeros((10, 3))
+
+        assert trajectory_smoothness(static[:2]) == 0.0
+        assert trajectory_smoothness(static) == 1.0
+        assert directional_consistency(static[:1]) == 1.0
+        assert directional_consistency(static) == 1.0
+        assert path_length(static[:1]) == 0.0
@@ -0,0 +1,202 @@
+"""
+Unit tests for the print queue index
+Testing positions, prefix ETAs, compaction and bulk persistence of the queue
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from sqlalchemy import create_engine, event, insert, select, update
+
+from backend.models import PrintJob, PrintQueue
+from backend.services.print_queue import PrinterQueueIndex, PrintQueueManager
+
+
+def make_index(durations, status='queued'):
+    jobs = [uuid4() for _ in durations]
+    return jobs, PrinterQueueIndex((job, duration, status) for job, duration in zip(jobs, durations))
+
+
+class TestPrinterQueueIndex:
+    """Test positions and prefix sums"""
+
+    def test_positions_and_offsets(self):
+        jobs, queue = make_index([100, 200, 300])
+
+        assert [queue.position(job) for job in jobs] == [1, 2, 3]
+        assert [queue.start_offset(job) for job in jobs] == [0, 100, 300]
+        assert queue.total_seconds == 600
+
+    def test_append_and_remove(self):
+        jobs, queue = make_index([100, 200, 300])
+        extra = uuid4()
+
+        assert queue.append(extra, 50) == 4
+        assert queue.remove(jobs[1]) == 2
+        assert queue.position(jobs[2]) == 2
+        assert queue.start_offset(extra) == 400
+        assert queue.remove(jobs[1]) is None
+        assert len(queue) == 3
+
+    def test_set_duration_moves_later_starts(self):
+        jobs, queue = make_index([100, 200, 300])
+
+        assert queue.set_duration(jobs[0], 160)
+        assert not queue.set_duration(jobs[0], 160)
+        assert queue.start_offset(jobs[2]) == 360
+        assert queue.total_seconds == 660
+
+    def test_compaction_keeps_order(self):
+        jobs, queue = make_index(range(1, 201))
+
+        for job in jobs[:150]:
+            queue.remove(job)
+
+        assert queue.job_ids() == jobs[150:]
+        assert queue.start_offset(jobs[199]) == sum(range(151, 200))
+        assert len(queue._jobs) < 200
+
+    def test_reorder_keeps_running_job_first(self):
+        jobs, queue = make_index([10, 20, 30, 40])
+        queue.set_status(jobs[0], 'processing')
+
+        queue.reorder([jobs[3], jobs[1]])
+
+        assert queue.job_ids() == [jobs[0], jobs[3], jobs[1], jobs[2]]
+        assert queue.start_offset(jobs[2]) == 70
+
+    def test_reorder_rejects_unknown_jobs(self):
+        _, queue = make_index([10])
+
+        with pytest.raises(ValueError):
+            queue.reorder([uuid4()])
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    PrintJob.metadata.create_all(engine, tables=[PrintJob.__table__, PrintQueue.__table__])
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    try:
+        with engine.begin() as connection:
+            connection.statements = statements
+            yield connection
+    finally:
+        engine.dispose()
+
+
+def add_jobs(db, printer_id, durations):
+    """Insert queued jobs through the manager; rows hold what it computed"""
+    manager = PrintQueueManager()
+    manager.load(printer_id, [])
+    jobs = []
+    for duration in durations:
+        job = SimpleNamespace(id=uuid4(), printer_id=printer_id, tempo_estimado_segundos=duration)
+        item = SimpleNamespace()
+        manager.add(db, item, job)
+        db.execute(insert(PrintJob.__table__).values(
+            id=job.id, user_id=uuid4(), printer_id=printer_id, material_id=uuid4(), nome="job",
+            arquivo_modelo="modelo.stl", tempo_estimado_segundos=duration, fila_posicao=job.fila_posicao
+        ))
+        db.execute(insert(PrintQueue.__table__).values(
+            id=uuid4(), printer_id=printer_id, print_job_id=job.id, status='queued', posicao=item.posicao,
+            estimado_inicio=item.estimado_inicio, estimado_conclusao=item.estimado_conclusao
+        ))
+        jobs.append(job)
+    return manager, jobs
+
+
+def stored_positions(db, printer_id):
+    columns = PrintQueue.__table__.c
+    rows = db.execute(
+        select(columns.print_job_id, columns.posicao)
+        .where(columns.printer_id == printer_id, columns.status == 'queued')
+        .order_by(columns.posicao)
+    )
+    return [tuple(row) for row in rows]
+
+
+class TestPrintQueueManager:
+    """Test positions written to the database"""
+
+    def test_add_sets_positions_and_etas(self):
+        manager = PrintQueueManager()
+        printer_id = uuid4()
+        manager.load(printer_id, [])
+        jobs = [SimpleNamespace(id=uuid4(), printer_id=printer_id, tempo_estimado_segundos=duration)
+                for duration in (600, 1200, 60)]
+        items = [SimpleNamespace() for _ in jobs]
+
+        for item, job in zip(items, jobs):
+            manager.add(None, item, job)
+
+        assert [item.posicao for item in items] == [1, 2, 3]
+        assert [job.fila_posicao for job in jobs] == [1, 2, 3]
+        assert (items[2].estimado_inicio - items[0].estimado_inicio).total_seconds() == pytest.approx(1800, abs=1)
+        assert (items[2].estimado_conclusao - items[2].estimado_inicio).total_seconds() == 60
+
+    def test_reorder_writes_in_bulk(self, db):
+        printer_id = uuid4()
+        manager, jobs = add_jobs(db, printer_id, [60] * 300)
+        new_order = [job.id for job in reversed(jobs)]
+        db.statements.clear()
+
+        manager.reorder(db, printer_id, new_order)
+
+        updates = [sql for sql in db.statements if sql.lstrip().upper().startswith("UPDATE")]
+        assert len(updates) == len(db.statements) == 3
+        assert stored_positions(db, printer_id) == [(job_id, index) for index, job_id in enumerate(new_order, 1)]
+        fila = db.execute(select(PrintJob.__table__.c.fila_posicao).where(PrintJob.__table__.c.id == jobs[0].id))
+        assert fila.scalar() == 300
+
+    def test_remove_renumbers_following_jobs(self, db):
+        printer_id = uuid4()
+        manager, jobs = add_jobs(db, printer_id, [60, 60, 60])
+        db.execute(update(PrintQueue.__table__).where(PrintQueue.__table__.c.print_job_id == jobs[0].id)
+                   .values(status='cancelled'))
+
+        assert manager.remove(db, jobs[0]) == 1
+
+        assert stored_positions(db, printer_id) == [(jobs[1].id, 1), (jobs[2].id, 2)]
+        assert manager.loaded(printer_id).total_seconds == 120
+
+    def test_rebuild_renumbers_position_gaps(self, db):
+        printer_id = uuid4()
+        manager, jobs = add_jobs(db, printer_id, [60, 60, 60])
+        db.execute(update(PrintQueue.__table__).where(PrintQueue.__table__.c.print_job_id == jobs[1].id)
+                   .values(status='cancelled'))
+        manager.load(printer_id, [(jobs[0].id, 60, 'queued'), (jobs[2].id, 60, 'queued')])
+
+        assert manager._renumber_gaps(db, printer_id, [1, 3])
+        assert stored_positions(db, printer_id) == [(jobs[0].id, 1), (jobs[2].id, 2)]
+        assert not manager._renumber_gaps(db, printer_id, [1, 2])
+
+    def test_new_duration_moves_later_etas(self, db):
+        printer_id = uuid4()
+        manager, jobs = add_jobs(db, printer_id, [60, 60, 60])
+        columns = PrintQueue.__table__.c
+        before = db.execute(select(columns.estimado_inicio).where(columns.print_job_id == jobs[2].id)).scalar()
+
+        jobs[0].tempo_estimado_segundos = 3660
+        manager.update_duration(db, jobs[0])
+
+        after = db.execute(select(columns.estimado_inicio).where(columns.print_job_id == jobs[2].id)).scalar()
+        assert (after - before).total_seconds() == pytest.approx(3600, abs=5)
+
+    def test_discard_drops_only_given_printers(self):
+        manager = PrintQueueManager()
+        kept, dropped = uuid4(), uuid4()
+        manager.load(kept, [(uuid4(), 60, 'queued')])
+        manager.load(dropped, [(uuid4(), 60, 'queued')])
+
+        manager.discard([dropped, uuid4()])
+
+        assert manager.loaded(dropped) is None
+        assert len(manager.loaded(kept)) == 1
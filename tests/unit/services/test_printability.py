@@ -0,0 +1,117 @@
+"""
+Unit tests for vectorized printability analysis
+Testing overhang buckets, support volume, wall thickness and bed contact
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+trimesh = pytest.importorskip("trimesh")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.printability import (
+    GridRayCaster,
+    analyze_printability,
+    overhang_angles,
+    printability_report,
+)
+
+
+def box(extents, center):
+    mesh = trimesh.creation.box(extents=extents)
+    mesh.apply_translation(center)
+    return mesh
+
+
+@pytest.fixture
+def bridged_parts():
+    """Base 10 mm na mesa, placa 2 mm sobre ela e placa 2 mm flutuando ao lado"""
+    return trimesh.util.concatenate([
+        box([10, 10, 10], [0, 0, 5]),
+        box([10, 10, 2], [0, 0, 21]),
+        box([10, 10, 2], [30, 0, 21]),
+    ])
+
+
+class TestGridRayCaster:
+    """Test the grid ray caster against trimesh geometry"""
+
+    def test_matches_analytic_sphere_chords(self):
+        """Test rays from the center hit a sphere at its radius"""
+        sphere = trimesh.creation.icosphere(subdivisions=4, radius=10.0)
+        caster = GridRayCaster(sphere.triangles)
+        rng = np.random.default_rng(1)
+        directions = rng.normal(size=(300, 3))
+        directions /= np.linalg.norm(directions, axis=1)[:, None]
+
+        distances, faces = caster.first_hit(np.zeros((300, 3)), directions, 50.0)
+
+        assert np.all(faces >= 0)
+        assert np.allclose(distances, 10.0, rtol=0.01)
+
+    def test_misses_and_max_distance(self):
+        """Test rays pointing away or too short report no hit"""
+        caster = GridRayCaster(box([10, 10, 10], [0, 0, 0]).triangles)
+        origins = np.array([[0, 0, 20.0], [0, 0, 20.0]])
+        directions = np.array([[0, 0, 1.0], [0, 0, -1.0]])
+
+        distances, _ = caster.first_hit(origins, directions, np.array([100.0, 10.0]))
+
+        assert np.all(np.isinf(distances))
+
+
+class TestAnalyzePrintability:
+    """Test metrics computed over the whole mesh"""
+
+    def test_cube_on_bed(self):
+        """Test a cube has full bed contact, no overhang and walls as thick as the cube"""
+        metrics = analyze_printability(box([20, 20, 20], [0, 0, 10]))
+
+        assert metrics.bed_contact_area_mm2 == pytest.approx(400.0)
+        assert metrics.critical_overhang_area_mm2 == 0.0
+        assert metrics.support_volume_mm3 == 0.0
+        assert metrics.min_wall_thickness_mm == pytest.approx(20.0)
+        assert metrics.volume_mm3 == pytest.approx(8000.0)
+
+    def test_support_stops_at_part_below(self, bridged_parts):
+        """Test support columns end on the part below or on the bed"""
+        metrics = analyze_printability(bridged_parts, samples=4096)
+
+        # 100 mm² x 10 mm sobre a base + 100 mm² x 20 mm até a mesa
+        assert metrics.support_volume_mm3 == pytest.approx(3000.0, rel=0.05)
+        assert metrics.overhang_area_mm2["75-90"] == pytest.approx(200.0)
+        assert metrics.bed_contact_area_mm2 == pytest.approx(100.0)
+
+    def test_thin_wall(self):
+        """Test a 0.5 mm plate is reported below the minimum wall thickness"""
+        plate = box([30, 30, 0.5], [0, 0, 0.25])
+        metrics = analyze_printability(plate)
+        report = printability_report(metrics)
+
+        assert metrics.min_wall_thickness_mm == pytest.approx(0.5)
+        assert metrics.thin_wall_area_mm2 > 0.9 * 2 * 900
+        assert any("Paredes finas" in warning for warning in report["warnings"])
+        assert report["printable"] is True
+
+    def test_overhang_buckets_sum_to_downward_area(self):
+        """Test bucketed overhang area equals the area of downward faces off the bed"""
+        sphere = trimesh.creation.icosphere(subdivisions=3, radius=10.0)
+        metrics = analyze_printability(sphere, samples=0)
+        downward = sphere.face_normals[:, 2] < 0
+
+        assert sum(metrics.overhang_area_mm2.values()) == pytest.approx(
+            sphere.area_faces[downward].sum()
+        )
+        assert metrics.ray_samples == 0
+        assert metrics.min_wall_thickness_mm is None
+
+
+def test_overhang_angles():
+    """Test angles are measured from vertical walls (0) to flat ceilings (90)"""
+    normals = np.array([[1.0, 0, 0], [0, 0, -1.0], [0, 0, 1.0], [0, -np.sqrt(0.5), -np.sqrt(0.5)]])
+
+    assert overhang_angles(normals) == pytest.approx([0.0, 90.0, 0.0, 45.0])
@@ -0,0 +1,136 @@
+"""
+Unit tests for the batched PyBullet simulation engine
+Testing multi-trial drop tests in a single physics world
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+p = pytest.importorskip("pybullet")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.simulation_engine import BatchedDropTestEngine, StressTestEngine
+
+
+@pytest.fixture
+def physics_client():
+    """Cliente PyBullet DIRECT isolado por teste"""
+    client = p.connect(p.DIRECT)
+    yield client
+    p.disconnect(client)
+
+
+@pytest.fixture
+def box_shape(physics_client):
+    """Shape de colisão de uma caixa de 5 cm"""
+    return p.createCollisionShape(
+        p.GEOM_BOX, halfExtents=[0.025, 0.025, 0.025], physicsClientId=physics_client
+    )
+
+
+class TestBatchedDropTestEngine:
+    """Test batched drop test engine"""
+
+    def test_creates_one_body_per_drop(self, physics_client, box_shape):
+        """Test engine creates N bodies plus a ground plane"""
+        engine = BatchedDropTestEngine(physics_client, box_shape)
+        bodies = engine.setup(6)
+
+        assert len(bodies) == 6
+        assert engine.ground_id is not None
+        assert p.getNumBodies(physicsClientId=physics_client) == 7
+
+    def test_run_fills_preallocated_arrays(self, physics_client, box_shape):
+        """Test samples are returned as (steps, drops, 3) arrays"""
+        engine = BatchedDropTestEngine(physics_client, box_shape)
+        run = engine.run(num_drops=4, drop_height=1.0)
+
+        assert run["positions"].shape == (run["num_steps"], 4, 3)
+        assert run["velocities"].shape == (run["num_steps"], 4, 3)
+        assert run["num_steps"] <= engine.max_steps
+
+    def test_all_drops_hit_ground_and_settle(self, physics_client, box_shape):
+        """Test every copy touches the ground and settles before max time"""
+        engine = BatchedDropTestEngine(physics_client, box_shape)
+        run = engine.run(num_drops=5, drop_height=1.0)
+
+        assert (run["contact_step"] > 0).all()
+        assert (run["settle_step"] > run["contact_step"]).all()
+        assert run["num_steps"] < engine.max_steps
+
+        # Queda livre de 1 m leva ~0.45 s (~108 passos a 240 Hz)
+        assert abs(run["contact_step"][0] - 108) < 15
+
+    def test_copies_do_not_interact(self, physics_client, box_shape):
+        """Test identical drops produce identical trajectories"""
+        engine = BatchedDropTestEngine(physics_client, box_shape)
+        run = engine.run(num_drops=3, drop_height=0.5)
+
+        z = run["positions"][:, :, 2]
+        assert np.allclose(z, z[:, :1], atol=1e-6)
+
+    def test_analyze_matches_result_format(self, physics_client, box_shape):
+        """Test per-drop results keep the service's result keys"""
+        engine = BatchedDropTestEngine(physics_client, box_shape)
+        testes = engine.analyze(engine.run(num_drops=2, drop_height=1.0))
+
+        assert [t["numero_teste"] for t in testes] == [0, 1]
+        for teste in testes:
+            assert set(teste) >= {
+                "altura_queda", "velocidade_impacto", "tempo_impacto",
+                "posicao_impacto", "rebotes", "tempo_ate_repouso"
+            }
+            assert teste["velocidade_impacto"] < 0
+            assert isinstance(teste["rebotes"], int)
+
+    def test_engine_reuses_world_between_runs(self, physics_client, box_shape):
+        """Test a second run reuses the loaded world and drops extra copies"""
+        engine = BatchedDropTestEngine(physics_client, box_shape)
+        engine.run(num_drops=4, drop_height=1.0)
+        first_bodies = list(engine.body_ids)
+        run = engine.run(num_drops=2, drop_height=1.0)
+
+        assert engine.body_ids == first_bodies[:2]
+        assert run["positions"].shape[1] == 2
+        assert p.getNumBodies(physicsClientId=physics_client) == 3
+
+
+class TestStressTestEngine:
+    """Test rupture search in a reused physics world"""
+
+    def test_adaptive_matches_linear_with_fewer_evaluations(self, physics_client, box_shape):
+        """Test bisection finds the linear rupture force within tolerance"""
+        engine = StressTestEngine(physics_client, box_shape, mass=50.0)
+        linear = engine.linear_search(1000, 10, [0, 0, 1])
+        adaptive = engine.adaptive_search(1000, [0, 0, 1], initial_step=10, tolerance=10)
+
+        assert linear["ponto_ruptura"] is not None
+        assert abs(adaptive["ponto_ruptura"] - linear["ponto_ruptura"]) <= 10
+        assert adaptive["avaliacoes"] < linear["avaliacoes"] / 3
+        assert adaptive["avaliacoes"] == len(adaptive["testes_forca"])
+
+    def test_no_rupture_below_max_force(self, physics_client, box_shape):
+        """Test the search stops at max_force when nothing ruptures"""
+        engine = StressTestEngine(physics_client, box_shape, mass=50.0)
+        result = engine.adaptive_search(100, [0, 0, 1], initial_step=10, tolerance=1)
+
+        assert result["ponto_ruptura"] is None
+        assert result["testes_forca"][-1]["forca"] == 100
+        assert not any(t["ruptura"] for t in result["testes_forca"])
+
+    def test_evaluations_reuse_loaded_body(self, physics_client, box_shape):
+        """Test every evaluation restores the same body from its rest state"""
+        engine = StressTestEngine(physics_client, box_shape)
+        engine.setup()
+        body_id = engine.body_id
+        first = engine.evaluate(5.0, [0, 0, 1])
+        engine.evaluate(500.0, [0, 0, 1])
+        again = engine.evaluate(5.0, [0, 0, 1])
+
+        assert engine.body_id == body_id
+        assert p.getNumBodies(physicsClientId=physics_client) == 2
+        assert again["deslocamento"] == pytest.approx(first["deslocamento"], abs=1e-9)
@@ -0,0 +1,97 @@
+"""
+Unit tests for simulation execution backends
+Testing non-blocking submission, cancellation and backend selection
+"""
+
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.simulation_executor import (
+    CeleryExecutor,
+    InlineExecutor,
+    LocalProcessExecutor,
+    create_simulation_executor,
+)
+
+
+def slow_job(simulation_id, model_path, simulation_data):
+    """Job de teste que simula uma execução demorada"""
+    time.sleep(simulation_data.get("sleep", 0.5))
+    return {"simulation_id": simulation_id, "status": "completed"}
+
+
+def failing_job(simulation_id, model_path, simulation_data):
+    raise RuntimeError("falha simulada")
+
+
+@pytest.fixture
+def fork_context():
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("fork indisponível nesta plataforma")
+    return multiprocessing.get_context("fork")
+
+
+class TestInlineExecutor:
+    """Test synchronous execution used in tests"""
+
+    def test_runs_job_during_submit(self):
+        """Test the job result is available right after submit"""
+        executor = InlineExecutor(job=slow_job, on_cancel=lambda sid: None)
+        executor.submit("sim-1", "model.stl", {"sleep": 0})
+
+        assert executor.results["sim-1"]["status"] == "completed"
+
+    def test_failure_does_not_propagate(self):
+        """Test job errors are recorded instead of raised to the caller"""
+        executor = InlineExecutor(job=failing_job, on_cancel=lambda sid: None)
+        executor.submit("sim-1", "model.stl", {})
+
+        assert isinstance(executor.results["sim-1"], RuntimeError)
+
+
+class TestLocalProcessExecutor:
+    """Test the local process pool backend"""
+
+    def test_submit_returns_immediately(self, fork_context):
+        """Test submit does not wait for the simulation to finish"""
+        executor = LocalProcessExecutor(max_workers=1, job=slow_job,
+                                        on_cancel=lambda sid: None, mp_context=fork_context)
+        try:
+            start = time.perf_counter()
+            executor.submit("sim-1", "model.stl", {"sleep": 0.5})
+            assert time.perf_counter() - start < 0.25
+
+            result = executor.future("sim-1").result(timeout=10)
+            assert result["status"] == "completed"
+        finally:
+            executor.shutdown()
+
+    def test_cancel_pending_simulation(self, fork_context):
+        """Test a queued simulation is cancelled and marked in the database hook"""
+        cancelled = []
+        executor = LocalProcessExecutor(max_workers=1, job=slow_job,
+                                        on_cancel=cancelled.append, mp_context=fork_context)
+        try:
+            executor.submit("sim-1", "model.stl", {"sleep": 0.5})
+            executor.submit("sim-2", "model.stl", {"sleep": 0.5})
+            executor.submit("sim-3", "model.stl", {"sleep": 0.5})
+
+            assert executor.cancel("sim-3") is True
+            assert cancelled == ["sim-3"]
+        finally:
+            executor.shutdown()
+
+
+def test_backend_selection():
+    """Test backends are chosen by name and unknown names are rejected"""
+    assert isinstance(create_simulation_executor("celery"), CeleryExecutor)
+    assert isinstance(create_simulation_executor("inline"), InlineExecutor)
+
+    with pytest.raises(ValueError):
+        create_simulation_executor("threads")
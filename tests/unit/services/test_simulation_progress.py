@@ -0,0 +1,185 @@
+"""
+Unit tests for real-time simulation progress
+Testing event throttling and delivery to WebSocket rooms
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services import simulation_progress
+from backend.services.simulation_progress import (
+    SimulationProgressRelay,
+    SimulationProgressReporter,
+    progress_channel,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+
+class FakeManager:
+    def __init__(self):
+        self.sent = []
+
+    async def send_to_room(self, room_name, message):
+        self.sent.append((room_name, message))
+
+
+class FakePubSub:
+    """Subscription that delivers its messages, then drops or stays open"""
+
+    def __init__(self, messages, drop):
+        self.messages = messages
+        self.drop = drop
+        self.closed = False
+
+    async def psubscribe(self, pattern):
+        self.pattern = pattern
+
+    async def listen(self):
+        for data in self.messages:
+            yield {"type": "pmessage", "data": data}
+        if self.drop:
+            raise ConnectionError("Connection closed by server")
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeAsyncRedis:
+    def __init__(self, sessions):
+        self.sessions = list(sessions)
+        self.opened = []
+
+    def pubsub(self, ignore_subscribe_messages=True):
+        self.opened.append(self.sessions.pop(0))
+        return self.opened[-1]
+
+
+class TestSimulationProgressReporter:
+    """Test throttled progress publishing"""
+
+    def test_limits_event_rate(self):
+        """Test at most max_rate events per second are published"""
+        clock, redis_client = FakeClock(), FakeRedis()
+        reporter = SimulationProgressReporter("sim-1", redis_client, max_rate=5, clock=clock)
+
+        # 1000 chamadas ao longo de 2 s de relógio
+        for i in range(1000):
+            clock.now = i * 0.002
+            reporter(i / 1000, {"passo": i})
+
+        assert len(redis_client.published) == 10
+        channel, event = redis_client.published[-1]
+        assert channel == progress_channel("sim-1")
+        assert event["simulation_id"] == "sim-1"
+
+    def test_force_and_monotonic_progress(self):
+        """Test forced events bypass the limit and progress never goes back"""
+        clock, redis_client = FakeClock(), FakeRedis()
+        reporter = SimulationProgressReporter("sim-1", redis_client, start=25, end=75, clock=clock)
+
+        reporter(0.8)
+        reporter(0.2, force=True)
+        reporter(1.0, force=True)
+
+        progress = [event["progress"] for _, event in redis_client.published]
+        assert progress == [65.0, 65.0, 75.0]
+
+
+class TestSimulationProgressRelay:
+    """Test forwarding of published events to simulation rooms"""
+
+    def test_delivers_to_simulation_room(self):
+        """Test a published event reaches the simulation_<id> room"""
+        manager = FakeManager()
+        relay = SimulationProgressRelay(manager)
+        data = json.dumps({"simulation_id": "abc", "event": "progress", "progress": 50})
+
+        assert asyncio.run(relay.handle_message(data)) is True
+        assert manager.sent == [("simulation_abc", {"simulation_id": "abc", "event": "progress",
+                                                    "progress": 50})]
+
+    def test_ignores_malformed_messages(self):
+        """Test invalid payloads are dropped without raising"""
+        manager = FakeManager()
+        relay = SimulationProgressRelay(manager)
+
+        assert asyncio.run(relay.handle_message(b"not json")) is False
+        assert asyncio.run(relay.handle_message(json.dumps({"event": "progress"}))) is False
+        assert manager.sent == []
+
+
+    def test_resubscribes_after_connection_loss(self, monkeypatch):
+        """Test the relay keeps delivering after Redis drops the subscription"""
+        monkeypatch.setattr(simulation_progress, "RELAY_RECONNECT_MIN_SECONDS", 0.01)
+        manager = FakeManager()
+        relay = SimulationProgressRelay(manager)
+        event = lambda progress: json.dumps({"simulation_id": "abc", "progress": progress})
+        relay._client = FakeAsyncRedis([
+            FakePubSub([event(10)], drop=True),
+            FakePubSub([], drop=True),
+            FakePubSub([event(20)], drop=False),
+        ])
+
+        async def scenario():
+            await relay._subscribe()
+            relay._task = asyncio.create_task(relay._listen())
+            for _ in range(100):
+                if len(manager.sent) == 2:
+                    break
+                await asyncio.sleep(0.01)
+            relay._client, client = None, relay._client
+            await relay.stop()
+            return client
+
+        client = asyncio.run(scenario())
+
+        assert [message["progress"] for _, message in manager.sent] == [10, 20]
+        assert [pubsub.closed for pubsub in client.opened] == [True, True, True]
+
+
+def test_fluid_engine_reports_partial_metrics():
+    """Test the fluid loop calls the progress callback with partial metrics"""
+    np = pytest.importorskip("numpy")
+    trimesh = pytest.importorskip("trimesh")
+    p = pytest.importorskip("pybullet")
+    from backend.services.fluid_drag import FluidDragEngine, ProjectedAreaTable
+
+    client = p.connect(p.DIRECT)
+    try:
+        cube = trimesh.creation.box(extents=[0.05, 0.05, 0.05])
+        shape = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.025] * 3, physicsClientId=client)
+        table = ProjectedAreaTable.from_mesh(cube.vertices, cube.faces, num_directions=16)
+        calls = []
+
+        FluidDragEngine(client, shape, table).run(
+            1.0, fluid_density=1.2, drag_coefficient=0.47, start_height=100,
+            progress=lambda fraction, metrics: calls.append((fraction, metrics))
+        )
+
+        assert len(calls) == 10
+        assert [c[0] for c in calls] == sorted(c[0] for c in calls)
+        assert calls[-1][1]["velocidade"] > 0
+    finally:
+        p.disconnect(client)
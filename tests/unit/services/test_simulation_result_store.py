@@ -0,0 +1,187 @@
+"""
+Unit tests for the simulation result store
+Testing summary/series split, columnar encoding and content-addressed keys
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.simulation_result_store import (
+    SimulationResultStore,
+    decode_series,
+    encode_series,
+    join_result,
+    split_result,
+)
+
+
+class FakeRedis:
+    """Redis mínimo em memória (get/setex/pipeline)"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+
+@pytest.fixture
+def fluid_result():
+    """Resultado de teste de fluido com 500 amostras"""
+    return {
+        "tipo": "fluid",
+        "status": "completed",
+        "metricas": {"velocidade_terminal": 12.5, "coeficiente_arrasto": 0.47},
+        "resistencia": [
+            {"tempo": i / 240, "velocidade": 0.1 * i, "posicao": [0.0, 0.0, 10 - i * 0.01]}
+            for i in range(500)
+        ],
+    }
+
+
+class TestSplitResult:
+    """Test summary/series separation"""
+
+    def test_record_lists_become_series(self, fluid_result):
+        """Test numeric record lists move out of the summary"""
+        summary, series = split_result(fluid_result)
+
+        assert "resistencia" not in summary
+        assert summary["series"]["resistencia"]["length"] == 500
+        assert series["resistencia"]["posicao"].shape == (500, 3)
+        assert summary["metricas"] == fluid_result["metricas"]
+
+    def test_small_or_mixed_lists_stay_in_summary(self):
+        """Test short lists and non-numeric records are kept as-is"""
+        result = {
+            "testes": [{"numero_teste": 0, "rebotes": 1}],
+            "recomendacoes": ["a", "b"] * 10,
+            "eventos": [{"tipo": "impacto", "tempo": float(i)} for i in range(20)],
+        }
+        summary, series = split_result(result)
+
+        assert series == {}
+        assert summary == result
+
+    def test_join_restores_original(self, fluid_result):
+        """Test join_result rebuilds the record lists"""
+        summary, series = split_result(fluid_result)
+        restored = join_result(summary, series)
+
+        assert restored == fluid_result
+
+
+class TestSeriesEncoding:
+    """Test columnar compressed encoding"""
+
+    def test_round_trip(self, fluid_result):
+        """Test encode/decode preserves every column"""
+        _, series = split_result(fluid_result)
+        decoded = decode_series(encode_series(series))
+
+        for name, columns in series.items():
+            for column, values in columns.items():
+                assert np.array_equal(decoded[name][column], values)
+
+    def test_decode_is_zero_copy_view(self, fluid_result):
+        """Test decoded arrays are views over the decompressed buffer"""
+        _, series = split_result(fluid_result)
+        decoded = decode_series(encode_series(series))
+
+        array = decoded["resistencia"]["velocidade"]
+        assert not array.flags.owndata
+        assert not array.flags.writeable
+
+    def test_column_filter(self, fluid_result):
+        """Test decoding a subset of columns"""
+        _, series = split_result(fluid_result)
+        decoded = decode_series(encode_series(series), columns=["tempo"])
+
+        assert list(decoded["resistencia"]) == ["tempo"]
+
+    def test_encoded_is_smaller_than_json(self, fluid_result):
+        """Test the compressed blob is smaller than the JSON records"""
+        _, series = split_result(fluid_result)
+
+        assert len(encode_series(series)) < len(json.dumps(fluid_result["resistencia"]))
+
+    def test_invalid_blob_rejected(self):
+        """Test blobs without the magic header are rejected"""
+        with pytest.raises(ValueError):
+            decode_series(b"not a series blob")
+
+
+class TestSimulationResultStore:
+    """Test Redis cache and per-simulation persistence"""
+
+    def test_cache_key_uses_mesh_content(self, tmp_path):
+        """Test editing the model file changes the cache key"""
+        model = tmp_path / "model.stl"
+        model.write_bytes(b"solid a\nendsolid a\n")
+        key_before = SimulationResultStore.cache_key(str(model), "drop_test", {"num_drops": 5})
+
+        model.write_bytes(b"solid bb\nendsolid bb\n")
+        key_after = SimulationResultStore.cache_key(str(model), "drop_test", {"num_drops": 5})
+
+        assert key_before != key_after
+        assert key_before.startswith("simulation:v")
+
+    def test_cache_key_does_not_reread_unchanged_mesh(self, tmp_path, monkeypatch):
+        """Test the mesh hash is memoized while the file is unchanged"""
+        from backend.services import simulation_result_store
+
+        model = tmp_path / "model.stl"
+        model.write_bytes(b"solid a\nendsolid a\n")
+        key = SimulationResultStore.cache_key(str(model), "drop_test", {"num_drops": 5})
+
+        def no_read(path):
+            raise AssertionError("malha lida de novo")
+
+        monkeypatch.setattr(simulation_result_store, "file_content_hash", no_read)
+
+        assert SimulationResultStore.cache_key(str(model), "drop_test", {"num_drops": 3}) != key
+        assert SimulationResultStore.cache_key(str(model), "drop_test", {"num_drops": 5}) == key
+
+    def test_cache_round_trip(self, tmp_path, fluid_result):
+        """Test cached results come back complete"""
+        store = SimulationResultStore(FakeRedis(), results_path=tmp_path)
+        store.cache("simulation:test", fluid_result)
+
+        assert store.get_cached("simulation:test") == fluid_result
+        assert "resistencia" not in store.get_cached_summary("simulation:test")
+
+    def test_cache_disabled_without_redis(self, tmp_path, fluid_result):
+        """Test the store is a no-op without Redis"""
+        store = SimulationResultStore(None, results_path=tmp_path)
+        store.cache("simulation:test", fluid_result)
+
+        assert store.get_cached("simulation:test") is None
+
+    def test_save_and_load_for_simulation(self, tmp_path, fluid_result):
+        """Test summary is JSON-ready and series persist on disk"""
+        store = SimulationResultStore(None, results_path=tmp_path)
+        fluid_result["metricas"]["pontos"] = np.int64(500)
+        summary = store.save_for_simulation("sim-1", fluid_result)
+
+        json.dumps(summary)
+        series = store.load_series("sim-1", names=["resistencia"], columns=["velocidade"])
+        assert series["resistencia"]["velocidade"].shape == (500,)
+
+        store.delete_for_simulation("sim-1")
+        assert store.load_series("sim-1") == {}
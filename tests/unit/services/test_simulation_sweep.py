@@ -0,0 +1,239 @@
+"""
+Unit tests for simulation parameter sweeps
+Testing grid expansion, per-process world reuse and streamed results
+"""
+
+import asyncio
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+trimesh = pytest.importorskip("trimesh")
+p = pytest.importorskip("pybullet")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services import simulation_sweep
+from backend.services.geometry_metrics import DEFAULT_MATERIAL_DENSITY, compute_geometry_metrics
+from backend.services.simulation_result_store import SimulationResultStore
+from backend.services.simulation_service import SimulationService
+from backend.services.simulation_sweep import (
+    SimulationSweepRunner,
+    expand_parameter_grid,
+    run_sweep_point,
+)
+
+
+@pytest.fixture
+def box_stl(tmp_path):
+    """Caixa de 5 cm salva como STL"""
+    path = tmp_path / "box.stl"
+    trimesh.creation.box(extents=[0.05, 0.05, 0.05]).export(str(path))
+    return path
+
+
+@pytest.fixture
+def geometry():
+    """Métricas de uma caixa de 50 mm, como gravadas em `metricas_geometria`"""
+    return compute_geometry_metrics(trimesh.creation.box(extents=[50, 50, 50])).to_dict()
+
+
+def _record_mass(service, name, masses):
+    """Envolver um método do serviço registrando o `mass` recebido"""
+    original = getattr(service, name)
+
+    def wrapper(*args, **kwargs):
+        masses.append(kwargs["mass"])
+        return original(*args, **kwargs)
+
+    setattr(service, name, wrapper)
+
+
+async def _collect(aiter):
+    return [event async for event in aiter]
+
+
+class TestExpandParameterGrid:
+    """Test cartesian grid expansion"""
+
+    def test_cartesian_product_over_base(self):
+        """Test every combination is produced on top of the base parameters"""
+        points = expand_parameter_grid(
+            {"num_drops": 3},
+            {"drop_height": [0.5, 1.0], "mass": [0.1, 0.2, 0.3]}
+        )
+
+        assert len(points) == 6
+        assert all(point["num_drops"] == 3 for point in points)
+        assert {(pt["drop_height"], pt["mass"]) for pt in points} == {
+            (h, m) for h in (0.5, 1.0) for m in (0.1, 0.2, 0.3)
+        }
+
+    def test_range_includes_stop(self):
+        """Test {start, stop, step} ranges include the stop value"""
+        points = expand_parameter_grid({}, {"mass": {"start": 0.1, "stop": 0.5, "step": 0.1}})
+
+        assert [pt["mass"] for pt in points] == [0.1, 0.2, 0.3, 0.4, 0.5]
+
+    def test_rejects_grid_over_limit(self):
+        """Test grids larger than the point limit are rejected"""
+        with pytest.raises(ValueError):
+            expand_parameter_grid({}, {"a": list(range(20)), "b": list(range(20))}, max_points=100)
+
+    def test_rejects_invalid_range(self):
+        """Test ranges with a non-positive step are rejected"""
+        with pytest.raises(ValueError):
+            expand_parameter_grid({}, {"mass": {"start": 1, "stop": 2, "step": 0}})
+
+
+class TestSweepPoint:
+    """Test sweep points run in a persistent world"""
+
+    def test_points_reuse_loaded_world(self, box_stl, monkeypatch):
+        """Test consecutive drop points share one client and collision shape"""
+        monkeypatch.setattr(simulation_sweep, "_worker_service", None)
+
+        first = run_sweep_point(0, str(box_stl), "drop_test", {"drop_height": 0.5, "num_drops": 2})
+        world = simulation_sweep._worker_service.world
+        second = run_sweep_point(1, str(box_stl), "drop_test", {"drop_height": 1.0, "num_drops": 3, "mass": 2.0})
+
+        assert first["status"] == second["status"] == "completed"
+        assert simulation_sweep._worker_service.world is world
+        assert len(world._shapes) == 1
+        assert len(second["resultado"]["testes"]) == 3
+        assert second["resultado"]["testes"][0]["altura_queda"] == pytest.approx(1.0, abs=0.01)
+        world.close()
+
+
+class TestWorkerModelMass:
+    """Test workers take the body mass from the model geometry record"""
+
+    @pytest.mark.parametrize("simulation_type, method, parameters", [
+        ("drop_test", "_run_batched_drop_test", {"drop_height": 0.5, "num_drops": 1}),
+        ("fluid", "_run_fluid_drag", {"test_duration": 0.5}),
+    ])
+    def test_async_execution_uses_geometry_mass(self, box_stl, geometry, tmp_path,
+                                                simulation_type, method, parameters):
+        """Test the Celery entry point forwards metricas_geometria to the mass"""
+        service = SimulationService()
+        service.result_store = SimulationResultStore(None, tmp_path / "results")
+        masses = []
+        _record_mass(service, method, masses)
+
+        result = service.execute_simulation_async(None, str(box_stl), {
+            "tipo": simulation_type,
+            "parametros": parameters,
+            "metricas_geometria": geometry
+        })
+
+        assert result["status"] == "completed"
+        assert masses == [pytest.approx(125000 * DEFAULT_MATERIAL_DENSITY / 1e6)]
+
+    def test_sweep_point_uses_geometry_mass(self, box_stl, geometry, tmp_path, monkeypatch):
+        """Test sweep points without an explicit mass use the geometry record"""
+        monkeypatch.setattr(simulation_sweep, "_worker_service", None)
+        service = simulation_sweep._get_worker_service()
+        service.result_store = SimulationResultStore(None, tmp_path / "results")
+        masses = []
+        _record_mass(service, "_run_batched_drop_test", masses)
+
+        event = run_sweep_point(0, str(box_stl), "drop_test",
+                                {"drop_height": 0.5, "num_drops": 1}, geometry)
+        service.world.close()
+
+        assert event["status"] == "completed"
+        assert masses == [pytest.approx(125000 * DEFAULT_MATERIAL_DENSITY / 1e6)]
+
+
+class TestSweepRunner:
+    """Test streamed sweep execution"""
+
+    def test_streams_points_and_completion(self, monkeypatch):
+        """Test each point yields one event plus a final summary event"""
+        def fake_point(index, model_path, simulation_type, parameters, geometry=None):
+            return {"index": index, "parametros": parameters, "status": "completed"}
+
+        monkeypatch.setattr(simulation_sweep, "run_sweep_point", fake_point)
+        runner = SimulationSweepRunner(executor=ThreadPoolExecutor(max_workers=2))
+        points = expand_parameter_grid({}, {"drop_height": [0.5, 1.0, 1.5]})
+
+        events = asyncio.run(_collect(runner.run("model.stl", "drop_test", points)))
+        runner.shutdown()
+
+        assert sorted(e["index"] for e in events[:-1]) == [0, 1, 2]
+        assert events[-1]["status"] == "complete"
+        assert events[-1]["completed"] == 3
+
+    def test_invalid_points_are_not_executed(self, monkeypatch):
+        """Test points failing validation are reported without running"""
+        executed = []
+
+        def fake_point(index, model_path, simulation_type, parameters, geometry=None):
+            executed.append(index)
+            return {"index": index, "parametros": parameters, "status": "completed"}
+
+        def validator(simulation_type, parameters):
+            valid = parameters["drop_height"] <= 5.0
+            return {"valid": valid, "errors": [] if valid else ["altura"]}
+
+        monkeypatch.setattr(simulation_sweep, "run_sweep_point", fake_point)
+        runner = SimulationSweepRunner(executor=ThreadPoolExecutor(max_workers=1))
+        points = expand_parameter_grid({}, {"drop_height": [1.0, 10.0]})
+
+        events = asyncio.run(_collect(runner.run("model.stl", "drop_test", points, validator)))
+        runner.shutdown()
+
+        assert executed == [0]
+        assert [e["status"] for e in events] == ["invalid", "completed", "complete"]
+        assert events[-1]["invalid"] == 1
+
+    def test_failed_point_keeps_its_parameters(self, monkeypatch):
+        """Test an exception in a point is reported with its index and parameters"""
+        def fake_point(index, model_path, simulation_type, parameters, geometry=None):
+            if index == 1:
+                raise RuntimeError("malha inválida")
+            return {"index": index, "parametros": parameters, "status": "completed"}
+
+        monkeypatch.setattr(simulation_sweep, "run_sweep_point", fake_point)
+        runner = SimulationSweepRunner(executor=ThreadPoolExecutor(max_workers=1))
+        points = expand_parameter_grid({}, {"drop_height": [0.5, 1.0]})
+
+        events = asyncio.run(_collect(runner.run("model.stl", "drop_test", points)))
+        runner.shutdown()
+
+        failed = [e for e in events if e["status"] == "failed"]
+        assert failed == [{"index": 1, "parametros": {"drop_height": 1.0}, "status": "failed",
+                           "error": "malha inválida"}]
+        assert events[-1]["failed"] == 1
+
+    def test_closing_stream_cancels_pending_points(self, monkeypatch):
+        """Test a consumer that stops early leaves queued points unexecuted"""
+        release = threading.Event()
+        executed = []
+
+        def fake_point(index, model_path, simulation_type, parameters, geometry=None):
+            executed.append(index)
+            if index > 0:
+                release.wait(5)
+            return {"index": index, "parametros": parameters, "status": "completed"}
+
+        async def first_event(events):
+            event = await events.__anext__()
+            await events.aclose()
+            return event
+
+        monkeypatch.setattr(simulation_sweep, "run_sweep_point", fake_point)
+        executor = ThreadPoolExecutor(max_workers=1)
+        runner = SimulationSweepRunner(executor=executor)
+        points = expand_parameter_grid({}, {"drop_height": [0.5, 1.0, 1.5, 2.0]})
+
+        event = asyncio.run(first_event(runner.run("model.stl", "drop_test", points)))
+        release.set()
+        executor.shutdown(wait=True)
+
+        assert event["index"] == 0
+        assert executed[0] == 0 and not {2, 3} & set(executed)
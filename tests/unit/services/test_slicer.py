@@ -0,0 +1,153 @@
+"""
+Unit tests for the in-process slicer
+Testing contour stitching, offsets, infill, G-code output and the print job integration
+"""
+
+import asyncio
+import io
+import re
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+trimesh = pytest.importorskip("trimesh")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.gcode_stream import GcodeFileSink, is_generating
+from backend.services.slicer import (
+    SliceSettings,
+    iter_gcode,
+    offset_contour,
+    rectilinear_infill,
+    signed_area,
+    slice_mesh,
+    slice_to_gcode,
+)
+
+
+@pytest.fixture
+def box():
+    return trimesh.creation.box(extents=[20, 10, 5])
+
+
+def square(size):
+    return np.array([[0, 0], [size, 0], [size, size], [0, size]], dtype=np.float64)
+
+
+class TestSliceMesh:
+    """Test plane intersection and stitching"""
+
+    def test_box_layers_are_closed_and_counterclockwise(self, box):
+        contours, open_chains = slice_mesh(box.vertices, box.faces, np.array([-2.0, 0.0, 2.0]))
+
+        assert open_chains == 0
+        assert [len(layer) for layer in contours] == [1, 1, 1]
+        for layer in contours:
+            assert signed_area(layer[0]) == pytest.approx(200)
+
+    def test_hole_is_clockwise(self):
+        mesh = trimesh.creation.annulus(r_min=3, r_max=6, height=4)
+
+        contours, _ = slice_mesh(mesh.vertices, mesh.faces, np.array([0.1]))
+        areas = sorted(signed_area(c) for c in contours[0])
+
+        assert areas[0] < 0 < areas[1]
+        assert -areas[0] == pytest.approx(np.pi * 9, rel=0.05)
+        assert areas[1] == pytest.approx(np.pi * 36, rel=0.05)
+
+    def test_open_mesh_reports_chains(self, box):
+        walls = box.faces[np.abs(box.face_normals[:, 2]) < 0.5]
+
+        _, open_chains = slice_mesh(box.vertices, walls[2:], np.array([0.0]))
+
+        assert open_chains > 0
+
+
+class TestContourGeometry:
+    """Test offsets and infill lines"""
+
+    def test_offset_shrinks_outer_contour(self):
+        inner = offset_contour(square(10), 1.0)
+
+        assert signed_area(inner) == pytest.approx(64)
+
+    def test_offset_collapse_returns_none(self):
+        assert offset_contour(square(1), 0.6) is None
+
+    def test_full_density_infill_covers_area(self):
+        segments = rectilinear_infill([square(10)], spacing=0.5, angle_deg=0)
+        length = np.linalg.norm(segments[:, 1] - segments[:, 0], axis=1).sum()
+
+        assert length * 0.5 == pytest.approx(100, rel=0.05)
+        assert segments[:, :, 0].min() >= 0 and segments[:, :, 0].max() <= 10
+
+
+class TestSliceToGcode:
+    """Test the streamed G-code and its totals"""
+
+    def test_gcode_layers_and_extrusion(self, box):
+        stream = io.StringIO()
+
+        result = slice_to_gcode(box.vertices, box.faces, SliceSettings(), stream)
+        gcode = stream.getvalue()
+        e_values = [float(v) for v in re.findall(r"^G1 X\S+ Y\S+ E(\S+)", gcode, re.M)]
+
+        assert result.layers == 25
+        assert gcode.count(";LAYER:") == 25
+        assert np.all(np.diff(e_values) > 0)
+        assert result.open_contours == 0
+        assert result.bounds_mm[0][2] == pytest.approx(0)
+
+    def test_chunks_match_stream_output(self, box):
+        stream = io.StringIO()
+        slice_to_gcode(box.vertices, box.faces, SliceSettings(), stream)
+
+        chunks = list(iter_gcode(box.vertices, box.faces, SliceSettings()))
+
+        assert len(chunks) >= 25
+        assert "".join(chunks) == stream.getvalue()
+
+    def test_statistics_without_stream_match(self, box):
+        settings = SliceSettings(infill_density=100)
+
+        written = slice_to_gcode(box.vertices, box.faces, settings, io.StringIO())
+        counted = slice_to_gcode(box.vertices, box.faces, settings)
+
+        assert counted.print_time_s == pytest.approx(written.print_time_s)
+        assert counted.filament_length_mm == pytest.approx(written.filament_length_mm)
+        # Peça maciça: filamento próximo do volume do sólido
+        assert counted.filament_volume_mm3 == pytest.approx(1000, rel=0.15)
+
+
+class TestPrintJobIntegration:
+    """Test Print3DService writes sliced G-code"""
+
+    def test_generate_gcode_writes_file(self, box, tmp_path, monkeypatch):
+        from backend.services import print3d_service
+
+        model_path = tmp_path / "box.stl"
+        box.export(str(model_path))
+        monkeypatch.setattr(print3d_service, "GCODE_STORAGE_PATH", tmp_path / "gcode")
+        job = SimpleNamespace(id="1", arquivo_modelo=str(model_path), altura_camada=0.2,
+                              percentual_preenchimento=20, velocidade_impressao=50,
+                              temperatura_bico=None, temperatura_mesa=None, paredes_duplas=True,
+                              velocidade_ventilador=50, camadas_totais=None)
+        printer = SimpleNamespace(volume_impressao_x=220, volume_impressao_y=220,
+                                  velocidade_viagem_padrao=150)
+        material = SimpleNamespace(temperatura_bico_recomendada=210, temperatura_mesa_recomendada=60,
+                                   distancia_retração=4.0, velocidade_retração=25)
+
+        service = print3d_service.Print3DService()
+        sink = GcodeFileSink(service._gcode_output_path(job)).open()
+
+        path = asyncio.run(service._generate_gcode_cura(job, printer, material, sink))
+        gcode = Path(path).read_text()
+
+        assert job.camadas_totais == 25
+        assert "M109 S210" in gcode and "M190 S60" in gcode
+        assert "G1 X0 Y110 F3000" in gcode
+        assert not is_generating(path)